@@ -15,6 +15,12 @@ sys.path.insert(0, str(project_root))
 
 # Import our database configuration
 from src.core.config import settings  # noqa: E402
+from src.core.database import metadata  # noqa: E402
+from src.domain.attendance import repository as _attendance  # noqa: E402,F401
+from src.domain.classes import repository as _classes  # noqa: E402,F401
+from src.domain.notifications import jobs as _notifications  # noqa: E402,F401
+from src.domain.payments import repository as _payments  # noqa: E402,F401
+from src.domain.waitlist import repository as _waitlist  # noqa: E402,F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -29,13 +35,17 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = None
+target_metadata = metadata
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# Tenant schemas are migrated with `alembic -x schema=school_<tenant> upgrade head`
+# (see src/scripts/migrate_tenants.py); without it the default schema is used.
+target_schema = context.get_x_argument(as_dictionary=True).get("schema", settings.DATABASE_SCHEMA)
+
 
 def get_database_url() -> str:
     """Get the database URL from our application settings.
@@ -65,7 +75,7 @@ def run_migrations_offline() -> None:
         dialect_opts={"paramstyle": "named"},
         # Include schema in migration context
         include_schemas=True,
-        version_table_schema=settings.DATABASE_SCHEMA,
+        version_table_schema=target_schema,
     )
 
     with context.begin_transaction():
@@ -86,7 +96,7 @@ def run_migrations_online() -> None:
         database_url,
         poolclass=pool.NullPool,
         # Set the default schema
-        connect_args={"options": f"-csearch_path={settings.DATABASE_SCHEMA}"}
+        connect_args={"options": f"-csearch_path={target_schema}"}
     )
 
     with connectable.connect() as connection:
@@ -95,7 +105,7 @@ def run_migrations_online() -> None:
             target_metadata=target_metadata,
             # Include schema in migration context
             include_schemas=True,
-            version_table_schema=settings.DATABASE_SCHEMA,
+            version_table_schema=target_schema,
         )
 
         with context.begin_transaction():
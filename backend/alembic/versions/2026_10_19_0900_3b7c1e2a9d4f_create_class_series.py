@@ -0,0 +1,47 @@
+"""Create class series
+
+Revision ID: 3b7c1e2a9d4f
+Revises: 859efdfc3f9f
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7c1e2a9d4f'
+down_revision: Union[str, Sequence[str], None] = '859efdfc3f9f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Series are stored as rules; sessions are expanded per query window
+    op.create_table(
+        'class_series',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('studio_id', sa.Uuid(), nullable=False),
+        sa.Column('instructor_id', sa.Uuid(), nullable=False),
+        sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('duration_minutes', sa.Integer(), nullable=False),
+        sa.Column('timezone', sa.String(length=64), nullable=False),
+        sa.Column('recurrence', sa.Text(), nullable=False),
+        sa.Column('location', sa.String(length=200), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sequence', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_class_series_studio_id', 'class_series', ['studio_id'])
+    op.create_index('ix_class_series_instructor_id', 'class_series', ['instructor_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_class_series_instructor_id', table_name='class_series')
+    op.drop_index('ix_class_series_studio_id', table_name='class_series')
+    op.drop_table('class_series')
@@ -0,0 +1,41 @@
+"""Create expected payments
+
+Revision ID: 8e2d4a6c1f05
+Revises: 3b7c1e2a9d4f
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2d4a6c1f05'
+down_revision: Union[str, Sequence[str], None] = '3b7c1e2a9d4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'expected_payments',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('reference', sa.String(length=140), nullable=False),
+        sa.Column('amount_cents', sa.Integer(), nullable=False),
+        sa.Column('due_on', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('matched_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('statement_line', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # Reconciliation scans pending payments by keyset pagination on id
+    op.create_index('ix_expected_payments_status_id', 'expected_payments', ['status', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expected_payments_status_id', table_name='expected_payments')
+    op.drop_table('expected_payments')
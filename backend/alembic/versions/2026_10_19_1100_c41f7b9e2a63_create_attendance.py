@@ -0,0 +1,45 @@
+"""Create attendance and class capacity
+
+Revision ID: c41f7b9e2a63
+Revises: 8e2d4a6c1f05
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7b9e2a63'
+down_revision: Union[str, Sequence[str], None] = '8e2d4a6c1f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('class_series', sa.Column('capacity', sa.Integer(), nullable=False, server_default='20'))
+    op.create_table(
+        'attendance',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('series_id', sa.Uuid(), nullable=False),
+        sa.Column('session_id', sa.Uuid(), nullable=False),
+        sa.Column('student_id', sa.Uuid(), nullable=False),
+        sa.Column('instructor_id', sa.Uuid(), nullable=False),
+        sa.Column('studio_id', sa.Uuid(), nullable=False),
+        sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # Reports scan a time range; retention looks up the first check-in per student
+    op.create_index('ix_attendance_starts_at', 'attendance', ['starts_at'])
+    op.create_index('ix_attendance_student_id_starts_at', 'attendance', ['student_id', 'starts_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendance_student_id_starts_at', table_name='attendance')
+    op.drop_index('ix_attendance_starts_at', table_name='attendance')
+    op.drop_table('attendance')
+    op.drop_column('class_series', 'capacity')
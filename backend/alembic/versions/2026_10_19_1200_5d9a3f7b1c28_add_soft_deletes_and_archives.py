@@ -0,0 +1,82 @@
+"""Add class series soft deletes and archive tables
+
+Revision ID: 5d9a3f7b1c28
+Revises: c41f7b9e2a63
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9a3f7b1c28'
+down_revision: Union[str, Sequence[str], None] = 'c41f7b9e2a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('class_series', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    # Only deleted series are indexed; the archival job finds them without a scan
+    op.create_index(
+        'ix_class_series_deleted_at',
+        'class_series',
+        ['deleted_at'],
+        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+    )
+
+    op.create_table(
+        'class_series_archive',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('studio_id', sa.Uuid(), nullable=False),
+        sa.Column('instructor_id', sa.Uuid(), nullable=False),
+        sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('duration_minutes', sa.Integer(), nullable=False),
+        sa.Column('timezone', sa.String(length=64), nullable=False),
+        sa.Column('recurrence', sa.Text(), nullable=False),
+        sa.Column('location', sa.String(length=200), nullable=True),
+        sa.Column('capacity', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sequence', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'attendance_archive',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('series_id', sa.Uuid(), nullable=False),
+        sa.Column('session_id', sa.Uuid(), nullable=False),
+        sa.Column('student_id', sa.Uuid(), nullable=False),
+        sa.Column('instructor_id', sa.Uuid(), nullable=False),
+        sa.Column('studio_id', sa.Uuid(), nullable=False),
+        sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'expected_payments_archive',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('reference', sa.String(length=140), nullable=False),
+        sa.Column('amount_cents', sa.Integer(), nullable=False),
+        sa.Column('due_on', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('matched_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('statement_line', sa.Integer(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('expected_payments_archive')
+    op.drop_table('attendance_archive')
+    op.drop_table('class_series_archive')
+    op.drop_index('ix_class_series_deleted_at', table_name='class_series')
+    op.drop_column('class_series', 'deleted_at')
@@ -0,0 +1,87 @@
+"""Create session seats, waitlists and notification jobs
+
+Revision ID: 7f3c2e9a4b16
+Revises: 5d9a3f7b1c28
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3c2e9a4b16'
+down_revision: Union[str, Sequence[str], None] = '5d9a3f7b1c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'session_seats',
+        sa.Column('session_id', sa.Uuid(), nullable=False),
+        sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('ends_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('capacity', sa.Integer(), nullable=False),
+        sa.Column('seats_taken', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('waitlist_version', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('session_id'),
+    )
+    op.create_table(
+        'seat_reservations',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('session_id', sa.Uuid(), nullable=False),
+        sa.Column('student_id', sa.Uuid(), nullable=False),
+        sa.Column('reserved_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id', 'student_id', name='uq_seat_reservations_session_id_student_id'),
+    )
+    # Schedule conflict checks look up the seats of the candidates
+    op.create_index('ix_seat_reservations_student_id', 'seat_reservations', ['student_id'])
+    op.create_table(
+        'waitlist_entries',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('session_id', sa.Uuid(), nullable=False),
+        sa.Column('student_id', sa.Uuid(), nullable=False),
+        sa.Column('tier', sa.SmallInteger(), nullable=False),
+        sa.Column('signed_up_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id', 'student_id', name='uq_waitlist_entries_session_id_student_id'),
+    )
+    # A session's waitlist in promotion order; loading it needs no sort
+    op.create_index(
+        'ix_waitlist_entries_priority',
+        'waitlist_entries',
+        ['session_id', 'tier', 'signed_up_at', 'id'],
+    )
+    op.create_table(
+        'notification_jobs',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('kind', sa.String(length=64), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # Only unsent jobs are indexed; the sender picks them up oldest first
+    op.create_index(
+        'ix_notification_jobs_pending',
+        'notification_jobs',
+        ['created_at'],
+        postgresql_where=sa.text('sent_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notification_jobs_pending', table_name='notification_jobs')
+    op.drop_table('notification_jobs')
+    op.drop_index('ix_waitlist_entries_priority', table_name='waitlist_entries')
+    op.drop_table('waitlist_entries')
+    op.drop_index('ix_seat_reservations_student_id', table_name='seat_reservations')
+    op.drop_table('seat_reservations')
+    op.drop_table('session_seats')
@@ -0,0 +1,51 @@
+"""Add delivery state to notification jobs
+
+Revision ID: a2d8e4f1c937
+Revises: 7f3c2e9a4b16
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2d8e4f1c937'
+down_revision: Union[str, Sequence[str], None] = '7f3c2e9a4b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'notification_jobs',
+        sa.Column('available_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.alter_column('notification_jobs', 'available_at', server_default=None)
+    op.add_column('notification_jobs', sa.Column('failed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('notification_jobs', sa.Column('last_error', sa.Text(), nullable=True))
+    # Only pending jobs are indexed; the sender picks up those that are due
+    op.drop_index('ix_notification_jobs_pending', table_name='notification_jobs')
+    op.create_index(
+        'ix_notification_jobs_pending',
+        'notification_jobs',
+        ['available_at'],
+        postgresql_where=sa.text('sent_at IS NULL AND failed_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notification_jobs_pending', table_name='notification_jobs')
+    op.create_index(
+        'ix_notification_jobs_pending',
+        'notification_jobs',
+        ['created_at'],
+        postgresql_where=sa.text('sent_at IS NULL'),
+    )
+    op.drop_column('notification_jobs', 'last_error')
+    op.drop_column('notification_jobs', 'failed_at')
+    op.drop_column('notification_jobs', 'available_at')
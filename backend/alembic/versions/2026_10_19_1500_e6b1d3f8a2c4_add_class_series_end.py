@@ -0,0 +1,36 @@
+"""Add the end of class series
+
+Revision ID: e6b1d3f8a2c4
+Revises: a2d8e4f1c937
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1d3f8a2c4'
+down_revision: Union[str, Sequence[str], None] = 'a2d8e4f1c937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing series keep NULL, read as open-ended, until they are next saved
+    op.add_column('class_series', sa.Column('ends_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('class_series_archive', sa.Column('ends_at', sa.DateTime(timezone=True), nullable=True))
+    # Schedules load the series overlapping a window
+    op.create_index('ix_class_series_starts_at', 'class_series', ['starts_at'])
+    op.create_index('ix_class_series_ends_at', 'class_series', ['ends_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_class_series_ends_at', table_name='class_series')
+    op.drop_index('ix_class_series_starts_at', table_name='class_series')
+    op.drop_column('class_series_archive', 'ends_at')
+    op.drop_column('class_series', 'ends_at')
@@ -0,0 +1,33 @@
+"""Add the email of waiting students
+
+Revision ID: b83e5c1d9f47
+Revises: e6b1d3f8a2c4
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83e5c1d9f47'
+down_revision: Union[str, Sequence[str], None] = 'e6b1d3f8a2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Entries from before have no address; their promotion notifications are given up
+    op.add_column(
+        'waitlist_entries',
+        sa.Column('email', sa.String(length=320), nullable=False, server_default=''),
+    )
+    op.alter_column('waitlist_entries', 'email', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('waitlist_entries', 'email')
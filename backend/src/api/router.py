@@ -5,9 +5,13 @@ for different API versions and endpoints.
 """
 from fastapi import APIRouter
 
-from src.api.v1 import healthcheck, users
+from src.api.v1 import calendar, classes, debug, healthcheck, reports, users
 
 router = APIRouter()
 
 router.include_router(healthcheck.router, tags=["health"])
+router.include_router(debug.router, tags=["debug"], include_in_schema=False)
 router.include_router(users.router, tags=["users"])
+router.include_router(calendar.router, tags=["calendar"])
+router.include_router(classes.router, tags=["classes"])
+router.include_router(reports.router, tags=["reports"])
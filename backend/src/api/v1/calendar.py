@@ -0,0 +1,61 @@
+"""Calendar feed endpoints module.
+
+This module serves the iCalendar feeds students, instructors and studios
+subscribe to in their calendar apps.
+"""
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from src.core.config import settings
+from src.core.exceptions import EntityNotFoundError
+from src.domain.calendar.feeds import FeedCache, SessionSource, parse_feed_token
+from src.domain.classes.repository import ClassSeriesRepository
+from src.domain.classes.schedule import ClassSchedule
+from src.domain.classes.schemas import ClassSeries
+from src.domain.waitlist.repository import WaitlistRepository
+
+router = APIRouter()
+
+feed_cache = FeedCache()
+
+
+def invalidate_series_feeds(before: Optional[ClassSeries], after: Optional[ClassSeries]) -> None:
+    """Drop the feeds showing the sessions of a changed class series."""
+    feed_cache.invalidate_owners(
+        {owner for series in (before, after) if series is not None for owner in series.owners()}
+    )
+
+
+ClassSeriesRepository.subscribe(invalidate_series_feeds)
+
+
+def get_session_source() -> SessionSource:
+    """Get the source of the sessions shown in feeds."""
+    return ClassSchedule(ClassSeriesRepository(), WaitlistRepository())
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check whether an If-None-Match header matches an ETag."""
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+@router.get("/calendar/{token}.ics", response_class=Response)
+async def get_calendar_feed(
+    token: str,
+    source: Annotated[SessionSource, Depends(get_session_source)],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    try:
+        owner = parse_feed_token(token)
+    except EntityNotFoundError as error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message) from error
+
+    feed = await feed_cache.get(owner, source)
+    headers = {"ETag": feed.etag, "Cache-Control": f"private, max-age={settings.CALENDAR_FEED_MAX_AGE}"}
+    if etag_matches(if_none_match, feed.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=feed.body, media_type="text/calendar; charset=utf-8", headers=headers)
@@ -0,0 +1,115 @@
+"""Class schedule endpoints module.
+
+This module exposes the recurring class series, the sessions generated from
+them, and a Server-Sent Events stream of their seat availability.
+"""
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from typing import Annotated, Any, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+
+from src.core.broadcast import Subscription, broadcaster
+from src.core.config import settings
+from src.core.listing import ListQuery, list_query, set_total
+from src.core.repositories.base import BaseRepository
+from src.core.response_cache import cache_response, purge
+from src.domain.calendar.schemas import ClassSession
+from src.domain.classes.availability import availability_topic
+from src.domain.classes.repository import ClassSeriesRepository
+from src.domain.classes.schedule import ClassSchedule
+from src.domain.classes.schemas import ClassSeries
+
+router = APIRouter()
+
+# Longest window a single request may expand
+MAX_WINDOW = timedelta(days=93)
+
+
+def purge_class_sessions(before: Optional[ClassSeries], after: Optional[ClassSeries]) -> None:
+    """Purge the cached session lists after a class series changed."""
+    purge("classes")
+
+
+ClassSeriesRepository.subscribe(purge_class_sessions)
+
+
+def get_class_schedule() -> ClassSchedule:
+    """Get the schedule sessions are expanded from."""
+    return ClassSchedule(ClassSeriesRepository())
+
+
+def get_class_series_repository() -> BaseRepository[ClassSeries]:
+    """Get the repository class series are listed from."""
+    return ClassSeriesRepository()
+
+
+@router.get("/classes/series", response_model=list[ClassSeries])
+async def list_class_series(
+    query: Annotated[ListQuery, Depends(list_query(ClassSeriesRepository))],
+    repository: Annotated[BaseRepository[ClassSeries], Depends(get_class_series_repository)],
+    response: Response,
+) -> list[ClassSeries]:
+    if query.total is not None:
+        set_total(response, await repository.count(filters=query.filters, mode=query.total))
+    return await repository.list(filters=query.filters, order_by=query.order_by, offset=query.offset, limit=query.limit)
+
+
+@router.get(
+    "/classes/sessions",
+    response_model=list[ClassSession],
+    dependencies=[Depends(cache_response(60, ["classes"]))],
+)
+async def list_class_sessions(
+    start: datetime,
+    end: datetime,
+    schedule: Annotated[ClassSchedule, Depends(get_class_schedule)],
+    studio_id: Optional[UUID] = None,
+    instructor_id: Optional[UUID] = None,
+) -> list[ClassSession]:
+    if start.tzinfo is None or end.tzinfo is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start and end need a UTC offset")
+    if not start < end <= start + MAX_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"end must be after start and within {MAX_WINDOW.days} days",
+        )
+
+    filters: dict[str, Any] = {}
+    if studio_id is not None:
+        filters["studio_id"] = studio_id
+    if instructor_id is not None:
+        filters["instructor_id"] = instructor_id
+    occurrences = await schedule.occurrences(start, end, filters or None)
+    return [occurrence.to_session() for occurrence in occurrences]
+
+
+async def event_stream(subscription: Subscription, heartbeat: float) -> AsyncIterator[str]:
+    """Render a subscription as Server-Sent Events, with heartbeats while idle."""
+    yield f"retry: {int(heartbeat * 1000)}\n\n"
+    while True:
+        message = await subscription.get(timeout=heartbeat)
+        yield ": heartbeat\n\n" if message is None else message.to_sse()
+
+
+@router.get("/classes/availability", response_class=StreamingResponse)
+async def stream_availability(session_id: Annotated[list[UUID], Query()]) -> StreamingResponse:
+    if len(session_id) > settings.SSE_MAX_TOPICS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"at most {settings.SSE_MAX_TOPICS} sessions per stream",
+        )
+    topics = [availability_topic(session) for session in session_id]
+
+    async def stream() -> AsyncIterator[str]:
+        with broadcaster.subscribe(topics) as subscription:
+            async for chunk in event_stream(subscription, settings.SSE_HEARTBEAT_INTERVAL):
+                yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,87 @@
+"""Debug endpoints module.
+
+This module lets operators profile a live worker and inspect its memory
+allocations. The endpoints are only served when ``DEBUG_ENDPOINTS_ENABLED`` is
+set and the caller sends ``DEBUG_TOKEN`` in the ``X-Debug-Token`` header;
+otherwise they answer 404 as if they did not exist. Each request reaches a
+single worker, the one that happened to accept it.
+"""
+import asyncio
+import hmac
+import os
+import time
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+
+from src.core.config import settings
+from src.core.profiling import (
+    AllocationReport,
+    ProfilerBusyError,
+    allocation_tracker,
+    profiler,
+)
+
+
+def require_debug_access(x_debug_token: Annotated[Optional[str], Header()] = None) -> None:
+    """Reject requests unless the debug endpoints are enabled and the token matches."""
+    if not settings.DEBUG_ENDPOINTS_ENABLED or not settings.DEBUG_TOKEN:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_debug_token is None or not hmac.compare_digest(x_debug_token.encode(), settings.DEBUG_TOKEN.encode()):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="invalid debug token")
+
+
+router = APIRouter(prefix="/debug", dependencies=[Depends(require_debug_access)])
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(seconds: Annotated[float, Query(gt=0)] = 10.0) -> PlainTextResponse:
+    """Sample the stacks of all threads of this worker and return them as collapsed stacks.
+
+    Render the file with ``flamegraph.pl``, or open it in speedscope. Runs are
+    capped at ``DEBUG_PROFILE_MAX_SECONDS``; one runs at a time per worker.
+
+    Returns:
+        PlainTextResponse: One ``frame;frame;frame count`` line per distinct stack.
+    """
+    try:
+        result = await profiler.profile(seconds)
+    except ProfilerBusyError as error:
+        raise HTTPException(status.HTTP_409_CONFLICT, detail=str(error)) from error
+    filename = f"profile-{os.getpid()}-{time.strftime('%Y%m%dT%H%M%S')}.folded"
+    return PlainTextResponse(
+        result.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(result.samples),
+        },
+    )
+
+
+@router.post("/allocations/snapshots", response_model=AllocationReport)
+async def take_allocation_snapshot(
+    limit: Annotated[int, Query(ge=1, le=500)] = 20, compare_to: Optional[int] = None
+) -> AllocationReport:
+    """Take a snapshot of the memory allocated by this worker, starting allocation tracing if needed.
+
+    The first snapshot starts tracing and only sees what is allocated afterwards.
+    Take another one later with ``compare_to`` set to the number of the first to
+    see which source lines hold more memory than before.
+
+    Returns:
+        AllocationReport: The snapshot number and its largest allocations or growths.
+    """
+    try:
+        return await asyncio.to_thread(allocation_tracker.snapshot, limit, compare_to)
+    except ProfilerBusyError as error:
+        raise HTTPException(status.HTTP_409_CONFLICT, detail=str(error)) from error
+    except KeyError as error:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"snapshot {compare_to} not found") from error
+
+
+@router.delete("/allocations", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_allocation_tracing() -> Response:
+    """Stop tracing allocations and drop the snapshots of this worker."""
+    await asyncio.to_thread(allocation_tracker.stop)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -2,10 +2,15 @@
 
 This module provides endpoints for health checking and monitoring the API service.
 """
+import time
 from datetime import datetime
-from typing import Dict
+from typing import Any, Dict
 
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from src.core.health import health_monitor
+from src.core.loop_monitor import render_metrics
 
 router = APIRouter()
 
@@ -18,3 +23,63 @@ async def ping() -> Dict[str, str]:
         Dict[str, str]: A dictionary with the current UTC timestamp.
     """
     return {"response": f"pong {datetime.utcnow().isoformat()}"}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Export runtime metrics, such as event loop lag, in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: The metrics.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/health/live")
+async def live() -> Dict[str, str]:
+    """Report that the worker process is running and its event loop responds.
+
+    Never touches the database: a database outage must not get workers restarted.
+
+    Returns:
+        Dict[str, str]: The liveness status.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def ready() -> JSONResponse:
+    """Report whether the worker should receive traffic, from the background-refreshed dependency status.
+
+    Returns:
+        JSONResponse: The readiness state, the reasons when not ready and the dependency status; 200 when
+        ready and 503 otherwise, including while the worker is draining.
+    """
+    readiness = health_monitor.readiness()
+    body: dict[str, Any] = {"status": readiness.state, "reasons": readiness.reasons}
+    dependencies = readiness.status
+    if dependencies is not None:
+        body["checked_seconds_ago"] = round(time.monotonic() - dependencies.checked_at, 3)
+        body["database"] = {
+            "reachable": dependencies.database_reachable,
+            "failures": dependencies.database_failures,
+            "breaker": "open" if dependencies.breaker_open else "closed",
+            "error": dependencies.error,
+        }
+        body["pool"] = (
+            {
+                "checked_out": dependencies.pool.checked_out,
+                "capacity": dependencies.pool.capacity,
+                "saturation": round(dependencies.pool.saturation, 3),
+            }
+            if dependencies.pool is not None
+            else None
+        )
+        body["migrations"] = {
+            "state": dependencies.migrations,
+            "current": list(dependencies.current_revisions),
+            "head": list(dependencies.head_revisions),
+        }
+    return JSONResponse(
+        body, status_code=status.HTTP_200_OK if readiness.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
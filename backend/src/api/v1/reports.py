@@ -0,0 +1,121 @@
+"""Owner report endpoints module.
+
+This module exposes retention cohorts, attendance heatmaps, instructor
+utilization and a columnar export of the underlying check-ins.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Annotated, Optional
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from src.domain.attendance.repository import AttendanceRepository
+from src.domain.classes.repository import ClassSeriesRepository
+from src.domain.classes.schedule import ClassSchedule
+from src.domain.reports.analytics import (
+    attendance_heatmap,
+    instructor_utilization,
+    retention_cohorts,
+)
+from src.domain.reports.columns import (
+    AttendanceColumns,
+    OfferedSessions,
+    load_attendance_columns,
+    load_offered_sessions,
+)
+from src.domain.reports.schemas import (
+    AttendanceHeatmap,
+    InstructorUtilization,
+    RetentionReport,
+)
+
+router = APIRouter()
+
+# Longest window a single report may cover
+MAX_WINDOW = timedelta(days=366)
+
+
+def get_attendance_repository() -> AttendanceRepository:
+    """Get the repository reports are computed from."""
+    return AttendanceRepository()
+
+
+def get_report_schedule() -> ClassSchedule:
+    """Get the schedule offered sessions are expanded from."""
+    return ClassSchedule(ClassSeriesRepository())
+
+
+class ReportWindow:
+    """Validated time window, time zone and studio of a report request."""
+
+    def __init__(
+        self,
+        start: datetime,
+        end: datetime,
+        timezone: Annotated[str, Query()] = "Europe/Lisbon",
+        studio_id: Optional[UUID] = None,
+    ) -> None:
+        """Validate the query parameters."""
+        if start.tzinfo is None or end.tzinfo is None:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start and end need a UTC offset")
+        if not start < end <= start + MAX_WINDOW:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"end must be after start and within {MAX_WINDOW.days} days",
+            )
+        try:
+            self.tz = ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError) as error:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"unknown time zone {timezone!r}"
+            ) from error
+        self.start = start
+        self.end = end
+        self.studio_id = studio_id
+
+    async def columns(self, repository: AttendanceRepository) -> AttendanceColumns:
+        """Load the check-ins of the window."""
+        return await load_attendance_columns(repository, self.start, self.end, self.studio_id)
+
+    async def offered(self, schedule: ClassSchedule) -> OfferedSessions:
+        """Load the sessions scheduled in the window."""
+        return await load_offered_sessions(schedule, self.start, self.end, self.studio_id)
+
+
+Window = Annotated[ReportWindow, Depends()]
+Repository = Annotated[AttendanceRepository, Depends(get_attendance_repository)]
+Schedule = Annotated[ClassSchedule, Depends(get_report_schedule)]
+
+
+@router.get("/reports/retention", response_model=RetentionReport)
+async def get_retention_report(window: Window, repository: Repository) -> RetentionReport:
+    columns = await window.columns(repository)
+    return await asyncio.to_thread(retention_cohorts, columns, window.start, window.end, window.tz)
+
+
+@router.get("/reports/attendance-heatmap", response_model=AttendanceHeatmap)
+async def get_attendance_heatmap(window: Window, repository: Repository) -> AttendanceHeatmap:
+    columns = await window.columns(repository)
+    return await asyncio.to_thread(attendance_heatmap, columns, window.tz)
+
+
+@router.get("/reports/instructor-utilization", response_model=list[InstructorUtilization])
+async def get_instructor_utilization(
+    window: Window, repository: Repository, schedule: Schedule
+) -> list[InstructorUtilization]:
+    columns, offered = await asyncio.gather(window.columns(repository), window.offered(schedule))
+    return await asyncio.to_thread(instructor_utilization, columns, offered)
+
+
+@router.get("/reports/attendance.npz", response_class=Response)
+async def export_attendance(window: Window, repository: Repository) -> Response:
+    columns = await window.columns(repository)
+    body = await asyncio.to_thread(columns.to_npz)
+    filename = f"attendance-{window.start:%Y%m%d}-{window.end:%Y%m%d}.npz"
+    return Response(
+        content=body,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
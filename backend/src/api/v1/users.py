@@ -1,7 +1,8 @@
 from typing import List
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from src.core.response_cache import cache_response, purge
 from src.domain.users.schemas import UserCreate
 
 router = APIRouter()
@@ -9,16 +10,17 @@ router = APIRouter()
 
 @router.post("/users")
 async def create_user(user: UserCreate) -> dict[str, str]:
+    purge("users")
     return {"message": f"Welcome in Boneca dear {user.name}"}
 
 
-@router.get("/users")
+@router.get("/users", dependencies=[Depends(cache_response(60, ["users"]))])
 async def list_users() -> dict[str, List[dict]]:
     # This is a placeholder implementation
     return {"users": []}
 
 
-@router.get("/users/{user_id}")
+@router.get("/users/{user_id}", dependencies=[Depends(cache_response(60, ["user:{user_id}"]))])
 async def get_user(user_id: int) -> dict[str, str]:
     # This is a placeholder implementation
     return {"user_id": str(user_id), "message": "User details would be here"}
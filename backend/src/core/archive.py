@@ -0,0 +1,156 @@
+"""Hot/cold data tiering.
+
+Hot tables keep only the live working set. Rows that are no longer read on hot
+paths (long soft-deleted rows, sessions of closed terms, settled payments) are
+moved into ``<table>_archive`` tables by the archival job, so hot tables and
+their indexes stay small. Historical lookups read the archive explicitly
+(``SQLRepository.get_archived`` and ``list_archived``).
+
+Rows are moved in small batches, each in its own transaction: copying and
+deleting a batch holds row locks only briefly and never produces one huge
+transaction, so the job can run next to live traffic.
+"""
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Connection,
+    DateTime,
+    Engine,
+    Table,
+    delete,
+    insert,
+    literal,
+    select,
+)
+
+from src.core.config import settings
+from src.core.database import get_engine, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def archive_table(table: Table) -> Table:
+    """Define the archive table of a hot table.
+
+    The archive has the same columns (without defaults and secondary indexes)
+    plus ``archived_at``, and lives in the same metadata, so Alembic manages it
+    like any other table.
+
+    Args:
+        table: Hot table with an ``id`` primary key
+
+    Returns:
+        The ``<table>_archive`` table
+    """
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+        for column in table.columns
+    ]
+    return Table(
+        f"{table.name}_archive",
+        table.metadata,
+        *columns,
+        Column("archived_at", DateTime(timezone=True), nullable=False),
+    )
+
+
+@dataclass(frozen=True)
+class ArchivePolicy:
+    """Which rows of a hot table are moved to its archive.
+
+    Attributes:
+        table: Hot table.
+        archive: Archive table (see ``archive_table``).
+        condition: Builds the condition selecting archivable rows for the current time.
+    """
+
+    table: Table
+    archive: Table
+    condition: Callable[[datetime], ColumnElement[bool]]
+
+    @property
+    def name(self) -> str:
+        """Get the name of the hot table."""
+        return self.table.name
+
+
+def archive_batch(connection: Connection, policy: ArchivePolicy, now: datetime, batch_size: int) -> int:
+    """Move one batch of archivable rows within the caller's transaction.
+
+    On PostgreSQL the batch is locked with ``FOR UPDATE SKIP LOCKED``, so rows
+    that live traffic is changing are left for the next run.
+
+    Returns:
+        Number of moved rows
+    """
+    table = policy.table
+    candidates = select(table.c.id).where(policy.condition(now)).order_by(table.c.id).limit(batch_size)
+    if connection.dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    ids = connection.execute(candidates).scalars().all()
+    if not ids:
+        return 0
+
+    names = [column.name for column in table.columns]
+    rows = select(*table.columns, literal(now, DateTime(timezone=True))).where(table.c.id.in_(ids))
+    connection.execute(insert(policy.archive).from_select([*names, "archived_at"], rows))
+    connection.execute(delete(table).where(table.c.id.in_(ids)))
+    return len(ids)
+
+
+class Archiver:
+    """Runs archive policies batch by batch."""
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+        pause: float = 0.0,
+    ) -> None:
+        """Initialize the archiver.
+
+        Args:
+            engine: Engine to archive on; defaults to the engine of the current tenant
+            batch_size: Maximum number of rows moved per transaction
+            pause: Seconds to sleep between batches, to spread the load
+        """
+        self._engine = engine
+        self.batch_size = batch_size
+        self.pause = pause
+
+    @property
+    def engine(self) -> Engine:
+        """Get the engine rows are archived on."""
+        return self._engine or get_engine()
+
+    def run(self, policy: ArchivePolicy, now: Optional[datetime] = None, max_batches: Optional[int] = None) -> int:
+        """Move all rows selected by a policy, one transaction per batch.
+
+        Args:
+            policy: Policy to run
+            now: Time the policy conditions are evaluated at; defaults to the current time
+            max_batches: Stop after this many batches
+
+        Returns:
+            Number of moved rows
+        """
+        now = now or datetime.now(timezone.utc)
+        moved = batches = 0
+        while max_batches is None or batches < max_batches:
+            with transaction(self.engine) as connection:
+                count = archive_batch(connection, policy, now, self.batch_size)
+            moved += count
+            batches += 1
+            if count < self.batch_size:
+                break
+            if self.pause:
+                time.sleep(self.pause)
+        logger.info("Archived %d rows of %s in %d batches", moved, policy.name, batches)
+        return moved
@@ -0,0 +1,313 @@
+"""In-process broadcast of live updates, optionally synced through PostgreSQL.
+
+A single ``Broadcaster`` fans every published message out to the subscriptions
+of its topic. Publishing never waits on subscribers: each subscription keeps
+only the latest message per topic and event, so a slow consumer skips
+superseded updates instead of queueing them or holding up the publisher.
+
+With several workers, ``PostgresNotifier`` routes published messages through
+``NOTIFY`` on ``BROADCAST_CHANNEL``; every worker ``LISTEN``s on a dedicated
+connection and hands incoming messages to its local broadcaster.
+"""
+import asyncio
+import json
+import logging
+import re
+import select
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError
+
+from src.core.config import settings
+from src.core.database import get_engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PATTERN = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
+# Topics are scoped by tenant, e.g. ("salsa-porto", "session:<uuid>")
+Topic = tuple[Optional[str], str]
+
+
+@dataclass(frozen=True)
+class Message:
+    """A published update.
+
+    Attributes:
+        topic: Topic the message was published to.
+        event: Event name, e.g. "availability".
+        data: JSON-serializable payload.
+    """
+
+    topic: Topic
+    event: str
+    data: dict[str, Any]
+
+    def to_sse(self) -> str:
+        """Format the message as a Server-Sent Events frame."""
+        return f"event: {self.event}\ndata: {json.dumps(self.data, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    """A consumer's view of a set of topics.
+
+    Pending messages are coalesced per topic and event, so memory stays bounded
+    by the number of subscribed topics no matter how far the consumer lags.
+
+    Attributes:
+        topics: Subscribed topics.
+        superseded: Number of messages replaced before the consumer read them.
+    """
+
+    def __init__(self, topics: Iterable[Topic]) -> None:
+        """Initialize the subscription.
+
+        Args:
+            topics: Topics to receive messages for
+        """
+        self.topics = frozenset(topics)
+        self.superseded = 0
+        self._pending: OrderedDict[tuple[Topic, str], Message] = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def deliver(self, message: Message) -> None:
+        """Queue a message, replacing an unread one of the same topic and event."""
+        key = (message.topic, message.event)
+        if key in self._pending:
+            self.superseded += 1
+            del self._pending[key]
+        self._pending[key] = message
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """Wait for the next message.
+
+        Args:
+            timeout: Seconds to wait at most; None waits forever
+
+        Returns:
+            The oldest pending message, or None if the timeout passed first
+        """
+        if not self._pending:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except TimeoutError:
+                return None
+        return self._pending.popitem(last=False)[1]
+
+
+class Broadcaster:
+    """Fans published messages out to all subscriptions of their topic.
+
+    The latest message of each topic and event is retained (up to ``retain``
+    of them), so new subscribers start with the current state.
+
+    Must be used from the event loop thread.
+    """
+
+    def __init__(self, retain: int = settings.BROADCAST_RETAIN) -> None:
+        """Initialize the broadcaster.
+
+        Args:
+            retain: Maximum number of latest messages kept for replay
+        """
+        self.retain = retain
+        self._subscriptions: dict[Topic, set[Subscription]] = {}
+        self._latest: OrderedDict[tuple[Topic, str], Message] = OrderedDict()
+
+    def subscriber_count(self, topic: Topic) -> int:
+        """Get the number of subscriptions of a topic."""
+        return len(self._subscriptions.get(topic, ()))
+
+    @contextmanager
+    def subscribe(self, topics: Iterable[Topic]) -> Iterator[Subscription]:
+        """Subscribe to topics for the duration of a block.
+
+        Args:
+            topics: Topics to receive messages for
+
+        Yields:
+            The subscription, primed with the latest retained messages
+        """
+        subscription = Subscription(topics)
+        for topic in subscription.topics:
+            self._subscriptions.setdefault(topic, set()).add(subscription)
+        for key, message in self._latest.items():
+            if key[0] in subscription.topics:
+                subscription.deliver(message)
+        try:
+            yield subscription
+        finally:
+            for topic in subscription.topics:
+                subscribers = self._subscriptions[topic]
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[topic]
+
+    def publish(self, message: Message) -> int:
+        """Deliver a message to this process' subscriptions.
+
+        Args:
+            message: Message to deliver
+
+        Returns:
+            Number of subscriptions the message was delivered to
+        """
+        key = (message.topic, message.event)
+        self._latest.pop(key, None)
+        self._latest[key] = message
+        while len(self._latest) > self.retain:
+            self._latest.popitem(last=False)
+
+        subscriptions = self._subscriptions.get(message.topic, ())
+        for subscription in subscriptions:
+            subscription.deliver(message)
+        return len(subscriptions)
+
+
+class PostgresNotifier:
+    """Keeps the broadcasters of several workers in sync with LISTEN/NOTIFY.
+
+    Messages are published with ``pg_notify`` and delivered to the local
+    broadcaster only when the notification comes back, so every worker sees
+    the same messages in the same order.
+    """
+
+    def __init__(
+        self,
+        broadcaster: Broadcaster,
+        channel: str,
+        engine: Optional[Engine] = None,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """Initialize the notifier.
+
+        Args:
+            broadcaster: Local broadcaster receiving the notifications
+            channel: NOTIFY channel name
+            engine: Engine to connect with; defaults to the shared engine
+            poll_interval: Seconds between checks for shutdown and reconnects
+
+        Raises:
+            ValueError: If the channel is not a plain lowercase identifier
+        """
+        if not CHANNEL_PATTERN.match(channel):
+            raise ValueError(f"Invalid NOTIFY channel name {channel!r}")
+        self.broadcaster = broadcaster
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self._engine = engine
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def engine(self) -> Engine:
+        """Get the engine notifications are sent and received with."""
+        return self._engine or get_engine()
+
+    @property
+    def running(self) -> bool:
+        """Whether the listener thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start listening on a background thread; call from the event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen, name="broadcast-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop listening and wait for the listener thread to finish."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def publish(self, message: Message) -> None:
+        """Publish a message to the broadcasters of all workers."""
+        payload = json.dumps({"topic": list(message.topic), "event": message.event, "data": message.data})
+        await asyncio.to_thread(self._notify, payload)
+
+    def _notify(self, payload: str) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload}
+            )
+
+    def _listen(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._listen_once()
+            except (DBAPIError, OSError):
+                logger.warning("Broadcast listener lost its connection, reconnecting", exc_info=True)
+                self._stopping.wait(self.poll_interval)
+
+    def _listen_once(self) -> None:
+        raw = self.engine.raw_connection()
+        try:
+            connection: Any = raw.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            while not self._stopping.is_set():
+                readable, _, _ = select.select([connection], [], [], self.poll_interval)
+                if readable:
+                    self.drain(connection)
+        finally:
+            # The session is still subscribed; never hand it back to the pool
+            raw.invalidate()
+
+    def drain(self, connection: Any) -> None:
+        """Hand all notifications received on a connection to the event loop."""
+        connection.poll()
+        while connection.notifies:
+            notification = connection.notifies.pop(0)
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._dispatch, notification.payload)
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            decoded = json.loads(payload)
+            message = Message(tuple(decoded["topic"]), decoded["event"], decoded["data"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed broadcast notification %r", payload)
+            return
+        self.broadcaster.publish(message)
+
+
+broadcaster = Broadcaster()
+_notifier: Optional[PostgresNotifier] = None
+
+
+async def publish(message: Message) -> None:
+    """Publish a message to all workers, or only this one without ``BROADCAST_CHANNEL``."""
+    if _notifier is not None and _notifier.running:
+        await _notifier.publish(message)
+    else:
+        broadcaster.publish(message)
+
+
+def start_notifier() -> Optional[PostgresNotifier]:
+    """Start syncing with other workers if ``BROADCAST_CHANNEL`` is set; call from the event loop."""
+    global _notifier
+    if settings.BROADCAST_CHANNEL and _notifier is None:
+        _notifier = PostgresNotifier(broadcaster, settings.BROADCAST_CHANNEL)
+        _notifier.start()
+    return _notifier
+
+
+def stop_notifier() -> None:
+    """Stop syncing with other workers."""
+    global _notifier
+    if _notifier is not None:
+        _notifier.stop()
+        _notifier = None
@@ -22,6 +22,102 @@ class Settings(BaseSettings):
         DATABASE_PASSWORD: The PostgreSQL password.
         DATABASE_SCHEMA: The PostgreSQL schema name.
         DATABASE_URL: Complete database connection URL (auto-constructed if not provided).
+        DATABASE_POOL_SIZE: Number of persistent connections kept in the pool.
+        DATABASE_MAX_OVERFLOW: Extra connections allowed above the pool size under load.
+        DATABASE_POOL_RECYCLE: Seconds after which pooled connections are recycled.
+        DATABASE_LOCK_TIMEOUT_MS: Upper bound for the per-transaction lock_timeout.
+        DATABASE_STATEMENT_CACHE_SIZE: Maximum number of repository statements cached by query shape.
+        DATABASE_PREPARED_STATEMENTS: Whether cached statements run as server-side prepared statements.
+        SLOW_QUERY_THRESHOLD_MS: Statements slower than this are logged as slow queries.
+        SLOW_QUERY_EXPLAIN: Whether to capture EXPLAIN (ANALYZE, BUFFERS) for slow SELECTs.
+
+        # Multi-tenancy settings
+        TENANT_HEADER: Header carrying the tenant (school) identifier.
+        TENANT_DOMAIN: Base domain whose subdomains name tenants (e.g. "boneca.app").
+        TENANT_SCHEMA_PREFIX: Prefix of the per-tenant PostgreSQL schemas.
+        TENANT_ENGINE_CACHE_SIZE: Maximum number of tenant connection pools kept open.
+        TENANT_ENGINE_IDLE_TIMEOUT: Seconds after which an unused tenant pool is closed.
+        TENANT_POOL_SIZE: Persistent connections per tenant pool.
+        TENANT_MAX_OVERFLOW: Extra connections per tenant pool under load.
+
+        # Calendar feed settings
+        CALENDAR_FEED_SECRET: Secret used to sign calendar feed tokens.
+        CALENDAR_FEED_CACHE_SIZE: Maximum number of rendered feeds kept in memory.
+        CALENDAR_FEED_PAST_DAYS: Days of past sessions included in a feed.
+        CALENDAR_FEED_FUTURE_DAYS: Days of upcoming sessions included in a feed.
+        CALENDAR_FEED_MAX_AGE: Seconds calendar clients may cache a feed.
+
+        # Request deadline settings
+        REQUEST_TIMEOUT_HEADER: Header a client can use to announce its timeout in seconds.
+        REQUEST_DEFAULT_TIMEOUT: Deadline in seconds for requests without header or route default.
+        REQUEST_MAX_TIMEOUT: Upper bound in seconds for client-provided timeouts.
+
+        # Live update settings
+        BROADCAST_CHANNEL: PostgreSQL NOTIFY channel syncing live updates across workers; empty for in-process only.
+        BROADCAST_RETAIN: Number of latest per-topic messages replayed to new subscribers.
+        SSE_HEARTBEAT_INTERVAL: Seconds between heartbeats on idle event streams.
+        SSE_MAX_TOPICS: Maximum number of topics a single event stream may subscribe to.
+
+        # Event loop monitoring settings
+        LOOP_LAG_INTERVAL: Seconds between event loop lag samples.
+        LOOP_BLOCK_DETECTION: Whether to capture stacks of callbacks blocking the loop (development).
+        LOOP_BLOCK_THRESHOLD_MS: Loop lag or blocking time logged as a warning.
+
+        # Response cache settings
+        RESPONSE_CACHE_ENABLED: Whether opted-in GET routes are served from the response cache.
+        RESPONSE_CACHE_MAX_ENTRIES: Maximum number of responses kept by the in-process cache.
+        RESPONSE_CACHE_MAX_BODY: Largest response body in bytes that is cached.
+
+        # Total count settings
+        TOTAL_COUNT_CAP: Largest total a capped count reports exactly (beyond it "N+").
+        TOTAL_COUNT_CACHE_TTL: Seconds capped counts and estimates are cached; 0 disables the cache.
+        TOTAL_COUNT_CACHE_SIZE: Maximum number of totals kept by the in-process cache.
+
+        # Health check settings
+        HEALTH_CHECK_INTERVAL: Seconds between background dependency checks readiness is based on.
+        HEALTH_FAILURE_THRESHOLD: Failed database probes in a row after which the worker is not ready.
+        HEALTH_MAX_POOL_SATURATION: Share of the connection pool in use from which the worker is not ready.
+        HEALTH_DRAIN_SECONDS: Seconds requests are still served after SIGTERM while readiness reports draining.
+
+        # Debug endpoint settings
+        DEBUG_ENDPOINTS_ENABLED: Whether the profiling and allocation endpoints under /debug are served.
+        DEBUG_TOKEN: Shared secret callers of the debug endpoints send in X-Debug-Token; empty disables them.
+        DEBUG_PROFILE_INTERVAL: Seconds between stack samples of the sampling profiler.
+        DEBUG_PROFILE_MAX_SECONDS: Longest profiling run a request may ask for.
+        DEBUG_TRACEMALLOC_FRAMES: Frames stored per traced memory block once allocation tracing starts.
+
+        # Authentication settings
+        AUTH_SECRET: Secret used to sign access tokens.
+        AUTH_TOKEN_TTL: Seconds an access token is valid.
+        AUTH_TOKEN_CACHE_SIZE: Maximum number of verified tokens kept by the in-process cache.
+        AUTH_HASH_COST: Base-2 logarithm of the scrypt cost of new password hashes.
+        AUTH_HASH_WORKERS: Processes hashing passwords.
+        AUTH_HASH_QUEUE_LIMIT: Hash operations that may wait for a process before logins are rejected with 503.
+
+        # Waitlist settings
+        WAITLIST_QUEUE_CACHE_SIZE: Maximum number of session waitlist queues kept in memory per worker.
+
+        # Notification settings
+        SMTP_HOST: SMTP server notifications are sent through.
+        SMTP_PORT: SMTP server port.
+        SMTP_USERNAME: SMTP login; empty to send without authentication.
+        SMTP_PASSWORD: SMTP password.
+        SMTP_STARTTLS: Whether to upgrade connections with STARTTLS.
+        SMTP_TIMEOUT: Seconds to wait for the SMTP server.
+        SMTP_MAX_CONNECTIONS_PER_HOST: Maximum number of concurrent connections to one SMTP server.
+        SMTP_MESSAGES_PER_CONNECTION: Messages sent over a connection before it is replaced.
+        NOTIFICATION_FROM: Sender address of notifications.
+        NOTIFICATION_BATCH_SIZE: Maximum number of notification jobs claimed at once.
+        NOTIFICATION_MAX_ATTEMPTS: Deliveries of a job that are tried before it is given up.
+        NOTIFICATION_RETRY_BACKOFF: Seconds before the first retry of a job; doubled on every attempt.
+        NOTIFICATION_LEASE: Seconds a claimed job is hidden from other senders.
+        NOTIFICATION_RENDER_CACHE_SIZE: Maximum number of rendered messages kept per process.
+
+        # Archival settings
+        ARCHIVE_BATCH_SIZE: Maximum number of rows the archival job moves per transaction.
+        ARCHIVE_DELETED_AFTER_DAYS: Days after a soft delete until the row is archived.
+        ARCHIVE_ATTENDANCE_AFTER_DAYS: Age in days of check-ins that are archived.
+        ARCHIVE_PAYMENTS_AFTER_DAYS: Age in days (by due date) of matched payments that are archived.
     """
 
     PROJECT_NAME: str = "Boneca"
@@ -35,6 +131,102 @@ class Settings(BaseSettings):
     DATABASE_USER: str = "boneca"
     DATABASE_PASSWORD: str = "boneca"
     DATABASE_SCHEMA: str = "boneca"
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_LOCK_TIMEOUT_MS: int = 5000
+    DATABASE_STATEMENT_CACHE_SIZE: int = 500
+    DATABASE_PREPARED_STATEMENTS: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 250.0
+    SLOW_QUERY_EXPLAIN: bool = False
+
+    # Multi-tenancy configuration
+    TENANT_HEADER: str = "X-Tenant"
+    TENANT_DOMAIN: str = ""
+    TENANT_SCHEMA_PREFIX: str = "school_"
+    TENANT_ENGINE_CACHE_SIZE: int = 32
+    TENANT_ENGINE_IDLE_TIMEOUT: int = 600
+    TENANT_POOL_SIZE: int = 2
+    TENANT_MAX_OVERFLOW: int = 3
+
+    # Calendar feed configuration
+    CALENDAR_FEED_SECRET: str = "change-me"
+    CALENDAR_FEED_CACHE_SIZE: int = 10000
+    CALENDAR_FEED_PAST_DAYS: int = 30
+    CALENDAR_FEED_FUTURE_DAYS: int = 180
+    CALENDAR_FEED_MAX_AGE: int = 300
+
+    # Request deadline configuration
+    REQUEST_TIMEOUT_HEADER: str = "X-Request-Timeout"
+    REQUEST_DEFAULT_TIMEOUT: float = 30.0
+    REQUEST_MAX_TIMEOUT: float = 120.0
+
+    # Live update configuration
+    BROADCAST_CHANNEL: str = ""
+    BROADCAST_RETAIN: int = 10000
+    SSE_HEARTBEAT_INTERVAL: float = 15.0
+    SSE_MAX_TOPICS: int = 50
+
+    # Event loop monitoring configuration
+    LOOP_LAG_INTERVAL: float = 0.5
+    LOOP_BLOCK_DETECTION: bool = False
+    LOOP_BLOCK_THRESHOLD_MS: float = 100.0
+
+    # Response cache configuration
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+    RESPONSE_CACHE_MAX_BODY: int = 1048576
+
+    # Total count configuration
+    TOTAL_COUNT_CAP: int = 10000
+    TOTAL_COUNT_CACHE_TTL: float = 30.0
+    TOTAL_COUNT_CACHE_SIZE: int = 10000
+
+    # Health check configuration
+    HEALTH_CHECK_INTERVAL: float = 5.0
+    HEALTH_FAILURE_THRESHOLD: int = 3
+    HEALTH_MAX_POOL_SATURATION: float = 1.0
+    HEALTH_DRAIN_SECONDS: float = 10.0
+
+    # Debug endpoint configuration
+    DEBUG_ENDPOINTS_ENABLED: bool = False
+    DEBUG_TOKEN: str = ""
+    DEBUG_PROFILE_INTERVAL: float = 0.01
+    DEBUG_PROFILE_MAX_SECONDS: float = 60.0
+    DEBUG_TRACEMALLOC_FRAMES: int = 1
+
+    # Authentication configuration
+    AUTH_SECRET: str = "change-me"
+    AUTH_TOKEN_TTL: int = 3600
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_HASH_COST: int = 14
+    AUTH_HASH_WORKERS: int = 2
+    AUTH_HASH_QUEUE_LIMIT: int = 32
+
+    # Waitlist configuration
+    WAITLIST_QUEUE_CACHE_SIZE: int = 1000
+
+    # Notification configuration
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_STARTTLS: bool = False
+    SMTP_TIMEOUT: float = 10.0
+    SMTP_MAX_CONNECTIONS_PER_HOST: int = 4
+    SMTP_MESSAGES_PER_CONNECTION: int = 100
+    NOTIFICATION_FROM: str = "Boneca <no-reply@boneca.local>"
+    NOTIFICATION_BATCH_SIZE: int = 500
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_RETRY_BACKOFF: float = 60.0
+    NOTIFICATION_LEASE: float = 300.0
+    NOTIFICATION_RENDER_CACHE_SIZE: int = 10000
+
+    # Archival configuration
+    ARCHIVE_BATCH_SIZE: int = 5000
+    ARCHIVE_DELETED_AFTER_DAYS: int = 90
+    ARCHIVE_ATTENDANCE_AFTER_DAYS: int = 1095
+    ARCHIVE_PAYMENTS_AFTER_DAYS: int = 730
 
     @property
     def DATABASE_URL(self) -> str:
@@ -3,18 +3,39 @@
 This module provides utilities for connecting to the PostgreSQL database
 using the application configuration.
 """
-from typing import Any, Dict
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Connection, Engine, MetaData, create_engine, text
+from sqlalchemy.exc import OperationalError
 
 from src.core.config import settings
+from src.core.deadlines import get_current_deadline
+from src.core.exceptions import DeadlineExceededError
+from src.core.query_log import instrument_engine
+from src.core.tenancy import get_current_tenant, tenant_schema
+
+# SQLSTATE codes PostgreSQL raises when statement_timeout or lock_timeout fire
+DEADLINE_SQLSTATES = {"57014": "query", "55P03": "lock"}
+
+# Tables of all domains; Alembic autogenerate compares migrations against it
+metadata = MetaData()
 
 
 class DatabaseConfig:
     """Database configuration helper class."""
 
     @staticmethod
-    def get_connection_params() -> dict[str, str | int]:
+    def get_connection_params(schema: Optional[str] = None) -> dict[str, str | int]:
         """Get database connection parameters as a dictionary.
 
+        Args:
+            schema: Schema to put on the search_path; defaults to ``DATABASE_SCHEMA``
+
         Returns:
             Dictionary containing database connection parameters.
         """
@@ -24,7 +45,7 @@ class DatabaseConfig:
             "database": settings.DATABASE_NAME,
             "user": settings.DATABASE_USER,
             "password": settings.DATABASE_PASSWORD,
-            "options": f"-c search_path={settings.DATABASE_SCHEMA}",
+            "options": f"-c search_path={schema or settings.DATABASE_SCHEMA}",
         }
 
     @staticmethod
@@ -46,31 +67,259 @@ class DatabaseConfig:
         return settings.DATABASE_SCHEMA
 
     @staticmethod
-    def get_alembic_config() -> Dict[str, Any]:
+    def get_alembic_config(schema: Optional[str] = None) -> Dict[str, Any]:
         """Get Alembic-specific database configuration.
 
+        Args:
+            schema: Schema to migrate; defaults to ``DATABASE_SCHEMA``
+
         Returns:
             Dictionary containing Alembic configuration parameters.
         """
         return {
             "sqlalchemy.url": settings.DATABASE_URL,
-            "target_schema": settings.DATABASE_SCHEMA,
-            "version_table_schema": settings.DATABASE_SCHEMA,
+            "target_schema": schema or settings.DATABASE_SCHEMA,
+            "version_table_schema": schema or settings.DATABASE_SCHEMA,
             "include_schemas": True,
         }
 
     @staticmethod
-    def get_migration_connection_args() -> Dict[str, Any]:
+    def get_migration_connection_args(schema: Optional[str] = None) -> Dict[str, Any]:
         """Get connection arguments for migration operations.
 
+        Args:
+            schema: Schema to put on the search_path; defaults to ``DATABASE_SCHEMA``
+
         Returns:
             Dictionary containing connection arguments for SQLAlchemy.
         """
         return {
-            "options": f"-csearch_path={settings.DATABASE_SCHEMA}",
+            "options": f"-csearch_path={schema or settings.DATABASE_SCHEMA}",
             "sslmode": "prefer",  # Default SSL mode for PostgreSQL
         }
 
+    @staticmethod
+    def create_engine(
+        schema: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+    ) -> Engine:
+        """Create a pooled SQLAlchemy engine for the application database.
+
+        Every statement executed through the engine is recorded by the query log.
+
+        Args:
+            schema: Schema to put on the search_path; defaults to ``DATABASE_SCHEMA``
+            pool_size: Persistent connections; defaults to ``DATABASE_POOL_SIZE``
+            max_overflow: Extra connections; defaults to ``DATABASE_MAX_OVERFLOW``
+
+        Returns:
+            SQLAlchemy engine configured from the application settings.
+        """
+        engine = create_engine(
+            settings.DATABASE_URL,
+            pool_size=settings.DATABASE_POOL_SIZE if pool_size is None else pool_size,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW if max_overflow is None else max_overflow,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=True,
+            connect_args={"options": f"-c search_path={schema or settings.DATABASE_SCHEMA}"},
+        )
+        instrument_engine(engine)
+        return engine
+
+
+def create_tenant_engine(tenant: str) -> Engine:
+    """Create the connection pool of a tenant.
+
+    Args:
+        tenant: Tenant identifier
+
+    Returns:
+        Small engine whose connections use the tenant schema.
+    """
+    return DatabaseConfig.create_engine(
+        schema=tenant_schema(tenant),
+        pool_size=settings.TENANT_POOL_SIZE,
+        max_overflow=settings.TENANT_MAX_OVERFLOW,
+    )
+
+
+class TenantEngineCache:
+    """Bounded LRU of per-tenant engines.
+
+    At most ``max_size`` tenant pools are open at a time. The least recently used
+    pool is closed when a new tenant needs one, and pools unused for
+    ``idle_timeout`` seconds are closed on the next lookup, so hundreds of
+    schools do not mean hundreds of idle pools. The cache is thread-safe because
+    repositories look up engines from worker threads.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        idle_timeout: float,
+        factory: Callable[[str], Engine] = create_tenant_engine,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of open tenant engines
+            idle_timeout: Seconds after which an unused engine is closed
+            factory: Callable creating the engine of a tenant
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._factory = factory
+        self._engines: OrderedDict[str, tuple[Engine, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of open tenant engines."""
+        return len(self._engines)
+
+    def __contains__(self, tenant: object) -> bool:
+        """Check whether a tenant currently has an open engine."""
+        return tenant in self._engines
+
+    def get(self, tenant: str) -> Engine:
+        """Get the engine of a tenant, creating it if needed.
+
+        Args:
+            tenant: Tenant identifier
+
+        Returns:
+            The tenant engine.
+        """
+        now = time.monotonic()
+        evicted: list[Engine] = []
+        with self._lock:
+            entry = self._engines.pop(tenant, None)
+            evicted.extend(self._pop_idle(now))
+            engine = entry[0] if entry is not None else self._factory(tenant)
+            self._engines[tenant] = (engine, now)
+            while len(self._engines) > self.max_size:
+                evicted.append(self._engines.popitem(last=False)[1][0])
+        for stale in evicted:
+            stale.dispose()
+        return engine
+
+    def evict_idle(self) -> int:
+        """Close engines unused for longer than the idle timeout.
+
+        Returns:
+            Number of closed engines.
+        """
+        with self._lock:
+            evicted = self._pop_idle(time.monotonic())
+        for stale in evicted:
+            stale.dispose()
+        return len(evicted)
+
+    def _pop_idle(self, now: float) -> list[Engine]:
+        evicted = []
+        # Entries are kept in order of last use, so idle ones are at the front
+        while self._engines:
+            tenant, (engine, last_used) = next(iter(self._engines.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._engines[tenant]
+            evicted.append(engine)
+        return evicted
+
+    def dispose(self) -> None:
+        """Close all tenant engines."""
+        with self._lock:
+            engines = [engine for engine, _ in self._engines.values()]
+            self._engines.clear()
+        for engine in engines:
+            engine.dispose()
+
+
+_engine: Optional[Engine] = None
+tenant_engines = TenantEngineCache(settings.TENANT_ENGINE_CACHE_SIZE, settings.TENANT_ENGINE_IDLE_TIMEOUT)
+
+
+def get_engine() -> Engine:
+    """Get the engine for the current tenant, creating it on first use.
+
+    Requests without a tenant use the shared engine on ``DATABASE_SCHEMA``.
+
+    Returns:
+        The SQLAlchemy engine to run statements on.
+    """
+    global _engine
+    tenant = get_current_tenant()
+    if tenant is not None:
+        return tenant_engines.get(tenant)
+    if _engine is None:
+        _engine = DatabaseConfig.create_engine()
+    return _engine
+
+
+def dispose_engine() -> None:
+    """Close all pooled connections of the shared and tenant engines."""
+    global _engine
+    tenant_engines.dispose()
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+
+
+def apply_deadline(connection: Connection) -> None:
+    """Apply the current request deadline to an open transaction.
+
+    The remaining time budget becomes the transaction-local ``statement_timeout``
+    and ``lock_timeout``, so PostgreSQL cancels the query on the server once the
+    deadline passes instead of letting it run after the client gave up.
+
+    Args:
+        connection: Connection with an open transaction
+
+    Raises:
+        DeadlineExceededError: If the deadline has already passed
+    """
+    deadline = get_current_deadline()
+    if deadline is None:
+        return
+    deadline.check("query")
+    if connection.dialect.name != "postgresql":
+        return
+
+    statement_timeout = max(1, deadline.remaining_ms())
+    lock_timeout = min(statement_timeout, settings.DATABASE_LOCK_TIMEOUT_MS)
+    connection.execute(
+        text(
+            "SELECT set_config('statement_timeout', :statement_timeout, true), "
+            "set_config('lock_timeout', :lock_timeout, true)"
+        ),
+        {"statement_timeout": f"{statement_timeout}ms", "lock_timeout": f"{lock_timeout}ms"},
+    )
+
+
+@contextmanager
+def transaction(engine: Optional[Engine] = None) -> Iterator[Connection]:
+    """Open a transaction bounded by the current request deadline.
+
+    Args:
+        engine: Engine to use; defaults to the shared application engine
+
+    Yields:
+        Connection with an open transaction, committed on success
+
+    Raises:
+        DeadlineExceededError: If the deadline passed or the server cancelled a statement
+    """
+    engine = engine or get_engine()
+    try:
+        with engine.begin() as connection:
+            apply_deadline(connection)
+            yield connection
+    except OperationalError as error:
+        operation = DEADLINE_SQLSTATES.get(getattr(error.orig, "pgcode", None) or "")
+        if operation is None:
+            raise
+        raise DeadlineExceededError(operation) from error
+
 
 # Example usage for future database implementations
 def example_connection_usage() -> None:
@@ -0,0 +1,184 @@
+"""Request deadline propagation module.
+
+This module carries a per-request deadline from the HTTP layer down to the
+database layer. The deadline is taken from a request header or a per-route
+default and stored in a context variable, so repository calls can translate the
+remaining time into server-side ``statement_timeout`` and ``lock_timeout`` values.
+"""
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, MutableMapping, Optional
+
+from fastapi import Request
+
+from src.core.config import settings
+from src.core.exceptions import DeadlineExceededError
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """Point in time by which an operation has to complete.
+
+    Attributes:
+        expires_at: Expiry time on the ``time.monotonic()`` clock.
+    """
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """Create a deadline that expires the given number of seconds from now.
+
+        Args:
+            seconds: Time budget in seconds
+
+        Returns:
+            The new deadline
+        """
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Get the remaining time budget in seconds (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def remaining_ms(self) -> int:
+        """Get the remaining time budget in whole milliseconds (never negative)."""
+        return int(self.remaining() * 1000)
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has already passed."""
+        return self.remaining_ms() <= 0
+
+    def check(self, operation: str = "request") -> None:
+        """Ensure the deadline has not passed yet.
+
+        Args:
+            operation: Name of the operation about to start, used in the error
+
+        Raises:
+            DeadlineExceededError: If the deadline has already passed
+        """
+        if self.expired:
+            raise DeadlineExceededError(operation, 0)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+def get_current_deadline() -> Optional[Deadline]:
+    """Get the deadline of the current request, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds: float, replace: bool = False) -> Iterator[Deadline]:
+    """Run a block under a deadline.
+
+    Nested scopes can only tighten the deadline, never extend it, unless they
+    replace it.
+
+    Args:
+        seconds: Time budget for the block in seconds
+        replace: Whether the budget replaces the outer deadline instead of tightening it
+
+    Yields:
+        The deadline in effect inside the block
+    """
+    deadline = Deadline.after(seconds)
+    outer = _current_deadline.get()
+    if not replace and outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def parse_timeout_header(value: Optional[str]) -> Optional[float]:
+    """Parse the client-provided timeout header.
+
+    Invalid or non-positive values are ignored; valid values are capped at
+    ``REQUEST_MAX_TIMEOUT``.
+
+    Args:
+        value: Raw header value in seconds
+
+    Returns:
+        Timeout in seconds, or None if the header is missing or invalid
+    """
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    if seconds <= 0 or seconds != seconds:
+        return None
+    return min(seconds, settings.REQUEST_MAX_TIMEOUT)
+
+
+class DeadlineMiddleware:
+    """ASGI middleware that sets the deadline for every HTTP request.
+
+    The timeout is read from the ``REQUEST_TIMEOUT_HEADER`` header and falls back
+    to ``REQUEST_DEFAULT_TIMEOUT``. Routes can set their own default with
+    :func:`route_deadline`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI call."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = settings.REQUEST_TIMEOUT_HEADER.lower().encode("latin-1")
+        raw = next((value for key, value in scope.get("headers", []) if key == header), None)
+        seconds = parse_timeout_header(raw.decode("latin-1") if raw is not None else None)
+        with deadline_scope(seconds or settings.REQUEST_DEFAULT_TIMEOUT):
+            await self.app(scope, receive, send)
+
+
+def route_deadline(seconds: float) -> Callable[[Request], AsyncIterator[Deadline]]:
+    """Create a dependency that applies a per-route default deadline.
+
+    A timeout sent by the client in the request header takes precedence over
+    the route default. Without one, the route default replaces
+    ``REQUEST_DEFAULT_TIMEOUT``, so slow routes such as exports can be given
+    more time than other requests. The route deadline is reset once the request
+    is handled.
+
+    Example:
+        ``@router.get("/reports", dependencies=[Depends(route_deadline(5))])``
+
+    Args:
+        seconds: Default time budget for the route in seconds
+
+    Returns:
+        FastAPI dependency callable
+    """
+
+    async def apply_route_deadline(request: Request) -> AsyncIterator[Deadline]:
+        timeout = parse_timeout_header(request.headers.get(settings.REQUEST_TIMEOUT_HEADER))
+        with deadline_scope(timeout or seconds, replace=timeout is None) as deadline:
+            yield deadline
+
+    return apply_route_deadline
@@ -56,6 +56,52 @@ class EntityConflictError(RepositoryError):
         )
 
 
+class DeadlineExceededError(RepositoryError):
+    """Raised when an operation runs past the deadline of the current request."""
+
+    def __init__(self, operation: str, timeout_ms: Optional[int] = None) -> None:
+        """Initialize the exception.
+
+        Args:
+            operation: Operation that was interrupted (e.g., "query", "lock")
+            timeout_ms: Timeout in milliseconds that was applied, if known
+        """
+        super().__init__(
+            f"Deadline exceeded during {operation}",
+            {"operation": operation, "timeout_ms": timeout_ms},
+        )
+
+
+class AuthenticationError(BonecaError):
+    """Raised when credentials or a token cannot be verified."""
+
+    def __init__(self, reason: str) -> None:
+        """Initialize the exception.
+
+        Args:
+            reason: Why authentication failed (e.g., "expired token")
+        """
+        super().__init__(f"Authentication failed: {reason}", {"reason": reason})
+
+
+class OverloadedError(BonecaError):
+    """Raised when a bounded resource has no capacity left and the caller should retry later."""
+
+    def __init__(self, resource: str, limit: int, retry_after: int = 1) -> None:
+        """Initialize the exception.
+
+        Args:
+            resource: Saturated resource (e.g., "password hashing")
+            limit: Number of queued operations the resource accepts
+            retry_after: Seconds after which a retry is likely to succeed
+        """
+        super().__init__(
+            f"{resource.capitalize()} is overloaded",
+            {"resource": resource, "limit": limit, "retry_after": retry_after},
+        )
+        self.retry_after = retry_after
+
+
 class ValidationError(BonecaError):
     """Raised when entity validation fails."""
 
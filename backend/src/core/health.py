@@ -0,0 +1,329 @@
+"""Liveness, readiness and draining of the worker.
+
+Orchestrators probe every worker of every replica every few seconds. Running a
+query per probe would add load and compete for pooled connections exactly when
+the pool is busiest, so ``HealthMonitor`` checks the dependencies on a
+background task every ``HEALTH_CHECK_INTERVAL`` seconds and readiness only
+reads its latest ``DependencyStatus``:
+
+- pool saturation: connections checked out of the shared engine's pool relative
+  to its size plus overflow, read from the pool without a query;
+- database reachability: a ``SELECT 1`` and a read of the Alembic revision, on
+  a pooled connection. When every connection is checked out the probe is
+  skipped, since the busy connections show the database is there;
+- breaker: the database counts as down until a probe succeeds and again once
+  ``HEALTH_FAILURE_THRESHOLD`` probes in a row failed, so a single lost probe
+  does not take the worker out of rotation;
+- migrations: the revision of the database against the heads of the migration
+  scripts shipped with the code. A database behind the code is not ready; one
+  ahead of it (migrated by a newer release during a rollout) is.
+
+A status older than three check intervals means the checks are stuck, and the
+worker is not ready either.
+
+On SIGTERM the worker starts draining: readiness answers 503 while requests are
+still served for ``HEALTH_DRAIN_SECONDS``, so load balancers take the worker out
+of rotation before it stops accepting connections. Then the server shuts down
+gracefully, as on SIGINT.
+"""
+import asyncio
+import contextlib
+import logging
+import signal
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.pool import QueuePool
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from src.core.config import settings
+from src.core.database import get_engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_CONFIG = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# States of the database schema relative to the migration scripts
+MIGRATIONS_CURRENT = "current"
+MIGRATIONS_PENDING = "pending"
+MIGRATIONS_AHEAD = "ahead"
+MIGRATIONS_UNKNOWN = "unknown"
+
+
+@dataclass(frozen=True)
+class PoolStatus:
+    """Usage of a connection pool.
+
+    Attributes:
+        checked_out: Connections in use.
+        capacity: Connections the pool may open, or None without a limit.
+    """
+
+    checked_out: int
+    capacity: Optional[int]
+
+    @property
+    def saturation(self) -> float:
+        """Get the share of the capacity in use; 0 without a limit."""
+        return self.checked_out / self.capacity if self.capacity else 0.0
+
+
+@dataclass(frozen=True)
+class DependencyStatus:
+    """Result of one round of dependency checks.
+
+    Attributes:
+        checked_at: Time of the checks on the ``time.monotonic()`` clock.
+        database_reachable: Whether the last probe reached the database.
+        database_failures: Failed probes in a row.
+        breaker_open: Whether the database counts as down.
+        pool: Usage of the shared pool; None for pools without a size.
+        migrations: ``current``, ``pending``, ``ahead`` or ``unknown``.
+        current_revisions: Alembic revisions of the database.
+        head_revisions: Heads of the migration scripts.
+        error: Error of the last failed probe.
+    """
+
+    checked_at: float
+    database_reachable: bool
+    database_failures: int
+    breaker_open: bool
+    pool: Optional[PoolStatus]
+    migrations: str
+    current_revisions: tuple[str, ...] = ()
+    head_revisions: tuple[str, ...] = ()
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Readiness:
+    """Whether the worker should receive traffic.
+
+    Attributes:
+        state: ``ready``, ``not_ready``, ``starting`` (no checks yet) or ``draining``.
+        reasons: Why the worker is not ready.
+        status: Latest dependency status, if any.
+    """
+
+    state: str
+    reasons: list[str] = field(default_factory=list)
+    status: Optional[DependencyStatus] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the worker is ready."""
+        return self.state == "ready"
+
+
+def pool_status(engine: Engine) -> Optional[PoolStatus]:
+    """Get the usage of the pool of an engine, or None if it does not limit its connections."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    overflow = pool._max_overflow
+    return PoolStatus(pool.checkedout(), pool.size() + overflow if overflow >= 0 else None)
+
+
+class HealthMonitor:
+    """Refreshes the dependency status on a background task and derives readiness from it."""
+
+    def __init__(
+        self,
+        interval: float = settings.HEALTH_CHECK_INTERVAL,
+        failure_threshold: int = settings.HEALTH_FAILURE_THRESHOLD,
+        max_pool_saturation: float = settings.HEALTH_MAX_POOL_SATURATION,
+        engine: Optional[Engine] = None,
+        alembic_config: Path = ALEMBIC_CONFIG,
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between dependency checks
+            failure_threshold: Failed database probes in a row after which the database counts as down
+            max_pool_saturation: Share of the pool in use from which the worker is not ready
+            engine: Engine to check; defaults to the shared application engine
+            alembic_config: Alembic configuration locating the migration scripts
+        """
+        self.interval = interval
+        self.failure_threshold = failure_threshold
+        self.max_pool_saturation = max_pool_saturation
+        self.status: Optional[DependencyStatus] = None
+        self.draining = False
+        self._engine = engine
+        self._alembic_config = alembic_config
+        self._migrations: Optional[tuple[tuple[str, ...], frozenset[str]]] = None
+        self._failures = 0
+        self._reached = False
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the refresh task is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start refreshing the dependency status; call from the event loop."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._refresh(), name="health-monitor")
+
+    async def stop(self) -> None:
+        """Stop refreshing."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def drain(self) -> None:
+        """Report the worker as draining from now on."""
+        self.draining = True
+
+    async def _refresh(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.check)
+            except Exception:
+                logger.exception("Dependency checks failed")
+            await asyncio.sleep(self.interval)
+
+    def check(self) -> DependencyStatus:
+        """Check the dependencies; blocks the calling thread.
+
+        Returns:
+            The new dependency status, also kept in ``status``
+        """
+        engine = self._engine or get_engine()
+        pool = pool_status(engine)
+        previous = self.status
+        error = None
+        if previous is not None and pool is not None and pool.capacity is not None and pool.saturation >= 1:
+            # Waiting for a connection would only add to the contention
+            reachable, revisions = previous.database_reachable, previous.current_revisions
+        else:
+            try:
+                revisions = self._probe(engine)
+                reachable = True
+            except SQLAlchemyError as probe_error:
+                reachable, revisions, error = False, (), str(probe_error).splitlines()[0]
+            self._failures = 0 if reachable else self._failures + 1
+            self._reached = self._reached or reachable
+
+        heads, migrations = self._compare_migrations(revisions if reachable else None)
+        self.status = DependencyStatus(
+            checked_at=time.monotonic(),
+            database_reachable=reachable,
+            database_failures=self._failures,
+            breaker_open=not self._reached or self._failures >= self.failure_threshold,
+            pool=pool,
+            migrations=migrations,
+            current_revisions=revisions,
+            head_revisions=heads,
+            error=error,
+        )
+        return self.status
+
+    @staticmethod
+    def _probe(engine: Engine) -> tuple[str, ...]:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            try:
+                return tuple(sorted(connection.scalars(text("SELECT version_num FROM alembic_version"))))
+            except DBAPIError:
+                # Reachable, but not migrated at all
+                return ()
+
+    def _compare_migrations(self, revisions: Optional[tuple[str, ...]]) -> tuple[tuple[str, ...], str]:
+        if self._migrations is None:
+            try:
+                script = ScriptDirectory.from_config(Config(str(self._alembic_config)))
+                heads = tuple(sorted(script.get_heads()))
+                known = frozenset(revision.revision for revision in script.walk_revisions())
+            except Exception:
+                logger.warning("Migration scripts not found at %s; not checking migrations", self._alembic_config)
+                heads, known = (), frozenset()
+            self._migrations = (heads, known)
+        heads, known = self._migrations
+        if revisions is None or not heads:
+            return heads, MIGRATIONS_UNKNOWN
+        if revisions == heads:
+            return heads, MIGRATIONS_CURRENT
+        if any(revision not in known for revision in revisions):
+            return heads, MIGRATIONS_AHEAD
+        return heads, MIGRATIONS_PENDING
+
+    def readiness(self, now: Optional[float] = None) -> Readiness:
+        """Derive whether the worker should receive traffic from the latest status.
+
+        Args:
+            now: Current time on the ``time.monotonic()`` clock
+
+        Returns:
+            The readiness and, when not ready, the reasons
+        """
+        status = self.status
+        if self.draining:
+            return Readiness("draining", ["worker is shutting down"], status)
+        if status is None:
+            return Readiness("starting", ["dependencies not checked yet"])
+        reasons = []
+        if (now if now is not None else time.monotonic()) - status.checked_at > 3 * self.interval:
+            reasons.append("dependency status is stale")
+        if status.breaker_open:
+            reasons.append("database unreachable")
+        if status.migrations == MIGRATIONS_PENDING:
+            reasons.append("database migrations pending")
+        if status.pool is not None and status.pool.saturation >= self.max_pool_saturation:
+            reasons.append("connection pool saturated")
+        return Readiness("not_ready" if reasons else "ready", reasons, status)
+
+
+def install_drain_handler(monitor: HealthMonitor, seconds: float) -> bool:
+    """Drain on SIGTERM for a number of seconds before shutting the server down as on SIGINT.
+
+    A second SIGTERM shuts down right away. Call from the event loop of the main
+    thread after the server installed its own signal handlers.
+
+    Args:
+        monitor: Monitor reporting the draining state
+        seconds: Seconds requests are still served after SIGTERM
+
+    Returns:
+        Whether the handler was installed
+    """
+    loop = asyncio.get_running_loop()
+
+    def terminate() -> None:
+        if monitor.draining:
+            signal.raise_signal(signal.SIGINT)
+            return
+        logger.info("Draining for %.0f s before shutting down", seconds)
+        monitor.drain()
+        loop.call_later(seconds, signal.raise_signal, signal.SIGINT)
+
+    try:
+        loop.add_signal_handler(signal.SIGTERM, terminate)
+    except (RuntimeError, ValueError):
+        # Not the main thread, or signals are not supported by the loop
+        return False
+    return True
+
+
+health_monitor = HealthMonitor()
+
+
+def start_health_monitor() -> None:
+    """Start the dependency checks and, with ``HEALTH_DRAIN_SECONDS``, draining on SIGTERM; call from the event loop."""
+    health_monitor.start()
+    if settings.HEALTH_DRAIN_SECONDS > 0:
+        install_drain_handler(health_monitor, settings.HEALTH_DRAIN_SECONDS)
+
+
+async def stop_health_monitor() -> None:
+    """Stop the dependency checks and report the worker as draining."""
+    health_monitor.drain()
+    await health_monitor.stop()
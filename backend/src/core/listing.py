@@ -0,0 +1,82 @@
+"""Filtering, sorting and pagination parameters of list endpoints.
+
+``list_query`` turns the query string of a list request into a ``ListQuery``
+for a SQL repository. Filters and sort fields are checked against what the
+repository declares as indexed (``filterable_fields``, ``sortable_fields``), so
+a client asking for anything else gets a 422 instead of a sequential scan.
+"""
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Annotated, Any, Optional
+
+from fastapi import HTTPException, Query, Request, Response, status
+
+from src.core.exceptions import ValidationError
+from src.core.repositories.counts import Total, TotalMode
+from src.core.repositories.filters import Filter, parse_query, sort_fields
+from src.core.repositories.sql import SQLRepository
+
+# Largest page a list endpoint returns
+MAX_LIMIT = 500
+# Response header carrying the total, e.g. "1234", "10000+" or "~1234"
+TOTAL_HEADER = "X-Total-Count"
+
+
+@dataclass(frozen=True)
+class ListQuery:
+    """Parsed parameters of a list request.
+
+    Attributes:
+        filters: Filter expression built from the remaining query parameters.
+        order_by: Fields to sort by, descending if prefixed with ``-``.
+        offset: Number of entities to skip.
+        limit: Maximum number of entities to return.
+        total: How to count the total, or None to skip counting.
+    """
+
+    filters: Filter
+    order_by: tuple[str, ...]
+    offset: int
+    limit: int
+    total: Optional[TotalMode] = None
+
+
+def set_total(response: Response, total: Optional[Total]) -> None:
+    """Report a total in the ``X-Total-Count`` header of a list response."""
+    if total is not None:
+        response.headers[TOTAL_HEADER] = str(total)
+
+
+def list_query(repository: type[SQLRepository[Any]]) -> Callable[..., Awaitable[ListQuery]]:
+    """Create a dependency parsing list parameters for a repository.
+
+    Example:
+        ``GET /classes/series?studio_id=...&instructor_id__in=a,b&order_by=-id&limit=50&total=capped``
+
+    Args:
+        repository: Repository class whose table and declared fields are used
+
+    Returns:
+        FastAPI dependency callable
+    """
+    filterable = ("id", *repository.filterable_fields)
+    sortable = ("id", *repository.sortable_fields)
+
+    async def parse(
+        request: Request,
+        offset: Annotated[int, Query(ge=0)] = 0,
+        limit: Annotated[int, Query(ge=1, le=MAX_LIMIT)] = 100,
+        order_by: str = "",
+        total: Optional[TotalMode] = None,
+    ) -> ListQuery:
+        names = [name.strip() for name in order_by.split(",") if name.strip()]
+        try:
+            filters = parse_query(
+                request.query_params.multi_items(), repository.table, filterable, repository.entity_type
+            )
+            fields = sort_fields(names, sortable, repository.entity_type)
+        except ValidationError as error:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=error.details) from error
+        return ListQuery(filters=filters, order_by=fields, offset=offset, limit=limit, total=total)
+
+    return parse
@@ -0,0 +1,260 @@
+"""Event loop lag monitoring and blocking call detection.
+
+Every route is ``async def`` while the database driver is synchronous, so a
+single synchronous call made directly in a handler stalls every request of the
+worker. ``LoopLagMonitor`` measures how late the loop wakes up from a short
+sleep and keeps a histogram of the lag, exported by ``render_metrics``.
+
+``BlockingDetector`` is meant for development (``LOOP_BLOCK_DETECTION``) and
+tests. A watchdog thread pings the loop; when a ping stays unanswered longer
+than the threshold, the loop is stuck in a callback and the detector captures
+the stack of the loop thread, which points at the blocking call.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from types import FrameType
+from typing import Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the lag histogram buckets
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class LagHistogram:
+    """Cumulative histogram of event loop lag samples."""
+
+    def __init__(self, buckets: tuple[float, ...] = LAG_BUCKETS) -> None:
+        """Initialize an empty histogram.
+
+        Args:
+            buckets: Increasing upper bounds in seconds
+        """
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.last = 0.0
+        self.maximum = 0.0
+
+    def observe(self, lag: float) -> None:
+        """Record a lag sample in seconds."""
+        for index, bound in enumerate(self.buckets):
+            if lag <= bound:
+                self.counts[index] += 1
+        self.count += 1
+        self.sum += lag
+        self.last = lag
+        self.maximum = max(self.maximum, lag)
+
+    def render(self, name: str) -> list[str]:
+        """Render the histogram in the Prometheus text format."""
+        lines = [f"# TYPE {name} histogram"]
+        lines.extend(f'{name}_bucket{{le="{bound}"}} {count}' for bound, count in zip(self.buckets, self.counts))
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class LoopLagMonitor:
+    """Samples event loop lag on a background task."""
+
+    def __init__(
+        self,
+        interval: float = settings.LOOP_LAG_INTERVAL,
+        warn_after: float = settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds slept between samples
+            warn_after: Lag in seconds from which a sample is logged as a warning
+        """
+        self.interval = interval
+        self.warn_after = warn_after
+        self.histogram = LagHistogram()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the sampling task is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start sampling; call from the event loop."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._sample(), name="loop-lag-monitor")
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.histogram.observe(lag)
+            if lag >= self.warn_after:
+                logger.warning("Event loop lagged %.0f ms", lag * 1000)
+
+
+@dataclass(frozen=True)
+class BlockingReport:
+    """A callback caught blocking the event loop.
+
+    Attributes:
+        blocked_for: Seconds the loop had been blocked when the stack was captured.
+        stack: Formatted stack of the loop thread at that moment.
+    """
+
+    blocked_for: float
+    stack: str
+
+
+def callback_stack(frame: Optional[FrameType]) -> str:
+    """Format the stack of a frame from the running event loop callback down."""
+    if frame is None:
+        return ""
+    frames = traceback.extract_stack(frame)
+    asyncio_frames = [index for index, entry in enumerate(frames) if f"{os.sep}asyncio{os.sep}" in entry.filename]
+    if asyncio_frames and asyncio_frames[-1] + 1 < len(frames):
+        frames = traceback.StackSummary.from_list(frames[asyncio_frames[-1] + 1 :])
+    return "".join(frames.format())
+
+
+class BlockingDetector:
+    """Detects callbacks blocking the event loop from a watchdog thread."""
+
+    def __init__(
+        self,
+        threshold: float = settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+        on_block: Optional[Callable[[BlockingReport], None]] = None,
+        max_reports: int = 100,
+    ) -> None:
+        """Initialize the detector.
+
+        Args:
+            threshold: Seconds a ping may stay unanswered before the loop counts as blocked
+            on_block: Called from the watchdog thread with each report; defaults to logging it
+            max_reports: Number of latest reports kept in ``reports``
+        """
+        self.threshold = threshold
+        self.on_block = on_block or self._log
+        self.reports: deque[BlockingReport] = deque(maxlen=max_reports)
+        self.blocked = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._ping = 0
+        self._pinged_at: Optional[float] = None
+        self._reported = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the watchdog thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start watching a loop run by the calling thread.
+
+        Args:
+            loop: Loop to watch; defaults to the running loop
+        """
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-block-detector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and wait for the watchdog thread to finish."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _pong(self, ping: int) -> None:
+        with self._lock:
+            if ping == self._ping:
+                self._pinged_at = None
+
+    def _watch(self) -> None:
+        assert self._loop is not None
+        while not self._stopping.wait(self.threshold / 4):
+            if not self._loop.is_running() or self._loop.is_closed():
+                # Between run_until_complete calls nothing is scheduled, which is not blocking
+                with self._lock:
+                    self._pinged_at = None
+                continue
+            now = time.monotonic()
+            with self._lock:
+                if self._pinged_at is None:
+                    self._ping += 1
+                    self._pinged_at, self._reported = now, False
+                    self._loop.call_soon_threadsafe(self._pong, self._ping)
+                    continue
+                if self._reported or now - self._pinged_at < self.threshold:
+                    continue
+                self._reported = True
+                blocked_for = now - self._pinged_at
+            report = BlockingReport(blocked_for, callback_stack(sys._current_frames().get(self._loop_thread or 0)))
+            self.blocked += 1
+            self.reports.append(report)
+            self.on_block(report)
+
+    @staticmethod
+    def _log(report: BlockingReport) -> None:
+        logger.warning("Event loop blocked for at least %.0f ms in:\n%s", report.blocked_for * 1000, report.stack)
+
+
+loop_monitor = LoopLagMonitor()
+_detector: Optional[BlockingDetector] = None
+
+
+def start_loop_monitor() -> None:
+    """Start lag sampling and, with ``LOOP_BLOCK_DETECTION``, blocking detection; call from the event loop."""
+    global _detector
+    loop_monitor.start()
+    if settings.LOOP_BLOCK_DETECTION and _detector is None:
+        _detector = BlockingDetector()
+        _detector.start()
+
+
+async def stop_loop_monitor() -> None:
+    """Stop lag sampling and blocking detection."""
+    global _detector
+    await loop_monitor.stop()
+    if _detector is not None:
+        _detector.stop()
+        _detector = None
+
+
+def render_metrics() -> str:
+    """Render the event loop metrics in the Prometheus text format."""
+    lines = loop_monitor.histogram.render("boneca_event_loop_lag_seconds")
+    lines.append("# TYPE boneca_event_loop_lag_max_seconds gauge")
+    lines.append(f"boneca_event_loop_lag_max_seconds {loop_monitor.histogram.maximum}")
+    if _detector is not None:
+        lines.append("# TYPE boneca_event_loop_blocked_total counter")
+        lines.append(f"boneca_event_loop_blocked_total {_detector.blocked}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,323 @@
+"""On-demand sampling profiler and allocation snapshots for live workers.
+
+``SamplingProfiler`` records where every thread of the worker spends its time
+without instrumenting any code: a background thread wakes up every
+``DEBUG_PROFILE_INTERVAL`` seconds, reads the current stack of each thread from
+``sys._current_frames()`` and counts identical stacks. The cost is one stack
+walk per thread and sample, and labels are cached per code location, so running
+it at 100 Hz on a busy worker costs a few percent of one core. The result is
+rendered in the collapsed-stack format (``frame;frame;frame count``) read by
+``flamegraph.pl``, speedscope and inferno. Each stack starts with the name of
+its thread; an idle event loop shows up waiting in ``select``.
+
+``AllocationTracker`` wraps ``tracemalloc``. Tracing slows every allocation
+down, so it only starts with the first snapshot and runs until it is stopped
+explicitly. Snapshots are numbered and the latest few are kept, so the growth
+between two of them can be reported.
+"""
+import asyncio
+import contextlib
+import linecache
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from dataclasses import dataclass
+from types import CodeType, FrameType
+from typing import Optional, Union
+
+from src.core.config import settings
+
+# Snapshots are filtered from allocations made by the import system and tracemalloc itself
+_IGNORED_ALLOCATIONS = (
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class ProfilerBusyError(Exception):
+    """Another profile or snapshot is being taken in this worker."""
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Stacks counted by a profiling run.
+
+    Attributes:
+        stacks: Number of samples per stack, each stack a tuple of frame labels from the thread down.
+        samples: Number of times the threads were sampled.
+        seconds: Wall time of the run.
+    """
+
+    stacks: Counter[tuple[str, ...]]
+    samples: int
+    seconds: float
+
+    def collapsed(self) -> str:
+        """Render the stacks in the collapsed-stack format, most frequent first."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads of the process from a background thread."""
+
+    def __init__(
+        self,
+        interval: float = settings.DEBUG_PROFILE_INTERVAL,
+        max_seconds: float = settings.DEBUG_PROFILE_MAX_SECONDS,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples
+            max_seconds: Longest run accepted
+        """
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self._labels: dict[tuple[CodeType, int], str] = {}
+        self._paths: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether a profile is being taken."""
+        return self._lock.locked()
+
+    async def profile(self, seconds: float) -> Profile:
+        """Sample all threads for a number of seconds without blocking the event loop.
+
+        Args:
+            seconds: Length of the run; capped at ``max_seconds``
+
+        Returns:
+            The counted stacks
+
+        Raises:
+            ProfilerBusyError: If a profile is already being taken
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already being taken")
+        loop = asyncio.get_running_loop()
+        done: asyncio.Future[Profile] = loop.create_future()
+        stopping = threading.Event()
+
+        def run() -> None:
+            outcome: Union[Profile, BaseException]
+            try:
+                outcome = self.collect(min(seconds, self.max_seconds), stopping)
+            except Exception as error:
+                outcome = error
+            finally:
+                self._lock.release()
+            # The loop is closed when the worker exited during the run
+            with contextlib.suppress(RuntimeError):
+                loop.call_soon_threadsafe(_resolve, done, outcome)
+
+        threading.Thread(target=run, name="sampling-profiler", daemon=True).start()
+        try:
+            return await done
+        finally:
+            # Stop sampling when the request is cancelled, e.g. because the client went away
+            stopping.set()
+
+    def collect(self, seconds: float, stopping: Optional[threading.Event] = None) -> Profile:
+        """Sample all other threads for a number of seconds; blocks the calling thread.
+
+        Args:
+            seconds: Length of the run
+            stopping: Ends the run early when set
+
+        Returns:
+            The counted stacks
+        """
+        stopping = stopping or threading.Event()
+        stacks: Counter[tuple[str, ...]] = Counter()
+        samples = 0
+        started = time.monotonic()
+        deadline = started + seconds
+        while not stopping.is_set() and time.monotonic() < deadline:
+            self.sample(stacks)
+            samples += 1
+            stopping.wait(self.interval)
+        return Profile(stacks, samples, time.monotonic() - started)
+
+    def sample(self, stacks: Counter[tuple[str, ...]]) -> None:
+        """Count the current stack of every thread but the calling one."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        current = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == current:
+                continue
+            labels = [self._label(entry) for entry in _walk(frame)]
+            labels.append(f"thread:{names.get(ident, ident)}")
+            labels.reverse()
+            stacks[tuple(labels)] += 1
+
+    def _label(self, frame: FrameType) -> str:
+        code = frame.f_code
+        key = (code, frame.f_lineno)
+        label = self._labels.get(key)
+        if label is None:
+            label = f"{code.co_qualname} ({self._path(code.co_filename)}:{frame.f_lineno})"
+            self._labels[key] = label
+        return label
+
+    def _path(self, filename: str) -> str:
+        path = self._paths.get(filename)
+        if path is None:
+            # Relative to the longest import root, e.g. src/api/v1/users.py or sqlalchemy/engine/base.py
+            roots = [root for root in map(os.path.abspath, sys.path) if filename.startswith(root + os.sep)]
+            path = os.path.relpath(filename, max(roots, key=len)) if roots else filename
+            self._paths[filename] = path
+        return path
+
+
+def _resolve(future: asyncio.Future[Profile], outcome: Union[Profile, BaseException]) -> None:
+    if future.done():
+        return
+    if isinstance(outcome, BaseException):
+        future.set_exception(outcome)
+    else:
+        future.set_result(outcome)
+
+
+def _walk(frame: Optional[FrameType]) -> list[FrameType]:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    return frames
+
+
+@dataclass(frozen=True)
+class AllocationStat:
+    """Memory allocated from one source line and still alive.
+
+    Attributes:
+        location: ``file:line`` of the allocation.
+        size: Bytes allocated.
+        count: Number of memory blocks.
+        size_diff: Change of ``size`` since the compared snapshot.
+        count_diff: Change of ``count`` since the compared snapshot.
+        line: Source code of the line.
+    """
+
+    location: str
+    size: int
+    count: int
+    size_diff: int = 0
+    count_diff: int = 0
+    line: str = ""
+
+
+@dataclass(frozen=True)
+class AllocationReport:
+    """Top allocations of a snapshot.
+
+    Attributes:
+        snapshot: Number of the snapshot, to compare later snapshots with.
+        compared_to: Number of the snapshot the differences are relative to.
+        traced: Bytes currently allocated by traced memory blocks.
+        peak: Highest ``traced`` since tracing started.
+        top: Largest allocations, or largest growths when compared.
+    """
+
+    snapshot: int
+    compared_to: Optional[int]
+    traced: int
+    peak: int
+    top: list[AllocationStat]
+
+
+class AllocationTracker:
+    """Takes numbered ``tracemalloc`` snapshots and compares them."""
+
+    def __init__(self, frames: int = settings.DEBUG_TRACEMALLOC_FRAMES, keep: int = 4) -> None:
+        """Initialize the tracker.
+
+        Args:
+            frames: Frames stored per traced memory block
+            keep: Number of latest snapshots kept for comparison
+        """
+        self.frames = frames
+        self._snapshots: deque[tuple[int, tracemalloc.Snapshot]] = deque(maxlen=keep)
+        self._taken = 0
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        """Whether memory allocations are traced."""
+        return tracemalloc.is_tracing()
+
+    def snapshot(self, limit: int = 20, compare_to: Optional[int] = None) -> AllocationReport:
+        """Start tracing if needed and take a snapshot of the traced allocations.
+
+        The first snapshot only sees memory allocated after it started tracing;
+        compare later snapshots with it to find what grows.
+
+        Args:
+            limit: Number of source lines reported
+            compare_to: Number of an earlier snapshot to report the growth since
+
+        Returns:
+            The largest allocations, or the largest growths when compared
+
+        Raises:
+            ProfilerBusyError: If a snapshot is already being taken
+            KeyError: If the snapshot to compare with is unknown or was dropped
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A snapshot is already being taken")
+        try:
+            earlier = None
+            if compare_to is not None:
+                earlier = dict(self._snapshots).get(compare_to)
+                if earlier is None:
+                    raise KeyError(compare_to)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_ALLOCATIONS)
+            traced, peak = tracemalloc.get_traced_memory()
+            self._taken += 1
+            self._snapshots.append((self._taken, snapshot))
+
+            if earlier is not None:
+                top = [
+                    _allocation(stat.traceback, stat.size, stat.count, stat.size_diff, stat.count_diff)
+                    for stat in snapshot.compare_to(earlier, "lineno")[:limit]
+                ]
+            else:
+                top = [
+                    _allocation(stat.traceback, stat.size, stat.count) for stat in snapshot.statistics("lineno")[:limit]
+                ]
+            return AllocationReport(self._taken, compare_to, traced, peak, top)
+        finally:
+            self._lock.release()
+
+    def stop(self) -> None:
+        """Stop tracing and drop all snapshots."""
+        with self._lock:
+            self._snapshots.clear()
+            tracemalloc.stop()
+
+
+def _allocation(
+    traceback: tracemalloc.Traceback, size: int, count: int, size_diff: int = 0, count_diff: int = 0
+) -> AllocationStat:
+    frame = traceback[0]
+    return AllocationStat(
+        location=f"{frame.filename}:{frame.lineno}",
+        size=size,
+        count=count,
+        size_diff=size_diff,
+        count_diff=count_diff,
+        line=linecache.getline(frame.filename, frame.lineno).strip(),
+    )
+
+
+profiler = SamplingProfiler()
+allocation_tracker = AllocationTracker()
@@ -0,0 +1,251 @@
+"""SQL query instrumentation module.
+
+This module records every statement executed through an instrumented engine:
+normalized SQL, duration, rows returned and the route that issued it. Records are
+collected per request (or per ``query_log()`` block), statements slower than
+``SLOW_QUERY_THRESHOLD_MS`` are logged, optionally together with an
+``EXPLAIN (ANALYZE, BUFFERS)`` plan.
+"""
+import logging
+import re
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import Connection, Engine, event
+from sqlalchemy.engine.interfaces import DBAPICursor, ExecutionContext
+
+from src.core.config import settings
+from src.core.deadlines import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_START_TIMES_KEY = "query_log_start_times"
+
+
+def normalize_sql(statement: str) -> str:
+    """Normalize a SQL statement so queries of the same shape compare equal.
+
+    Literals and bind placeholders become ``?``, ``IN`` lists collapse to
+    ``IN (...)`` and whitespace is collapsed.
+
+    Args:
+        statement: SQL statement as sent to the driver
+
+    Returns:
+        Normalized statement
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    """A single executed statement.
+
+    Attributes:
+        sql: Normalized SQL statement.
+        duration_ms: Execution time in milliseconds.
+        rows: Rows returned or affected (-1 if the driver does not report it).
+        route: Route that issued the statement, if known.
+        plan: ``EXPLAIN (ANALYZE, BUFFERS)`` output captured for slow statements.
+    """
+
+    sql: str
+    duration_ms: float
+    rows: int
+    route: Optional[str] = None
+    plan: Optional[str] = None
+
+
+class QueryLog:
+    """Collection of statements issued by one request or block of code.
+
+    Logs nest: a statement recorded in an inner log (e.g. the log of a request)
+    is also recorded in every enclosing log (e.g. a test's query budget).
+    """
+
+    def __init__(
+        self, route: Optional[str] = None, scope: Optional[Scope] = None, parent: Optional["QueryLog"] = None
+    ) -> None:
+        """Initialize the log.
+
+        Args:
+            route: Fixed route label
+            scope: ASGI scope to derive the route label from once routing is done
+            parent: Enclosing log that also receives the records
+        """
+        self._route = route
+        self._scope = scope
+        self.parent = parent
+        self.records: list[QueryRecord] = []
+
+    @property
+    def route(self) -> Optional[str]:
+        """Get the label of the route that issued the statements."""
+        if self._route is None and self._scope is not None:
+            endpoint = self._scope.get("endpoint")
+            target = getattr(endpoint, "__name__", None) or self._scope.get("path", "")
+            return f"{self._scope.get('method', '')} {target}".strip()
+        return self._route
+
+    @property
+    def count(self) -> int:
+        """Get the number of recorded statements."""
+        return len(self.records)
+
+    @property
+    def total_ms(self) -> float:
+        """Get the total execution time of all recorded statements."""
+        return sum(record.duration_ms for record in self.records)
+
+    def add(self, record: QueryRecord) -> None:
+        """Append a statement record, here and in the enclosing logs."""
+        self.records.append(record)
+        if self.parent is not None:
+            self.parent.add(record)
+
+
+_current_log: ContextVar[Optional[QueryLog]] = ContextVar("current_query_log", default=None)
+
+
+def get_current_query_log() -> Optional[QueryLog]:
+    """Get the query log of the current request, if any."""
+    return _current_log.get()
+
+
+@contextmanager
+def query_log(route: Optional[str] = None, scope: Optional[Scope] = None) -> Iterator[QueryLog]:
+    """Collect all statements executed inside the block.
+
+    An enclosing log keeps receiving the statements as well.
+
+    Args:
+        route: Route label attached to the records
+        scope: ASGI scope to derive the route label from
+
+    Yields:
+        The log the statements are recorded in
+    """
+    log = QueryLog(route, scope, parent=_current_log.get())
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+
+
+class QueryLogMiddleware:
+    """ASGI middleware that collects the statements issued by each HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI call."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with query_log(scope=scope) as log:
+            await self.app(scope, receive, send)
+        if log.count:
+            logger.debug("%s issued %d queries in %.1f ms", log.route, log.count, log.total_ms)
+
+
+def _explain(cursor: DBAPICursor, statement: str, parameters: Any) -> Optional[str]:
+    """Capture the plan of a statement inside a savepoint on the same connection."""
+    explain_cursor = cursor.connection.cursor()
+    explain_cursor.execute("SAVEPOINT query_log_explain")
+    try:
+        explain_cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+        plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+    except Exception:  # a failed plan capture must never fail the request
+        explain_cursor.execute("ROLLBACK TO SAVEPOINT query_log_explain")
+        logger.warning("Could not capture plan for slow query", exc_info=True)
+        return None
+    explain_cursor.execute("RELEASE SAVEPOINT query_log_explain")
+    return plan
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    duration_ms = (time.perf_counter() - conn.info[_START_TIMES_KEY].pop()) * 1000
+    log = _current_log.get()
+    slow = duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS
+
+    plan = None
+    if (
+        slow
+        and settings.SLOW_QUERY_EXPLAIN
+        and not executemany
+        and conn.dialect.name == "postgresql"
+        # Repositories only prepare SELECTs (see ``src.core.repositories.statements``)
+        and statement.lstrip().upper().startswith(("SELECT", "EXECUTE"))
+    ):
+        plan = _explain(cursor, statement, parameters)
+
+    record = QueryRecord(
+        sql=normalize_sql(statement),
+        duration_ms=duration_ms,
+        rows=cursor.rowcount,
+        route=log.route if log is not None else None,
+        plan=plan,
+    )
+    if log is not None:
+        log.add(record)
+    if slow:
+        logger.warning(
+            "Slow query (%.1f ms, %d rows, route=%s): %s%s",
+            record.duration_ms,
+            record.rows,
+            record.route,
+            record.sql,
+            f"\n{plan}" if plan else "",
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record every statement executed through the engine.
+
+    Args:
+        engine: Engine to instrument; calling this twice is a no-op
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
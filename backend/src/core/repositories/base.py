@@ -1,8 +1,12 @@
 """Base repository interface and abstract implementations."""
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 from typing import Any, AsyncContextManager, Generic, Optional, TypeVar
 from uuid import UUID
 
+from src.core.repositories.counts import Total, TotalMode
+from src.core.repositories.filters import Filters
+
 T = TypeVar("T")
 
 
@@ -37,11 +41,12 @@ class BaseRepository(Generic[T], AsyncContextManager["BaseRepository[T]"], ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def get(self, id: UUID) -> T:
+    async def get(self, id: UUID, *, include_deleted: bool = False) -> T:
         """Retrieve an entity by its ID.
 
         Args:
             id: The unique identifier of the entity
+            include_deleted: Also return a soft-deleted entity
 
         Returns:
             The entity if found
@@ -56,21 +61,53 @@ class BaseRepository(Generic[T], AsyncContextManager["BaseRepository[T]"], ABC):
     async def list(
         self,
         *,
-        filters: Optional[dict[str, Any]] = None,
+        filters: Optional[Filters] = None,
         offset: int = 0,
         limit: int = 100,
+        include_deleted: bool = False,
+        order_by: Sequence[str] = (),
     ) -> list[T]:
-        """List entities with optional filtering and pagination.
+        """List entities with optional filtering, sorting and pagination.
+
+        Soft-deleted entities are excluded unless ``include_deleted`` is set.
 
         Args:
-            filters: Optional dictionary of field-value pairs to filter by
+            filters: Optional filter expression (see ``src.core.repositories.filters``)
+                or dictionary of field-value pairs to filter by
             offset: Number of records to skip (for pagination)
             limit: Maximum number of records to return (for pagination)
+            include_deleted: Also return soft-deleted entities
+            order_by: Fields to sort by, descending if prefixed with ``-``
 
         Returns:
             List of entities matching the criteria
 
         Raises:
+            ValidationError: If a field cannot be filtered or sorted by
+            RepositoryError: If there's an error accessing the repository
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count(
+        self,
+        *,
+        filters: Optional[Filters] = None,
+        include_deleted: bool = False,
+        mode: TotalMode = TotalMode.EXACT,
+    ) -> Total:
+        """Count the entities a ``list`` call with the same filters would page through.
+
+        Args:
+            filters: Optional filter expression or dictionary of field-value pairs
+            include_deleted: Also count soft-deleted entities
+            mode: Exact count, capped count or planner estimate (see ``src.core.repositories.counts``)
+
+        Returns:
+            The total
+
+        Raises:
+            ValidationError: If a field cannot be filtered by
             RepositoryError: If there's an error accessing the repository
         """
         raise NotImplementedError
@@ -115,6 +152,9 @@ class BaseRepository(Generic[T], AsyncContextManager["BaseRepository[T]"], ABC):
     async def delete(self, id: UUID) -> None:
         """Delete an entity by its ID.
 
+        Repositories with soft deletes only mark the entity as deleted; it is
+        hidden from reads until the archival job moves it out of the hot table.
+
         Args:
             id: The unique identifier of the entity to delete
 
@@ -0,0 +1,201 @@
+"""Total counts for paginated lists.
+
+An exact ``COUNT(*)`` visits every matching row and on a large table costs more
+than the page itself. Repositories therefore count in one of three modes:
+
+- ``exact``: ``COUNT(*)``, for small tables and when the number matters;
+- ``capped``: counts at most ``cap + 1`` rows, reported as "10000+" beyond the cap;
+- ``estimate``: the planner's row estimate, from ``pg_class.reltuples`` for an
+  unfiltered table or from ``EXPLAIN`` otherwise; free, but only as good as the
+  table statistics.
+
+Capped counts and estimates are cached per tenant for a short TTL, so a UI
+polling the same list does not recount on every page.
+"""
+import enum
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import Connection, Select, func, select, text
+
+from src.core.config import settings
+from src.core.tenancy import get_current_tenant
+
+
+class TotalMode(str, enum.Enum):
+    """How a total is counted."""
+
+    EXACT = "exact"
+    CAPPED = "capped"
+    ESTIMATE = "estimate"
+
+
+@dataclass(frozen=True)
+class Total:
+    """Number of entities matching a list query.
+
+    Attributes:
+        value: The count, the cap for capped counts beyond it, or the estimate.
+        mode: How the count was obtained.
+        capped: Whether more than ``value`` entities match.
+        cached: Whether the count was served from the count cache.
+    """
+
+    value: int
+    mode: TotalMode
+    capped: bool = False
+    cached: bool = False
+
+    def __str__(self) -> str:
+        """Render the total for display, e.g. ``1234``, ``10000+`` or ``~1234``."""
+        if self.capped:
+            return f"{self.value}+"
+        if self.mode is TotalMode.ESTIMATE:
+            return f"~{self.value}"
+        return str(self.value)
+
+
+# (tenant, mode, cap, statement SQL, bound parameters)
+CountKey = tuple[Optional[str], TotalMode, int, str, str]
+
+
+class CountCache:
+    """In-process TTL cache of totals with LRU eviction."""
+
+    def __init__(
+        self,
+        ttl: float = settings.TOTAL_COUNT_CACHE_TTL,
+        max_entries: int = settings.TOTAL_COUNT_CACHE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds a total stays fresh; 0 disables caching
+            max_entries: Maximum number of stored totals
+            clock: Monotonic clock returning seconds
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: OrderedDict[CountKey, tuple[float, Total]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get the number of stored totals."""
+        return len(self._entries)
+
+    def get(self, key: CountKey) -> Optional[Total]:
+        """Get a fresh total and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, total = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return total
+
+    def set(self, key: CountKey, total: Total) -> None:
+        """Store a total, evicting the least recently used ones beyond ``max_entries``."""
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (self.clock() + self.ttl, total)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all totals."""
+        self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+def cache_key(connection: Connection, statement: Select[Any], mode: TotalMode, cap: int) -> CountKey:
+    """Build the cache key of counting a statement in the current tenant."""
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    return (get_current_tenant(), mode, cap, str(compiled), repr(sorted(compiled.params.items())))
+
+
+def exact_count(connection: Connection, statement: Select[Any]) -> int:
+    """Count all rows of a statement."""
+    return int(connection.scalar(select(func.count()).select_from(statement.order_by(None).subquery())) or 0)
+
+
+def capped_count(connection: Connection, statement: Select[Any], cap: int) -> Total:
+    """Count the rows of a statement, stopping after ``cap + 1``."""
+    limited = statement.order_by(None).limit(cap + 1).subquery()
+    value = int(connection.scalar(select(func.count()).select_from(limited)) or 0)
+    return Total(min(value, cap), TotalMode.CAPPED, capped=value > cap)
+
+
+def planner_estimate(connection: Connection, statement: Select[Any], table_name: Optional[str]) -> Optional[int]:
+    """Get the planner's row estimate of a statement on PostgreSQL.
+
+    Args:
+        connection: Connection to plan on
+        statement: Statement whose rows are estimated
+        table_name: Table an unfiltered statement reads; its ``reltuples`` is used directly
+
+    Returns:
+        The estimate, or None if the database cannot estimate (other dialects,
+        tables that were never analyzed)
+    """
+    if connection.dialect.name != "postgresql":
+        return None
+    if table_name is not None:
+        reltuples = connection.scalar(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"), {"name": table_name}
+        )
+        # reltuples is -1 until the table is first vacuumed or analyzed
+        return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar_one()
+    plan = json.loads(result) if isinstance(result, str) else result
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count(
+    connection: Connection,
+    statement: Select[Any],
+    mode: TotalMode,
+    *,
+    table_name: Optional[str] = None,
+    cap: int = settings.TOTAL_COUNT_CAP,
+    cache: Optional[CountCache] = None,
+) -> Total:
+    """Count the rows of a statement in a mode.
+
+    Estimates fall back to a capped count where the planner cannot help. Only
+    capped counts and estimates are cached; exact counts always hit the database.
+
+    Args:
+        connection: Connection to count on
+        statement: Statement whose rows are counted
+        mode: Counting mode
+        table_name: Table an unfiltered statement reads, enabling ``reltuples`` estimates
+        cap: Largest number a capped count reports exactly
+        cache: Cache to use; defaults to the process-wide cache
+
+    Returns:
+        The total
+    """
+    if mode is TotalMode.EXACT:
+        return Total(exact_count(connection, statement), mode)
+
+    cache = cache if cache is not None else count_cache
+    key = cache_key(connection, statement, mode, cap)
+    cached = cache.get(key)
+    if cached is not None:
+        return Total(cached.value, cached.mode, cached.capped, cached=True)
+
+    estimate = planner_estimate(connection, statement, table_name) if mode is TotalMode.ESTIMATE else None
+    total = Total(estimate, mode) if estimate is not None else capped_count(connection, statement, cap)
+    cache.set(key, total)
+    return total
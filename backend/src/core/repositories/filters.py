@@ -0,0 +1,444 @@
+"""Typed filter expressions for repository queries.
+
+A filter is a small immutable tree of conditions (``Eq``, ``In``, ``Range``,
+``Prefix``, ``IsNull``) combined with ``And`` and ``Or``. SQL repositories
+compile it to a parameterized SQLAlchemy condition; in-memory repositories
+evaluate it against their entities. Plain ``{"field": value}`` dictionaries
+remain accepted and mean a conjunction of equality conditions.
+
+``parse_query`` builds filters from query parameters at the API boundary, e.g.
+``?studio_id=...&starts_at__gte=2026-01-01T00:00:00Z&title__prefix=Sal``.
+Values are converted to the Python type of their column, so they are bound as
+typed parameters and never interpolated into SQL. ``Prefix`` is only accepted on
+text columns whose index can answer ``LIKE 'value%'`` (see ``prefix_columns``).
+"""
+from collections.abc import Collection, Hashable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any, Optional, Union, cast
+
+from pydantic import TypeAdapter
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    PrimaryKeyConstraint,
+    String,
+    Table,
+    UnaryExpression,
+    UniqueConstraint,
+    and_,
+    bindparam,
+    false,
+    or_,
+    true,
+)
+
+from src.core.exceptions import ValidationError
+
+# Largest number of values accepted by ``In``
+MAX_IN_VALUES = 100
+# Largest number of distinct sort fields, besides the ID
+MAX_SORT_FIELDS = 4
+# Query parameters that are not filters
+RESERVED_PARAMETERS = frozenset({"offset", "limit", "order_by", "total"})
+# Operator classes and collations with which a B-tree index compares bytes and can serve LIKE 'value%'
+PATTERN_OPS = frozenset({"text_pattern_ops", "varchar_pattern_ops", "bpchar_pattern_ops"})
+BYTEWISE_COLLATIONS = frozenset({"C", "POSIX"})
+
+
+@dataclass(frozen=True)
+class Eq:
+    """``field = value``."""
+
+    field: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class In:
+    """``field IN (values)``."""
+
+    field: str
+    values: tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Range:
+    """Bounds on a field; unset bounds are open.
+
+    Attributes:
+        field: Filtered field.
+        gte: Inclusive lower bound.
+        gt: Exclusive lower bound.
+        lte: Inclusive upper bound.
+        lt: Exclusive upper bound.
+    """
+
+    field: str
+    gte: Any = None
+    gt: Any = None
+    lte: Any = None
+    lt: Any = None
+
+
+@dataclass(frozen=True)
+class Prefix:
+    """``field`` starts with ``value`` (compiled to an escaped ``LIKE 'value%'``)."""
+
+    field: str
+    value: str
+
+
+@dataclass(frozen=True)
+class IsNull:
+    """``field IS NULL``, or ``IS NOT NULL`` if ``is_null`` is false."""
+
+    field: str
+    is_null: bool = True
+
+
+@dataclass(frozen=True, init=False)
+class And:
+    """All clauses hold; an empty ``And`` matches everything."""
+
+    clauses: tuple["Filter", ...]
+
+    def __init__(self, *clauses: "Filter") -> None:
+        """Combine clauses."""
+        object.__setattr__(self, "clauses", clauses)
+
+
+@dataclass(frozen=True, init=False)
+class Or:
+    """Any clause holds; an empty ``Or`` matches nothing."""
+
+    clauses: tuple["Filter", ...]
+
+    def __init__(self, *clauses: "Filter") -> None:
+        """Combine clauses."""
+        object.__setattr__(self, "clauses", clauses)
+
+
+Filter = Union[Eq, In, Range, Prefix, IsNull, And, Or]
+Filters = Union[Filter, Mapping[str, Any]]
+
+
+def as_filter(filters: Optional[Filters]) -> Filter:
+    """Normalize ``None`` and equality dictionaries to a filter expression."""
+    if filters is None:
+        return And()
+    if isinstance(filters, Mapping):
+        return And(*(Eq(field, value) for field, value in filters.items()))
+    return filters
+
+
+def fields(expression: Filter) -> Iterator[str]:
+    """Iterate over the fields an expression refers to."""
+    if isinstance(expression, (And, Or)):
+        for clause in expression.clauses:
+            yield from fields(clause)
+    else:
+        yield expression.field
+
+
+def equalities(expression: Filter) -> Optional[dict[str, Any]]:
+    """Get the conditions of a pure conjunction of ``Eq`` clauses, or None for any other expression."""
+    if isinstance(expression, Eq):
+        return {expression.field: expression.value}
+    if not isinstance(expression, And):
+        return None
+    result: dict[str, Any] = {}
+    for clause in expression.clauses:
+        nested = equalities(clause)
+        if nested is None:
+            return None
+        result.update(nested)
+    return result
+
+
+def _bound(column: Column[Any], value: Any, parameters: Optional[dict[str, Any]]) -> Any:
+    if parameters is None:
+        return value
+    name = f"filter_{len(parameters)}"
+    parameters[name] = value
+    return bindparam(name, type_=column.type)
+
+
+def _in_values(values: Sequence[Any]) -> Sequence[Any]:
+    # Padded to the next power of two by repeating the last value, so few list lengths share a statement
+    size = 1 << (len(values) - 1).bit_length() if values else 0
+    return [*values, *[values[-1]] * (size - len(values))] if values else values
+
+
+def _like_prefix(value: str) -> str:
+    # Same escaping as SQLAlchemy's ``autoescape``, which needs a literal value
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+
+
+def compile_filter(
+    expression: Filter, table: Table, parameters: Optional[dict[str, Any]] = None
+) -> ColumnElement[bool]:
+    """Compile an expression to a parameterized SQL condition on a table.
+
+    Values are embedded in the condition, unless ``parameters`` is given: then
+    each value becomes a named bind parameter (``filter_0``, ``filter_1``, ...)
+    whose value is added to ``parameters``, and expressions of the same
+    ``shape`` compile to the same condition. ``In`` lists are padded with their
+    last value to the length of their shape.
+
+    Raises:
+        KeyError: If a field is not a column of the table
+    """
+    if isinstance(expression, And):
+        return and_(true(), *(compile_filter(clause, table, parameters) for clause in expression.clauses))
+    if isinstance(expression, Or):
+        return or_(false(), *(compile_filter(clause, table, parameters) for clause in expression.clauses))
+
+    column: Column[Any] = table.c[expression.field]
+    if isinstance(expression, Eq):
+        if parameters is not None and expression.value is None:
+            return column.is_(None)
+        return cast(ColumnElement[bool], column == _bound(column, expression.value, parameters))
+    if isinstance(expression, In):
+        if parameters is None:
+            return column.in_(expression.values)
+        # Bound one by one: an expanding IN is rendered at execution and cannot be prepared
+        if not expression.values:
+            return false()
+        return column.in_([_bound(column, value, parameters) for value in _in_values(expression.values)])
+    if isinstance(expression, Prefix):
+        if parameters is None:
+            return column.startswith(expression.value, autoescape=True)
+        return column.like(_bound(column, _like_prefix(expression.value), parameters), escape="/")
+    if isinstance(expression, IsNull):
+        return column.is_(None) if expression.is_null else column.is_not(None)
+    bounds = []
+    if expression.gte is not None:
+        bounds.append(column >= _bound(column, expression.gte, parameters))
+    if expression.gt is not None:
+        bounds.append(column > _bound(column, expression.gt, parameters))
+    if expression.lte is not None:
+        bounds.append(column <= _bound(column, expression.lte, parameters))
+    if expression.lt is not None:
+        bounds.append(column < _bound(column, expression.lt, parameters))
+    return and_(true(), *bounds)
+
+
+def filter_parameters(expression: Filter) -> dict[str, Any]:
+    """Get the parameter values of an expression compiled with bound parameters (see ``compile_filter``)."""
+    values: list[Any] = []
+    for clause in _leaves(expression):
+        if isinstance(clause, Eq) and clause.value is not None:
+            values.append(clause.value)
+        elif isinstance(clause, In):
+            values.extend(_in_values(clause.values))
+        elif isinstance(clause, Prefix):
+            values.append(_like_prefix(clause.value))
+        elif isinstance(clause, Range):
+            values.extend(bound for bound in (clause.gte, clause.gt, clause.lte, clause.lt) if bound is not None)
+    return {f"filter_{index}": value for index, value in enumerate(values)}
+
+
+def shape(expression: Filter) -> Hashable:
+    """Get the structure of an expression without its values.
+
+    Expressions of the same shape compile to the same condition when their
+    values are bound as parameters (see ``compile_filter``). ``In`` lists are
+    padded to the next power of two, so their lengths only make a few shapes.
+    """
+    if isinstance(expression, (And, Or)):
+        return (type(expression).__name__, tuple(shape(clause) for clause in expression.clauses))
+    if isinstance(expression, Eq):
+        return ("Eq", expression.field, expression.value is None)
+    if isinstance(expression, In):
+        return ("In", expression.field, len(_in_values(expression.values)))
+    if isinstance(expression, Range):
+        bounds = (expression.gte, expression.gt, expression.lte, expression.lt)
+        return ("Range", expression.field, tuple(bound is not None for bound in bounds))
+    if isinstance(expression, IsNull):
+        return ("IsNull", expression.field, expression.is_null)
+    return ("Prefix", expression.field)
+
+
+def matches(expression: Filter, entity: Any) -> bool:
+    """Evaluate an expression against an object's attributes."""
+    if isinstance(expression, And):
+        return all(matches(clause, entity) for clause in expression.clauses)
+    if isinstance(expression, Or):
+        return any(matches(clause, entity) for clause in expression.clauses)
+
+    value = getattr(entity, expression.field)
+    if isinstance(expression, Eq):
+        return cast(bool, value == expression.value)
+    if isinstance(expression, In):
+        return value in expression.values
+    if isinstance(expression, Prefix):
+        return isinstance(value, str) and value.startswith(expression.value)
+    if isinstance(expression, IsNull):
+        return (value is None) == expression.is_null
+    if value is None:
+        return False
+    return (
+        (expression.gte is None or value >= expression.gte)
+        and (expression.gt is None or value > expression.gt)
+        and (expression.lte is None or value <= expression.lte)
+        and (expression.lt is None or value < expression.lt)
+    )
+
+
+def prefix_columns(table: Table) -> set[str]:
+    """Get the text columns on which a ``Prefix`` can be answered by an index scan.
+
+    With any other collation than ``C``, PostgreSQL only uses a B-tree index for
+    ``LIKE 'value%'`` if the index was built with a ``*_pattern_ops`` operator class.
+    """
+    leading: list[tuple[Column[Any], dict[str, str]]] = [
+        (index.expressions[0], index.dialect_options["postgresql"]["ops"] or {})
+        for index in table.indexes
+        if index.expressions and isinstance(index.expressions[0], Column)
+    ]
+    leading.extend(
+        (next(iter(constraint.columns)), {})
+        for constraint in table.constraints
+        if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint)) and constraint.columns
+    )
+    return {
+        column.name
+        for column, ops in leading
+        if isinstance(column.type, String)
+        and (ops.get(column.name) in PATTERN_OPS or column.type.collation in BYTEWISE_COLLATIONS)
+    }
+
+
+def check_fields(
+    expression: Filter,
+    allowed: Collection[str],
+    entity_type: str,
+    prefixable: Optional[Collection[str]] = None,
+) -> None:
+    """Ensure an expression only uses allowed fields and bounded ``In`` lists.
+
+    Args:
+        expression: Expression to check
+        allowed: Fields that may be filtered on
+        entity_type: Entity type reported in errors
+        prefixable: Fields ``Prefix`` may be used on; None allows any allowed field
+
+    Raises:
+        ValidationError: If a field is not filterable, an ``In`` list is too long or a prefix is not supported
+    """
+    errors: dict[str, Any] = {field: "not filterable" for field in fields(expression) if field not in allowed}
+    for clause in _leaves(expression):
+        if isinstance(clause, In) and len(clause.values) > MAX_IN_VALUES:
+            errors[clause.field] = f"at most {MAX_IN_VALUES} values"
+        elif isinstance(clause, Prefix) and prefixable is not None and clause.field not in prefixable:
+            errors.setdefault(clause.field, "prefix needs a text field with a pattern index")
+    if errors:
+        raise ValidationError(entity_type, errors)
+
+
+def _leaves(expression: Filter) -> Iterator[Filter]:
+    if isinstance(expression, (And, Or)):
+        for clause in expression.clauses:
+            yield from _leaves(clause)
+    else:
+        yield expression
+
+
+def sort_fields(order_by: Sequence[str], allowed: Collection[str], entity_type: str) -> tuple[str, ...]:
+    """Normalize sort fields, ``-`` marking descending order.
+
+    Only the first mention of a field counts, since later ones cannot change the
+    order, and the ID always comes last as the tie breaker, so pages are stable
+    and orders that sort the same are spelled the same.
+
+    Raises:
+        ValidationError: If a field is not sortable or there are more than ``MAX_SORT_FIELDS``
+    """
+    errors = {name.lstrip("-"): "not sortable" for name in order_by if name.lstrip("-") not in allowed}
+    if errors:
+        raise ValidationError(entity_type, errors)
+    first = {name.lstrip("-"): name for name in reversed(order_by)}
+    fields = [name for name in dict.fromkeys(name.lstrip("-") for name in order_by) if name != "id"]
+    if len(fields) > MAX_SORT_FIELDS:
+        raise ValidationError(entity_type, {"order_by": f"at most {MAX_SORT_FIELDS} fields"})
+    return (*(first[name] for name in fields), first.get("id", "id"))
+
+
+def order_clauses(
+    table: Table, order_by: Sequence[str], allowed: Collection[str], entity_type: str
+) -> list[UnaryExpression[Any]]:
+    """Build ``ORDER BY`` clauses from field names, normalized by ``sort_fields``.
+
+    Raises:
+        ValidationError: If a field is not sortable or there are too many
+    """
+    return [
+        table.c[name[1:]].desc() if name.startswith("-") else table.c[name].asc()
+        for name in sort_fields(order_by, allowed, entity_type)
+    ]
+
+
+def _convert(table: Table, field: str, value: str) -> Any:
+    return TypeAdapter(table.c[field].type.python_type).validate_python(value)
+
+
+def parse_query(
+    parameters: Iterable[tuple[str, str]],
+    table: Table,
+    filterable: Collection[str],
+    entity_type: str,
+) -> Filter:
+    """Build a conjunction of filters from query parameters.
+
+    Supported lookups are ``field=v``, ``field__in=a,b``, ``field__gte=v``,
+    ``field__gt=v``, ``field__lte=v``, ``field__lt=v``, ``field__prefix=v`` and
+    ``field__isnull=true|false``. Parameters in ``RESERVED_PARAMETERS`` are skipped.
+    ``field__prefix`` is only accepted on text columns in ``prefix_columns``.
+
+    Args:
+        parameters: Query parameters as (name, value) pairs
+        table: Table whose column types the values are converted to
+        filterable: Fields that may be filtered on
+        entity_type: Entity type reported in errors
+
+    Returns:
+        The filter expression
+
+    Raises:
+        ValidationError: If a field is not filterable, a lookup is unknown or a value is invalid
+    """
+    clauses: list[Filter] = []
+    errors: dict[str, Any] = {}
+    prefixable = prefix_columns(table)
+    for name, raw in parameters:
+        if name in RESERVED_PARAMETERS:
+            continue
+        field, _, lookup = name.partition("__")
+        if field not in filterable:
+            errors[name] = "not filterable"
+            continue
+        try:
+            if lookup == "":
+                clauses.append(Eq(field, _convert(table, field, raw)))
+            elif lookup == "in":
+                clauses.append(In(field, tuple(_convert(table, field, part) for part in raw.split(","))))
+            elif lookup in ("gte", "gt", "lte", "lt"):
+                clauses.append(Range(field, **{lookup: _convert(table, field, raw)}))
+            elif lookup == "prefix" and not isinstance(table.c[field].type, String):
+                errors[name] = "prefix only applies to text fields"
+            elif lookup == "prefix" and field not in prefixable:
+                errors[name] = "prefix needs a text field with a pattern index"
+            elif lookup == "prefix":
+                clauses.append(Prefix(field, raw))
+            elif lookup == "isnull":
+                clauses.append(IsNull(field, TypeAdapter(bool).validate_python(raw)))
+            else:
+                errors[name] = f"unknown lookup {lookup!r}"
+        except (PydanticValidationError, NotImplementedError) as error:
+            errors[name] = f"invalid value {raw!r}: {error.__class__.__name__}"
+    if errors:
+        raise ValidationError(entity_type, errors)
+    expression = And(*clauses)
+    check_fields(expression, filterable, entity_type, prefixable)
+    return expression
@@ -0,0 +1,230 @@
+"""In-memory base repository with secondary hash indexes.
+
+This repository keeps entities in process memory. It is a drop-in replacement for
+SQL-backed repositories in tests and local development, and the baseline for
+benchmarks. Fields listed in ``indexed_fields`` and ``unique_fields`` get a hash
+index, so ``list(filters=...)`` on them costs O(matching rows) instead of a scan.
+"""
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime, timezone
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Optional, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from src.core.exceptions import (
+    EntityConflictError,
+    EntityNotFoundError,
+    ValidationError,
+)
+from src.core.repositories.base import BaseRepository
+from src.core.repositories.counts import Total, TotalMode
+from src.core.repositories.filters import (
+    Filter,
+    Filters,
+    as_filter,
+    equalities,
+    fields,
+    matches,
+)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class InMemoryRepository(BaseRepository[ModelT]):
+    """Base repository for entities kept in process memory.
+
+    Subclasses must set ``model`` (with an ``id`` field) and ``entity_type``, and
+    may declare ``indexed_fields`` and ``unique_fields``. Unique fields are
+    indexed as well and enforce uniqueness by raising ``EntityConflictError``.
+    Entities are copied on the way in and out, so callers cannot corrupt the
+    indexes by mutating returned objects. With ``soft_delete_field`` (an
+    optional datetime field) deletes only stamp the entity, as in ``SQLRepository``.
+    """
+
+    model: type[ModelT]
+    entity_type: str = "entity"
+    indexed_fields: tuple[str, ...] = ()
+    unique_fields: tuple[str, ...] = ()
+    soft_delete_field: Optional[str] = None
+
+    def __init__(self, entities: Iterable[ModelT] = ()) -> None:
+        """Initialize the repository.
+
+        Args:
+            entities: Entities to preload, e.g. fixtures
+
+        Raises:
+            EntityConflictError: If the preloaded entities violate unique fields
+        """
+        self._rows: dict[UUID, ModelT] = {}
+        # Insertion position of each entity; index buckets are kept in this order
+        self._positions: dict[UUID, int] = {}
+        self._inserted = 0
+        # Insertion-ordered dicts are used as ordered sets of entity IDs
+        self._indexes: dict[str, dict[Any, dict[UUID, None]]] = {
+            field: {} for field in (*self.indexed_fields, *self.unique_fields)
+        }
+        for entity in entities:
+            self._insert(entity.model_copy())
+
+    async def connect(self) -> None:
+        """Connect to the repository (no-op for in-memory storage)."""
+
+    async def disconnect(self) -> None:
+        """Disconnect from the repository (no-op for in-memory storage)."""
+
+    def clear(self) -> None:
+        """Remove all entities."""
+        self._rows.clear()
+        self._positions.clear()
+        for index in self._indexes.values():
+            index.clear()
+
+    def __len__(self) -> int:
+        """Get the number of stored entities."""
+        return len(self._rows)
+
+    def _check_unique(self, entity: ModelT, ignore_id: Optional[UUID] = None) -> None:
+        for field in self.unique_fields:
+            value = getattr(entity, field)
+            holders = self._indexes[field].get(value, {})
+            if any(holder != ignore_id for holder in holders):
+                raise EntityConflictError(self.entity_type, field, value)
+
+    def _insert(self, entity: ModelT) -> None:
+        entity_id: UUID = entity.id  # type: ignore[attr-defined]
+        if entity_id in self._rows:
+            raise EntityConflictError(self.entity_type, "id", entity_id)
+        self._check_unique(entity)
+        self._rows[entity_id] = entity
+        self._positions[entity_id] = self._inserted
+        self._inserted += 1
+        for field in self._indexes:
+            self._index(field, getattr(entity, field), entity_id)
+
+    def _index(self, field: str, value: Any, entity_id: UUID) -> None:
+        index = self._indexes[field]
+        holders = index.setdefault(value, {})
+        last = next(reversed(holders), None)
+        holders[entity_id] = None
+        if last is not None and self._positions[last] > self._positions[entity_id]:
+            # An updated entity joins a bucket of newer ones; restore insertion order
+            index[value] = dict.fromkeys(sorted(holders, key=self._positions.__getitem__))
+
+    def _unindex(self, field: str, value: Any, entity_id: UUID) -> None:
+        index = self._indexes[field]
+        holders = index[value]
+        del holders[entity_id]
+        if not holders:
+            del index[value]
+
+    def _deleted(self, entity: ModelT) -> bool:
+        return self.soft_delete_field is not None and getattr(entity, self.soft_delete_field) is not None
+
+    def _expression(self, filters: Optional[Filters], order_by: Sequence[str] = ()) -> Filter:
+        expression = as_filter(filters)
+        names = [*fields(expression), *(name.lstrip("-") for name in order_by)]
+        known = {*self.model.model_fields, *self.model.model_computed_fields}
+        unknown = {field: "unknown field" for field in names if field not in known}
+        if unknown:
+            raise ValidationError(self.entity_type, unknown)
+        return expression
+
+    def _candidates(self, expression: Filter) -> Iterator[ModelT]:
+        conditions = equalities(expression) or {}
+        indexed = [self._indexes[field].get(value, {}) for field, value in conditions.items() if field in self._indexes]
+        if not indexed:
+            rows: Iterable[ModelT] = self._rows.values()
+        else:
+            smallest = min(indexed, key=len)
+            rows = (self._rows[entity_id] for entity_id in smallest)
+        return (entity for entity in rows if matches(expression, entity))
+
+    async def get(self, id: UUID, *, include_deleted: bool = False) -> ModelT:
+        """Retrieve an entity by its ID."""
+        entity = self._rows.get(id)
+        if entity is None or (self._deleted(entity) and not include_deleted):
+            raise EntityNotFoundError(self.entity_type, str(id))
+        return entity.model_copy()
+
+    async def count(
+        self,
+        *,
+        filters: Optional[Filters] = None,
+        include_deleted: bool = False,
+        mode: TotalMode = TotalMode.EXACT,
+    ) -> Total:
+        """Count matching entities; in memory every mode counts exactly."""
+        candidates = self._candidates(self._expression(filters))
+        value = sum(1 for entity in candidates if include_deleted or not self._deleted(entity))
+        return Total(value, TotalMode.EXACT)
+
+    async def list(
+        self,
+        *,
+        filters: Optional[Filters] = None,
+        offset: int = 0,
+        limit: int = 100,
+        include_deleted: bool = False,
+        order_by: Sequence[str] = (),
+    ) -> list[ModelT]:
+        """List entities matching filters, in insertion order unless ``order_by`` is given.
+
+        Any field of the model can be filtered and sorted on. Equality filters
+        on indexed fields are resolved through the smallest matching index
+        bucket; the remaining conditions are checked on those rows only.
+        """
+        candidates = self._candidates(self._expression(filters, order_by))
+        if not include_deleted:
+            candidates = (entity for entity in candidates if not self._deleted(entity))
+        if order_by:
+            ordered = list(candidates)
+            # Stable sorts applied from the last key to the first give a multi-key sort
+            for name in reversed(order_by):
+                ordered.sort(key=attrgetter(name.lstrip("-")), reverse=name.startswith("-"))
+            candidates = iter(ordered)
+        page = islice(candidates, offset, offset + limit)
+        return [entity.model_copy() for entity in page]
+
+    async def create(self, entity: ModelT) -> ModelT:
+        """Store a new entity."""
+        self._insert(entity.model_copy())
+        return entity
+
+    async def update(self, id: UUID, entity: ModelT) -> ModelT:
+        """Replace an existing entity, keeping its ID and, with ``soft_delete_field``, its deletion state.
+
+        Soft-deleted entities count as missing.
+        """
+        current = self._rows.get(id)
+        if current is None or self._deleted(current):
+            raise EntityNotFoundError(self.entity_type, str(id))
+        kept: dict[str, Any] = {"id": id}
+        if self.soft_delete_field is not None:
+            kept[self.soft_delete_field] = getattr(current, self.soft_delete_field)
+        updated = entity.model_copy(update=kept)
+        self._check_unique(updated, ignore_id=id)
+        for field in self._indexes:
+            old_value, new_value = getattr(current, field), getattr(updated, field)
+            if old_value != new_value:
+                self._unindex(field, old_value, id)
+                self._index(field, new_value, id)
+        self._rows[id] = updated
+        return updated.model_copy()
+
+    async def delete(self, id: UUID) -> None:
+        """Delete an entity by its ID; with ``soft_delete_field`` only mark it as deleted."""
+        if self.soft_delete_field is not None:
+            current = await self.get(id)
+            self._rows[id] = current.model_copy(update={self.soft_delete_field: datetime.now(timezone.utc)})
+            return
+        try:
+            entity = self._rows.pop(id)
+        except KeyError:
+            raise EntityNotFoundError(self.entity_type, str(id)) from None
+        del self._positions[id]
+        for field in self._indexes:
+            self._unindex(field, getattr(entity, field), id)
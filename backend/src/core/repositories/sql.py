@@ -0,0 +1,445 @@
+"""SQL base repository built on SQLAlchemy Core.
+
+Concrete repositories declare the table they are stored in and the pydantic model
+their rows map to. All statements run on a worker thread inside a transaction
+bounded by the current request deadline (see ``src.core.database.transaction``),
+so the synchronous driver never blocks the event loop and a slow query is
+cancelled by PostgreSQL once the client has given up.
+"""
+import asyncio
+from collections.abc import AsyncIterator, Hashable, Mapping, Sequence
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar, Union
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    Column,
+    Connection,
+    Delete,
+    Engine,
+    Integer,
+    PrimaryKeyConstraint,
+    RowMapping,
+    Select,
+    Table,
+    UniqueConstraint,
+    Update,
+    bindparam,
+    delete,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+
+from src.core.database import get_engine, transaction
+from src.core.exceptions import (
+    ConfigurationError,
+    EntityConflictError,
+    EntityNotFoundError,
+    RepositoryError,
+)
+from src.core.repositories.base import BaseRepository
+from src.core.repositories.counts import Total, TotalMode
+from src.core.repositories.counts import count as count_rows
+from src.core.repositories.filters import (
+    And,
+    Filters,
+    as_filter,
+    check_fields,
+    compile_filter,
+    filter_parameters,
+    order_clauses,
+    prefix_columns,
+    shape,
+    sort_fields,
+)
+from src.core.repositories.statements import (
+    CachedStatement,
+    StaleStatementError,
+    StatementCache,
+    statement_cache,
+)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+R = TypeVar("R")
+
+
+def _fetch_all(statement: Select[Any], connection: Connection) -> Sequence[RowMapping]:
+    return connection.execute(statement).mappings().all()
+
+
+def _fetch_cached(
+    statement: CachedStatement, parameters: Mapping[str, Any], connection: Connection
+) -> Sequence[RowMapping]:
+    return statement.execute(connection, parameters).mappings().all()
+
+
+def indexed_columns(table: Table) -> set[str]:
+    """Get the columns that lead an index, unique constraint or the primary key of a table.
+
+    Conditions on these columns can be answered by an index scan.
+    """
+    leading = {index.expressions[0] for index in table.indexes if index.expressions}
+    leading.update(
+        next(iter(constraint.columns))
+        for constraint in table.constraints
+        if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint)) and constraint.columns
+    )
+    return {column.name for column in leading if isinstance(column, Column)}
+
+
+class SQLRepository(BaseRepository[ModelT]):
+    """Base repository for entities stored in a single SQL table.
+
+    Subclasses must set ``table`` (with an ``id`` primary key column), ``model``
+    and ``entity_type``. They may set ``soft_delete_column`` to a nullable
+    timestamp column: ``delete`` then only stamps the row, and reads skip
+    stamped rows unless asked for them. Rows moved out of the hot table by the
+    archival job (see ``src.core.archive``) are read explicitly from ``archive``.
+
+    Only ``filterable_fields`` can be filtered on and only ``sortable_fields``
+    sorted by (the ID always can). Each must lead an index of the table, which
+    is checked when the subclass is defined, so no filter a client sends can
+    turn into a sequential scan of the table. ``Prefix`` filters additionally
+    need a text column with a pattern index (see ``prefix_columns``).
+
+    ``get``, ``list`` and ``batches`` build their statement once per query
+    shape and run it as a prepared statement on PostgreSQL (see
+    ``src.core.repositories.statements``).
+    """
+
+    table: Table
+    model: type[ModelT]
+    entity_type: str = "entity"
+    soft_delete_column: Optional[str] = None
+    archive: Optional[Table] = None
+    filterable_fields: tuple[str, ...] = ()
+    sortable_fields: tuple[str, ...] = ()
+    _prefix_fields: frozenset[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Check that the declared filterable and sortable fields are indexed.
+
+        Raises:
+            ConfigurationError: If a declared field does not lead an index of the table
+        """
+        super().__init_subclass__(**kwargs)
+        table = getattr(cls, "table", None)
+        if table is None:
+            return
+        indexed = indexed_columns(table)
+        cls._prefix_fields = frozenset(prefix_columns(table))
+        for attribute in ("filterable_fields", "sortable_fields"):
+            unindexed = [field for field in getattr(cls, attribute) if field not in indexed]
+            if unindexed:
+                raise ConfigurationError(
+                    f"{cls.__name__}.{attribute}", f"{', '.join(unindexed)} not indexed in {table.name}"
+                )
+
+    def __init__(self, engine: Optional[Engine] = None, statements: Optional[StatementCache] = None) -> None:
+        """Initialize the repository.
+
+        Args:
+            engine: Engine to use; defaults to the engine of the current tenant
+            statements: Cache of statements by query shape; defaults to the process-wide cache
+        """
+        self._engine = engine
+        self.statements = statements if statements is not None else statement_cache
+
+    @property
+    def engine(self) -> Engine:
+        """Get the engine the repository runs its statements on.
+
+        Without an explicit engine this is resolved on every access, so the
+        statements of each request go to the schema of its tenant.
+        """
+        return self._engine or get_engine()
+
+    async def connect(self) -> None:
+        """Connect to the repository.
+
+        Engines are shared and resolved per transaction, so there is nothing to open.
+        """
+
+    async def disconnect(self) -> None:
+        """Release the repository.
+
+        The engine and its pool are shared by the application and stay open.
+        """
+
+    async def run(self, operation: Callable[[Connection], R]) -> R:
+        """Run a unit of work in a deadline-bounded transaction on a worker thread.
+
+        Args:
+            operation: Callable receiving the connection of the open transaction
+
+        Returns:
+            Whatever the operation returns
+        """
+        return await asyncio.to_thread(self._run_sync, operation)
+
+    def _run_sync(self, operation: Callable[[Connection], R]) -> R:
+        try:
+            with transaction(self.engine) as connection:
+                return operation(connection)
+        except StaleStatementError:
+            # A migration changed a table under a prepared statement; the transaction was rolled back
+            with transaction(self.engine) as connection:
+                return operation(connection)
+
+    def _to_entity(self, row: Any) -> ModelT:
+        return self.model.model_validate(dict(row))
+
+    def _filtered(
+        self,
+        statement: Select[Any],
+        filters: Optional[Filters],
+        include_deleted: bool = False,
+        table: Optional[Table] = None,
+        bound: bool = False,
+    ) -> Select[Any]:
+        table = self.table if table is None else table
+        expression = as_filter(filters)
+        check_fields(expression, ("id", *self.filterable_fields), self.entity_type, self._prefix_fields)
+        if expression != And():
+            statement = statement.where(compile_filter(expression, table, {} if bound else None))
+        if self.soft_delete_column is not None and not include_deleted:
+            statement = statement.where(table.c[self.soft_delete_column].is_(None))
+        return statement
+
+    def _cached(self, key: Hashable, build: Callable[[], Select[Any]]) -> CachedStatement:
+        # Filterable and sortable fields differ per repository, so a shape is only valid within its class
+        return self.statements.get((type(self), key), build)
+
+    def _archive_table(self) -> Table:
+        if self.archive is None:
+            raise RepositoryError(f"{self.entity_type} has no archive", {"table": self.table.name})
+        return self.archive
+
+    def _conflict(self, error: IntegrityError, entity: ModelT) -> EntityConflictError:
+        diag = getattr(error.orig, "diag", None)
+        field = getattr(diag, "constraint_name", None) or "unique constraint"
+        return EntityConflictError(self.entity_type, field, getattr(entity, "id", None))
+
+    async def get(self, id: UUID, *, include_deleted: bool = False) -> ModelT:
+        """Retrieve an entity by its ID."""
+        statement = self._cached(
+            ("get", include_deleted),
+            lambda: self._filtered(select(self.table), None, include_deleted).where(self.table.c.id == bindparam("id")),
+        )
+        row = await self.run(lambda connection: statement.execute(connection, {"id": id}).mappings().first())
+        if row is None:
+            raise EntityNotFoundError(self.entity_type, str(id))
+        return self._to_entity(row)
+
+    async def batches(
+        self,
+        *,
+        filters: Optional[Filters] = None,
+        batch_size: int = 1000,
+        include_deleted: bool = False,
+    ) -> AsyncIterator[list[ModelT]]:
+        """Iterate over all matching entities in batches, ordered by ID.
+
+        Batches are fetched with keyset pagination (``id > last_id``), so every
+        query uses the primary key index no matter how deep the iteration is.
+
+        Args:
+            filters: Optional filter expression or equality filters
+            batch_size: Maximum number of entities per batch
+            include_deleted: Also yield soft-deleted entities
+
+        Yields:
+            Non-empty lists of entities
+        """
+        expression = as_filter(filters)
+        parameters = {**filter_parameters(expression), "limit": batch_size}
+        first = self._cached(
+            ("batches", shape(expression), include_deleted, False),
+            lambda: self._batch_statement(expression, include_deleted, keyset=False),
+        )
+        following = self._cached(
+            ("batches", shape(expression), include_deleted, True),
+            lambda: self._batch_statement(expression, include_deleted, keyset=True),
+        )
+        after: Optional[UUID] = None
+        while True:
+            if after is None:
+                rows = await self.run(partial(_fetch_cached, first, parameters))
+            else:
+                rows = await self.run(partial(_fetch_cached, following, {**parameters, "after": after}))
+            if rows:
+                yield [self._to_entity(row) for row in rows]
+            if len(rows) < batch_size:
+                return
+            after = rows[-1]["id"]
+
+    def _batch_statement(self, filters: Filters, include_deleted: bool, keyset: bool) -> Select[Any]:
+        statement = self._filtered(select(self.table), filters, include_deleted, bound=True)
+        if keyset:
+            statement = statement.where(self.table.c.id > bindparam("after"))
+        return statement.order_by(self.table.c.id).limit(bindparam("limit", type_=Integer))
+
+    async def get_archived(self, id: UUID) -> ModelT:
+        """Retrieve an entity from the archive by its ID.
+
+        Raises:
+            EntityNotFoundError: If the entity is not archived
+            RepositoryError: If the repository has no archive
+        """
+        archive = self._archive_table()
+        statement = select(*(archive.c[column.name] for column in self.table.columns)).where(archive.c.id == id)
+        rows = await self.run(partial(_fetch_all, statement))
+        if not rows:
+            raise EntityNotFoundError(self.entity_type, str(id))
+        return self._to_entity(rows[0])
+
+    async def list_archived(
+        self,
+        *,
+        filters: Optional[Filters] = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> list[ModelT]:
+        """List archived entities matching filters, ordered by ID.
+
+        Raises:
+            RepositoryError: If the repository has no archive
+        """
+        archive = self._archive_table()
+        statement = select(*(archive.c[column.name] for column in self.table.columns))
+        statement = self._filtered(statement, filters, include_deleted=True, table=archive)
+        statement = statement.order_by(archive.c.id).offset(offset).limit(limit)
+        rows = await self.run(partial(_fetch_all, statement))
+        return [self._to_entity(row) for row in rows]
+
+    async def list(
+        self,
+        *,
+        filters: Optional[Filters] = None,
+        offset: int = 0,
+        limit: int = 100,
+        include_deleted: bool = False,
+        order_by: Sequence[str] = (),
+    ) -> list[ModelT]:
+        """List entities matching filters, sorted by ``order_by`` and then by ID.
+
+        Raises:
+            ValidationError: If a field is not filterable or not sortable
+        """
+        expression = as_filter(filters)
+        sortable = ("id", *self.sortable_fields)
+        ordering = sort_fields(order_by, sortable, self.entity_type)
+
+        def build() -> Select[Any]:
+            statement = self._filtered(select(self.table), expression, include_deleted, bound=True)
+            return (
+                statement.order_by(*order_clauses(self.table, ordering, sortable, self.entity_type))
+                .offset(bindparam("offset", type_=Integer))
+                .limit(bindparam("limit", type_=Integer))
+            )
+
+        statement = self._cached(("list", shape(expression), include_deleted, ordering), build)
+        parameters = {**filter_parameters(expression), "offset": offset, "limit": limit}
+        rows = await self.run(partial(_fetch_cached, statement, parameters))
+        return [self._to_entity(row) for row in rows]
+
+    async def count(
+        self,
+        *,
+        filters: Optional[Filters] = None,
+        include_deleted: bool = False,
+        mode: TotalMode = TotalMode.EXACT,
+    ) -> Total:
+        """Count matching entities; estimates without any predicate read ``pg_class.reltuples``.
+
+        ``reltuples`` includes soft-deleted rows, so the planner's estimate of the
+        filtered statement is used whenever they are left out.
+        """
+        expression = as_filter(filters)
+        statement = self._filtered(select(self.table.c.id), expression, include_deleted)
+        unfiltered = expression == And() and (self.soft_delete_column is None or include_deleted)
+        table_name = self.table.name if unfiltered else None
+        return await self.run(partial(count_rows, statement=statement, mode=mode, table_name=table_name))
+
+    async def update_many(self, changes: Sequence[dict[str, Any]]) -> None:
+        """Update many rows with a single executemany statement.
+
+        Args:
+            changes: Rows to update, each with an ``id`` and the same set of changed columns
+        """
+        if not changes:
+            return
+        columns = [column for column in changes[0] if column != "id"]
+        statement = (
+            update(self.table)
+            .where(self.table.c.id == bindparam("row_id"))
+            .values({column: bindparam(f"new_{column}") for column in columns})
+        )
+        parameters = [
+            {"row_id": change["id"], **{f"new_{column}": change[column] for column in columns}} for change in changes
+        ]
+        await self.run(lambda connection: connection.execute(statement, parameters))
+
+    async def create(self, entity: ModelT) -> ModelT:
+        """Insert a new entity."""
+        statement = insert(self.table).values(**entity.model_dump())
+        try:
+            await self.run(lambda connection: connection.execute(statement))
+        except IntegrityError as error:
+            raise self._conflict(error, entity) from error
+        return entity
+
+    async def update(self, id: UUID, entity: ModelT) -> ModelT:
+        """Replace the stored values of an existing entity.
+
+        Soft-deleted entities count as missing, and the soft delete column is never
+        written, so only ``delete`` and ``restore`` change whether an entity is deleted.
+        """
+        excluded = {"id"}
+        statement = update(self.table).where(self.table.c.id == id)
+        if self.soft_delete_column is not None:
+            excluded.add(self.soft_delete_column)
+            statement = statement.where(self.table.c[self.soft_delete_column].is_(None))
+        statement = statement.values(**entity.model_dump(exclude=excluded))
+        try:
+            rowcount = await self.run(lambda connection: connection.execute(statement).rowcount)
+        except IntegrityError as error:
+            raise self._conflict(error, entity) from error
+        if rowcount == 0:
+            raise EntityNotFoundError(self.entity_type, str(id))
+        return entity
+
+    async def delete(self, id: UUID) -> None:
+        """Delete an entity by its ID; with ``soft_delete_column`` only mark it as deleted."""
+        statement: Union[Delete, Update]
+        if self.soft_delete_column is None:
+            statement = delete(self.table).where(self.table.c.id == id)
+        else:
+            column = self.table.c[self.soft_delete_column]
+            statement = (
+                update(self.table)
+                .where(self.table.c.id == id, column.is_(None))
+                .values({column: datetime.now(timezone.utc)})
+            )
+        rowcount = await self.run(lambda connection: connection.execute(statement).rowcount)
+        if rowcount == 0:
+            raise EntityNotFoundError(self.entity_type, str(id))
+
+    async def restore(self, id: UUID) -> None:
+        """Undo the soft delete of an entity that has not been archived yet.
+
+        Raises:
+            EntityNotFoundError: If no soft-deleted entity has the ID
+            RepositoryError: If the repository does not soft delete
+        """
+        if self.soft_delete_column is None:
+            raise RepositoryError(f"{self.entity_type} does not soft delete", {"table": self.table.name})
+        column = self.table.c[self.soft_delete_column]
+        statement = update(self.table).where(self.table.c.id == id, column.is_not(None)).values({column: None})
+        rowcount = await self.run(lambda connection: connection.execute(statement).rowcount)
+        if rowcount == 0:
+            raise EntityNotFoundError(self.entity_type, str(id))
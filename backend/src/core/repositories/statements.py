@@ -0,0 +1,209 @@
+"""Cached repository statements and server-side prepared statements.
+
+The queries behind ``get`` and the common ``list`` filters are tiny and very
+frequent: building the SQLAlchemy construct, compiling it to SQL and having
+PostgreSQL parse and plan it costs more than running it. SQL repositories
+therefore build each query shape once, with every value bound as a named
+parameter, and keep it in a process-wide ``StatementCache`` keyed by repository
+and shape (e.g. ``get`` with or without soft-deleted rows, ``list`` with an
+``Eq`` on ``studio_id`` sorted by ``-starts_at``).
+
+On PostgreSQL each pooled connection prepares a cached statement the first time
+it runs it (``PREPARE``) and executes it by name from then on, so the server
+skips parsing and, once the plan proves stable, planning. Prepared statements
+live as long as the DBAPI connection; the names a connection has prepared are
+kept in its ``Connection.info``, which SQLAlchemy clears when the connection is
+recycled or invalidated. Names are derived from the SQL, so a statement evicted
+from the cache and rebuilt finds its prepared twin again. Each connection keeps
+at most as many prepared statements as the cache holds and deallocates the
+least recently used one beyond that, so statements evicted from the cache do
+not pile up in the server sessions.
+
+A migration that changes a table under a prepared statement makes PostgreSQL
+reject it ("cached plan must not change result type"), and a server session
+reset by a pooler no longer knows the name. Both raise ``StaleStatementError``:
+the connection deallocates its prepared statements before its next query and
+SQL repositories run the transaction again. Behind a pooler in transaction mode,
+where consecutive transactions use different server sessions, disable prepared
+statements with ``DATABASE_PREPARED_STATEMENTS``.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from functools import cached_property
+from typing import Any
+
+from sqlalchemy import Connection, CursorResult, Select, bindparam, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.selectable import TextualSelect
+
+from src.core.config import settings
+
+# SQLSTATE of a prepared statement that no longer exists (invalid_sql_statement_name)
+UNKNOWN_STATEMENT_SQLSTATE = "26000"
+# feature_not_supported covers much more; only this message means the result type of a prepared statement changed
+CHANGED_PLAN_SQLSTATE = "0A000"
+CHANGED_PLAN_MESSAGE = "cached plan must not change result type"
+# ``Connection.info`` keys: names prepared on the connection, and whether to drop them first
+PREPARED_KEY = "prepared_statements"
+DEALLOCATE_KEY = "deallocate_prepared_statements"
+
+# PREPARE takes positional $n parameters
+_PREPARE_DIALECT = postgresql.dialect(paramstyle="numeric_dollar")
+
+
+class StaleStatementError(Exception):
+    """PostgreSQL rejected a prepared statement; the transaction is aborted but can be retried."""
+
+
+class CachedStatement:
+    """A statement built once per query shape, with its prepared form for PostgreSQL."""
+
+    def __init__(
+        self,
+        statement: Select[Any],
+        prepare: bool = True,
+        max_prepared: int = settings.DATABASE_STATEMENT_CACHE_SIZE,
+    ) -> None:
+        """Wrap a statement; its prepared form is compiled on first use on PostgreSQL.
+
+        Args:
+            statement: Statement whose values are all named bind parameters
+            prepare: Whether to run it as a prepared statement on PostgreSQL
+            max_prepared: Prepared statements a connection keeps before deallocating the least recently used
+        """
+        self.statement = statement
+        self.prepare = prepare
+        self.max_prepared = max_prepared
+
+    @cached_property
+    def _compiled(self) -> SQLCompiler:
+        return self.statement.compile(dialect=_PREPARE_DIALECT)
+
+    @cached_property
+    def sql(self) -> str:
+        """Get the SQL of the statement, with positional parameters for ``PREPARE``."""
+        return self._compiled.string
+
+    @cached_property
+    def name(self) -> str:
+        """Get the name of the prepared statement, derived from its SQL."""
+        return "repo_" + hashlib.sha256(self.sql.encode()).hexdigest()[:24]
+
+    @cached_property
+    def execute_statement(self) -> TextualSelect:
+        """Get the ``EXECUTE`` statement running the prepared statement, with typed parameters and columns."""
+        names = self._compiled.positiontup or []
+        arguments = f"({', '.join(f':{name}' for name in names)})" if names else ""
+        return (
+            text(f"EXECUTE {self.name}{arguments}")
+            .bindparams(*(bindparam(name, type_=self._compiled.binds[name].type) for name in names))
+            .columns(*self.statement.selected_columns)
+        )
+
+    def execute(self, connection: Connection, parameters: Mapping[str, Any]) -> CursorResult[Any]:
+        """Execute the statement, as a prepared statement on PostgreSQL.
+
+        Args:
+            connection: Connection of an open transaction
+            parameters: Values of the bind parameters
+
+        Returns:
+            The result, with the columns of the statement
+
+        Raises:
+            StaleStatementError: If PostgreSQL rejected the prepared statement
+        """
+        if not self.prepare or connection.dialect.name != "postgresql":
+            return connection.execute(self.statement, parameters)
+
+        info = connection.info
+        if info.pop(DEALLOCATE_KEY, False):
+            connection.exec_driver_sql("DEALLOCATE ALL")
+        # Names in the order they were last used, oldest first
+        prepared: OrderedDict[str, None] = info.setdefault(PREPARED_KEY, OrderedDict())
+        try:
+            if self.name in prepared:
+                prepared.move_to_end(self.name)
+            else:
+                while prepared and len(prepared) >= self.max_prepared:
+                    connection.exec_driver_sql(f"DEALLOCATE {prepared.popitem(last=False)[0]}")
+                connection.exec_driver_sql(f"PREPARE {self.name} AS {self.sql}")
+                prepared[self.name] = None
+            return connection.execute(self.execute_statement, parameters)
+        except DBAPIError as error:
+            if not _is_stale(error):
+                raise
+            # The transaction is aborted; drop every prepared statement once it is over
+            prepared.clear()
+            info[DEALLOCATE_KEY] = True
+            raise StaleStatementError(self.name) from error
+
+
+def _is_stale(error: DBAPIError) -> bool:
+    pgcode = getattr(error.orig, "pgcode", None)
+    if pgcode == UNKNOWN_STATEMENT_SQLSTATE:
+        return True
+    return pgcode == CHANGED_PLAN_SQLSTATE and CHANGED_PLAN_MESSAGE in str(error.orig)
+
+
+class StatementCache:
+    """Process-wide LRU cache of repository statements by query shape."""
+
+    def __init__(
+        self,
+        max_entries: int = settings.DATABASE_STATEMENT_CACHE_SIZE,
+        prepare: bool = settings.DATABASE_PREPARED_STATEMENTS,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached statements, and of prepared statements per connection;
+                0 builds every statement anew
+            prepare: Whether statements run as prepared statements on PostgreSQL
+        """
+        self.max_entries = max_entries
+        self.prepare = prepare
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, CachedStatement] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of cached statements."""
+        return len(self._entries)
+
+    def get(self, key: Hashable, build: Callable[[], Select[Any]]) -> CachedStatement:
+        """Get the statement of a query shape, building it on first use.
+
+        Args:
+            key: The query shape; equal keys must build the same statement
+            build: Builds the statement, with named bind parameters for all values
+
+        Returns:
+            The cached statement
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        cached = CachedStatement(build(), self.prepare, self.max_entries)
+        with self._lock:
+            self._entries[key] = cached
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def clear(self) -> None:
+        """Drop all statements."""
+        with self._lock:
+            self._entries.clear()
+
+
+statement_cache = StatementCache()
@@ -0,0 +1,315 @@
+"""Shared response cache for opted-in GET routes.
+
+Routes opt in with the ``cache_response`` dependency, which names the TTL, the
+request headers the response varies on and the surrogate keys (tags) of the
+entry, e.g. ``"class:{class_id}"``. ``ResponseCacheMiddleware`` looks every GET
+request up before routing, so a hit is replayed without running dependencies,
+the endpoint or serialization. Mutations call ``purge`` with the affected keys.
+
+Entries are scoped by tenant and keyed by path, normalized query string and the
+values of the varying headers. A response is not stored if one of its tags was
+purged while the request ran, since it may have read the data from before the
+change. The in-process backend evicts by LRU and TTL;
+with several workers a purge only reaches the local worker, so keep TTLs short
+for data that changes often.
+"""
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import Request
+from starlette.datastructures import Headers
+
+from src.core.config import settings
+from src.core.deadlines import ASGIApp, Message, Receive, Scope, Send
+from src.core.tenancy import get_current_tenant
+
+# Request scope entry through which a route announces its cache policy
+SCOPE_KEY = "boneca.response_cache"
+
+# (tenant, path, normalized query)
+BaseKey = tuple[Optional[str], str, str]
+# (tenant, path, normalized query, values of the varying headers)
+CacheKey = tuple[Optional[str], str, str, tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How the response of a route may be cached.
+
+    Attributes:
+        ttl: Seconds the response stays fresh.
+        tags: Surrogate keys used to purge the entry.
+        vary: Lowercase names of request headers the response depends on.
+    """
+
+    ttl: float
+    tags: frozenset[str]
+    vary: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A stored response.
+
+    Attributes:
+        status: HTTP status code.
+        headers: Raw response headers.
+        body: Complete response body.
+        tags: Surrogate keys of the entry.
+        stored_at: Time the entry was stored (``time.monotonic()`` clock).
+        expires_at: Time the entry expires (``time.monotonic()`` clock).
+    """
+
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    tags: frozenset[str]
+    stored_at: float
+    expires_at: float
+
+
+def normalize_query(query_string: bytes) -> str:
+    """Normalize a query string so equivalent requests share an entry."""
+    return urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+
+
+class InMemoryResponseCache:
+    """In-process response cache with LRU and TTL eviction.
+
+    Expired entries are dropped when they are read or when the least recently
+    used entries are evicted to make room.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of stored responses
+            clock: Monotonic clock returning seconds
+        """
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self._vary: dict[BaseKey, tuple[str, ...]] = {}
+        self._variants: dict[BaseKey, int] = {}
+        self._tagged: dict[tuple[Optional[str], str], set[CacheKey]] = {}
+        # Purges are numbered; each purged tag remembers the number of its latest purge
+        self.purges = 0
+        self._purged: dict[tuple[Optional[str], str], int] = {}
+
+    def __len__(self) -> int:
+        """Get the number of stored responses."""
+        return len(self._entries)
+
+    def vary(self, base: BaseKey) -> Optional[tuple[str, ...]]:
+        """Get the varying headers of a path and query, or None if nothing is cached for it."""
+        return self._vary.get(base)
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        """Get a fresh entry and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self.clock():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: CacheKey, vary: tuple[str, ...], entry: CachedResponse) -> None:
+        """Store an entry, evicting the least recently used ones beyond ``max_entries``."""
+        self._drop(key)
+        base: BaseKey = (key[0], key[1], key[2])
+        self._entries[key] = entry
+        self._vary[base] = vary
+        self._variants[base] = self._variants.get(base, 0) + 1
+        for tag in entry.tags:
+            self._tagged.setdefault((key[0], tag), set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def purge(self, tenant: Optional[str], tags: Iterable[str]) -> int:
+        """Drop every entry of a tenant tagged with any of the given surrogate keys.
+
+        Returns:
+            Number of dropped entries
+        """
+        self.purges += 1
+        for tag in tags:
+            self._purged[(tenant, tag)] = self.purges
+        keys = set().union(*(self._tagged.get((tenant, tag), set()) for tag in tags))
+        for key in keys:
+            self._drop(key)
+        return len(keys)
+
+    def purged_since(self, tenant: Optional[str], tags: Iterable[str], purges: int) -> bool:
+        """Check whether any of a tenant's tags was purged after the given number of purges."""
+        return any(self._purged.get((tenant, tag), 0) > purges for tag in tags)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._vary.clear()
+        self._variants.clear()
+        self._tagged.clear()
+
+    def _drop(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tagged.get((key[0], tag))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[(key[0], tag)]
+        base: BaseKey = (key[0], key[1], key[2])
+        # Forget the varying headers once no variant of the path and query is left
+        self._variants[base] -= 1
+        if not self._variants[base]:
+            del self._variants[base]
+            del self._vary[base]
+
+
+response_cache = InMemoryResponseCache()
+
+
+def cache_response(
+    ttl: float,
+    tags: Sequence[str] = (),
+    vary: Sequence[str] = (),
+) -> Callable[[Request], Awaitable[None]]:
+    """Create a dependency that opts a GET route into the response cache.
+
+    Example:
+        ``@router.get("/classes/{class_id}", dependencies=[Depends(cache_response(60, ["class:{class_id}"]))])``
+
+    Args:
+        ttl: Seconds the response stays fresh
+        tags: Surrogate keys; ``{name}`` placeholders are filled from path parameters
+        vary: Request headers the response depends on, e.g. ``["Accept-Language"]``
+
+    Returns:
+        FastAPI dependency callable
+    """
+    names = tuple(sorted(header.lower() for header in vary))
+
+    async def mark_cacheable(request: Request) -> None:
+        request.scope[SCOPE_KEY] = CachePolicy(
+            ttl=ttl,
+            tags=frozenset(tag.format(**request.path_params) for tag in tags),
+            vary=names,
+        )
+
+    return mark_cacheable
+
+
+def purge(*tags: str) -> int:
+    """Purge the current tenant's cached responses tagged with any of the surrogate keys.
+
+    Returns:
+        Number of dropped entries
+    """
+    return response_cache.purge(get_current_tenant(), tags)
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving and storing responses of opted-in GET routes.
+
+    Requests with an ``Authorization`` header bypass the cache. Only complete
+    ``200`` responses without ``Set-Cookie`` or ``Cache-Control: private/no-store``
+    and with bodies of at most ``RESPONSE_CACHE_MAX_BODY`` bytes are stored.
+    """
+
+    def __init__(self, app: ASGIApp, cache: Optional[InMemoryResponseCache] = None) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            cache: Cache backend; defaults to the shared in-process cache
+        """
+        self.app = app
+        self.cache = cache if cache is not None else response_cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI call."""
+        if scope["type"] != "http" or scope["method"] != "GET" or not settings.RESPONSE_CACHE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if "authorization" in headers:
+            await self.app(scope, receive, send)
+            return
+
+        base: BaseKey = (get_current_tenant(), scope["path"], normalize_query(scope.get("query_string", b"")))
+        vary = self.cache.vary(base)
+        if vary is not None:
+            entry = self.cache.get((*base, tuple(headers.get(name, "") for name in vary)))
+            if entry is not None:
+                await self._replay(entry, send)
+                return
+
+        start: Optional[Message] = None
+        # None once the body is too large to be stored
+        chunks: Optional[list[bytes]] = []
+        size = 0
+        purges = self.cache.purges
+
+        async def capture(message: Message) -> None:
+            nonlocal start, chunks, size
+            policy: Optional[CachePolicy] = scope.get(SCOPE_KEY)
+            if message["type"] == "http.response.start" and policy is not None:
+                message["headers"] = [*message.get("headers", []), *self._policy_headers(policy)]
+                start = message
+            elif message["type"] == "http.response.body" and start is not None and policy is not None:
+                body = message.get("body", b"")
+                size += len(body)
+                if chunks is not None and size > settings.RESPONSE_CACHE_MAX_BODY:
+                    chunks = None
+                elif chunks is not None:
+                    chunks.append(body)
+                    stale = self.cache.purged_since(base[0], policy.tags, purges)
+                    if not message.get("more_body", False) and not stale:
+                        self._store(base, headers, policy, start, b"".join(chunks))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+    @staticmethod
+    def _policy_headers(policy: CachePolicy) -> list[tuple[bytes, bytes]]:
+        extra = [(b"x-cache", b"MISS")]
+        if policy.tags:
+            extra.append((b"surrogate-key", " ".join(sorted(policy.tags)).encode("latin-1")))
+        return extra
+
+    def _store(self, base: BaseKey, headers: Headers, policy: CachePolicy, start: Message, body: bytes) -> None:
+        response_headers = Headers(raw=start.get("headers", []))
+        cache_control = response_headers.get("cache-control", "").lower()
+        if (
+            start["status"] != 200
+            or "set-cookie" in response_headers
+            or "no-store" in cache_control
+            or "private" in cache_control
+        ):
+            return
+        now = self.cache.clock()
+        stored = [(name, value) for name, value in start.get("headers", []) if name != b"x-cache"]
+        self.cache.set(
+            (*base, tuple(headers.get(name, "") for name in policy.vary)),
+            policy.vary,
+            CachedResponse(start["status"], stored, body, policy.tags, now, now + policy.ttl),
+        )
+
+    async def _replay(self, entry: CachedResponse, send: Send) -> None:
+        age = int(self.cache.clock() - entry.stored_at)
+        headers = [*entry.headers, (b"x-cache", b"HIT"), (b"age", str(age).encode("latin-1"))]
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
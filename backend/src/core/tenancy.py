@@ -0,0 +1,148 @@
+"""Multi-tenancy module.
+
+Each dance school (tenant) lives in its own PostgreSQL schema. This module resolves
+the tenant of a request from the ``TENANT_HEADER`` header or the request host and
+keeps it in a context variable, so ``src.core.database.get_engine()`` can route
+statements to the tenant's schema.
+"""
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Mapping, Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+from src.core.config import settings
+from src.core.deadlines import ASGIApp, Receive, Scope, Send
+from src.core.exceptions import ValidationError
+
+# Lowercase slug used in hosts and schema names, e.g. "salsa-porto"
+TENANT_PATTERN = re.compile(r"^[a-z0-9](?:[a-z0-9-]{0,38}[a-z0-9])?$")
+
+
+def validate_tenant(tenant: str) -> str:
+    """Validate a tenant identifier.
+
+    Args:
+        tenant: Tenant identifier from a header or host
+
+    Returns:
+        The tenant identifier
+
+    Raises:
+        ValidationError: If the identifier is not a valid tenant slug
+    """
+    if not TENANT_PATTERN.match(tenant):
+        raise ValidationError("tenant", {"tenant": f"invalid tenant identifier {tenant!r}"})
+    return tenant
+
+
+def tenant_schema(tenant: str) -> str:
+    """Get the schema name of a tenant.
+
+    Args:
+        tenant: Tenant identifier
+
+    Returns:
+        PostgreSQL schema name, e.g. ``school_salsa_porto``
+
+    Raises:
+        ValidationError: If the identifier is not a valid tenant slug
+    """
+    return f"{settings.TENANT_SCHEMA_PREFIX}{validate_tenant(tenant).replace('-', '_')}"
+
+
+def resolve_tenant(headers: Mapping[str, str], host: Optional[str] = None) -> Optional[str]:
+    """Resolve the tenant of a request.
+
+    The ``TENANT_HEADER`` header takes precedence; otherwise the first label of a
+    host under ``TENANT_DOMAIN`` names the tenant.
+
+    Args:
+        headers: Request headers with lowercase names
+        host: Request host, with or without port
+
+    Returns:
+        Tenant identifier, or None for the default (single-tenant) schema
+
+    Raises:
+        ValidationError: If the tenant identifier is invalid
+    """
+    header = headers.get(settings.TENANT_HEADER.lower())
+    if header:
+        return validate_tenant(header.strip().lower())
+
+    domain = settings.TENANT_DOMAIN.lower()
+    if not domain or not host:
+        return None
+    hostname = host.split(":", 1)[0].lower()
+    if not hostname.endswith(f".{domain}"):
+        return None
+    subdomain = hostname.removesuffix(f".{domain}")
+    if "." in subdomain:
+        return None
+    return validate_tenant(subdomain)
+
+
+_current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+
+def get_current_tenant() -> Optional[str]:
+    """Get the tenant of the current request, if any."""
+    return _current_tenant.get()
+
+
+@contextmanager
+def tenant_scope(tenant: Optional[str]) -> Iterator[Optional[str]]:
+    """Run a block on behalf of a tenant.
+
+    Args:
+        tenant: Tenant identifier, or None for the default schema
+
+    Yields:
+        The tenant in effect inside the block
+
+    Raises:
+        ValidationError: If the tenant identifier is invalid
+    """
+    token = _current_tenant.set(validate_tenant(tenant) if tenant is not None else None)
+    try:
+        yield tenant
+    finally:
+        _current_tenant.reset(token)
+
+
+class TenantMiddleware:
+    """ASGI middleware that resolves the tenant of every HTTP request.
+
+    Requests with an invalid tenant identifier are rejected with ``400 Bad Request``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI call."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        try:
+            tenant = resolve_tenant(headers, headers.get("host"))
+        except ValidationError as error:
+            response = JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST, content={"detail": error.message, **error.details}
+            )
+            await response(scope, receive, send)
+            return
+
+        with tenant_scope(tenant):
+            await self.app(scope, receive, send)
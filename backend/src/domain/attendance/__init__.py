@@ -0,0 +1,4 @@
+"""Attendance domain package.
+
+This package contains the check-ins of students at class sessions.
+"""
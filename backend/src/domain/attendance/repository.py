@@ -0,0 +1,49 @@
+"""Attendance repository.
+
+This module defines the table check-ins are stored in, its archive, and the
+repository used to access them.
+"""
+from datetime import timedelta
+
+from sqlalchemy import Column, DateTime, Index, Table, Uuid
+
+from src.core.archive import ArchivePolicy, archive_table
+from src.core.config import settings
+from src.core.database import metadata
+from src.core.repositories.sql import SQLRepository
+from src.domain.attendance.schemas import Attendance
+
+attendance = Table(
+    "attendance",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("series_id", Uuid, nullable=False),
+    Column("session_id", Uuid, nullable=False),
+    Column("student_id", Uuid, nullable=False),
+    Column("instructor_id", Uuid, nullable=False),
+    Column("studio_id", Uuid, nullable=False),
+    Column("starts_at", DateTime(timezone=True), nullable=False),
+    # Reports scan a time range; retention looks up the first check-in per student
+    Index("ix_attendance_starts_at", "starts_at"),
+    Index("ix_attendance_student_id_starts_at", "student_id", "starts_at"),
+)
+
+attendance_archive = archive_table(attendance)
+
+# Check-ins of closed terms are history; reports and retention only look at the hot window
+attendance_archive_policy = ArchivePolicy(
+    attendance,
+    attendance_archive,
+    lambda now: attendance.c.starts_at < now - timedelta(days=settings.ARCHIVE_ATTENDANCE_AFTER_DAYS),
+)
+
+
+class AttendanceRepository(SQLRepository[Attendance]):
+    """Repository for check-ins."""
+
+    table = attendance
+    model = Attendance
+    entity_type = "attendance"
+    archive = attendance_archive
+    filterable_fields = ("starts_at", "student_id")
+    sortable_fields = ("starts_at",)
@@ -0,0 +1,39 @@
+"""Attendance data models and schemas.
+
+This module defines the data models used for check-ins.
+"""
+from datetime import datetime, timezone
+from uuid import UUID
+
+from pydantic import BaseModel, field_validator
+
+
+class Attendance(BaseModel):
+    """A student checking in to a class session.
+
+    Studio and instructor are copied from the series at check-in time, so
+    reports can aggregate attendance without expanding series.
+
+    Attributes:
+        id: Unique ID of the check-in.
+        series_id: Class series the session belongs to.
+        session_id: Occurrence of the series (see ``Occurrence.id``).
+        student_id: Student who attended.
+        instructor_id: Instructor who taught the session.
+        studio_id: Studio the session took place in.
+        starts_at: Start of the session.
+    """
+
+    id: UUID
+    series_id: UUID
+    session_id: UUID
+    student_id: UUID
+    instructor_id: UUID
+    studio_id: UUID
+    starts_at: datetime
+
+    @field_validator("starts_at")
+    @classmethod
+    def assume_utc(cls, value: datetime) -> datetime:
+        """Treat naive datetimes (e.g. read back from SQLite) as UTC."""
+        return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,5 @@
+"""Calendar domain package.
+
+This package contains the iCalendar feeds students, instructors and studios
+subscribe to, including rendering and feed caching.
+"""
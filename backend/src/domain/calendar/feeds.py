@@ -0,0 +1,339 @@
+"""Calendar feed tokens, session sources and the rendered feed cache.
+
+Calendar apps poll subscribed feeds every few minutes. Feeds are therefore
+rendered once, cached as bytes with an ETag and dropped when one of their
+sessions changes. Changes are only reported to the worker that made them, so
+cached feeds also expire after ``CALENDAR_FEED_MAX_AGE`` seconds, the time
+calendar clients may keep them anyway: other workers serve a changed schedule
+no later than that. Rendered events are cached per session as well, so
+rebuilding a feed after a change renders the changed session only.
+"""
+import asyncio
+import hashlib
+import hmac
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from time import monotonic
+from typing import Any, Optional, Protocol
+from uuid import UUID
+
+from src.core.config import settings
+from src.core.exceptions import EntityNotFoundError
+from src.core.tenancy import get_current_tenant
+from src.domain.calendar.ics import render_calendar, render_event
+from src.domain.calendar.schemas import ClassSession, FeedKind, FeedOwner
+
+FeedKey = tuple[Optional[str], FeedOwner]
+SessionKey = tuple[Optional[str], UUID]
+SessionListener = Callable[[Optional[ClassSession], Optional[ClassSession]], Any]
+
+
+def _signature(tenant: Optional[str], owner: FeedOwner) -> str:
+    payload = f"{tenant or ''}:{owner.kind.value}:{owner.owner_id.hex}".encode()
+    return hmac.new(settings.CALENDAR_FEED_SECRET.encode(), payload, hashlib.sha256).hexdigest()[:32]
+
+
+def feed_token(owner: FeedOwner) -> str:
+    """Create the subscription token of a feed for the current tenant.
+
+    Args:
+        owner: Owner of the feed
+
+    Returns:
+        Signed token used in the feed URL
+    """
+    return f"{owner.kind.value}-{owner.owner_id.hex}-{_signature(get_current_tenant(), owner)}"
+
+
+def parse_feed_token(token: str) -> FeedOwner:
+    """Resolve the owner of a feed token for the current tenant.
+
+    Args:
+        token: Token from the feed URL
+
+    Returns:
+        Owner of the feed
+
+    Raises:
+        EntityNotFoundError: If the token is malformed or its signature is invalid
+    """
+    try:
+        kind, owner_id, signature = token.split("-")
+        owner = FeedOwner(FeedKind(kind), UUID(hex=owner_id))
+    except ValueError:
+        raise EntityNotFoundError("calendar feed", token) from None
+    if not hmac.compare_digest(signature, _signature(get_current_tenant(), owner)):
+        raise EntityNotFoundError("calendar feed", token)
+    return owner
+
+
+def feed_window(today: Optional[date] = None) -> tuple[datetime, datetime]:
+    """Get the time window covered by feeds rendered on a given day.
+
+    Args:
+        today: Day of rendering; defaults to the current UTC date
+
+    Returns:
+        Start and end of the window (UTC)
+    """
+    today = today or datetime.now(timezone.utc).date()
+    midnight = datetime.combine(today, time.min, tzinfo=timezone.utc)
+    return (
+        midnight - timedelta(days=settings.CALENDAR_FEED_PAST_DAYS),
+        midnight + timedelta(days=settings.CALENDAR_FEED_FUTURE_DAYS),
+    )
+
+
+class SessionSource(Protocol):
+    """Source of the sessions shown in calendar feeds."""
+
+    async def sessions_for(self, owner: FeedOwner, start: datetime, end: datetime) -> list[ClassSession]:
+        """Get the sessions of a feed owner overlapping a time window."""
+        ...
+
+
+class InMemorySchedule:
+    """Session source keeping sessions in memory, indexed by feed owner.
+
+    Listeners registered with ``subscribe`` are called with the previous and new
+    version of every changed session.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty schedule."""
+        self._sessions: dict[UUID, ClassSession] = {}
+        self._by_owner: dict[FeedOwner, set[UUID]] = {}
+        self._listeners: list[SessionListener] = []
+
+    def subscribe(self, listener: SessionListener) -> None:
+        """Register a callable notified of session changes."""
+        self._listeners.append(listener)
+
+    def upsert(self, session: ClassSession) -> None:
+        """Add or replace a session."""
+        before = self._sessions.get(session.id)
+        if before is not None:
+            self._unindex(before)
+        self._sessions[session.id] = session
+        for owner in session.owners():
+            self._by_owner.setdefault(owner, set()).add(session.id)
+        self._notify(before, session)
+
+    def remove(self, session_id: UUID) -> None:
+        """Remove a session if it exists."""
+        before = self._sessions.pop(session_id, None)
+        if before is not None:
+            self._unindex(before)
+            self._notify(before, None)
+
+    def _unindex(self, session: ClassSession) -> None:
+        for owner in session.owners():
+            self._by_owner[owner].discard(session.id)
+
+    def _notify(self, before: Optional[ClassSession], after: Optional[ClassSession]) -> None:
+        for listener in self._listeners:
+            listener(before, after)
+
+    async def sessions_for(self, owner: FeedOwner, start: datetime, end: datetime) -> list[ClassSession]:
+        """Get the sessions of a feed owner overlapping a time window."""
+        sessions = (self._sessions[session_id] for session_id in self._by_owner.get(owner, ()))
+        return [session for session in sessions if session.starts_at < end and session.ends_at > start]
+
+
+@dataclass(frozen=True)
+class RenderedFeed:
+    """A feed rendered to bytes.
+
+    Attributes:
+        body: Encoded iCalendar document.
+        etag: Strong ETag of the body.
+        session_ids: Sessions contained in the feed.
+        window_start: Start of the time window the feed was rendered for.
+        expires_at: Time on the cache's clock after which the feed is rendered again.
+    """
+
+    body: bytes
+    etag: str
+    session_ids: frozenset[UUID]
+    window_start: datetime
+    expires_at: float
+
+
+@dataclass
+class _PendingRender:
+    """Render of a feed that requests are waiting for.
+
+    Attributes:
+        lock: Held by the request rendering the feed.
+        waiters: Requests holding or waiting for the lock.
+        generation: Bumped by every invalidation of the feed.
+    """
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    waiters: int = 0
+    generation: int = 0
+
+
+class FeedCache:
+    """LRU cache of rendered calendar feeds with per-session invalidation.
+
+    Entries are keyed by tenant and feed owner. A feed is rendered again after
+    ``invalidate_session`` reports a change to one of its sessions, once its time
+    window has moved on, or once it is older than ``ttl``. Concurrent requests for a stale feed wait for a
+    single render instead of each querying the schedule. A render that an
+    invalidation overtook while it loaded sessions is served but not cached.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.CALENDAR_FEED_CACHE_SIZE,
+        ttl: float = settings.CALENDAR_FEED_MAX_AGE,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of feeds kept in memory
+            ttl: Seconds a rendered feed is served, bounding how long changes made in other workers go unnoticed
+            clock: Source of the current time in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self.renders = 0
+        self._feeds: OrderedDict[FeedKey, RenderedFeed] = OrderedDict()
+        self._dependents: dict[SessionKey, set[FeedKey]] = {}
+        self._events: dict[SessionKey, tuple[ClassSession, bytes]] = {}
+        self._pending: dict[FeedKey, _PendingRender] = {}
+
+    def __len__(self) -> int:
+        """Get the number of cached feeds."""
+        return len(self._feeds)
+
+    def _cached(self, key: FeedKey, window_start: datetime) -> Optional[RenderedFeed]:
+        feed = self._feeds.get(key)
+        if feed is None or feed.window_start != window_start or feed.expires_at <= self._clock():
+            return None
+        self._feeds.move_to_end(key)
+        return feed
+
+    async def get(self, owner: FeedOwner, source: SessionSource, today: Optional[date] = None) -> RenderedFeed:
+        """Get the rendered feed of an owner, rendering it if needed.
+
+        Args:
+            owner: Owner of the feed
+            source: Source to load sessions from on a cache miss
+            today: Day of the request; defaults to the current UTC date
+
+        Returns:
+            The rendered feed
+        """
+        key = (get_current_tenant(), owner)
+        start, end = feed_window(today)
+        feed = self._cached(key, start)
+        if feed is not None:
+            return feed
+
+        pending = self._pending.setdefault(key, _PendingRender())
+        pending.waiters += 1
+        try:
+            async with pending.lock:
+                feed = self._cached(key, start)
+                if feed is None:
+                    generation = pending.generation
+                    sessions = await source.sessions_for(owner, start, end)
+                    feed = self._render(key, sessions, start)
+                    if pending.generation == generation:
+                        self._store(key, feed)
+        finally:
+            # The entry lives until the last waiter is done, so newcomers queue on the same lock
+            pending.waiters -= 1
+            if not pending.waiters:
+                del self._pending[key]
+        return feed
+
+    def _render(self, key: FeedKey, sessions: list[ClassSession], window_start: datetime) -> RenderedFeed:
+        tenant, owner = key
+        events = []
+        for session in sorted(sessions, key=lambda session: (session.starts_at, session.id)):
+            cached = self._events.get((tenant, session.id))
+            if cached is None or cached[0] != session:
+                cached = (session, render_event(session))
+                self._events[(tenant, session.id)] = cached
+            events.append(cached[1])
+
+        body = render_calendar(f"{settings.PROJECT_NAME} {owner.kind.value} schedule", events)
+        self.renders += 1
+        return RenderedFeed(
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            session_ids=frozenset(session.id for session in sessions),
+            window_start=window_start,
+            expires_at=self._clock() + self.ttl,
+        )
+
+    def _store(self, key: FeedKey, feed: RenderedFeed) -> None:
+        self._drop(key)
+        self._feeds[key] = feed
+        for session_id in feed.session_ids:
+            self._dependents.setdefault((key[0], session_id), set()).add(key)
+        while len(self._feeds) > self.max_size:
+            self._drop(next(iter(self._feeds)))
+
+    def _drop(self, key: FeedKey) -> bool:
+        feed = self._feeds.pop(key, None)
+        if feed is None:
+            return False
+        for session_id in feed.session_ids:
+            session_key = (key[0], session_id)
+            dependents = self._dependents.get(session_key)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[session_key]
+                    self._events.pop(session_key, None)
+        return True
+
+    def invalidate_session(self, before: Optional[ClassSession], after: Optional[ClassSession]) -> int:
+        """Drop the feeds affected by a session change in the current tenant.
+
+        Affected are the feeds that contained the session and the feeds of every
+        owner of its previous and new version (e.g. a newly enrolled student).
+
+        Args:
+            before: Session before the change, None if it was created
+            after: Session after the change, None if it was deleted
+
+        Returns:
+            Number of dropped feeds
+        """
+        tenant = get_current_tenant()
+        keys: set[FeedKey] = set()
+        for session in (before, after):
+            if session is None:
+                continue
+            keys |= self._dependents.get((tenant, session.id), set())
+            keys |= {(tenant, owner) for owner in session.owners()}
+            self._events.pop((tenant, session.id), None)
+        return self._invalidate(keys)
+
+    def invalidate_owners(self, owners: Iterable[FeedOwner]) -> int:
+        """Drop the feeds of owners in the current tenant, e.g. after a class series changed.
+
+        Args:
+            owners: Owners whose feeds are out of date
+
+        Returns:
+            Number of dropped feeds
+        """
+        tenant = get_current_tenant()
+        return self._invalidate({(tenant, owner) for owner in owners})
+
+    def _invalidate(self, keys: set[FeedKey]) -> int:
+        for key in keys:
+            pending = self._pending.get(key)
+            if pending is not None:
+                pending.generation += 1
+        return sum(self._drop(key) for key in keys)
@@ -0,0 +1,110 @@
+"""iCalendar (RFC 5545) rendering.
+
+Events are rendered to bytes independently, so a feed can be assembled from
+cached event blocks and only changed sessions have to be rendered again.
+"""
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from src.domain.calendar.schemas import ClassSession
+
+CRLF = b"\r\n"
+PRODID = "-//Boneca//Class Schedule//EN"
+_MAX_LINE_OCTETS = 75
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT property value.
+
+    Args:
+        value: Raw text
+
+    Returns:
+        Text with backslashes, semicolons, commas and newlines escaped
+    """
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def format_datetime(value: datetime) -> str:
+    """Format a timezone-aware datetime as a UTC DATE-TIME value."""
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def fold_line(line: str) -> bytes:
+    """Encode a content line, folding it at 75 octets.
+
+    Continuation lines start with a single space. Multi-byte characters are
+    never split across lines.
+
+    Args:
+        line: Unfolded content line without line break
+
+    Returns:
+        Encoded and folded line terminated by CRLF
+    """
+    encoded = line.encode("utf-8")
+    if len(encoded) <= _MAX_LINE_OCTETS:
+        return encoded + CRLF
+
+    chunks: list[bytes] = []
+    current = b""
+    limit = _MAX_LINE_OCTETS
+    for char in line:
+        octets = char.encode("utf-8")
+        if len(current) + len(octets) > limit:
+            chunks.append(current)
+            current = b" "
+            limit = _MAX_LINE_OCTETS
+        current += octets
+    chunks.append(current)
+    return CRLF.join(chunks) + CRLF
+
+
+def render_event(session: ClassSession) -> bytes:
+    """Render a session as a VEVENT block.
+
+    Args:
+        session: Session to render
+
+    Returns:
+        The encoded VEVENT component
+    """
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{session.id}@boneca",
+        f"DTSTAMP:{format_datetime(session.updated_at)}",
+        f"DTSTART:{format_datetime(session.starts_at)}",
+        f"DTEND:{format_datetime(session.ends_at)}",
+        f"SUMMARY:{escape_text(session.title)}",
+        f"SEQUENCE:{session.sequence}",
+    ]
+    if session.location:
+        lines.append(f"LOCATION:{escape_text(session.location)}")
+    lines.append("END:VEVENT")
+    return b"".join(fold_line(line) for line in lines)
+
+
+def render_calendar(name: str, events: Iterable[bytes]) -> bytes:
+    """Wrap rendered events in a VCALENDAR object.
+
+    Args:
+        name: Calendar name shown by calendar apps
+        events: Rendered VEVENT blocks
+
+    Returns:
+        The complete encoded calendar
+    """
+    header = b"".join(
+        fold_line(line)
+        for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{escape_text(name)}",
+        )
+    )
+    return header + b"".join(events) + fold_line("END:VCALENDAR")
@@ -0,0 +1,66 @@
+"""Calendar data models and schemas.
+
+This module defines the data models used to build calendar feeds.
+"""
+from datetime import datetime
+from enum import Enum
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class FeedKind(str, Enum):
+    """Kind of owner a calendar feed belongs to."""
+
+    STUDENT = "student"
+    INSTRUCTOR = "instructor"
+    STUDIO = "studio"
+
+
+class FeedOwner(NamedTuple):
+    """Owner of a calendar feed.
+
+    Attributes:
+        kind: Whether the feed belongs to a student, instructor or studio.
+        owner_id: ID of the student, instructor or studio.
+    """
+
+    kind: FeedKind
+    owner_id: UUID
+
+
+class ClassSession(BaseModel):
+    """A single scheduled class session as shown in calendar feeds.
+
+    Attributes:
+        id: Unique ID of the session (stable across updates).
+        title: Title of the class.
+        starts_at: Start time (timezone-aware).
+        ends_at: End time (timezone-aware).
+        studio_id: Studio the session takes place in.
+        instructor_id: Instructor teaching the session.
+        student_ids: Students enrolled in the session.
+        location: Optional human-readable location.
+        updated_at: Time of the last change, used as DTSTAMP.
+        sequence: Revision number, incremented on every change.
+    """
+
+    id: UUID
+    title: str
+    starts_at: datetime
+    ends_at: datetime
+    studio_id: UUID
+    instructor_id: UUID
+    student_ids: frozenset[UUID] = frozenset()
+    location: Optional[str] = None
+    updated_at: datetime
+    sequence: int = 0
+
+    def owners(self) -> set[FeedOwner]:
+        """Get the owners of all feeds this session appears in."""
+        return {
+            FeedOwner(FeedKind.STUDIO, self.studio_id),
+            FeedOwner(FeedKind.INSTRUCTOR, self.instructor_id),
+            *(FeedOwner(FeedKind.STUDENT, student_id) for student_id in self.student_ids),
+        }
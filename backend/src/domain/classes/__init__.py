@@ -0,0 +1,5 @@
+"""Classes domain package.
+
+This package contains recurring class series, their recurrence rules and the
+lazy expansion of series into sessions.
+"""
@@ -0,0 +1,52 @@
+"""Live seat availability of class sessions.
+
+Changes are published on the broadcaster (see ``src.core.broadcast``) under a
+per-session topic of the current tenant and streamed to clients as Server-Sent
+Events, which replaces polling the seat counts.
+"""
+from uuid import UUID
+
+from pydantic import BaseModel, Field, computed_field
+
+from src.core.broadcast import Message, Topic, publish
+from src.core.tenancy import get_current_tenant
+
+AVAILABILITY_EVENT = "availability"
+
+
+class SeatAvailability(BaseModel):
+    """Seat counts of one class session.
+
+    Attributes:
+        session_id: The session (see ``Occurrence.id``).
+        capacity: Maximum number of students.
+        seats_taken: Students holding a seat.
+        waitlist: Students waiting for a seat.
+    """
+
+    session_id: UUID
+    capacity: int = Field(ge=0)
+    seats_taken: int = Field(ge=0)
+    waitlist: int = Field(default=0, ge=0)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def seats_available(self) -> int:
+        """Get the number of free seats."""
+        return max(self.capacity - self.seats_taken, 0)
+
+
+def availability_topic(session_id: UUID) -> Topic:
+    """Get the topic of a session's availability in the current tenant."""
+    return (get_current_tenant(), f"session:{session_id}")
+
+
+async def publish_availability(availability: SeatAvailability) -> None:
+    """Announce a change of a session's seat counts to all subscribers."""
+    await publish(
+        Message(
+            availability_topic(availability.session_id),
+            AVAILABILITY_EVENT,
+            availability.model_dump(mode="json"),
+        )
+    )
@@ -0,0 +1,204 @@
+"""Recurrence rules for class series.
+
+A series is stored as an RFC 5545 style recurrence (an ``RRULE`` line plus an
+optional ``EXDATE`` line), never as materialized sessions. Occurrences are
+produced lazily by generators that jump straight to the queried window, so
+expanding one week costs the same whether the series runs for a month or ten
+years.
+
+Supported are ``FREQ=DAILY`` and ``FREQ=WEEKLY`` with ``INTERVAL``, ``BYDAY``
+(weekly only), ``UNTIL`` and ``COUNT``, which covers regular class schedules.
+"""
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta, timezone
+from enum import Enum
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+_NO_DURATION = timedelta(0)
+_END_OF_TIME = datetime.max.replace(tzinfo=timezone.utc)
+
+
+class Frequency(str, Enum):
+    """Supported recurrence frequencies."""
+
+    DAILY = "DAILY"
+    WEEKLY = "WEEKLY"
+
+
+@dataclass(frozen=True)
+class Recurrence:
+    """A recurrence rule plus excluded dates.
+
+    Attributes:
+        frequency: How often the period repeats.
+        interval: Number of periods between repetitions.
+        weekdays: Weekdays (0 = Monday) for weekly rules; empty means the weekday of the first occurrence.
+        until: Last moment an occurrence may start (inclusive, UTC).
+        count: Maximum number of occurrences generated by the rule.
+        exception_dates: Local dates on which the class does not take place (e.g. holidays).
+    """
+
+    frequency: Frequency
+    interval: int = 1
+    weekdays: tuple[int, ...] = ()
+    until: Optional[datetime] = None
+    count: Optional[int] = None
+    exception_dates: frozenset[date] = field(default_factory=frozenset)
+
+    def __post_init__(self) -> None:
+        """Validate the rule."""
+        if self.interval < 1:
+            raise ValueError("INTERVAL must be positive")
+        if self.count is not None and self.count < 1:
+            raise ValueError("COUNT must be positive")
+        if self.count is not None and self.until is not None:
+            raise ValueError("COUNT and UNTIL are mutually exclusive")
+        if self.weekdays and self.frequency is not Frequency.WEEKLY:
+            raise ValueError("BYDAY is only supported for weekly rules")
+        if self.until is not None and self.until.tzinfo is None:
+            raise ValueError("UNTIL must be timezone-aware")
+
+    @classmethod
+    def parse(cls, text: str) -> "Recurrence":
+        r"""Parse ``RRULE:`` and ``EXDATE:`` lines.
+
+        Args:
+            text: Recurrence text, e.g. ``"RRULE:FREQ=WEEKLY;BYDAY=TU\nEXDATE:20260414"``
+
+        Returns:
+            The parsed recurrence
+
+        Raises:
+            ValueError: If the text is not a supported recurrence
+        """
+        rule: dict[str, str] = {}
+        exception_dates: set[date] = set()
+        for line in filter(None, (line.strip() for line in text.splitlines())):
+            name, _, value = line.partition(":")
+            if name == "RRULE":
+                rule = dict(part.split("=", 1) for part in value.split(";") if part)
+            elif name == "EXDATE":
+                exception_dates.update(datetime.strptime(day, "%Y%m%d").date() for day in value.split(","))
+            else:
+                raise ValueError(f"Unsupported recurrence line {line!r}")
+        if "FREQ" not in rule:
+            raise ValueError("Recurrence needs an RRULE with FREQ")
+
+        unsupported = set(rule) - {"FREQ", "INTERVAL", "BYDAY", "UNTIL", "COUNT", "WKST"}
+        if unsupported or rule.get("WKST", "MO") != "MO":
+            raise ValueError(f"Unsupported RRULE parts {sorted(unsupported) or ['WKST']}")
+        return cls(
+            frequency=Frequency(rule["FREQ"]),
+            interval=int(rule.get("INTERVAL", 1)),
+            weekdays=tuple(sorted(WEEKDAYS.index(day) for day in rule["BYDAY"].split(","))) if "BYDAY" in rule else (),
+            until=(
+                datetime.strptime(rule["UNTIL"], "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+                if "UNTIL" in rule
+                else None
+            ),
+            count=int(rule["COUNT"]) if "COUNT" in rule else None,
+            exception_dates=frozenset(exception_dates),
+        )
+
+    def format(self) -> str:
+        """Format the recurrence as ``RRULE:`` and ``EXDATE:`` lines."""
+        parts = [f"FREQ={self.frequency.value}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.weekdays:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[day] for day in self.weekdays))
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}")
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        lines = ["RRULE:" + ";".join(parts)]
+        if self.exception_dates:
+            lines.append("EXDATE:" + ",".join(f"{day:%Y%m%d}" for day in sorted(self.exception_dates)))
+        return "\n".join(lines)
+
+    def last_start(self, first: datetime, tz: ZoneInfo) -> Optional[datetime]:
+        """Get the latest moment an occurrence may start.
+
+        Args:
+            first: Start of the first occurrence (timezone-aware)
+            tz: Time zone the series is scheduled in
+
+        Returns:
+            ``UNTIL`` itself, the start of the last occurrence counted by ``COUNT``,
+            or None if the rule never ends
+        """
+        if self.until is not None:
+            return self.until
+        if self.count is None:
+            return None
+        # Excluded dates still use up the count, so the last counted occurrence may be one of them
+        counted = replace(self, exception_dates=frozenset())
+        last = deque(counted.occurrences(first, tz, first, _END_OF_TIME), maxlen=1)
+        return last[0] if last else first
+
+    def occurrences(
+        self,
+        first: datetime,
+        tz: ZoneInfo,
+        window_start: datetime,
+        window_end: datetime,
+        duration: timedelta = _NO_DURATION,
+    ) -> Iterator[datetime]:
+        """Lazily generate the occurrences overlapping a window.
+
+        Occurrences keep their local wall-clock time across DST changes. The
+        generator starts at the period containing the window, computing how many
+        occurrences ``COUNT`` has used up arithmetically instead of iterating.
+
+        Args:
+            first: Start of the first occurrence (timezone-aware)
+            tz: Time zone the series is scheduled in
+            window_start: Start of the window (inclusive, timezone-aware)
+            window_end: End of the window (exclusive, timezone-aware)
+            duration: Length of an occurrence; occurrences ending inside the window are included
+
+        Yields:
+            Start of each occurrence (timezone-aware, in ``tz``), in chronological order
+        """
+        local_first = first.astimezone(tz)
+        start_time = local_first.time()
+        first_day = local_first.date()
+
+        if self.frequency is Frequency.WEEKLY:
+            period_days = 7
+            anchor = first_day - timedelta(days=first_day.weekday())
+            slots = self.weekdays or (first_day.weekday(),)
+        else:
+            period_days = 1
+            anchor = first_day
+            slots = (0,)
+        skipped_in_first_period = sum(1 for slot in slots if slot < (first_day - anchor).days)
+
+        # Jump to the first period that can overlap the window
+        earliest = (window_start - duration).astimezone(tz).date()
+        step = period_days * self.interval
+        period = max(0, (earliest - anchor).days // step)
+        generated = period * len(slots) - (skipped_in_first_period if period else 0)
+
+        while True:
+            period_start = anchor + timedelta(days=period * step)
+            for slot in slots:
+                day = period_start + timedelta(days=slot)
+                if day < first_day:
+                    continue
+                if self.count is not None and generated >= self.count:
+                    return
+                generated += 1
+                occurrence = datetime.combine(day, start_time, tzinfo=tz)
+                if self.until is not None and occurrence > self.until:
+                    return
+                if occurrence >= window_end:
+                    return
+                if day in self.exception_dates or occurrence + duration <= window_start:
+                    continue
+                yield occurrence
+            period += 1
@@ -0,0 +1,106 @@
+"""Class series repository.
+
+This module defines the table recurring class series are stored in, its
+archive, and the repository used to access them.
+"""
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any, ClassVar, Optional
+from uuid import UUID
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Table, Text, Uuid, text
+
+from src.core.archive import ArchivePolicy, archive_table
+from src.core.config import settings
+from src.core.database import metadata
+from src.core.repositories.sql import SQLRepository
+from src.domain.classes.schemas import ClassSeries
+
+SeriesListener = Callable[[Optional[ClassSeries], Optional[ClassSeries]], Any]
+
+class_series = Table(
+    "class_series",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("title", String(200), nullable=False),
+    Column("studio_id", Uuid, nullable=False, index=True),
+    Column("instructor_id", Uuid, nullable=False, index=True),
+    Column("starts_at", DateTime(timezone=True), nullable=False, index=True),
+    Column("duration_minutes", Integer, nullable=False),
+    Column("timezone", String(64), nullable=False),
+    Column("recurrence", Text, nullable=False),
+    Column("location", String(200), nullable=True),
+    Column("capacity", Integer, nullable=False, default=20),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Column("sequence", Integer, nullable=False, default=0),
+    Column("deleted_at", DateTime(timezone=True), nullable=True),
+    # End of the last occurrence; NULL for series without UNTIL or COUNT
+    Column("ends_at", DateTime(timezone=True), nullable=True, index=True),
+    # Only deleted series are indexed; the archival job finds them without a scan
+    Index(
+        "ix_class_series_deleted_at",
+        "deleted_at",
+        postgresql_where=text("deleted_at IS NOT NULL"),
+    ),
+)
+
+class_series_archive = archive_table(class_series)
+
+# Deleted series stay restorable for a while, then only historical lookups need them
+class_series_archive_policy = ArchivePolicy(
+    class_series,
+    class_series_archive,
+    lambda now: class_series.c.deleted_at < now - timedelta(days=settings.ARCHIVE_DELETED_AFTER_DAYS),
+)
+
+
+class ClassSeriesRepository(SQLRepository[ClassSeries]):
+    """Repository for recurring class series.
+
+    Deleting a series only marks it as deleted, so its past sessions stay
+    resolvable; deleted series disappear from schedules and feeds immediately.
+    Listeners registered with ``subscribe`` are called with the previous and new
+    version of every series created, updated, deleted or restored through it.
+    """
+
+    table = class_series
+    model = ClassSeries
+    entity_type = "class series"
+    soft_delete_column = "deleted_at"
+    archive = class_series_archive
+    filterable_fields = ("studio_id", "instructor_id", "starts_at", "ends_at")
+
+    listeners: ClassVar[list[SeriesListener]] = []
+
+    @classmethod
+    def subscribe(cls, listener: SeriesListener) -> None:
+        """Register a callable notified of series changes."""
+        cls.listeners.append(listener)
+
+    def _notify(self, before: Optional[ClassSeries], after: Optional[ClassSeries]) -> None:
+        for listener in self.listeners:
+            listener(before, after)
+
+    async def create(self, entity: ClassSeries) -> ClassSeries:
+        """Insert a new series."""
+        created = await super().create(entity)
+        self._notify(None, created)
+        return created
+
+    async def update(self, id: UUID, entity: ClassSeries) -> ClassSeries:
+        """Replace the stored values of an existing series."""
+        before = await self.get(id)
+        updated = await super().update(id, entity)
+        self._notify(before, updated)
+        return updated
+
+    async def delete(self, id: UUID) -> None:
+        """Mark a series as deleted."""
+        before = await self.get(id)
+        await super().delete(id)
+        self._notify(before, None)
+
+    async def restore(self, id: UUID) -> None:
+        """Undo the soft delete of a series."""
+        await super().restore(id)
+        self._notify(None, await self.get(id))
@@ -0,0 +1,193 @@
+"""Lazy expansion of class series into sessions.
+
+Series are loaded through ``BaseRepository.list`` filters, limited to those
+whose first occurrence starts before the queried window ends and whose stored
+end (from ``UNTIL`` or ``COUNT``) is after it starts. They are expanded with
+generators for the queried window only; the occurrences of many series are
+merged in chronological order without materializing them first.
+
+Student feeds show the sessions the student holds a seat in, read from a
+``ReservationSource``; only the series running while those sessions take place
+are expanded.
+"""
+import heapq
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional, Protocol
+from uuid import UUID, uuid5
+from zoneinfo import ZoneInfo
+
+from src.core.repositories.base import BaseRepository
+from src.core.repositories.filters import And, Filter, IsNull, Or, Range, as_filter
+from src.domain.calendar.schemas import ClassSession, FeedKind, FeedOwner
+from src.domain.classes.schemas import ClassSeries
+from src.domain.waitlist.schemas import SessionSeats
+
+
+class ReservationSource(Protocol):
+    """Source of the sessions students hold seats in."""
+
+    async def reserved_sessions(self, student_id: UUID, start: datetime, end: datetime) -> list[SessionSeats]:
+        """Get the sessions a student holds a seat in that overlap a time window."""
+        ...
+
+
+@dataclass(frozen=True)
+class Occurrence:
+    """A single occurrence of a class series.
+
+    Attributes:
+        series: The series the occurrence belongs to.
+        starts_at: Start of the occurrence (timezone-aware).
+    """
+
+    series: ClassSeries
+    starts_at: datetime
+
+    @property
+    def id(self) -> UUID:
+        """Get the stable ID of the occurrence, derived from series and local date."""
+        local_day = self.starts_at.astimezone(ZoneInfo(self.series.timezone)).date()
+        return uuid5(self.series.id, local_day.isoformat())
+
+    @property
+    def ends_at(self) -> datetime:
+        """Get the end of the occurrence."""
+        return self.starts_at + self.series.duration
+
+    def to_session(self) -> ClassSession:
+        """Convert the occurrence to a calendar session."""
+        return ClassSession(
+            id=self.id,
+            title=self.series.title,
+            starts_at=self.starts_at.astimezone(timezone.utc),
+            ends_at=self.ends_at.astimezone(timezone.utc),
+            studio_id=self.series.studio_id,
+            instructor_id=self.series.instructor_id,
+            location=self.series.location,
+            updated_at=self.series.updated_at,
+            sequence=self.series.sequence,
+        )
+
+
+def expand(series: ClassSeries, start: datetime, end: datetime) -> Iterator[Occurrence]:
+    """Lazily generate the occurrences of a series overlapping a window.
+
+    Args:
+        series: Series to expand
+        start: Start of the window (inclusive, timezone-aware)
+        end: End of the window (exclusive, timezone-aware)
+
+    Yields:
+        Occurrences in chronological order
+    """
+    tz = ZoneInfo(series.timezone)
+    for starts_at in series.rule.occurrences(series.starts_at, tz, start, end, series.duration):
+        yield Occurrence(series, starts_at)
+
+
+def expand_all(series: Iterable[ClassSeries], start: datetime, end: datetime) -> Iterator[Occurrence]:
+    """Lazily merge the occurrences of many series in chronological order.
+
+    Args:
+        series: Series to expand
+        start: Start of the window (inclusive, timezone-aware)
+        end: End of the window (exclusive, timezone-aware)
+
+    Yields:
+        Occurrences of all series, ordered by start time
+    """
+    return heapq.merge(*(expand(item, start, end) for item in series), key=lambda occurrence: occurrence.starts_at)
+
+
+class ClassSchedule:
+    """Schedule of sessions generated from class series.
+
+    It also serves as a ``SessionSource`` for calendar feeds.
+    """
+
+    def __init__(
+        self,
+        repository: BaseRepository[ClassSeries],
+        reservations: Optional[ReservationSource] = None,
+        page_size: int = 500,
+    ) -> None:
+        """Initialize the schedule.
+
+        Args:
+            repository: Repository the series are loaded from
+            reservations: Source of the seats of students; without it student feeds stay empty
+            page_size: Number of series loaded per ``list`` call
+        """
+        self.repository = repository
+        self.reservations = reservations
+        self.page_size = page_size
+
+    async def series(
+        self,
+        filters: Optional[dict[str, Any]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> list[ClassSeries]:
+        """Load all series matching equality filters, page by page.
+
+        Args:
+            filters: Equality filters on series fields
+            start: Only load series still running at this time
+            end: Only load series started before this time
+
+        Returns:
+            The matching series
+        """
+        expression: Filter = as_filter(filters)
+        if start is not None:
+            expression = And(expression, Or(IsNull("ends_at"), Range("ends_at", gt=start)))
+        if end is not None:
+            expression = And(expression, Range("starts_at", lt=end))
+        loaded: list[ClassSeries] = []
+        while True:
+            page = await self.repository.list(filters=expression, offset=len(loaded), limit=self.page_size)
+            loaded.extend(page)
+            if len(page) < self.page_size:
+                return loaded
+
+    async def occurrences(
+        self,
+        start: datetime,
+        end: datetime,
+        filters: Optional[dict[str, Any]] = None,
+    ) -> list[Occurrence]:
+        """Get the occurrences of all matching series overlapping a window.
+
+        Args:
+            start: Start of the window (inclusive, timezone-aware)
+            end: End of the window (exclusive, timezone-aware)
+            filters: Equality filters on series fields, e.g. ``{"studio_id": ...}``
+
+        Returns:
+            Occurrences ordered by start time
+        """
+        return list(expand_all(await self.series(filters, start, end), start, end))
+
+    async def sessions_for(self, owner: FeedOwner, start: datetime, end: datetime) -> list[ClassSession]:
+        """Get the sessions of a calendar feed owner overlapping a window."""
+        if owner.kind is FeedKind.STUDENT:
+            return await self._student_sessions(owner.owner_id, start, end)
+        field = "studio_id" if owner.kind is FeedKind.STUDIO else "instructor_id"
+        occurrences = await self.occurrences(start, end, {field: owner.owner_id})
+        return [occurrence.to_session() for occurrence in occurrences]
+
+    async def _student_sessions(self, student_id: UUID, start: datetime, end: datetime) -> list[ClassSession]:
+        if self.reservations is None:
+            return []
+        seats = await self.reservations.reserved_sessions(student_id, start, end)
+        if not seats:
+            return []
+        booked = {item.session_id for item in seats}
+        span = (min(item.starts_at for item in seats), max(item.ends_at for item in seats))
+        return [
+            occurrence.to_session().model_copy(update={"student_ids": frozenset({student_id})})
+            for occurrence in await self.occurrences(*span)
+            if occurrence.id in booked
+        ]
@@ -0,0 +1,93 @@
+"""Class data models and schemas.
+
+This module defines the data models used for recurring classes.
+"""
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from typing import Optional
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pydantic import BaseModel, Field, computed_field, field_validator
+
+from src.domain.calendar.schemas import FeedKind, FeedOwner
+from src.domain.classes.recurrence import Recurrence
+
+
+class ClassSeries(BaseModel):
+    """A recurring class, stored as a rule plus exceptions.
+
+    Attributes:
+        id: Unique ID of the series.
+        title: Title of the class.
+        studio_id: Studio the class takes place in.
+        instructor_id: Instructor teaching the class.
+        starts_at: Start of the first occurrence.
+        duration_minutes: Length of each occurrence in minutes.
+        timezone: IANA time zone the schedule is defined in (e.g. "Europe/Lisbon").
+        recurrence: RRULE and optional EXDATE lines (see ``Recurrence``).
+        location: Optional human-readable location.
+        capacity: Maximum number of students per occurrence.
+        updated_at: Time of the last change.
+        sequence: Revision number, incremented on every change.
+        deleted_at: Time the series was deleted; deleted series have no sessions.
+        ends_at: End of the last occurrence (UTC), derived from the recurrence; None if the series never ends.
+    """
+
+    id: UUID
+    title: str
+    studio_id: UUID
+    instructor_id: UUID
+    starts_at: datetime
+    duration_minutes: int = Field(gt=0)
+    timezone: str = "Europe/Lisbon"
+    recurrence: str
+    location: Optional[str] = None
+    capacity: int = Field(default=20, gt=0)
+    updated_at: datetime
+    sequence: int = 0
+    deleted_at: Optional[datetime] = None
+
+    @field_validator("starts_at", "updated_at", "deleted_at")
+    @classmethod
+    def assume_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Treat naive datetimes (e.g. read back from SQLite) as UTC."""
+        return value if value is None or value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+    @field_validator("timezone")
+    @classmethod
+    def validate_timezone(cls, value: str) -> str:
+        """Ensure the time zone exists."""
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError) as error:
+            raise ValueError(f"Unknown time zone {value!r}") from error
+        return value
+
+    @field_validator("recurrence")
+    @classmethod
+    def validate_recurrence(cls, value: str) -> str:
+        """Ensure the recurrence can be expanded."""
+        Recurrence.parse(value)
+        return value
+
+    @cached_property
+    def rule(self) -> Recurrence:
+        """Get the parsed recurrence."""
+        return Recurrence.parse(self.recurrence)
+
+    @property
+    def duration(self) -> timedelta:
+        """Get the length of each occurrence."""
+        return timedelta(minutes=self.duration_minutes)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def ends_at(self) -> Optional[datetime]:
+        """Get the end of the last occurrence, stored so schedules only load series overlapping a window."""
+        last_start = self.rule.last_start(self.starts_at, ZoneInfo(self.timezone))
+        return None if last_start is None else (last_start + self.duration).astimezone(timezone.utc)
+
+    def owners(self) -> set[FeedOwner]:
+        """Get the owners of the feeds the sessions of this series appear in."""
+        return {FeedOwner(FeedKind.STUDIO, self.studio_id), FeedOwner(FeedKind.INSTRUCTOR, self.instructor_id)}
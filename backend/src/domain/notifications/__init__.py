@@ -0,0 +1,4 @@
+"""Notifications domain package.
+
+This package contains the outbox of notification jobs written by other domains.
+"""
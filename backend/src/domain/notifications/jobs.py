@@ -0,0 +1,87 @@
+"""Notification job outbox.
+
+Domains that need to notify someone insert a job into ``notification_jobs`` in
+the same transaction as the change that triggers it, so a notification is
+queued if and only if the change commits. Jobs are sent later, outside the
+request (see ``src.domain.notifications.sender``).
+
+A job's payload is the context of its template; the recipient's address is
+read from its ``email`` field.
+"""
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import uuid4
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Connection,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    Table,
+    Text,
+    Uuid,
+    insert,
+    text,
+)
+
+from src.core.database import metadata
+
+notification_jobs = Table(
+    "notification_jobs",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("kind", String(64), nullable=False),
+    Column("payload", JSON, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("available_at", DateTime(timezone=True), nullable=False),
+    Column("sent_at", DateTime(timezone=True), nullable=True),
+    Column("failed_at", DateTime(timezone=True), nullable=True),
+    Column("last_error", Text, nullable=True),
+    # Only pending jobs are indexed; the sender picks up those that are due
+    Index(
+        "ix_notification_jobs_pending",
+        "available_at",
+        postgresql_where=text("sent_at IS NULL AND failed_at IS NULL"),
+    ),
+)
+
+# Payload field holding the recipient's email address
+RECIPIENT_FIELD = "email"
+
+
+def enqueue(
+    connection: Connection,
+    kind: str,
+    payloads: Sequence[dict[str, Any]],
+    now: Optional[datetime] = None,
+) -> None:
+    """Queue notification jobs within the caller's transaction.
+
+    Args:
+        connection: Connection of the transaction making the change
+        kind: Kind of notification, e.g. ``waitlist.promoted``
+        payloads: JSON-serializable payload of each job
+        now: Creation time; defaults to the current time
+    """
+    if not payloads:
+        return
+    created_at = now or datetime.now(timezone.utc)
+    connection.execute(
+        insert(notification_jobs),
+        [
+            {
+                "id": uuid4(),
+                "kind": kind,
+                "payload": payload,
+                "created_at": created_at,
+                "attempts": 0,
+                "available_at": created_at,
+            }
+            for payload in payloads
+        ],
+    )
@@ -0,0 +1,220 @@
+"""Delivery of queued notification jobs.
+
+The sender claims due jobs in batches (``FOR UPDATE SKIP LOCKED``, so several
+senders can run side by side), renders them through the template cache and
+sends them over the pooled SMTP connections, spreading each batch over as many
+connections as the server allows. Claimed jobs are hidden for
+``NOTIFICATION_LEASE`` seconds, so jobs of a crashed sender are picked up again.
+
+Jobs the server rejects temporarily are retried with exponential backoff
+(``NOTIFICATION_RETRY_BACKOFF``, doubled per attempt) until
+``NOTIFICATION_MAX_ATTEMPTS``; permanent rejections and jobs that cannot be
+rendered are given up at once. Delivery is at least once: a sender that crashes
+after sending but before recording the batch sends it again.
+"""
+import asyncio
+import logging
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Any, Optional
+
+from sqlalchemy import Engine, RowMapping, bindparam, select, update
+
+from src.core.config import settings
+from src.core.database import get_engine, transaction
+from src.domain.notifications.jobs import RECIPIENT_FIELD, notification_jobs
+from src.domain.notifications.smtp import (
+    Delivery,
+    DeliveryStatus,
+    SMTPPool,
+    SMTPServer,
+    smtp_pool,
+)
+from src.domain.notifications.templates import TemplateRenderer, renderer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SendReport:
+    """Counts of a sender run.
+
+    Attributes:
+        batches: Number of claimed batches.
+        sent: Jobs delivered.
+        retried: Jobs scheduled for another attempt.
+        failed: Jobs given up.
+    """
+
+    batches: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+class NotificationSender:
+    """Sends due notification jobs in batches over pooled SMTP connections."""
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        pool: Optional[SMTPPool] = None,
+        templates: Optional[TemplateRenderer] = None,
+        server: Optional[SMTPServer] = None,
+        sender: str = settings.NOTIFICATION_FROM,
+        batch_size: int = settings.NOTIFICATION_BATCH_SIZE,
+        max_attempts: int = settings.NOTIFICATION_MAX_ATTEMPTS,
+        retry_backoff: float = settings.NOTIFICATION_RETRY_BACKOFF,
+        lease: float = settings.NOTIFICATION_LEASE,
+    ) -> None:
+        """Initialize the sender.
+
+        Args:
+            engine: Engine the jobs are stored in; defaults to the engine of the current tenant
+            pool: SMTP connection pool; defaults to the process-wide pool
+            templates: Template renderer; defaults to the process-wide renderer
+            server: SMTP server; defaults to the configured one
+            sender: From address
+            batch_size: Maximum number of jobs claimed at once
+            max_attempts: Deliveries tried before a job is given up
+            retry_backoff: Seconds before the first retry; doubled on every attempt
+            lease: Seconds a claimed job is hidden from other senders
+        """
+        self._engine = engine
+        self.pool = pool if pool is not None else smtp_pool
+        self.templates = templates if templates is not None else renderer
+        self.server = server or SMTPServer()
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease = lease
+
+    @property
+    def engine(self) -> Engine:
+        """Get the engine the jobs are stored in."""
+        return self._engine or get_engine()
+
+    def _claim(self, now: datetime) -> Sequence[RowMapping]:
+        jobs = notification_jobs
+        statement = (
+            select(jobs)
+            .where(jobs.c.sent_at.is_(None), jobs.c.failed_at.is_(None), jobs.c.available_at <= now)
+            .order_by(jobs.c.available_at)
+            .limit(self.batch_size)
+        )
+        with transaction(self.engine) as connection:
+            if connection.dialect.name == "postgresql":
+                statement = statement.with_for_update(skip_locked=True)
+            rows = connection.execute(statement).mappings().all()
+            if rows:
+                connection.execute(
+                    update(jobs)
+                    .where(jobs.c.id.in_([row["id"] for row in rows]))
+                    .values(available_at=now + timedelta(seconds=self.lease))
+                )
+        return rows
+
+    def _message(self, job: RowMapping) -> EmailMessage:
+        context = dict(job["payload"])
+        recipient = context.pop(RECIPIENT_FIELD, None)
+        if not recipient:
+            raise ValueError(f"No {RECIPIENT_FIELD!r} in the payload")
+        rendered = self.templates.render(job["kind"], context)
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = rendered.subject
+        message.set_content(rendered.body)
+        return message
+
+    def _outcome(self, job: RowMapping, delivery: Delivery, now: datetime) -> dict[str, Any]:
+        attempts = job["attempts"] + 1
+        outcome: dict[str, Any] = {
+            "job_id": job["id"],
+            "new_attempts": attempts,
+            "new_available_at": job["available_at"],
+            "new_sent_at": None,
+            "new_failed_at": None,
+            "new_last_error": delivery.error,
+        }
+        if delivery.status is DeliveryStatus.SENT:
+            outcome["new_sent_at"] = now
+        elif delivery.status is DeliveryStatus.RETRY and attempts < self.max_attempts:
+            outcome["new_available_at"] = now + timedelta(seconds=self.retry_backoff * 2 ** (attempts - 1))
+        else:
+            outcome["new_failed_at"] = now
+        return outcome
+
+    def _record(self, outcomes: list[dict[str, Any]]) -> None:
+        jobs = notification_jobs
+        statement = (
+            update(jobs)
+            .where(jobs.c.id == bindparam("job_id"))
+            .values(
+                attempts=bindparam("new_attempts"),
+                available_at=bindparam("new_available_at"),
+                sent_at=bindparam("new_sent_at"),
+                failed_at=bindparam("new_failed_at"),
+                last_error=bindparam("new_last_error"),
+            )
+        )
+        with transaction(self.engine) as connection:
+            connection.execute(statement, outcomes)
+
+    async def _deliver(self, jobs: Sequence[RowMapping]) -> list[Delivery]:
+        deliveries: list[Optional[Delivery]] = [None] * len(jobs)
+        sendable: list[tuple[int, EmailMessage]] = []
+        for index, job in enumerate(jobs):
+            try:
+                sendable.append((index, self._message(job)))
+            except ValueError as error:
+                deliveries[index] = Delivery(DeliveryStatus.FAILED, str(error))
+
+        # One chunk per allowed connection, so the whole batch is in flight at once
+        chunk_size = max(1, math.ceil(len(sendable) / self.pool.max_connections_per_host))
+        chunks = [sendable[start : start + chunk_size] for start in range(0, len(sendable), chunk_size)]
+        results = await asyncio.gather(
+            *(self.pool.send([message for _, message in chunk], self.server) for chunk in chunks)
+        )
+        for chunk, chunk_deliveries in zip(chunks, results):
+            for (index, _), delivery in zip(chunk, chunk_deliveries):
+                deliveries[index] = delivery
+        return [delivery for delivery in deliveries if delivery is not None]
+
+    async def send_pending(self, max_batches: Optional[int] = None, now: Optional[datetime] = None) -> SendReport:
+        """Send due jobs batch by batch until none are left.
+
+        Args:
+            max_batches: Stop after this many batches
+            now: Current time; defaults to the clock, pass it to replay a schedule
+
+        Returns:
+            Counts of sent, retried and failed jobs
+        """
+        report = SendReport()
+        while max_batches is None or report.batches < max_batches:
+            started = now or datetime.now(timezone.utc)
+            jobs = await asyncio.to_thread(self._claim, started)
+            if not jobs:
+                break
+            report.batches += 1
+            deliveries = await self._deliver(jobs)
+            finished = now or datetime.now(timezone.utc)
+            outcomes = [self._outcome(job, delivery, finished) for job, delivery in zip(jobs, deliveries)]
+            await asyncio.to_thread(self._record, outcomes)
+
+            for outcome in outcomes:
+                if outcome["new_sent_at"] is not None:
+                    report.sent += 1
+                elif outcome["new_failed_at"] is not None:
+                    report.failed += 1
+                    logger.warning("Gave up notification %s: %s", outcome["job_id"], outcome["new_last_error"])
+                else:
+                    report.retried += 1
+            if len(jobs) < self.batch_size:
+                break
+        return report
@@ -0,0 +1,251 @@
+"""Pooled SMTP delivery.
+
+Connecting, greeting, upgrading to TLS and logging in costs several round trips
+per connection, and SMTP servers throttle clients that open a connection per
+message. ``SMTPPool`` keeps connections open and sends batches of messages over
+each of them, with at most ``SMTP_MAX_CONNECTIONS_PER_HOST`` connections to one
+server at a time. Connections are replaced after
+``SMTP_MESSAGES_PER_CONNECTION`` messages, as many providers limit messages per
+session.
+
+``smtplib`` is synchronous, so every batch runs on a worker thread. A dropped
+connection is reopened with exponential backoff and the rest of the batch
+resent; messages the server rejects are reported per message, temporarily
+(4xx, retry later) or permanently (5xx).
+"""
+import asyncio
+import contextlib
+import enum
+import logging
+import smtplib
+import ssl
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds after which an idle connection is checked with NOOP before it is reused
+IDLE_CHECK_AFTER = 10.0
+
+
+@dataclass(frozen=True)
+class SMTPServer:
+    """An SMTP server and how to log in to it.
+
+    Attributes:
+        host: Host name.
+        port: Port.
+        username: Login; empty to send without authentication.
+        password: Password.
+        starttls: Whether to upgrade the connection with STARTTLS.
+    """
+
+    host: str = settings.SMTP_HOST
+    port: int = settings.SMTP_PORT
+    username: str = settings.SMTP_USERNAME
+    password: str = settings.SMTP_PASSWORD
+    starttls: bool = settings.SMTP_STARTTLS
+
+
+class DeliveryStatus(str, enum.Enum):
+    """Outcome of sending one message."""
+
+    SENT = "sent"
+    RETRY = "retry"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class Delivery:
+    """Outcome of sending one message.
+
+    Attributes:
+        status: Whether the message was sent, should be retried later or was rejected for good.
+        error: Reply or error of the server for undelivered messages.
+    """
+
+    status: DeliveryStatus
+    error: Optional[str] = None
+
+
+SENT = Delivery(DeliveryStatus.SENT)
+
+
+class _Connection:
+    """An open SMTP session and the number of messages sent over it."""
+
+    def __init__(self, client: smtplib.SMTP) -> None:
+        """Wrap a logged-in client."""
+        self.client = client
+        self.sent = 0
+        self.idle_since = time.monotonic()
+
+
+def _rejection(code: int, reply: object) -> Delivery:
+    text = reply.decode(errors="replace") if isinstance(reply, bytes) else str(reply)
+    status = DeliveryStatus.RETRY if 400 <= code < 500 else DeliveryStatus.FAILED
+    return Delivery(status, f"{code} {text}")
+
+
+class SMTPPool:
+    """Persistent SMTP connections with a per-host concurrency limit."""
+
+    def __init__(
+        self,
+        max_connections_per_host: int = settings.SMTP_MAX_CONNECTIONS_PER_HOST,
+        messages_per_connection: int = settings.SMTP_MESSAGES_PER_CONNECTION,
+        timeout: float = settings.SMTP_TIMEOUT,
+        reconnect_attempts: int = 3,
+        reconnect_backoff: float = 0.5,
+    ) -> None:
+        """Initialize the pool; connections are opened on demand.
+
+        Args:
+            max_connections_per_host: Maximum number of concurrent connections to one server
+            messages_per_connection: Messages sent over a connection before it is replaced
+            timeout: Seconds to wait for the server
+            reconnect_attempts: Times a dropped connection is reopened within one batch
+            reconnect_backoff: Seconds before the first reconnect; doubled on every attempt
+        """
+        self.max_connections_per_host = max_connections_per_host
+        self.messages_per_connection = messages_per_connection
+        self.timeout = timeout
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_backoff = reconnect_backoff
+        self.connects = 0
+        self._idle: dict[SMTPServer, deque[_Connection]] = {}
+        self._limits: dict[SMTPServer, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _limit(self, server: SMTPServer) -> asyncio.Semaphore:
+        limit = self._limits.get(server)
+        if limit is None:
+            limit = self._limits[server] = asyncio.Semaphore(self.max_connections_per_host)
+        return limit
+
+    def _connect(self, server: SMTPServer) -> _Connection:
+        client = smtplib.SMTP(server.host, server.port, timeout=self.timeout)
+        try:
+            client.ehlo()
+            if server.starttls:
+                client.starttls(context=ssl.create_default_context())
+                client.ehlo()
+            if server.username:
+                client.login(server.username, server.password)
+        except BaseException:
+            client.close()
+            raise
+        self.connects += 1
+        return _Connection(client)
+
+    def _checkout(self, server: SMTPServer) -> _Connection:
+        while True:
+            with self._lock:
+                idle = self._idle.get(server)
+                connection = idle.pop() if idle else None
+            if connection is None:
+                return self._connect(server)
+            if time.monotonic() - connection.idle_since < IDLE_CHECK_AFTER:
+                return connection
+            # Servers close idle sessions; probe before trusting a batch to it
+            with contextlib.suppress(smtplib.SMTPException, OSError):
+                if connection.client.noop()[0] == 250:
+                    return connection
+            connection.client.close()
+
+    def _checkin(self, server: SMTPServer, connection: _Connection) -> None:
+        if connection.sent >= self.messages_per_connection:
+            self._quit(connection)
+            return
+        connection.idle_since = time.monotonic()
+        with self._lock:
+            self._idle.setdefault(server, deque()).append(connection)
+
+    @staticmethod
+    def _quit(connection: _Connection) -> None:
+        try:
+            connection.client.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.client.close()
+
+    def _send_one(self, connection: _Connection, message: EmailMessage) -> Delivery:
+        try:
+            refused = connection.client.send_message(message)
+        except smtplib.SMTPRecipientsRefused as error:
+            # Only one recipient per message, so all of them were refused
+            code, reply = next(iter(error.recipients.values()))
+            return _rejection(code, reply)
+        except (smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as error:
+            return _rejection(error.smtp_code, error.smtp_error)
+        finally:
+            connection.sent += 1
+        if refused:
+            code, reply = next(iter(refused.values()))
+            return _rejection(code, reply)
+        return SENT
+
+    def _send_batch(self, server: SMTPServer, messages: Sequence[EmailMessage]) -> list[Delivery]:
+        deliveries: list[Delivery] = []
+        failures = 0
+        connection: Optional[_Connection] = None
+        while len(deliveries) < len(messages):
+            try:
+                if connection is None:
+                    connection = self._checkout(server)
+                elif connection.sent >= self.messages_per_connection:
+                    self._quit(connection)
+                    connection = self._connect(server)
+                deliveries.append(self._send_one(connection, messages[len(deliveries)]))
+            except (smtplib.SMTPException, OSError) as error:
+                # The connection is gone (or never came up); the current message was not accepted
+                if connection is not None:
+                    connection.client.close()
+                    connection = None
+                failures += 1
+                if failures > self.reconnect_attempts:
+                    logger.warning(
+                        "Giving up on %s:%s after %d attempts: %s", server.host, server.port, failures, error
+                    )
+                    retry = Delivery(DeliveryStatus.RETRY, f"{type(error).__name__}: {error}")
+                    deliveries.extend(retry for _ in range(len(messages) - len(deliveries)))
+                    break
+                time.sleep(self.reconnect_backoff * 2 ** (failures - 1))
+        if connection is not None:
+            self._checkin(server, connection)
+        return deliveries
+
+    async def send(self, messages: Sequence[EmailMessage], server: Optional[SMTPServer] = None) -> list[Delivery]:
+        """Send a batch of messages over one pooled connection.
+
+        Waits while the server already has ``max_connections_per_host`` batches
+        in flight. Split large sends into several batches and send them
+        concurrently to use more connections.
+
+        Args:
+            messages: Messages to send, each with a single recipient
+            server: Server to send through; defaults to the configured one
+
+        Returns:
+            The outcome of each message, in order
+        """
+        server = server or SMTPServer()
+        async with self._limit(server):
+            return await asyncio.to_thread(self._send_batch, server, messages)
+
+    def close(self) -> None:
+        """Quit all idle connections."""
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection in idle]
+            self._idle.clear()
+        for connection in connections:
+            self._quit(connection)
+
+
+smtp_pool = SMTPPool()
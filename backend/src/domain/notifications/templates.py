@@ -0,0 +1,142 @@
+"""Notification templates and their render cache.
+
+Templates use ``string.Template`` placeholders (``$name``) and carry a version
+that is bumped whenever their text changes. Each template version is parsed
+and checked once per process, and rendered messages are cached by template
+version and context: a season announcement or class reminder sent to thousands
+of students with the same context is rendered once. Changing a template means
+bumping its version, which bypasses every cached rendering of the old text.
+"""
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from string import Template
+from typing import Any, Optional
+
+from src.core.config import settings
+
+
+@dataclass(frozen=True)
+class NotificationTemplate:
+    """Text of one kind of notification.
+
+    Attributes:
+        kind: Kind of notification the template renders (see ``notification_jobs.kind``).
+        version: Revision of the text; bump it on every change.
+        subject: Subject line template.
+        body: Plain text body template.
+    """
+
+    kind: str
+    version: int
+    subject: str
+    body: str
+
+
+@dataclass(frozen=True)
+class RenderedMessage:
+    """A rendered notification, ready to be addressed and sent.
+
+    Attributes:
+        subject: Subject line.
+        body: Plain text body.
+    """
+
+    subject: str
+    body: str
+
+
+TEMPLATES: dict[str, NotificationTemplate] = {
+    template.kind: template
+    for template in (
+        NotificationTemplate(
+            kind="waitlist.promoted",
+            version=1,
+            subject="You got a seat",
+            body=(
+                "Good news: a seat freed up and you have been moved off the waitlist.\n\n"
+                "Session: $session_id\n"
+                "Reservation: $reservation_id\n\n"
+                "If you cannot make it anymore, please cancel so the next student gets the seat.\n"
+            ),
+        ),
+    )
+}
+
+# (kind, version)
+TemplateKey = tuple[str, int]
+# (kind, version, sorted context items)
+RenderKey = tuple[str, int, tuple[tuple[str, str], ...]]
+
+
+class TemplateRenderer:
+    """Renders notifications, parsing each template version and each distinct message once."""
+
+    def __init__(
+        self,
+        templates: Optional[Mapping[str, NotificationTemplate]] = None,
+        max_entries: int = settings.NOTIFICATION_RENDER_CACHE_SIZE,
+    ) -> None:
+        """Initialize the renderer.
+
+        Args:
+            templates: Templates by kind; defaults to ``TEMPLATES``
+            max_entries: Maximum number of cached rendered messages
+        """
+        self.templates = templates if templates is not None else TEMPLATES
+        self.max_entries = max_entries
+        self.compiled = 0
+        self._compiled: dict[TemplateKey, tuple[Template, Template]] = {}
+        self._rendered: OrderedDict[RenderKey, RenderedMessage] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get the number of cached rendered messages."""
+        return len(self._rendered)
+
+    def _compile(self, template: NotificationTemplate) -> tuple[Template, Template]:
+        key = (template.kind, template.version)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = (Template(template.subject), Template(template.body))
+            for part in compiled:
+                if not part.is_valid():
+                    raise ValueError(f"Invalid placeholder in template {template.kind!r} v{template.version}")
+            self._compiled[key] = compiled
+            self.compiled += 1
+        return compiled
+
+    def render(self, kind: str, context: Mapping[str, Any]) -> RenderedMessage:
+        """Render a notification.
+
+        Args:
+            kind: Kind of notification
+            context: Values of the placeholders; rendered with ``str``
+
+        Returns:
+            The rendered subject and body
+
+        Raises:
+            ValueError: If there is no template for the kind or a placeholder has no value
+        """
+        template = self.templates.get(kind)
+        if template is None:
+            raise ValueError(f"No template for notification {kind!r}")
+        values = tuple(sorted((name, str(value)) for name, value in context.items()))
+        key = (kind, template.version, values)
+        message = self._rendered.get(key)
+        if message is not None:
+            self._rendered.move_to_end(key)
+            return message
+
+        subject, body = self._compile(template)
+        try:
+            message = RenderedMessage(subject.substitute(dict(values)), body.substitute(dict(values)))
+        except KeyError as error:
+            raise ValueError(f"Missing value {error.args[0]!r} for template {kind!r}") from None
+        self._rendered[key] = message
+        while len(self._rendered) > self.max_entries:
+            self._rendered.popitem(last=False)
+        return message
+
+
+renderer = TemplateRenderer()
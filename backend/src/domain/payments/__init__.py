@@ -0,0 +1,5 @@
+"""Payments domain package.
+
+This package contains expected payments and the reconciliation of bank
+statement files against them.
+"""
@@ -0,0 +1,136 @@
+"""Reconciliation of bank statements against expected payments.
+
+Reconciliation is a hash join: pending payments are loaded in keyset-paginated
+batches into a table keyed by normalized reference and amount, then the
+statement is streamed through it. Matches are written back in bulk, so the
+whole run costs a handful of queries per thousand lines and its memory grows
+with the number of pending payments, not with the size of the statement file.
+"""
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from src.domain.payments.repository import ExpectedPaymentRepository
+from src.domain.payments.schemas import (
+    ExpectedPayment,
+    PaymentStatus,
+    RejectedLine,
+    StatementLine,
+)
+from src.domain.payments.statement import (
+    DEFAULT_CHUNK_SIZE,
+    normalize_reference,
+    read_statement,
+)
+
+MatchKey = tuple[str, int]
+
+
+@dataclass
+class ReconciliationReport:
+    """Outcome of reconciling one statement.
+
+    Attributes:
+        lines: Number of credit lines read from the statement.
+        matched: Number of lines matched to an expected payment.
+        unmatched_lines: Credit lines without an expected payment.
+        unmatched_payments: Pending payments that no line matched.
+        rejected_lines: Lines that could not be parsed and were skipped.
+    """
+
+    lines: int = 0
+    matched: int = 0
+    unmatched_lines: list[StatementLine] = field(default_factory=list)
+    unmatched_payments: list[ExpectedPayment] = field(default_factory=list)
+    rejected_lines: list[RejectedLine] = field(default_factory=list)
+
+
+class Reconciler:
+    """Matches statement lines to pending payments on reference and amount.
+
+    When several pending payments share a reference and amount (e.g. monthly
+    fees), lines settle the payment that is due first.
+    """
+
+    def __init__(
+        self,
+        repository: ExpectedPaymentRepository,
+        read_batch_size: int = 5000,
+        write_batch_size: int = 1000,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """Initialize the reconciler.
+
+        Args:
+            repository: Repository of expected payments
+            read_batch_size: Number of pending payments loaded per query
+            write_batch_size: Number of matches written back per statement
+            chunk_size: Approximate number of statement bytes parsed at once
+        """
+        self.repository = repository
+        self.read_batch_size = read_batch_size
+        self.write_batch_size = write_batch_size
+        self.chunk_size = chunk_size
+
+    async def load_pending(self) -> dict[MatchKey, list[ExpectedPayment]]:
+        """Build the hash table of pending payments.
+
+        Returns:
+            Payments by normalized reference and amount, latest due date first
+        """
+        table: dict[MatchKey, list[ExpectedPayment]] = {}
+        filters = {"status": PaymentStatus.PENDING.value}
+        async for batch in self.repository.batches(filters=filters, batch_size=self.read_batch_size):
+            for payment in batch:
+                table.setdefault((normalize_reference(payment.reference), payment.amount_cents), []).append(payment)
+        for payments in table.values():
+            payments.sort(key=lambda payment: payment.due_on, reverse=True)
+        return table
+
+    async def reconcile(self, path: Union[str, Path], now: Optional[datetime] = None) -> ReconciliationReport:
+        """Reconcile a statement file and mark matched payments.
+
+        Args:
+            path: Path of the statement file
+            now: Time recorded as ``matched_at``; defaults to the current time
+
+        Returns:
+            The reconciliation report
+        """
+        matched_at = now or datetime.now(timezone.utc)
+        table = await self.load_pending()
+        report = ReconciliationReport()
+        changes: list[dict[str, Any]] = []
+
+        for line in self._lines(path, report.rejected_lines):
+            report.lines += 1
+            candidates = table.get((normalize_reference(line.reference), line.amount_cents))
+            if not candidates:
+                report.unmatched_lines.append(line)
+                continue
+            payment = candidates.pop()
+            report.matched += 1
+            changes.append(
+                {
+                    "id": payment.id,
+                    "status": PaymentStatus.MATCHED.value,
+                    "matched_at": matched_at,
+                    "statement_line": line.line_number,
+                }
+            )
+            if len(changes) >= self.write_batch_size:
+                await self.repository.update_many(changes)
+                changes = []
+        await self.repository.update_many(changes)
+
+        report.unmatched_payments = sorted(
+            (payment for payments in table.values() for payment in payments),
+            key=lambda payment: (payment.due_on, payment.reference),
+        )
+        return report
+
+    def _lines(self, path: Union[str, Path], rejected: list[RejectedLine]) -> Iterator[StatementLine]:
+        for batch in read_statement(path, self.chunk_size, rejected=rejected):
+            yield from batch
@@ -0,0 +1,48 @@
+"""Expected payment repository.
+
+This module defines the table expected payments are stored in, its archive,
+and the repository used to access them.
+"""
+from datetime import timedelta
+
+from sqlalchemy import Column, Date, DateTime, Index, Integer, String, Table, Uuid
+
+from src.core.archive import ArchivePolicy, archive_table
+from src.core.config import settings
+from src.core.database import metadata
+from src.core.repositories.sql import SQLRepository
+from src.domain.payments.schemas import ExpectedPayment, PaymentStatus
+
+expected_payments = Table(
+    "expected_payments",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("reference", String(140), nullable=False),
+    Column("amount_cents", Integer, nullable=False),
+    Column("due_on", Date, nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("matched_at", DateTime(timezone=True), nullable=True),
+    Column("statement_line", Integer, nullable=True),
+    # Serves the keyset-paginated scan of pending payments
+    Index("ix_expected_payments_status_id", "status", "id"),
+)
+
+expected_payments_archive = archive_table(expected_payments)
+
+# Settled payments are only needed for bookkeeping lookups once their year is closed
+expected_payments_archive_policy = ArchivePolicy(
+    expected_payments,
+    expected_payments_archive,
+    lambda now: (expected_payments.c.status == PaymentStatus.MATCHED.value)
+    & (expected_payments.c.due_on < (now - timedelta(days=settings.ARCHIVE_PAYMENTS_AFTER_DAYS)).date()),
+)
+
+
+class ExpectedPaymentRepository(SQLRepository[ExpectedPayment]):
+    """Repository for expected payments."""
+
+    table = expected_payments
+    model = ExpectedPayment
+    entity_type = "payment"
+    archive = expected_payments_archive
+    filterable_fields = ("status",)
@@ -0,0 +1,69 @@
+"""Payment data models and schemas.
+
+This module defines the data models used for payments and bank statements.
+"""
+from datetime import date, datetime
+from enum import Enum
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class PaymentStatus(str, Enum):
+    """Reconciliation status of an expected payment."""
+
+    PENDING = "pending"
+    MATCHED = "matched"
+
+
+class ExpectedPayment(BaseModel):
+    """A payment a student owes, waiting to show up on a bank statement.
+
+    Attributes:
+        id: Unique ID of the payment.
+        reference: Payment reference the student is asked to quote.
+        amount_cents: Amount due in cents.
+        due_on: Day the payment is due.
+        status: Reconciliation status.
+        matched_at: Time the payment was matched to a statement line.
+        statement_line: Line number of the matching statement line.
+    """
+
+    model_config = ConfigDict(use_enum_values=True)
+
+    id: UUID
+    reference: str
+    amount_cents: int
+    due_on: date
+    status: PaymentStatus = PaymentStatus.PENDING
+    matched_at: Optional[datetime] = None
+    statement_line: Optional[int] = None
+
+
+class StatementLine(NamedTuple):
+    """A credit line of a bank statement file.
+
+    Attributes:
+        line_number: Line number in the file (1-based, header included).
+        booked_on: Booking date.
+        amount_cents: Credited amount in cents.
+        reference: Payment reference as sent by the bank.
+    """
+
+    line_number: int
+    booked_on: date
+    amount_cents: int
+    reference: str
+
+
+class RejectedLine(NamedTuple):
+    """A statement line that could not be parsed.
+
+    Attributes:
+        line_number: Line number in the file (1-based, header included).
+        reason: Why the line was rejected.
+    """
+
+    line_number: int
+    reason: str
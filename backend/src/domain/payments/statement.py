@@ -0,0 +1,148 @@
+"""Bank statement file parsing.
+
+Statement files are CSV files with a header row naming at least the
+``booking_date``, ``amount`` and ``reference`` columns. They are memory-mapped
+and parsed in chunks of whole records, so a file of any size is read with a
+bounded amount of memory and without a Python call per byte. A chunk never
+ends inside a quoted field: quoted fields may span lines, and a record cut by
+the chunk boundary is carried over to the next chunk.
+"""
+import csv
+import io
+import mmap
+from collections.abc import Iterator
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Optional, Union
+
+from src.core.exceptions import ValidationError
+from src.domain.payments.schemas import RejectedLine, StatementLine
+
+REQUIRED_COLUMNS = ("booking_date", "amount", "reference")
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def normalize_reference(reference: str) -> str:
+    """Normalize a payment reference for matching (no whitespace, upper case)."""
+    return "".join(reference.split()).upper()
+
+
+def parse_amount(text: str) -> int:
+    """Parse a decimal amount such as ``"1234.50"`` into cents.
+
+    Raises:
+        ValueError: If the amount is not a finite number with at most two decimals
+    """
+    try:
+        amount = Decimal(text.strip())
+    except InvalidOperation as error:
+        raise ValueError(f"invalid amount {text!r}") from error
+    # Infinity and NaN parse as decimals but are no amounts
+    if not amount.is_finite():
+        raise ValueError(f"invalid amount {text!r}")
+    cents = amount * 100
+    if cents != cents.to_integral_value():
+        raise ValueError(f"amount {text!r} has more than two decimals")
+    return int(cents)
+
+
+def _record_end(view: mmap.mmap, position: int, end: int) -> int:
+    # Quotes are escaped by doubling, so an odd count means the chunk ends inside a quoted field
+    quotes = view[position:end].count(b'"')
+    while quotes % 2:
+        newline = view.rfind(b"\n", position, end - 1)
+        if newline == -1:
+            return _quoted_record_end(view, end, quotes)
+        quotes -= view[newline + 1 : end].count(b'"')
+        end = newline + 1
+    return end
+
+
+def _quoted_record_end(view: mmap.mmap, end: int, quotes: int) -> int:
+    # A record longer than the chunk size is read up to the newline closing it
+    size = len(view)
+    while quotes % 2 and end < size:
+        newline = view.find(b"\n", end)
+        following = newline + 1 if newline != -1 else size
+        quotes += view[end:following].count(b'"')
+        end = following
+    return end
+
+
+def _chunks(view: mmap.mmap, start: int, chunk_size: int) -> Iterator[bytes]:
+    size = len(view)
+    position = start
+    while position < size:
+        limit = min(position + chunk_size, size)
+        if limit < size:
+            newline = view.rfind(b"\n", position, limit)
+            # A line longer than the chunk size is read up to its end
+            end = newline + 1 if newline != -1 else view.find(b"\n", limit) + 1 or size
+            end = _record_end(view, position, end)
+        else:
+            end = size
+        yield view[position:end]
+        position = end
+
+
+def read_statement(
+    path: Union[str, Path],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+    rejected: Optional[list[RejectedLine]] = None,
+) -> Iterator[list[StatementLine]]:
+    """Stream the credit lines of a statement file in batches.
+
+    Debit lines (negative amounts) are skipped. A byte order mark before the
+    header is ignored.
+
+    Args:
+        path: Path of the statement file
+        chunk_size: Approximate number of bytes parsed per batch
+        encoding: Text encoding of the file
+        rejected: Collects malformed lines, which are then skipped; without it the first one raises
+
+    Yields:
+        Statement lines of one chunk
+
+    Raises:
+        ValidationError: If the header lacks a required column, or a line is malformed and
+            ``rejected`` is not given
+    """
+    with open(path, "rb") as file:
+        if not file.seek(0, 2):
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            header_end = view.find(b"\n") + 1 or len(view)
+            header = next(csv.reader([view[:header_end].decode(encoding).lstrip("\ufeff").strip()]))
+            missing = [column for column in REQUIRED_COLUMNS if column not in header]
+            if missing:
+                raise ValidationError("statement", {"header": f"missing columns {', '.join(missing)}"})
+            date_index, amount_index, reference_index = (header.index(column) for column in REQUIRED_COLUMNS)
+
+            line_number = 1
+            for chunk in _chunks(view, header_end, chunk_size):
+                reader = csv.reader(io.StringIO(chunk.decode(encoding), newline=""))
+                batch = []
+                while True:
+                    # Records may span lines; a record is numbered by the line it starts on
+                    number = line_number + reader.line_num + 1
+                    try:
+                        row = next(reader)
+                        if not row:
+                            continue
+                        amount = parse_amount(row[amount_index])
+                        booked_on = date.fromisoformat(row[date_index])
+                        reference = row[reference_index]
+                    except StopIteration:
+                        break
+                    except (ValueError, IndexError, csv.Error) as error:
+                        if rejected is None:
+                            raise ValidationError("statement", {f"line {number}": str(error)}) from error
+                        rejected.append(RejectedLine(number, str(error)))
+                        continue
+                    if amount > 0:
+                        batch.append(StatementLine(number, booked_on, amount, reference))
+                line_number += reader.line_num
+                yield batch
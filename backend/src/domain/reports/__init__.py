@@ -0,0 +1,5 @@
+"""Reports domain package.
+
+This package contains the owner reports computed over attendance data:
+retention cohorts, attendance heatmaps and instructor utilization.
+"""
@@ -0,0 +1,155 @@
+"""Vectorized report aggregates.
+
+Every aggregate is computed with NumPy array operations over
+``AttendanceColumns``; no Python code runs per check-in, so reports over a year
+of attendance take milliseconds once the columns are loaded.
+"""
+from datetime import datetime
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from src.domain.reports.columns import AttendanceColumns, OfferedSessions
+from src.domain.reports.schemas import (
+    AttendanceHeatmap,
+    InstructorUtilization,
+    RetentionReport,
+)
+
+_HOUR = 3600
+_DAY = 24 * _HOUR
+
+
+def _utc_offset(timestamp: int, tz: ZoneInfo) -> int:
+    offset = datetime.fromtimestamp(timestamp, tz).utcoffset()
+    return int(offset.total_seconds()) if offset is not None else 0
+
+
+def local_seconds(epoch: np.ndarray, tz: ZoneInfo) -> np.ndarray:
+    """Convert UTC epoch seconds to local wall-clock epoch seconds.
+
+    UTC offsets are looked up once per hour of the covered range and applied
+    to all values with a single gather, which keeps DST changes exact for zones
+    whose transitions fall on the hour.
+
+    Args:
+        epoch: UTC epoch seconds
+        tz: Target time zone
+
+    Returns:
+        Seconds since 1970-01-01 00:00 local time
+    """
+    if not epoch.size:
+        return epoch
+    base = int(epoch.min()) // _HOUR * _HOUR
+    hours = (int(epoch.max()) - base) // _HOUR + 1
+    offsets = np.fromiter(
+        (_utc_offset(base + hour * _HOUR, tz) for hour in range(hours)),
+        dtype=np.int64,
+        count=hours,
+    )
+    local: np.ndarray = epoch + offsets[(epoch - base) // _HOUR]
+    return local
+
+
+def month_index(local: np.ndarray) -> np.ndarray:
+    """Get the number of months since January 1970 of local epoch seconds."""
+    return local.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+
+
+def retention_cohorts(columns: AttendanceColumns, start: datetime, end: datetime, tz: ZoneInfo) -> RetentionReport:
+    """Group new students by the month of their first check-in and track their return.
+
+    Only students whose first check-in ever falls into the window form cohorts.
+
+    Args:
+        columns: Check-ins of the window
+        start: Start of the window (inclusive, timezone-aware)
+        end: End of the window (exclusive, timezone-aware)
+        tz: Time zone month boundaries are computed in
+
+    Returns:
+        The cohort table
+    """
+    bounds = local_seconds(np.array([start.timestamp(), end.timestamp() - 1], dtype=np.int64), tz)
+    first_month, last_month = month_index(bounds)
+    months = int(last_month - first_month) + 1
+
+    new = columns.first_at >= int(start.timestamp())
+    students = columns.student[new]
+    cohort = month_index(local_seconds(columns.first_at[new], tz)) - first_month
+    offset = month_index(local_seconds(columns.starts_at[new], tz)) - first_month - cohort
+
+    # One entry per student and month they came back in
+    pairs = np.unique(students * months + offset)
+    student_cohort = np.zeros(int(students.max(initial=-1)) + 1, dtype=np.int64)
+    student_cohort[students] = cohort
+    counts = np.bincount(student_cohort[pairs // months] * months + pairs % months, minlength=months * months)
+    table = counts.reshape(months, months)
+
+    labels = np.arange(first_month, first_month + months).astype("datetime64[M]").astype(str)
+    return RetentionReport(
+        months=labels.tolist(),
+        cohort_sizes=table[:, 0].tolist(),
+        retained=[table[row, : months - row].tolist() for row in range(months)],
+    )
+
+
+def attendance_heatmap(columns: AttendanceColumns, tz: ZoneInfo) -> AttendanceHeatmap:
+    """Count check-ins by local weekday and hour.
+
+    Args:
+        columns: Check-ins to count
+        tz: Time zone weekdays and hours are computed in
+
+    Returns:
+        The heatmap
+    """
+    local = local_seconds(columns.starts_at, tz)
+    # 1970-01-01 was a Thursday; shift so that Monday is 0
+    weekday = (local // _DAY + 3) % 7
+    hour = local % _DAY // _HOUR
+    counts = np.bincount(weekday * 24 + hour, minlength=7 * 24).reshape(7, 24)
+    return AttendanceHeatmap(timezone=tz.key, counts=counts.tolist())
+
+
+def _recode(codes: np.ndarray, ids: list[UUID], index: dict[UUID, int]) -> np.ndarray:
+    recoded: np.ndarray = np.array([index[code_id] for code_id in ids], dtype=np.int64)[codes]
+    return recoded
+
+
+def instructor_utilization(columns: AttendanceColumns, offered: OfferedSessions) -> list[InstructorUtilization]:
+    """Compute the share of offered seats taken in each instructor's sessions.
+
+    Sessions and seats come from the schedule, so sessions nobody attended
+    lower the utilization; check-ins only count towards the seats taken.
+
+    Args:
+        columns: Check-ins of the window
+        offered: Sessions scheduled in the window
+
+    Returns:
+        Utilization per instructor, highest first
+    """
+    instructor_ids = sorted(set(columns.instructor_ids) | set(offered.instructor_ids))
+    index = {instructor_id: code for code, instructor_id in enumerate(instructor_ids)}
+    instructors = len(instructor_ids)
+    attended = _recode(columns.instructor, columns.instructor_ids, index)
+    scheduled = _recode(offered.instructor, offered.instructor_ids, index)
+
+    attendances = np.bincount(attended, minlength=instructors)
+    sessions = np.bincount(scheduled, minlength=instructors)
+    seats = np.bincount(scheduled, weights=offered.capacity, minlength=instructors).astype(np.int64)
+    utilization = np.divide(attendances, seats, out=np.zeros(instructors), where=seats > 0)
+
+    return [
+        InstructorUtilization(
+            instructor_id=instructor_ids[code],
+            sessions=int(sessions[code]),
+            attendances=int(attendances[code]),
+            seats=int(seats[code]),
+            utilization=round(float(utilization[code]), 4),
+        )
+        for code in np.argsort(-utilization, kind="stable")
+    ]
@@ -0,0 +1,211 @@
+"""Bulk loading of attendance data into columnar NumPy arrays.
+
+Reports never materialize rows as models. Check-ins come back from a single
+statement as narrow integer columns (dense codes instead of UUIDs, epoch seconds
+instead of datetimes) that are copied straight into NumPy arrays, and the aggregates in
+``src.domain.reports.analytics`` run on those arrays.
+"""
+import asyncio
+import io
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
+from typing import Any, Iterable, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import BigInteger, Connection, Engine, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.functions import FunctionElement
+
+from src.core.database import transaction
+from src.domain.attendance.repository import AttendanceRepository, attendance
+from src.domain.classes.repository import class_series
+from src.domain.classes.schedule import ClassSchedule, Occurrence
+
+COLUMNS = ("student", "instructor", "session", "starts_at", "first_at", "capacity")
+
+
+class EpochSeconds(FunctionElement[int]):
+    """Seconds since the Unix epoch of a timestamp column."""
+
+    type = BigInteger()
+    inherit_cache = True
+    name = "epoch_seconds"
+
+
+@compiles(EpochSeconds)
+def _epoch_seconds(element: EpochSeconds, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"CAST(EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)}) AS BIGINT)"
+
+
+@compiles(EpochSeconds, "sqlite")
+def _epoch_seconds_sqlite(element: EpochSeconds, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"CAST(strftime('%s', {compiler.process(element.clauses, **kw)}) AS INTEGER)"
+
+
+@dataclass(frozen=True)
+class AttendanceColumns:
+    """Check-ins of a time window as parallel arrays, one element per check-in.
+
+    Attributes:
+        student: Dense student codes (0..n).
+        instructor: Dense instructor codes, indexing ``instructor_ids``.
+        session: Dense session codes.
+        starts_at: Session start in UTC epoch seconds.
+        first_at: The student's first check-in ever, in UTC epoch seconds.
+        capacity: Capacity of the session; 0 if its series is gone.
+        instructor_ids: Instructor IDs ordered by code.
+    """
+
+    student: np.ndarray
+    instructor: np.ndarray
+    session: np.ndarray
+    starts_at: np.ndarray
+    first_at: np.ndarray
+    capacity: np.ndarray
+    instructor_ids: list[UUID]
+
+    def __len__(self) -> int:
+        """Get the number of check-ins."""
+        return len(self.starts_at)
+
+    def to_npz(self) -> bytes:
+        """Export the columns as a compressed NumPy ``.npz`` archive for offline analysis."""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            **{name: getattr(self, name) for name in COLUMNS},
+            instructor_ids=np.array([str(instructor_id) for instructor_id in self.instructor_ids]),
+        )
+        return buffer.getvalue()
+
+
+@dataclass(frozen=True)
+class OfferedSessions:
+    """Sessions scheduled in a time window as parallel arrays, one element per session.
+
+    Attributes:
+        instructor: Dense instructor codes, indexing ``instructor_ids``.
+        capacity: Seats offered by the session.
+        instructor_ids: Instructor IDs ordered by code.
+    """
+
+    instructor: np.ndarray
+    capacity: np.ndarray
+    instructor_ids: list[UUID]
+
+    def __len__(self) -> int:
+        """Get the number of sessions."""
+        return len(self.capacity)
+
+    @classmethod
+    def from_occurrences(cls, occurrences: Iterable[Occurrence]) -> "OfferedSessions":
+        """Build the columns from schedule occurrences."""
+        pairs = [(occurrence.series.instructor_id, occurrence.series.capacity) for occurrence in occurrences]
+        instructor_ids = sorted({instructor_id for instructor_id, _ in pairs})
+        codes = {instructor_id: code for code, instructor_id in enumerate(instructor_ids)}
+        return cls(
+            instructor=np.fromiter(
+                (codes[instructor_id] for instructor_id, _ in pairs), dtype=np.int64, count=len(pairs)
+            ),
+            capacity=np.fromiter((capacity for _, capacity in pairs), dtype=np.int64, count=len(pairs)),
+            instructor_ids=instructor_ids,
+        )
+
+
+def _load(connection: Connection, start: datetime, end: datetime, studio_id: Optional[UUID]) -> AttendanceColumns:
+    window = [attendance.c.starts_at >= start, attendance.c.starts_at < end]
+    if studio_id is not None:
+        window.append(attendance.c.studio_id == studio_id)
+
+    first = (
+        select(attendance.c.student_id, func.min(attendance.c.starts_at).label("first_at"))
+        .where(attendance.c.student_id.in_(select(attendance.c.student_id).where(*window)))
+        .group_by(attendance.c.student_id)
+        .subquery()
+    )
+    statement = (
+        select(
+            func.dense_rank().over(order_by=attendance.c.student_id) - 1,
+            func.dense_rank().over(order_by=attendance.c.instructor_id) - 1,
+            func.dense_rank().over(order_by=attendance.c.session_id) - 1,
+            EpochSeconds(attendance.c.starts_at),
+            EpochSeconds(first.c.first_at),
+            # Check-ins of series no longer in the table still count, with no seats offered
+            func.coalesce(class_series.c.capacity, 0),
+        )
+        .select_from(
+            attendance.join(first, first.c.student_id == attendance.c.student_id).outerjoin(
+                class_series, class_series.c.id == attendance.c.series_id
+            )
+        )
+        .where(*window)
+    )
+    instructors = select(attendance.c.instructor_id).where(*window).distinct().order_by(attendance.c.instructor_id)
+
+    rows = connection.execute(statement).all()
+    values = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * len(COLUMNS))
+    arrays = values.reshape(len(rows), len(COLUMNS)).T
+    return AttendanceColumns(
+        **{name: np.ascontiguousarray(array) for name, array in zip(COLUMNS, arrays)},
+        instructor_ids=list(connection.execute(instructors).scalars()),
+    )
+
+
+def _load_in_transaction(
+    engine: Engine, start: datetime, end: datetime, studio_id: Optional[UUID]
+) -> AttendanceColumns:
+    with transaction(engine) as connection:
+        return _load(connection, start, end, studio_id)
+
+
+async def load_attendance_columns(
+    repository: AttendanceRepository,
+    start: datetime,
+    end: datetime,
+    studio_id: Optional[UUID] = None,
+) -> AttendanceColumns:
+    """Load the check-ins of a time window as columns.
+
+    On PostgreSQL both statements read the same snapshot (``REPEATABLE READ``),
+    so instructor codes always match the instructor IDs.
+
+    Args:
+        repository: Repository whose engine and transaction handling are used
+        start: Start of the window (inclusive, timezone-aware)
+        end: End of the window (exclusive, timezone-aware)
+        studio_id: Restrict to the check-ins of one studio
+
+    Returns:
+        The columns of all check-ins in the window
+    """
+    engine = repository.engine
+    if engine.dialect.name == "postgresql":
+        engine = engine.execution_options(isolation_level="REPEATABLE READ")
+    return await asyncio.to_thread(_load_in_transaction, engine, start, end, studio_id)
+
+
+async def load_offered_sessions(
+    schedule: ClassSchedule,
+    start: datetime,
+    end: datetime,
+    studio_id: Optional[UUID] = None,
+) -> OfferedSessions:
+    """Load the sessions scheduled in a time window as columns.
+
+    Sessions are counted by start time, like check-ins, so a session running
+    across the start of the window belongs to the previous one.
+
+    Args:
+        schedule: Schedule the sessions are expanded from
+        start: Start of the window (inclusive, timezone-aware)
+        end: End of the window (exclusive, timezone-aware)
+        studio_id: Restrict to the sessions of one studio
+
+    Returns:
+        The columns of all sessions starting in the window
+    """
+    occurrences = await schedule.occurrences(start, end, {"studio_id": studio_id} if studio_id is not None else None)
+    return OfferedSessions.from_occurrences(occurrence for occurrence in occurrences if occurrence.starts_at >= start)
@@ -0,0 +1,51 @@
+"""Report data models and schemas.
+
+This module defines the results returned by the reporting endpoints.
+"""
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class RetentionReport(BaseModel):
+    """Monthly retention cohorts of new students.
+
+    Attributes:
+        months: Cohort months ("YYYY-MM"), one per row.
+        cohort_sizes: Number of students whose first check-in fell in the month.
+        retained: Per cohort, students checking in again 0, 1, 2, ... months later.
+    """
+
+    months: list[str]
+    cohort_sizes: list[int]
+    retained: list[list[int]]
+
+
+class AttendanceHeatmap(BaseModel):
+    """Check-ins by local weekday and hour.
+
+    Attributes:
+        timezone: Time zone weekdays and hours are computed in.
+        counts: Seven rows (Monday first) of 24 hourly check-in counts.
+    """
+
+    timezone: str
+    counts: list[list[int]]
+
+
+class InstructorUtilization(BaseModel):
+    """Utilization of one instructor's classes.
+
+    Attributes:
+        instructor_id: Instructor the numbers refer to.
+        sessions: Sessions scheduled in the window, attended or not.
+        attendances: Check-ins at the instructor's sessions.
+        seats: Capacity offered by the scheduled sessions.
+        utilization: Share of offered seats that were taken.
+    """
+
+    instructor_id: UUID
+    sessions: int
+    attendances: int
+    seats: int
+    utilization: float
@@ -0,0 +1,183 @@
+"""Password hashing on a bounded process pool.
+
+Passwords are hashed with scrypt, which is deliberately slow and memory-hard:
+one hash takes tens of milliseconds of CPU. Run inside an ``async def`` route it
+would freeze the worker for every other request, so hashing and verification
+run on a small process pool (a separate interpreter, so they do not compete for
+the GIL either). The number of queued operations is bounded: when a login storm
+fills the queue, further logins fail fast with ``OverloadedError`` (503) instead
+of piling up behind each other while every request waits.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional, TypeVar
+
+from src.core.config import settings
+from src.core.exceptions import OverloadedError
+
+ALGORITHM = "scrypt"
+# Block size and parallelization; memory per hash is 128 * r * 2**cost bytes (16 MiB at cost 14)
+BLOCK_SIZE = 8
+PARALLELISM = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class ScryptParameters:
+    """Cost parameters stored with each hash.
+
+    Attributes:
+        cost: Base-2 logarithm of the scrypt CPU/memory cost ``n``.
+        block_size: scrypt ``r``.
+        parallelism: scrypt ``p``.
+    """
+
+    cost: int = settings.AUTH_HASH_COST
+    block_size: int = BLOCK_SIZE
+    parallelism: int = PARALLELISM
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _derive(password: str, salt: bytes, parameters: ScryptParameters) -> bytes:
+    n = 2**parameters.cost
+    return hashlib.scrypt(
+        password.encode(),
+        salt=salt,
+        n=n,
+        r=parameters.block_size,
+        p=parameters.parallelism,
+        maxmem=256 * n * parameters.block_size,
+        dklen=KEY_BYTES,
+    )
+
+
+def hash_password(password: str, parameters: Optional[ScryptParameters] = None) -> str:
+    """Hash a password with a random salt; blocks for the duration of the hash.
+
+    Args:
+        password: Password to hash
+        parameters: Cost of the hash; defaults to ``AUTH_HASH_COST``
+
+    Returns:
+        Encoded hash ``scrypt$cost$r$p$salt$key``
+    """
+    parameters = parameters or ScryptParameters()
+    salt = os.urandom(SALT_BYTES)
+    key = _derive(password, salt, parameters)
+    return (
+        f"{ALGORITHM}${parameters.cost}${parameters.block_size}${parameters.parallelism}"
+        f"${_b64encode(salt)}${_b64encode(key)}"
+    )
+
+
+def parse_hash(encoded: str) -> tuple[ScryptParameters, bytes, bytes]:
+    """Split an encoded hash into its parameters, salt and key.
+
+    Raises:
+        ValueError: If the hash is malformed or uses another algorithm
+    """
+    algorithm, cost, block_size, parallelism, salt, key = encoded.split("$")
+    if algorithm != ALGORITHM:
+        raise ValueError(f"Unsupported password hash algorithm {algorithm!r}")
+    return ScryptParameters(int(cost), int(block_size), int(parallelism)), _b64decode(salt), _b64decode(key)
+
+
+def verify_password(password: str, encoded: str) -> bool:
+    """Check a password against an encoded hash; blocks for the duration of the hash."""
+    try:
+        parameters, salt, key = parse_hash(encoded)
+    except ValueError:
+        return False
+    return hmac.compare_digest(_derive(password, salt, parameters), key)
+
+
+def needs_rehash(encoded: str, parameters: Optional[ScryptParameters] = None) -> bool:
+    """Whether a hash was made with other parameters than the current ones (by default ``AUTH_HASH_COST``)."""
+    try:
+        return parse_hash(encoded)[0] != (parameters or ScryptParameters())
+    except ValueError:
+        return True
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded process pool."""
+
+    def __init__(
+        self,
+        workers: int = settings.AUTH_HASH_WORKERS,
+        queue_limit: int = settings.AUTH_HASH_QUEUE_LIMIT,
+        parameters: Optional[ScryptParameters] = None,
+    ) -> None:
+        """Initialize the hasher; the pool is started on first use.
+
+        Args:
+            workers: Number of hashing processes
+            queue_limit: Operations that may wait for a free process before new ones are rejected
+            parameters: Cost of new hashes; defaults to ``AUTH_HASH_COST``
+        """
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.parameters = parameters or ScryptParameters()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Get the number of running and queued operations."""
+        return self._pending
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _submit(self, function: Callable[..., R], *args: Any) -> R:
+        limit = self.workers + self.queue_limit
+        if self._pending >= limit:
+            raise OverloadedError("password hashing", limit)
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), function, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password off the event loop.
+
+        Raises:
+            OverloadedError: If the hashing queue is full
+        """
+        return await self._submit(hash_password, password, self.parameters)
+
+    async def verify(self, password: str, encoded: str) -> bool:
+        """Check a password against an encoded hash off the event loop.
+
+        Raises:
+            OverloadedError: If the hashing queue is full
+        """
+        return await self._submit(verify_password, password, encoded)
+
+    def shutdown(self) -> None:
+        """Stop the hashing processes."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
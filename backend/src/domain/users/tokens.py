@@ -0,0 +1,167 @@
+"""Signed access tokens and the verified-token cache.
+
+Tokens are ``<payload>.<signature>``: the payload is base64url-encoded JSON with
+the subject, the tenant and the expiry time, and the signature an HMAC-SHA256
+of the payload with ``AUTH_SECRET``. Every authenticated request verifies its
+token, so verified tokens are kept in a small LRU cache. An entry never outlives
+the token it caches: it is dropped once the token expires, so a cache hit never
+accepts an expired token.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Optional
+
+from src.core.config import settings
+from src.core.exceptions import AuthenticationError
+from src.core.tenancy import get_current_tenant
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """Verified contents of a token.
+
+    Attributes:
+        subject: ID of the authenticated user.
+        tenant: Tenant the token was issued for, or None for the default schema.
+        expires_at: Expiry as seconds since the epoch.
+    """
+
+    subject: str
+    tenant: Optional[str]
+    expires_at: float
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str, secret: str) -> str:
+    return _b64encode(hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest())
+
+
+def issue_token(
+    subject: str,
+    ttl: float = settings.AUTH_TOKEN_TTL,
+    secret: str = settings.AUTH_SECRET,
+    now: Optional[float] = None,
+) -> str:
+    """Issue a token for a subject in the current tenant.
+
+    Args:
+        subject: ID of the authenticated user
+        ttl: Seconds the token is valid
+        secret: Signing secret
+        now: Issue time as seconds since the epoch; defaults to the current time
+
+    Returns:
+        The signed token
+    """
+    expires_at = (time.time() if now is None else now) + ttl
+    claims = {"sub": subject, "tenant": get_current_tenant(), "exp": expires_at}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload, secret)}"
+
+
+def decode_token(token: str, secret: str = settings.AUTH_SECRET, now: Optional[float] = None) -> TokenClaims:
+    """Check the signature and expiry of a token, without the cache.
+
+    Raises:
+        AuthenticationError: If the token is malformed, forged or expired
+    """
+    payload, _, signature = token.partition(".")
+    # Bytes, since compare_digest raises TypeError on non-ASCII strings
+    if not hmac.compare_digest(signature.encode(), _sign(payload, secret).encode()):
+        raise AuthenticationError("invalid token")
+    try:
+        data = json.loads(_b64decode(payload))
+        claims = TokenClaims(str(data["sub"]), data["tenant"], float(data["exp"]))
+    except (ValueError, KeyError, TypeError):
+        raise AuthenticationError("invalid token") from None
+    if claims.expires_at <= (time.time() if now is None else now):
+        raise AuthenticationError("expired token")
+    return claims
+
+
+class VerifiedTokenCache:
+    """LRU cache of verified tokens whose entries expire with their tokens."""
+
+    def __init__(
+        self,
+        max_entries: int = settings.AUTH_TOKEN_CACHE_SIZE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached tokens
+            clock: Wall clock returning seconds since the epoch, the time base of token expiry
+        """
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: OrderedDict[str, TokenClaims] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get the number of cached tokens."""
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[TokenClaims]:
+        """Get the claims of a cached, unexpired token and mark it as recently used."""
+        claims = self._entries.get(token)
+        if claims is None:
+            return None
+        if claims.expires_at <= self.clock():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return claims
+
+    def set(self, token: str, claims: TokenClaims) -> None:
+        """Cache verified claims, evicting the least recently used tokens beyond ``max_entries``."""
+        self._entries[token] = claims
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        """Forget a token, e.g. on logout."""
+        self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        """Forget all tokens."""
+        self._entries.clear()
+
+
+token_cache = VerifiedTokenCache()
+
+
+def verify_token(token: str, cache: Optional[VerifiedTokenCache] = None) -> TokenClaims:
+    """Verify a token for the current tenant, serving repeated tokens from the cache.
+
+    Args:
+        token: The token to verify
+        cache: Cache to use; defaults to the process-wide cache
+
+    Returns:
+        The verified claims
+
+    Raises:
+        AuthenticationError: If the token is invalid, expired or issued for another tenant
+    """
+    cache = cache if cache is not None else token_cache
+    claims = cache.get(token)
+    if claims is None:
+        claims = decode_token(token, now=cache.clock())
+        cache.set(token, claims)
+    if claims.tenant != get_current_tenant():
+        raise AuthenticationError("token issued for another tenant")
+    return claims
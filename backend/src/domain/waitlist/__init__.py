@@ -0,0 +1,5 @@
+"""Waitlist domain package.
+
+This package contains the seats of class sessions, their waitlists and the
+promotion of waiting students into freed seats.
+"""
@@ -0,0 +1,132 @@
+"""Priority queue of a session's waitlist.
+
+Promotion always needs the best waiting student. Sorting the whole waitlist on
+every freed seat costs O(n log n) per cancellation; a binary heap gives the next
+student in O(log n) and absorbs bursts of cancellations before class. Students
+leaving the waitlist are removed lazily: their entries are skipped when they
+reach the top of the heap.
+"""
+import heapq
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from src.core.config import settings
+from src.domain.waitlist.schemas import WaitlistEntry
+
+HeapItem = tuple[int, datetime, UUID, WaitlistEntry]
+
+
+class WaitlistQueue:
+    """Binary heap of waitlist entries ordered by ``WaitlistEntry.priority``."""
+
+    def __init__(self, entries: Iterable[WaitlistEntry] = (), version: int = 0) -> None:
+        """Initialize the queue.
+
+        Entries already in priority order (as read through the waitlist index)
+        form a valid heap as they are, so loading them needs no sort.
+
+        Args:
+            entries: Initial entries, in any order
+            version: Waitlist version the entries were read at
+        """
+        self._heap: list[HeapItem] = [(*entry.priority, entry) for entry in entries]
+        heapq.heapify(self._heap)
+        self._live = {item[2] for item in self._heap}
+        self.version = version
+
+    def __len__(self) -> int:
+        """Get the number of waiting entries."""
+        return len(self._live)
+
+    def __contains__(self, entry_id: object) -> bool:
+        """Whether an entry is waiting."""
+        return entry_id in self._live
+
+    def push(self, entry: WaitlistEntry) -> None:
+        """Add an entry."""
+        if entry.id not in self._live:
+            self._live.add(entry.id)
+            heapq.heappush(self._heap, (*entry.priority, entry))
+
+    def remove(self, entry_id: UUID) -> None:
+        """Remove an entry; it is dropped once it reaches the top."""
+        self._live.discard(entry_id)
+
+    def _prune(self) -> None:
+        while self._heap and self._heap[0][2] not in self._live:
+            heapq.heappop(self._heap)
+
+    def peek(self) -> Optional[WaitlistEntry]:
+        """Get the best entry without removing it."""
+        self._prune()
+        return self._heap[0][3] if self._heap else None
+
+    def pop(self) -> Optional[WaitlistEntry]:
+        """Remove and return the best entry."""
+        self._prune()
+        if not self._heap:
+            return None
+        entry = heapq.heappop(self._heap)[3]
+        self._live.discard(entry.id)
+        return entry
+
+
+# (tenant, session ID)
+QueueKey = tuple[Optional[str], UUID]
+
+
+class WaitlistQueues:
+    """Per-worker LRU cache of waitlist queues.
+
+    A queue is only used while its ``version`` matches the waitlist version
+    stored with the session's seats; any change made elsewhere (another worker,
+    a rolled back transaction) makes it stale and it is reloaded.
+    """
+
+    def __init__(self, max_entries: int = settings.WAITLIST_QUEUE_CACHE_SIZE) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached queues
+        """
+        self.max_entries = max_entries
+        self._queues: OrderedDict[QueueKey, WaitlistQueue] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of cached queues."""
+        return len(self._queues)
+
+    def get(self, key: QueueKey, version: int) -> Optional[WaitlistQueue]:
+        """Get a queue if it is current and mark it as recently used."""
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None or queue.version != version:
+                return None
+            self._queues.move_to_end(key)
+            return queue
+
+    def put(self, key: QueueKey, queue: WaitlistQueue) -> None:
+        """Cache a queue, evicting the least recently used ones beyond ``max_entries``."""
+        with self._lock:
+            self._queues[key] = queue
+            self._queues.move_to_end(key)
+            while len(self._queues) > self.max_entries:
+                self._queues.popitem(last=False)
+
+    def discard(self, key: QueueKey) -> None:
+        """Forget a queue."""
+        with self._lock:
+            self._queues.pop(key, None)
+
+    def clear(self) -> None:
+        """Forget all queues."""
+        with self._lock:
+            self._queues.clear()
+
+
+waitlist_queues = WaitlistQueues()
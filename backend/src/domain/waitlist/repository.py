@@ -0,0 +1,444 @@
+"""Session seats and waitlist repository.
+
+This module defines the tables seats, reservations and waitlists are stored in,
+and the repository that books seats and promotes waiting students.
+
+Every operation locks the seat row of its session (``FOR UPDATE``), so changes
+to one session are serialized across workers and a seat is never given out
+twice. The waitlist is persisted in ``waitlist_entries``; each worker keeps the
+waitlists of busy sessions as heaps (see ``src.domain.waitlist.queue``) that
+are only trusted while their version matches ``session_seats.waitlist_version``.
+A promotion deletes the waitlist entry, creates the reservation, updates the
+seat count and queues the notification job in one transaction.
+"""
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    Engine,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Table,
+    UniqueConstraint,
+    Uuid,
+    delete,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+
+from src.core.database import metadata
+from src.core.exceptions import EntityConflictError, EntityNotFoundError
+from src.core.repositories.sql import SQLRepository
+from src.core.tenancy import get_current_tenant
+from src.domain.classes.availability import SeatAvailability, publish_availability
+from src.domain.notifications.jobs import enqueue
+from src.domain.waitlist.queue import (
+    QueueKey,
+    WaitlistQueue,
+    WaitlistQueues,
+    waitlist_queues,
+)
+from src.domain.waitlist.schemas import (
+    MembershipTier,
+    Promotion,
+    SessionSeats,
+    WaitlistEntry,
+)
+
+# Kind of the notification job queued for each promoted student
+PROMOTED_JOB = "waitlist.promoted"
+
+session_seats = Table(
+    "session_seats",
+    metadata,
+    Column("session_id", Uuid, primary_key=True),
+    Column("starts_at", DateTime(timezone=True), nullable=False),
+    Column("ends_at", DateTime(timezone=True), nullable=False),
+    Column("capacity", Integer, nullable=False),
+    Column("seats_taken", Integer, nullable=False, default=0),
+    Column("waitlist_version", Integer, nullable=False, default=0),
+)
+
+seat_reservations = Table(
+    "seat_reservations",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("session_id", Uuid, nullable=False),
+    Column("student_id", Uuid, nullable=False),
+    Column("reserved_at", DateTime(timezone=True), nullable=False),
+    UniqueConstraint("session_id", "student_id", name="uq_seat_reservations_session_id_student_id"),
+    # Schedule conflict checks look up the seats of the candidates
+    Index("ix_seat_reservations_student_id", "student_id"),
+)
+
+waitlist_entries = Table(
+    "waitlist_entries",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("session_id", Uuid, nullable=False),
+    Column("student_id", Uuid, nullable=False),
+    Column("email", String(320), nullable=False),
+    Column("tier", SmallInteger, nullable=False),
+    Column("signed_up_at", DateTime(timezone=True), nullable=False),
+    UniqueConstraint("session_id", "student_id", name="uq_waitlist_entries_session_id_student_id"),
+    # A session's waitlist in promotion order; loading it needs no sort
+    Index("ix_waitlist_entries_priority", "session_id", "tier", "signed_up_at", "id"),
+)
+
+Operation = Callable[[Connection], tuple[SeatAvailability, list[Promotion]]]
+
+
+class WaitlistRepository(SQLRepository[WaitlistEntry]):
+    """Repository for session seats and their waitlists."""
+
+    table = waitlist_entries
+    model = WaitlistEntry
+    entity_type = "waitlist entry"
+    filterable_fields = ("session_id",)
+
+    def __init__(self, engine: Optional[Engine] = None, queues: Optional[WaitlistQueues] = None) -> None:
+        """Initialize the repository.
+
+        Args:
+            engine: Engine to use; defaults to the engine of the current tenant
+            queues: Cache of waitlist queues; defaults to the process-wide cache
+        """
+        super().__init__(engine)
+        self.queues = queues if queues is not None else waitlist_queues
+
+    @staticmethod
+    def _key(session_id: UUID) -> QueueKey:
+        return (get_current_tenant(), session_id)
+
+    def _lock(self, connection: Connection, session_id: UUID) -> SessionSeats:
+        statement = select(session_seats).where(session_seats.c.session_id == session_id)
+        if connection.dialect.name == "postgresql":
+            statement = statement.with_for_update()
+        row = connection.execute(statement).mappings().first()
+        if row is None:
+            raise EntityNotFoundError("session seats", str(session_id))
+        return SessionSeats.model_validate(dict(row))
+
+    def _queue(self, connection: Connection, seats: SessionSeats) -> WaitlistQueue:
+        key = self._key(seats.session_id)
+        queue = self.queues.get(key, seats.waitlist_version)
+        if queue is None:
+            statement = (
+                select(waitlist_entries)
+                .where(waitlist_entries.c.session_id == seats.session_id)
+                .order_by(waitlist_entries.c.tier, waitlist_entries.c.signed_up_at, waitlist_entries.c.id)
+            )
+            rows = connection.execute(statement).mappings().all()
+            queue = WaitlistQueue((self._to_entity(row) for row in rows), seats.waitlist_version)
+            self.queues.put(key, queue)
+        return queue
+
+    @staticmethod
+    def _conflicts(connection: Connection, seats: SessionSeats, student_ids: Sequence[UUID]) -> set[UUID]:
+        """Get the students holding a seat in a session overlapping ``seats`` (including this one)."""
+        statement = (
+            select(seat_reservations.c.student_id)
+            .join(session_seats, session_seats.c.session_id == seat_reservations.c.session_id)
+            .where(
+                seat_reservations.c.student_id.in_(student_ids),
+                session_seats.c.starts_at < seats.ends_at,
+                session_seats.c.ends_at > seats.starts_at,
+            )
+        )
+        return set(connection.execute(statement).scalars())
+
+    @staticmethod
+    def _save(connection: Connection, seats: SessionSeats) -> None:
+        connection.execute(
+            update(session_seats)
+            .where(session_seats.c.session_id == seats.session_id)
+            .values(
+                capacity=seats.capacity,
+                seats_taken=seats.seats_taken,
+                waitlist_version=seats.waitlist_version,
+            )
+        )
+
+    def _fill(self, connection: Connection, seats: SessionSeats, queue: WaitlistQueue) -> list[Promotion]:
+        """Promote the best eligible students into the free seats of a locked session."""
+        chosen: list[WaitlistEntry] = []
+        skipped: list[WaitlistEntry] = []
+        free = seats.capacity - seats.seats_taken
+        while len(chosen) < free and len(queue):
+            candidates: list[WaitlistEntry] = []
+            while len(candidates) < free - len(chosen) and (entry := queue.pop()) is not None:
+                candidates.append(entry)
+            conflicted = self._conflicts(connection, seats, [entry.student_id for entry in candidates])
+            for entry in candidates:
+                (skipped if entry.student_id in conflicted else chosen).append(entry)
+        # Students with a conflict keep their place; they may become eligible later
+        for entry in skipped:
+            queue.push(entry)
+        if not chosen:
+            return []
+
+        now = datetime.now(timezone.utc)
+        promotions = [
+            Promotion(
+                session_id=seats.session_id,
+                student_id=entry.student_id,
+                email=entry.email,
+                reservation_id=uuid4(),
+                promoted_at=now,
+            )
+            for entry in chosen
+        ]
+        connection.execute(delete(waitlist_entries).where(waitlist_entries.c.id.in_([entry.id for entry in chosen])))
+        connection.execute(
+            insert(seat_reservations),
+            [
+                {
+                    "id": promotion.reservation_id,
+                    "session_id": promotion.session_id,
+                    "student_id": promotion.student_id,
+                    "reserved_at": now,
+                }
+                for promotion in promotions
+            ],
+        )
+        enqueue(connection, PROMOTED_JOB, [promotion.model_dump(mode="json") for promotion in promotions], now)
+        seats.seats_taken += len(promotions)
+        seats.waitlist_version += 1
+        queue.version = seats.waitlist_version
+        return promotions
+
+    @staticmethod
+    def _availability(seats: SessionSeats, queue: WaitlistQueue) -> SeatAvailability:
+        return SeatAvailability(
+            session_id=seats.session_id,
+            capacity=seats.capacity,
+            seats_taken=seats.seats_taken,
+            waitlist=len(queue),
+        )
+
+    async def _apply(self, session_id: UUID, operation: Operation) -> list[Promotion]:
+        try:
+            availability, promotions = await self.run(operation)
+        except BaseException:
+            # The cached queue may hold changes that were rolled back
+            self.queues.discard(self._key(session_id))
+            raise
+        await publish_availability(availability)
+        return promotions
+
+    async def open_session(self, seats: SessionSeats) -> SessionSeats:
+        """Start tracking the seats of a session.
+
+        Raises:
+            EntityConflictError: If the session is already tracked
+        """
+        statement = insert(session_seats).values(**seats.model_dump())
+        try:
+            await self.run(lambda connection: connection.execute(statement))
+        except IntegrityError as error:
+            raise EntityConflictError("session seats", "session_id", seats.session_id) from error
+        return seats
+
+    async def get_seats(self, session_id: UUID) -> SessionSeats:
+        """Get the seat counts of a session."""
+        statement = select(session_seats).where(session_seats.c.session_id == session_id)
+        row = await self.run(lambda connection: connection.execute(statement).mappings().first())
+        if row is None:
+            raise EntityNotFoundError("session seats", str(session_id))
+        return SessionSeats.model_validate(dict(row))
+
+    async def reserved_sessions(self, student_id: UUID, start: datetime, end: datetime) -> list[SessionSeats]:
+        """Get the sessions a student holds a seat in that overlap a time window."""
+        statement = (
+            select(session_seats)
+            .join(seat_reservations, seat_reservations.c.session_id == session_seats.c.session_id)
+            .where(
+                seat_reservations.c.student_id == student_id,
+                session_seats.c.starts_at < end,
+                session_seats.c.ends_at > start,
+            )
+            .order_by(session_seats.c.starts_at)
+        )
+        rows = await self.run(lambda connection: connection.execute(statement).mappings().all())
+        return [SessionSeats.model_validate(dict(row)) for row in rows]
+
+    async def reserve(self, session_id: UUID, student_id: UUID) -> UUID:
+        """Book a free seat directly.
+
+        Returns:
+            ID of the reservation
+
+        Raises:
+            EntityConflictError: If the session is full or the student has a seat in an overlapping session
+            EntityNotFoundError: If the session is not tracked
+        """
+        reservation_id = uuid4()
+
+        def operation(connection: Connection) -> tuple[SeatAvailability, list[Promotion]]:
+            seats = self._lock(connection, session_id)
+            if seats.seats_taken >= seats.capacity:
+                raise EntityConflictError("session seats", "capacity", seats.capacity)
+            if self._conflicts(connection, seats, [student_id]):
+                raise EntityConflictError("seat reservation", "schedule", student_id)
+            connection.execute(
+                insert(seat_reservations).values(
+                    id=reservation_id,
+                    session_id=session_id,
+                    student_id=student_id,
+                    reserved_at=datetime.now(timezone.utc),
+                )
+            )
+            seats.seats_taken += 1
+            self._save(connection, seats)
+            return self._availability(seats, self._queue(connection, seats)), []
+
+        await self._apply(session_id, operation)
+        return reservation_id
+
+    async def join(
+        self,
+        session_id: UUID,
+        student_id: UUID,
+        email: str,
+        tier: MembershipTier = MembershipTier.MEMBER,
+    ) -> WaitlistEntry:
+        """Put a student on the waitlist of a session.
+
+        If seats are free the waitlist is promoted right away, which may include
+        the new entry.
+
+        Raises:
+            EntityConflictError: If the student already holds a seat in or waits for the session
+            EntityNotFoundError: If the session is not tracked
+        """
+        entry = WaitlistEntry(
+            id=uuid4(),
+            session_id=session_id,
+            student_id=student_id,
+            email=email,
+            tier=tier,
+            signed_up_at=datetime.now(timezone.utc),
+        )
+
+        def operation(connection: Connection) -> tuple[SeatAvailability, list[Promotion]]:
+            seats = self._lock(connection, session_id)
+            if connection.scalar(
+                select(seat_reservations.c.id).where(
+                    seat_reservations.c.session_id == session_id, seat_reservations.c.student_id == student_id
+                )
+            ):
+                raise EntityConflictError("seat reservation", "student_id", student_id)
+            queue = self._queue(connection, seats)
+            try:
+                connection.execute(insert(waitlist_entries).values(**entry.model_dump()))
+            except IntegrityError as error:
+                raise EntityConflictError(self.entity_type, "student_id", student_id) from error
+            queue.push(entry)
+            seats.waitlist_version += 1
+            queue.version = seats.waitlist_version
+            promotions = self._fill(connection, seats, queue)
+            self._save(connection, seats)
+            return self._availability(seats, queue), promotions
+
+        await self._apply(session_id, operation)
+        return entry
+
+    async def leave(self, session_id: UUID, student_id: UUID) -> None:
+        """Take a student off the waitlist of a session.
+
+        Raises:
+            EntityNotFoundError: If the student is not waiting for the session
+        """
+
+        def operation(connection: Connection) -> tuple[SeatAvailability, list[Promotion]]:
+            seats = self._lock(connection, session_id)
+            queue = self._queue(connection, seats)
+            entry_id = connection.execute(
+                delete(waitlist_entries)
+                .where(waitlist_entries.c.session_id == session_id, waitlist_entries.c.student_id == student_id)
+                .returning(waitlist_entries.c.id)
+            ).scalar()
+            if entry_id is None:
+                raise EntityNotFoundError(self.entity_type, f"{session_id}/{student_id}")
+            queue.remove(entry_id)
+            seats.waitlist_version += 1
+            queue.version = seats.waitlist_version
+            self._save(connection, seats)
+            return self._availability(seats, queue), []
+
+        await self._apply(session_id, operation)
+
+    async def cancel(self, session_id: UUID, student_id: UUID) -> list[Promotion]:
+        """Give up a student's seat and promote the next eligible student into it.
+
+        Returns:
+            The promotion, if an eligible student was waiting
+
+        Raises:
+            EntityNotFoundError: If the student holds no seat in the session
+        """
+
+        def operation(connection: Connection) -> tuple[SeatAvailability, list[Promotion]]:
+            seats = self._lock(connection, session_id)
+            deleted = connection.execute(
+                delete(seat_reservations).where(
+                    seat_reservations.c.session_id == session_id, seat_reservations.c.student_id == student_id
+                )
+            ).rowcount
+            if not deleted:
+                raise EntityNotFoundError("seat reservation", f"{session_id}/{student_id}")
+            seats.seats_taken -= 1
+            queue = self._queue(connection, seats)
+            promotions = self._fill(connection, seats, queue)
+            self._save(connection, seats)
+            return self._availability(seats, queue), promotions
+
+        return await self._apply(session_id, operation)
+
+    async def resize(self, session_id: UUID, capacity: int) -> list[Promotion]:
+        """Change the capacity of a session, promoting waiting students into new seats in bulk.
+
+        Lowering the capacity below the seats taken keeps the existing
+        reservations; no new seats are given out until enough are cancelled.
+
+        Returns:
+            The promotions, best students first
+        """
+
+        def operation(connection: Connection) -> tuple[SeatAvailability, list[Promotion]]:
+            seats = self._lock(connection, session_id)
+            seats.capacity = capacity
+            queue = self._queue(connection, seats)
+            promotions = self._fill(connection, seats, queue)
+            self._save(connection, seats)
+            return self._availability(seats, queue), promotions
+
+        return await self._apply(session_id, operation)
+
+    async def promote(self, session_id: UUID) -> list[Promotion]:
+        """Promote waiting students into any free seats of a session.
+
+        Students skipped for a schedule conflict may become eligible once they
+        cancel their other seat; this re-checks them.
+
+        Returns:
+            The promotions, best students first
+        """
+
+        def operation(connection: Connection) -> tuple[SeatAvailability, list[Promotion]]:
+            seats = self._lock(connection, session_id)
+            queue = self._queue(connection, seats)
+            promotions = self._fill(connection, seats, queue)
+            self._save(connection, seats)
+            return self._availability(seats, queue), promotions
+
+        return await self._apply(session_id, operation)
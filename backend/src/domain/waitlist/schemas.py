@@ -0,0 +1,98 @@
+"""Waitlist data models and schemas.
+
+This module defines the data models used for session seats and waitlists.
+"""
+from datetime import datetime, timezone
+from enum import IntEnum
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator
+
+
+def _assume_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class MembershipTier(IntEnum):
+    """Membership tier of a waiting student; lower values are promoted first."""
+
+    UNLIMITED = 0
+    MEMBER = 1
+    DROP_IN = 2
+
+
+class SessionSeats(BaseModel):
+    """Seat counts of one class session.
+
+    Attributes:
+        session_id: The session (see ``Occurrence.id``).
+        starts_at: Start of the session.
+        ends_at: End of the session; students holding a seat in an overlapping
+            session are not promoted.
+        capacity: Maximum number of students.
+        seats_taken: Students holding a seat.
+        waitlist_version: Incremented on every change of the waitlist, so cached
+            queues can tell whether they are current.
+    """
+
+    session_id: UUID
+    starts_at: datetime
+    ends_at: datetime
+    capacity: int = Field(ge=0)
+    seats_taken: int = Field(default=0, ge=0)
+    waitlist_version: int = 0
+
+    @field_validator("starts_at", "ends_at")
+    @classmethod
+    def assume_utc(cls, value: datetime) -> datetime:
+        """Treat naive datetimes (e.g. read back from SQLite) as UTC."""
+        return _assume_utc(value)
+
+
+class WaitlistEntry(BaseModel):
+    """A student waiting for a seat in a full session.
+
+    Attributes:
+        id: Unique ID of the entry.
+        session_id: Session the student waits for.
+        student_id: The waiting student.
+        email: Address the student is notified at when promoted.
+        tier: Membership tier of the student at signup.
+        signed_up_at: Time the student joined the waitlist.
+    """
+
+    id: UUID
+    session_id: UUID
+    student_id: UUID
+    email: str
+    tier: MembershipTier = MembershipTier.MEMBER
+    signed_up_at: datetime
+
+    @field_validator("signed_up_at")
+    @classmethod
+    def assume_utc(cls, value: datetime) -> datetime:
+        """Treat naive datetimes (e.g. read back from SQLite) as UTC."""
+        return _assume_utc(value)
+
+    @property
+    def priority(self) -> tuple[int, datetime, UUID]:
+        """Get the sort key of the entry: tier, then signup time, then ID as a tie breaker."""
+        return (self.tier, self.signed_up_at, self.id)
+
+
+class Promotion(BaseModel):
+    """A waiting student moved into a seat.
+
+    Attributes:
+        session_id: Session the seat belongs to.
+        student_id: The promoted student.
+        email: Address of the student; the recipient of the notification.
+        reservation_id: ID of the seat reservation created by the promotion.
+        promoted_at: Time of the promotion.
+    """
+
+    session_id: UUID
+    student_id: UUID
+    email: str
+    reservation_id: UUID
+    promoted_at: datetime
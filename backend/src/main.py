@@ -2,21 +2,100 @@
 
 This module initializes the FastAPI application and configures the main routes.
 """
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 
 from src.api.router import router as api_router
+from src.core.broadcast import start_notifier, stop_notifier
 from src.core.config import settings
+from src.core.deadlines import DeadlineMiddleware
+from src.core.exceptions import (
+    AuthenticationError,
+    DeadlineExceededError,
+    OverloadedError,
+)
+from src.core.health import start_health_monitor, stop_health_monitor
+from src.core.loop_monitor import start_loop_monitor, stop_loop_monitor
+from src.core.query_log import QueryLogMiddleware
+from src.core.response_cache import ResponseCacheMiddleware
+from src.core.tenancy import TenantMiddleware
+from src.domain.users.passwords import password_hasher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start and stop background services with the application."""
+    start_loop_monitor()
+    start_notifier()
+    start_health_monitor()
+    try:
+        yield
+    finally:
+        await stop_health_monitor()
+        stop_notifier()
+        password_hasher.shutdown()
+        await stop_loop_monitor()
+
 
 boneca = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     docs_url=f"{settings.API_PREFIX}/docs",
     openapi_url=f"{settings.API_PREFIX}/openapi.json",
+    lifespan=lifespan,
 )
 
+boneca.add_middleware(ResponseCacheMiddleware)
+boneca.add_middleware(QueryLogMiddleware)
+boneca.add_middleware(TenantMiddleware)
+boneca.add_middleware(DeadlineMiddleware)
 boneca.include_router(api_router, prefix=settings.API_PREFIX)
 
 
+@boneca.exception_handler(DeadlineExceededError)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceededError) -> JSONResponse:
+    """Translate an expired request deadline into a 504 response.
+
+    Returns:
+        JSONResponse: The error message and details.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": exc.message, **exc.details},
+    )
+
+
+@boneca.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError) -> JSONResponse:
+    """Translate a saturated resource into a 503 response asking the client to retry.
+
+    Returns:
+        JSONResponse: The error message and details.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": exc.message, **exc.details},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@boneca.exception_handler(AuthenticationError)
+async def authentication_handler(request: Request, exc: AuthenticationError) -> JSONResponse:
+    """Translate failed authentication into a 401 response.
+
+    Returns:
+        JSONResponse: The error message and details.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content={"detail": exc.message, **exc.details},
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 @boneca.get("/")
 async def root() -> dict:
     """Get root endpoint that returns a welcome message.
@@ -0,0 +1 @@
+"""Operational scripts for running and maintaining the service."""
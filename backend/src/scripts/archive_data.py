@@ -0,0 +1,57 @@
+"""Move old rows out of the hot tables into their archive tables.
+
+Soft-deleted class series, check-ins of closed terms and settled payments are
+moved in batches, one short transaction per batch (see ``src.core.archive``).
+Run it regularly, e.g. nightly, for every tenant.
+
+Usage:
+    python -m src.scripts.archive_data [--tenant salsa] [--table attendance] [--batch-size 5000] [--pause 0.1]
+"""
+import argparse
+from typing import Optional, Sequence
+
+from src.core.archive import ArchivePolicy, Archiver
+from src.core.config import settings
+from src.core.tenancy import tenant_scope
+from src.domain.attendance.repository import attendance_archive_policy
+from src.domain.classes.repository import class_series_archive_policy
+from src.domain.payments.repository import expected_payments_archive_policy
+
+POLICIES: dict[str, ArchivePolicy] = {
+    policy.name: policy
+    for policy in (class_series_archive_policy, attendance_archive_policy, expected_payments_archive_policy)
+}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the command line interface.
+
+    Args:
+        argv: Command line arguments; defaults to ``sys.argv[1:]``
+
+    Returns:
+        Process exit code: 0 if all policies ran.
+    """
+    parser = argparse.ArgumentParser(description="Archive old rows of the hot tables")
+    parser.add_argument("--tenant", help="tenant whose schema is archived")
+    parser.add_argument("--table", action="append", choices=POLICIES, help="archive only this table (repeatable)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.ARCHIVE_BATCH_SIZE,
+        help=f"rows per transaction (default: {settings.ARCHIVE_BATCH_SIZE})",
+    )
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches (default: 0)")
+    parser.add_argument("--max-batches", type=int, help="stop each table after this many batches")
+    args = parser.parse_args(argv)
+
+    with tenant_scope(args.tenant):
+        archiver = Archiver(batch_size=args.batch_size, pause=args.pause)
+        for name in args.table or POLICIES:
+            moved = archiver.run(POLICIES[name], max_batches=args.max_batches)
+            print(f"{name}: archived {moved} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,445 @@
+"""Generate a synthetic dance-school dataset for load and scale testing.
+
+The generator is deterministic: the same seed, size and end date always produce
+the same rows. Popularity is skewed the way it is in real schools: a few
+students attend most sessions, a few instructors teach most classes, evening
+slots fill up and students drop out after a while. Rows are streamed into
+PostgreSQL with ``COPY`` or written as CSV fixture sets for benchmarks.
+
+Usage:
+    python -m src.scripts.generate_dataset [--size small] [--seed 0] [--tenant salsa] [--truncate]
+    python -m src.scripts.generate_dataset --size tiny --output fixtures/tiny
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from functools import cached_property
+from itertools import accumulate, islice
+from pathlib import Path
+from typing import Any, Optional
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Engine, Table, text
+
+from src.core.database import get_engine
+from src.core.tenancy import tenant_scope
+from src.domain.attendance.repository import attendance
+from src.domain.classes.recurrence import WEEKDAYS
+from src.domain.classes.repository import class_series
+from src.domain.classes.schedule import expand
+from src.domain.classes.schemas import ClassSeries
+from src.domain.payments.repository import expected_payments
+from src.domain.payments.schemas import PaymentStatus
+
+# Tables in load order
+TABLES: dict[str, Table] = {table.name: table for table in (class_series, attendance, expected_payments)}
+
+STYLES = ("Salsa", "Bachata", "Kizomba", "Tango", "Zouk", "West Coast Swing", "Lindy Hop", "Ballet")
+LEVELS = ("Beginners", "Improvers", "Intermediate", "Advanced")
+TIMEZONES = ("Europe/Lisbon", "Europe/Madrid", "Europe/Berlin")
+# Class start hours and how likely each is; most classes run in the evening
+HOURS = (10, 12, 17, 18, 19, 20, 21)
+HOUR_WEIGHTS = (1, 1, 2, 5, 8, 8, 4)
+CAPACITIES = (12, 16, 20, 24, 30)
+DURATIONS = (60, 75, 90)
+# Monthly membership plans in cents and how many students choose each
+PLANS = (4500, 6500, 8500, 12000)
+PLAN_WEIGHTS = (4, 5, 3, 1)
+# Students signed up to a class relative to its capacity
+ROSTER_FACTOR = 1.6
+# Share of past payments that already showed up on a bank statement
+MATCHED_SHARE = 0.97
+WEEK = timedelta(weeks=1)
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    """Number of entities to generate.
+
+    Attributes:
+        students: Number of students.
+        instructors: Number of instructors.
+        studios: Number of studios.
+        series: Number of recurring class series.
+        weeks: Weeks of history before the end date.
+    """
+
+    students: int
+    instructors: int
+    studios: int
+    series: int
+    weeks: int
+
+
+PRESETS = {
+    # ~2k check-ins; unit tests and quick benchmarks
+    "tiny": DatasetSize(students=300, instructors=6, studios=2, series=20, weeks=8),
+    # ~70k check-ins; local development
+    "small": DatasetSize(students=5_000, instructors=40, studios=5, series=300, weeks=26),
+    # ~1M check-ins; query plan and index work
+    "medium": DatasetSize(students=50_000, instructors=200, studios=20, series=2_000, weeks=52),
+    # ~20M check-ins; scale testing
+    "large": DatasetSize(students=500_000, instructors=1_000, studios=100, series=20_000, weeks=104),
+}
+
+
+def zipf_weights(count: int, exponent: float) -> list[float]:
+    """Get cumulative Zipf weights, making entity ``i`` more popular than ``i + 1``.
+
+    Args:
+        count: Number of entities
+        exponent: Skew; 0 is uniform, larger values concentrate on the first entities
+
+    Returns:
+        Cumulative weights for ``random.choices``
+    """
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def last_monday(day: date) -> date:
+    """Get the Monday of the week of a day."""
+    return day - timedelta(days=day.weekday())
+
+
+class DatasetGenerator:
+    """Deterministic generator of the rows of a synthetic school.
+
+    Every table draws from its own random stream derived from the seed, so
+    generating one table never changes the rows of another.
+    """
+
+    def __init__(self, size: DatasetSize, seed: int = 0, until: Optional[date] = None) -> None:
+        """Initialize the generator.
+
+        Args:
+            size: Number of entities to generate
+            seed: Seed of all random streams
+            until: End of the generated history (exclusive); defaults to the Monday of this week
+        """
+        self.size = size
+        self.seed = seed
+        self.until = until or last_monday(date.today())
+        self.end = datetime(self.until.year, self.until.month, self.until.day, tzinfo=timezone.utc)
+        self.start = self.end - size.weeks * WEEK
+
+    def _random(self, stream: str) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}")
+
+    @staticmethod
+    def _uuid(rng: random.Random) -> UUID:
+        return UUID(int=rng.getrandbits(128), version=4)
+
+    def _ids(self, stream: str, count: int) -> list[UUID]:
+        rng = self._random(stream)
+        return [self._uuid(rng) for _ in range(count)]
+
+    @cached_property
+    def students(self) -> list[UUID]:
+        """Get the student IDs, most active first."""
+        return self._ids("students", self.size.students)
+
+    @cached_property
+    def instructors(self) -> list[UUID]:
+        """Get the instructor IDs, busiest first."""
+        return self._ids("instructors", self.size.instructors)
+
+    @cached_property
+    def studios(self) -> list[UUID]:
+        """Get the studio IDs, largest first."""
+        return self._ids("studios", self.size.studios)
+
+    @cached_property
+    def series(self) -> list[ClassSeries]:
+        """Get the class series.
+
+        Most series run for the whole history; some start later, as schools add
+        classes over time.
+        """
+        rng = self._random("series")
+        instructor_weights = zipf_weights(len(self.instructors), 1.1)
+        studio_weights = zipf_weights(len(self.studios), 0.6)
+        result = []
+        for _ in range(self.size.series):
+            studio = rng.choices(range(len(self.studios)), cum_weights=studio_weights)[0]
+            tz = ZoneInfo(TIMEZONES[studio % len(TIMEZONES)])
+            days = sorted(rng.sample(range(6), rng.choice((1, 1, 2))))
+            first_week = 0 if rng.random() < 0.7 else rng.randrange(self.size.weeks)
+            first_day = self.start.date() + first_week * WEEK + timedelta(days=days[0])
+            hour = rng.choices(HOURS, weights=HOUR_WEIGHTS)[0]
+            starts_at = datetime(first_day.year, first_day.month, first_day.day, hour, rng.choice((0, 30)), tzinfo=tz)
+            result.append(
+                ClassSeries(
+                    id=self._uuid(rng),
+                    title=f"{rng.choice(STYLES)} {rng.choice(LEVELS)}",
+                    studio_id=self.studios[studio],
+                    instructor_id=rng.choices(self.instructors, cum_weights=instructor_weights)[0],
+                    starts_at=starts_at.astimezone(timezone.utc),
+                    duration_minutes=rng.choice(DURATIONS),
+                    timezone=tz.key,
+                    recurrence=f"RRULE:FREQ=WEEKLY;BYDAY={','.join(WEEKDAYS[day] for day in days)}",
+                    location=f"Room {rng.randint(1, 4)}",
+                    capacity=rng.choice(CAPACITIES),
+                    updated_at=self.start,
+                )
+            )
+        return result
+
+    def class_series_rows(self) -> Iterator[tuple[Any, ...]]:
+        """Generate the ``class_series`` rows."""
+        names = [column.name for column in class_series.columns]
+        for series in self.series:
+            data = series.model_dump()
+            yield tuple(data[name] for name in names)
+
+    def attendance_rows(self) -> Iterator[tuple[Any, ...]]:
+        """Generate the ``attendance`` rows.
+
+        Each series has a roster of students drawn with a Zipf skew. Every roster
+        member attends for a limited number of weeks, and within those weeks
+        shows up with the popularity of the class, up to its capacity.
+        """
+        student_weights = zipf_weights(len(self.students), 0.9)
+        weeks = self.size.weeks
+        for series in self.series:
+            rng = self._random(f"attendance:{series.id}")
+            members = dict.fromkeys(
+                rng.choices(self.students, cum_weights=student_weights, k=int(series.capacity * ROSTER_FACTOR))
+            )
+            roster = []
+            for student in members:
+                joined = rng.randrange(-weeks // 2, weeks)
+                roster.append((student, joined, joined + 1 + int(rng.expovariate(1 / weeks))))
+            popularity = rng.betavariate(4, 2)
+
+            for occurrence in expand(series, self.start, self.end):
+                week = (occurrence.starts_at - self.start) // WEEK
+                starts_at = occurrence.starts_at.astimezone(timezone.utc)
+                session_id = occurrence.id
+                attendees = [
+                    student for student, joined, left in roster if joined <= week < left and rng.random() < popularity
+                ]
+                for student in attendees[: series.capacity]:
+                    yield (
+                        self._uuid(rng),
+                        series.id,
+                        session_id,
+                        student,
+                        series.instructor_id,
+                        series.studio_id,
+                        starts_at,
+                    )
+
+    def expected_payment_rows(self) -> Iterator[tuple[Any, ...]]:
+        """Generate the ``expected_payments`` rows: one monthly fee per month a student is a member.
+
+        Fees due more than a month before the end date are mostly matched already.
+        """
+        rng = self._random("payments")
+        months = []
+        month = self.start.date().replace(day=1)
+        while month < self.until:
+            months.append(month)
+            month = (month + timedelta(days=32)).replace(day=1)
+        settled_before = self.until - timedelta(days=31)
+
+        statement_line = 1
+        for index in range(len(self.students)):
+            joined = rng.randrange(len(months))
+            stays = 1 + int(rng.expovariate(2 / len(months)))
+            amount = rng.choices(PLANS, weights=PLAN_WEIGHTS)[0]
+            for due_on in months[joined : joined + stays]:
+                matched = due_on < settled_before and rng.random() < MATCHED_SHARE
+                yield (
+                    self._uuid(rng),
+                    f"BON{index:07d}{due_on:%Y%m}",
+                    amount,
+                    due_on,
+                    PaymentStatus.MATCHED.value if matched else PaymentStatus.PENDING.value,
+                    (
+                        datetime(due_on.year, due_on.month, due_on.day, tzinfo=timezone.utc)
+                        + timedelta(days=rng.randrange(10))
+                        if matched
+                        else None
+                    ),
+                    statement_line if matched else None,
+                )
+                statement_line += matched
+
+    def rows(self, table: str) -> Iterator[tuple[Any, ...]]:
+        """Generate the rows of a table in column order.
+
+        Raises:
+            KeyError: If the table is not generated
+        """
+        generators = {
+            class_series.name: self.class_series_rows,
+            attendance.name: self.attendance_rows,
+            expected_payments.name: self.expected_payment_rows,
+        }
+        return generators[table]()
+
+
+class CsvStream:
+    """Read-only file object rendering rows as CSV on demand, for ``COPY ... FROM STDIN``.
+
+    Rows are formatted in batches, so memory stays bounded however many rows
+    are streamed. ``None`` becomes an unquoted empty field, which ``COPY`` reads as NULL.
+
+    Attributes:
+        rows: Number of rows rendered so far.
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]], batch_rows: int = 10_000) -> None:
+        """Initialize the stream.
+
+        Args:
+            rows: Rows to render
+            batch_rows: Number of rows formatted at a time
+        """
+        self.rows = 0
+        self._source = iter(rows)
+        self._batch_rows = batch_rows
+        self._buffer = ""
+        self._position = 0
+
+    def read(self, size: int = -1) -> str:
+        """Read up to ``size`` characters; all remaining ones if ``size`` is negative."""
+        while size < 0 or len(self._buffer) - self._position < size:
+            batch = list(islice(self._source, self._batch_rows))
+            if not batch:
+                break
+            output = io.StringIO()
+            csv.writer(output, lineterminator="\n").writerows(batch)
+            self._buffer = self._buffer[self._position :] + output.getvalue()
+            self._position = 0
+            self.rows += len(batch)
+        end = len(self._buffer) if size < 0 else self._position + size
+        chunk = self._buffer[self._position : end]
+        self._position += len(chunk)
+        return chunk
+
+
+def copy_rows(engine: Engine, table: Table, rows: Iterable[Sequence[Any]], batch_rows: int = 10_000) -> int:
+    """Bulk load rows into a table.
+
+    PostgreSQL loads with a single ``COPY`` per table; other databases (tests)
+    fall back to batched ``executemany`` inserts.
+
+    Args:
+        engine: Engine whose database the rows are loaded into
+        table: Target table
+        rows: Rows in column order
+        batch_rows: Number of rows rendered or inserted at a time
+
+    Returns:
+        Number of loaded rows
+    """
+    names = [column.name for column in table.columns]
+    if engine.dialect.name != "postgresql":
+        loaded = 0
+        source = iter(rows)
+        with engine.begin() as connection:
+            while batch := list(islice(source, batch_rows)):
+                connection.execute(table.insert(), [dict(zip(names, row)) for row in batch])
+                loaded += len(batch)
+        return loaded
+
+    stream = CsvStream(rows, batch_rows)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(names)}) FROM STDIN WITH (FORMAT csv)", stream, 1 << 20)
+        cursor.close()
+        raw.commit()
+    finally:
+        raw.close()
+    return stream.rows
+
+
+def truncate(engine: Engine) -> None:
+    """Empty all generated tables."""
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            connection.execute(text(f"TRUNCATE {', '.join(TABLES)}"))
+        else:
+            for table in reversed(TABLES.values()):
+                connection.execute(table.delete())
+
+
+def load(engine: Engine, generator: DatasetGenerator) -> dict[str, int]:
+    """Generate all tables and load them into a database.
+
+    Returns:
+        Number of loaded rows per table
+    """
+    return {name: copy_rows(engine, table, generator.rows(name)) for name, table in TABLES.items()}
+
+
+def write_fixture(generator: DatasetGenerator, directory: Path) -> dict[str, int]:
+    """Write a fixture set: one CSV file with header per table plus ``dataset.json``.
+
+    The CSV files can be loaded with ``COPY <table> FROM '<file>' WITH (FORMAT csv, HEADER)``.
+
+    Returns:
+        Number of written rows per table
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    for name, table in TABLES.items():
+        stream = CsvStream(generator.rows(name))
+        with open(directory / f"{name}.csv", "w", newline="", encoding="utf-8") as file:
+            file.write(",".join(column.name for column in table.columns) + "\n")
+            while chunk := stream.read(1 << 20):
+                file.write(chunk)
+        counts[name] = stream.rows
+    manifest = {"seed": generator.seed, "until": generator.until.isoformat(), "size": asdict(generator.size)}
+    (directory / "dataset.json").write_text(json.dumps({**manifest, "rows": counts}, indent=2) + "\n")
+    return counts
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the command line interface.
+
+    Args:
+        argv: Command line arguments; defaults to ``sys.argv[1:]``
+
+    Returns:
+        Process exit code: 0 if the dataset was generated.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic dance-school dataset")
+    parser.add_argument("--size", choices=PRESETS, default="small", help="dataset size (default: small)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument(
+        "--until", type=date.fromisoformat, help="end of the history, YYYY-MM-DD (default: this Monday)"
+    )
+    parser.add_argument("--tenant", help="tenant whose schema is loaded")
+    parser.add_argument("--truncate", action="store_true", help="empty the tables before loading")
+    parser.add_argument("--output", type=Path, help="write a CSV fixture set to this directory instead of loading")
+    args = parser.parse_args(argv)
+
+    generator = DatasetGenerator(PRESETS[args.size], seed=args.seed, until=args.until)
+    started = time.perf_counter()
+    if args.output:
+        counts = write_fixture(generator, args.output)
+    else:
+        with tenant_scope(args.tenant):
+            engine = get_engine()
+            if args.truncate:
+                truncate(engine)
+            counts = load(engine, generator)
+
+    for name, count in counts.items():
+        print(f"{name}: {count} rows")
+    print(f"Generated {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,146 @@
+"""Run Alembic migrations across all tenant schemas in parallel.
+
+Each schema is migrated by its own ``alembic -x schema=<schema>`` process, so a
+failing tenant does not stop the others and the migrations of many schools run
+concurrently.
+
+Usage:
+    python -m src.scripts.migrate_tenants [--revision head] [--jobs 4] [--tenant salsa ...] [--create]
+"""
+import argparse
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+from sqlalchemy import Engine, text
+
+from src.core.config import settings
+from src.core.database import get_engine
+from src.core.tenancy import tenant_schema
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+
+
+@dataclass(frozen=True)
+class MigrationResult:
+    """Outcome of migrating one schema.
+
+    Attributes:
+        schema: Migrated schema.
+        returncode: Exit code of the Alembic process.
+        output: Combined stdout and stderr of the Alembic process.
+    """
+
+    schema: str
+    returncode: int
+    output: str
+
+    @property
+    def ok(self) -> bool:
+        """Whether the migration succeeded."""
+        return self.returncode == 0
+
+
+def discover_tenant_schemas(engine: Engine) -> list[str]:
+    """List the existing tenant schemas.
+
+    Args:
+        engine: Engine connected to the application database
+
+    Returns:
+        Names of all schemas starting with ``TENANT_SCHEMA_PREFIX``, sorted.
+    """
+    statement = text(
+        "SELECT schema_name FROM information_schema.schemata "
+        "WHERE starts_with(schema_name, :prefix) ORDER BY schema_name"
+    )
+    with engine.connect() as connection:
+        return list(connection.execute(statement, {"prefix": settings.TENANT_SCHEMA_PREFIX}).scalars())
+
+
+def create_schemas(engine: Engine, schemas: Sequence[str]) -> None:
+    """Create schemas that do not exist yet.
+
+    Args:
+        engine: Engine connected with a role allowed to create schemas
+        schemas: Schema names to create
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as connection:
+        for schema in schemas:
+            connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {quote(schema)}"))
+
+
+def migrate_schema(schema: str, revision: str = "head") -> MigrationResult:
+    """Upgrade one schema with Alembic.
+
+    Args:
+        schema: Schema to migrate
+        revision: Target revision
+
+    Returns:
+        Outcome of the migration.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-m", "alembic", "-x", f"schema={schema}", "upgrade", revision],
+        cwd=BACKEND_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return MigrationResult(schema, completed.returncode, completed.stdout + completed.stderr)
+
+
+def migrate_all(schemas: Sequence[str], revision: str = "head", jobs: int = 4) -> list[MigrationResult]:
+    """Upgrade many schemas concurrently.
+
+    Args:
+        schemas: Schemas to migrate
+        revision: Target revision
+        jobs: Maximum number of concurrent Alembic processes
+
+    Returns:
+        Outcome per schema, in the order of ``schemas``.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        return list(executor.map(lambda schema: migrate_schema(schema, revision), schemas))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the command line interface.
+
+    Args:
+        argv: Command line arguments; defaults to ``sys.argv[1:]``
+
+    Returns:
+        Process exit code: 0 if every schema migrated, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Migrate all tenant schemas")
+    parser.add_argument("--revision", default="head", help="target revision (default: head)")
+    parser.add_argument("--jobs", type=int, default=4, help="concurrent migrations (default: 4)")
+    parser.add_argument("--tenant", action="append", default=[], help="migrate only this tenant (repeatable)")
+    parser.add_argument("--create", action="store_true", help="create missing tenant schemas first")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if args.tenant:
+        schemas = [tenant_schema(tenant) for tenant in args.tenant]
+    else:
+        schemas = discover_tenant_schemas(engine)
+    if args.create:
+        create_schemas(engine, schemas)
+
+    results = migrate_all(schemas, args.revision, args.jobs)
+    for result in results:
+        print(f"{'✅' if result.ok else '❌'} {result.schema}")
+        if not result.ok:
+            print(result.output)
+    print(f"Migrated {sum(result.ok for result in results)}/{len(results)} tenant schemas")
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Reconcile a bank statement file against expected payments.
+
+Matched payments are marked in the database; unmatched statement lines can be
+written to a CSV file for manual review. Lines that cannot be parsed are
+skipped and listed in the summary.
+
+Usage:
+    python -m src.scripts.reconcile_payments statement.csv [--tenant salsa] [--unmatched unmatched.csv]
+"""
+import argparse
+import asyncio
+import csv
+from typing import Optional, Sequence
+
+from src.core.tenancy import tenant_scope
+from src.domain.payments.reconcile import Reconciler, ReconciliationReport
+from src.domain.payments.repository import ExpectedPaymentRepository
+
+
+def write_unmatched_lines(report: ReconciliationReport, path: str) -> None:
+    """Write the unmatched statement lines of a report to a CSV file."""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["line_number", "booking_date", "amount", "reference"])
+        for line in report.unmatched_lines:
+            amount = f"{line.amount_cents // 100}.{line.amount_cents % 100:02d}"
+            writer.writerow([line.line_number, line.booked_on.isoformat(), amount, line.reference])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the command line interface.
+
+    Args:
+        argv: Command line arguments; defaults to ``sys.argv[1:]``
+
+    Returns:
+        Process exit code: 0 if the statement was reconciled.
+    """
+    parser = argparse.ArgumentParser(description="Reconcile a bank statement file")
+    parser.add_argument("statement", help="path of the statement CSV file")
+    parser.add_argument("--tenant", help="tenant whose payments are reconciled")
+    parser.add_argument("--batch-size", type=int, default=5000, help="pending payments per query (default: 5000)")
+    parser.add_argument("--unmatched", help="write unmatched statement lines to this CSV file")
+    args = parser.parse_args(argv)
+
+    with tenant_scope(args.tenant):
+        reconciler = Reconciler(ExpectedPaymentRepository(), read_batch_size=args.batch_size)
+        report = asyncio.run(reconciler.reconcile(args.statement))
+
+    print(f"Matched {report.matched}/{report.lines} statement lines")
+    print(f"Unmatched statement lines: {len(report.unmatched_lines)}")
+    print(f"Unmatched pending payments: {len(report.unmatched_payments)}")
+    print(f"Rejected statement lines: {len(report.rejected_lines)}")
+    for rejected in report.rejected_lines:
+        print(f"  line {rejected.line_number}: {rejected.reason}")
+    if args.unmatched:
+        write_unmatched_lines(report, args.unmatched)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
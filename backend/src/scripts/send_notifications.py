@@ -0,0 +1,55 @@
+"""Send queued notifications.
+
+Due notification jobs are claimed in batches and sent over pooled SMTP
+connections (see ``src.domain.notifications.sender``). Run it frequently, e.g.
+every minute, for every tenant; several senders may run at the same time.
+
+Usage:
+    python -m src.scripts.send_notifications [--tenant salsa] [--batch-size 500] [--max-batches 10]
+"""
+import argparse
+import asyncio
+from typing import Optional, Sequence
+
+from src.core.config import settings
+from src.core.tenancy import tenant_scope
+from src.domain.notifications.sender import NotificationSender, SendReport
+from src.domain.notifications.smtp import smtp_pool
+
+
+async def send(batch_size: int, max_batches: Optional[int]) -> SendReport:
+    """Send due jobs of the current tenant and close the SMTP connections afterwards."""
+    try:
+        return await NotificationSender(batch_size=batch_size).send_pending(max_batches=max_batches)
+    finally:
+        smtp_pool.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the command line interface.
+
+    Args:
+        argv: Command line arguments; defaults to ``sys.argv[1:]``
+
+    Returns:
+        Process exit code: 0 if no job was given up, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Send queued notifications")
+    parser.add_argument("--tenant", help="tenant whose notifications are sent")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.NOTIFICATION_BATCH_SIZE,
+        help=f"jobs claimed at once (default: {settings.NOTIFICATION_BATCH_SIZE})",
+    )
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    args = parser.parse_args(argv)
+
+    with tenant_scope(args.tenant):
+        report = asyncio.run(send(args.batch_size, args.max_batches))
+    print(f"sent {report.sent}, retrying {report.retried}, failed {report.failed} in {report.batches} batches")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
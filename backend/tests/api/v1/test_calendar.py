@@ -0,0 +1,93 @@
+"""Tests for calendar feed endpoints."""
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.v1.calendar import (
+    etag_matches,
+    feed_cache,
+    get_calendar_feed,
+    get_session_source,
+    invalidate_series_feeds,
+)
+from src.domain.calendar.feeds import feed_token, feed_window
+from src.domain.calendar.schemas import FeedKind, FeedOwner
+from src.domain.classes.repository import ClassSeriesRepository
+from src.domain.classes.schedule import ClassSchedule
+from src.domain.classes.schemas import ClassSeries
+from tests.domain.classes.test_schedule import ClassSeriesMemoryRepository
+
+
+class TestCalendarEndpoints:
+    """Test cases for calendar feed endpoints."""
+
+    async def test_feed_and_conditional_get(self) -> None:
+        """Test serving a feed and answering revalidation with 304."""
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        series = ClassSeries(
+            id=uuid4(),
+            title="Forró",
+            studio_id=uuid4(),
+            instructor_id=uuid4(),
+            starts_at=now + timedelta(days=1),
+            duration_minutes=60,
+            timezone="UTC",
+            recurrence="RRULE:FREQ=WEEKLY;COUNT=4",
+            updated_at=now,
+        )
+        schedule = ClassSchedule(ClassSeriesMemoryRepository([series]))
+        token = feed_token(FeedOwner(FeedKind.INSTRUCTOR, series.instructor_id))
+
+        response = await get_calendar_feed(token, schedule)
+        assert response.status_code == 200
+        assert response.media_type == "text/calendar; charset=utf-8"
+        assert "SUMMARY:Forró" in response.body.decode()
+
+        etag = response.headers["etag"]
+        not_modified = await get_calendar_feed(token, schedule, if_none_match=etag)
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+
+    def test_sessions_come_from_class_series(self) -> None:
+        """Test that feeds show the sessions expanded from the stored class series."""
+        source = get_session_source()
+        assert isinstance(source, ClassSchedule)
+        assert isinstance(source.repository, ClassSeriesRepository)
+
+    async def test_series_changes_drop_feeds(self) -> None:
+        """Test that feeds are dropped when a class series changes through its repository."""
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        series = ClassSeries(
+            id=uuid4(),
+            title="Zouk",
+            studio_id=uuid4(),
+            instructor_id=uuid4(),
+            starts_at=now + timedelta(days=1),
+            duration_minutes=60,
+            timezone="UTC",
+            recurrence="RRULE:FREQ=WEEKLY",
+            updated_at=now,
+        )
+        schedule = ClassSchedule(ClassSeriesMemoryRepository([series]))
+        owner = FeedOwner(FeedKind.STUDIO, series.studio_id)
+        await feed_cache.get(owner, schedule)
+
+        assert invalidate_series_feeds in ClassSeriesRepository.listeners
+        invalidate_series_feeds(series, series.model_copy(update={"studio_id": uuid4()}))
+        assert feed_cache._cached((None, owner), feed_window()[0]) is None
+
+    async def test_unknown_token(self) -> None:
+        """Test that invalid tokens yield 404."""
+        with pytest.raises(HTTPException) as exc_info:
+            await get_calendar_feed("nope", ClassSchedule(ClassSeriesMemoryRepository()))
+        assert exc_info.value.status_code == 404
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [(None, False), ('"abc"', True), ('W/"abc"', True), ('"x", "abc"', True), ("*", True), ('"x"', False)],
+    )
+    def test_etag_matches(self, header: str | None, expected: bool) -> None:
+        """Test If-None-Match matching."""
+        assert etag_matches(header, '"abc"') is expected
@@ -0,0 +1,136 @@
+"""Tests for class schedule endpoints."""
+from collections.abc import AsyncGenerator
+from datetime import datetime, timedelta, timezone
+from typing import cast
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException, Response
+
+from src.api.v1.classes import (
+    get_class_schedule,
+    get_class_series_repository,
+    list_class_series,
+    list_class_sessions,
+    purge_class_sessions,
+    stream_availability,
+)
+from src.core.config import settings
+from src.core.listing import ListQuery
+from src.core.repositories.counts import TotalMode
+from src.core.repositories.filters import Eq
+from src.core.response_cache import CachedResponse, response_cache
+from src.domain.classes.availability import SeatAvailability, publish_availability
+from src.domain.classes.repository import ClassSeriesRepository
+from src.domain.classes.schedule import ClassSchedule
+from src.domain.classes.schemas import ClassSeries
+from tests.domain.classes.test_schedule import ClassSeriesMemoryRepository
+
+START = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+
+class TestClassEndpoints:
+    """Test cases for class schedule endpoints."""
+
+    async def test_list_sessions(self) -> None:
+        """Test expanding sessions for a studio."""
+        studio_id = uuid4()
+        series = ClassSeries(
+            id=uuid4(),
+            title="Kizomba",
+            studio_id=studio_id,
+            instructor_id=uuid4(),
+            starts_at=START,
+            duration_minutes=90,
+            recurrence="RRULE:FREQ=DAILY",
+            updated_at=START,
+        )
+        schedule = ClassSchedule(ClassSeriesMemoryRepository([series]))
+
+        sessions = await list_class_sessions(START, START + timedelta(days=7), schedule, studio_id=studio_id)
+        assert len(sessions) == 7
+        assert await list_class_sessions(START, START + timedelta(days=7), schedule, studio_id=uuid4()) == []
+
+    @pytest.mark.parametrize(
+        ("start", "end"),
+        [
+            (START.replace(tzinfo=None), START + timedelta(days=1)),
+            (START, START),
+            (START, START + timedelta(days=365)),
+        ],
+    )
+    async def test_invalid_window(self, start: datetime, end: datetime) -> None:
+        """Test that unbounded or empty windows are rejected."""
+        schedule = ClassSchedule(ClassSeriesMemoryRepository())
+        with pytest.raises(HTTPException) as error:
+            await list_class_sessions(start, end, schedule)
+        assert error.value.status_code == 422
+
+    def test_default_schedule(self) -> None:
+        """Test that the default schedule reads from the database."""
+        assert isinstance(get_class_schedule().repository, ClassSeriesRepository)
+        assert isinstance(get_class_series_repository(), ClassSeriesRepository)
+
+    def test_series_changes_purge_cached_sessions(self) -> None:
+        """Test that a class series change purges the cached session lists."""
+        key = (None, "/api/v1/classes/sessions", "", ())
+        response_cache.set(key, (), CachedResponse(200, [], b"[]", frozenset({"classes"}), 0, float("inf")))
+
+        assert purge_class_sessions in ClassSeriesRepository.listeners
+        purge_class_sessions(None, None)
+        assert response_cache.get(key) is None
+
+    async def test_list_series(self) -> None:
+        """Test listing the series of an instructor."""
+        instructor_id = uuid4()
+        series = [
+            ClassSeries(
+                id=uuid4(),
+                title=title,
+                studio_id=uuid4(),
+                instructor_id=instructor_id,
+                starts_at=START,
+                duration_minutes=60,
+                recurrence="RRULE:FREQ=WEEKLY",
+                updated_at=START,
+            )
+            for title in ["Salsa", "Bachata", "Zouk"]
+        ]
+        repository = ClassSeriesMemoryRepository(series)
+        query = ListQuery(
+            filters=Eq("instructor_id", instructor_id), order_by=("-id",), offset=1, limit=1, total=TotalMode.CAPPED
+        )
+        response = Response()
+
+        listed = await list_class_series(query, repository, response)
+        assert [item.id for item in listed] == [sorted(item.id for item in series)[1]]
+        assert response.headers["X-Total-Count"] == "3"
+
+    async def test_stream_availability(self) -> None:
+        """Test streaming the current and changed seat counts of a session."""
+        session_id = uuid4()
+        await publish_availability(SeatAvailability(session_id=session_id, capacity=10, seats_taken=9))
+
+        response = await stream_availability([session_id])
+        assert response.media_type == "text/event-stream"
+        chunks = cast(AsyncGenerator[str, None], response.body_iterator)
+        assert await anext(chunks) == f"retry: {int(settings.SSE_HEARTBEAT_INTERVAL * 1000)}\n\n"
+        assert '"seats_available":1' in await anext(chunks)
+
+        await publish_availability(SeatAvailability(session_id=session_id, capacity=10, seats_taken=10, waitlist=1))
+        assert '"waitlist":1' in await anext(chunks)
+        await chunks.aclose()
+
+    async def test_stream_heartbeat(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that idle streams send heartbeats."""
+        monkeypatch.setattr(settings, "SSE_HEARTBEAT_INTERVAL", 0.01)
+        chunks = cast(AsyncGenerator[str, None], (await stream_availability([uuid4()])).body_iterator)
+        await anext(chunks)
+        assert await anext(chunks) == ": heartbeat\n\n"
+        await chunks.aclose()
+
+    async def test_stream_too_many_sessions(self) -> None:
+        """Test that streams are limited to SSE_MAX_TOPICS sessions."""
+        with pytest.raises(HTTPException) as error:
+            await stream_availability([uuid4() for _ in range(settings.SSE_MAX_TOPICS + 1)])
+        assert error.value.status_code == 422
@@ -0,0 +1,114 @@
+"""Tests for debug endpoints."""
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+
+from src.api.router import router as api_router
+from src.api.v1 import debug
+from src.core.config import settings
+from src.core.profiling import AllocationTracker, SamplingProfiler
+
+
+@pytest.fixture
+def enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "DEBUG_ENDPOINTS_ENABLED", True)
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", "s3cret")
+
+
+@pytest.fixture
+def tracker(monkeypatch: pytest.MonkeyPatch) -> Iterator[AllocationTracker]:
+    tracker = AllocationTracker()
+    monkeypatch.setattr(debug, "allocation_tracker", tracker)
+    yield tracker
+    tracker.stop()
+
+
+class TestDebugAccess:
+    """Test cases for guarding the debug endpoints."""
+
+    def test_disabled_by_default(self) -> None:
+        """Test that the endpoints answer 404 unless enabled, even with a token."""
+        assert settings.DEBUG_ENDPOINTS_ENABLED is False
+        with pytest.raises(HTTPException) as raised:
+            debug.require_debug_access(settings.DEBUG_TOKEN)
+        assert raised.value.status_code == 404
+
+    def test_enabled_without_token(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that enabling the endpoints without a token keeps them hidden."""
+        monkeypatch.setattr(settings, "DEBUG_ENDPOINTS_ENABLED", True)
+        monkeypatch.setattr(settings, "DEBUG_TOKEN", "")
+
+        with pytest.raises(HTTPException) as raised:
+            debug.require_debug_access("")
+        assert raised.value.status_code == 404
+
+    @pytest.mark.parametrize("token", [None, "", "wrong"])
+    def test_wrong_token(self, enabled: None, token: str) -> None:
+        """Test that callers without the right token are refused."""
+        with pytest.raises(HTTPException) as raised:
+            debug.require_debug_access(token)
+        assert raised.value.status_code == 403
+
+    def test_right_token(self, enabled: None) -> None:
+        """Test that the right token is let through."""
+        debug.require_debug_access("s3cret")
+
+    def test_every_route_is_guarded(self) -> None:
+        """Test that all debug routes depend on the access check and stay out of the API schema."""
+        routes = [route for route in api_router.routes if isinstance(route, APIRoute) and "/debug" in route.path]
+
+        assert {route.path for route in routes} == {
+            "/debug/profile",
+            "/debug/allocations/snapshots",
+            "/debug/allocations",
+        }
+        for route in routes:
+            assert not route.include_in_schema
+            assert debug.require_debug_access in [dependency.call for dependency in route.dependant.dependencies]
+
+
+class TestDebugEndpoints:
+    """Test cases for the profiling and allocation endpoints."""
+
+    async def test_profile(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a profile is returned as a collapsed-stack attachment."""
+        monkeypatch.setattr(debug, "profiler", SamplingProfiler(interval=0.001))
+
+        response = await debug.profile(seconds=0.05)
+
+        assert response.media_type == "text/plain"
+        assert response.headers["Content-Disposition"].endswith('.folded"')
+        assert int(response.headers["X-Profile-Samples"]) > 0
+        line = bytes(response.body).decode().splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("thread:")
+        assert int(count) > 0
+
+    async def test_profile_busy(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a second concurrent profile is refused with 409."""
+        monkeypatch.setattr(debug, "profiler", SamplingProfiler(interval=0.01))
+        first = asyncio.create_task(debug.profile(seconds=0.2))
+        await asyncio.sleep(0.02)
+
+        with pytest.raises(HTTPException) as raised:
+            await debug.profile(seconds=0.1)
+        assert raised.value.status_code == 409
+        await first
+
+    async def test_allocation_snapshots(self, tracker: AllocationTracker) -> None:
+        """Test that snapshots are numbered and compared, and unknown snapshots answer 404."""
+        first = await debug.take_allocation_snapshot(limit=5, compare_to=None)
+        second = await debug.take_allocation_snapshot(limit=5, compare_to=first.snapshot)
+
+        assert second.snapshot == first.snapshot + 1
+        assert second.compared_to == first.snapshot
+        with pytest.raises(HTTPException) as raised:
+            await debug.take_allocation_snapshot(limit=5, compare_to=99)
+        assert raised.value.status_code == 404
+
+        response = await debug.stop_allocation_tracing()
+        assert response.status_code == 204
+        assert not tracker.tracing
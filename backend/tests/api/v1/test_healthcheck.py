@@ -1,7 +1,13 @@
 """Tests for healthcheck endpoints."""
+import json
+import time
 from datetime import datetime
 
-from src.api.v1.healthcheck import ping
+import pytest
+
+from src.api.v1 import healthcheck
+from src.api.v1.healthcheck import live, metrics, ping, ready
+from src.core.health import DependencyStatus, HealthMonitor, PoolStatus
 
 
 class TestHealthCheck:
@@ -27,3 +33,84 @@ class TestHealthCheck:
         # This should not raise an exception if it's a valid ISO format
         parsed_time = datetime.fromisoformat(timestamp_part.replace("Z", "+00:00"))
         assert isinstance(parsed_time, datetime)
+
+    async def test_metrics(self) -> None:
+        """Test that event loop metrics are exported in the Prometheus format."""
+        response = await metrics()
+
+        assert response.media_type == "text/plain; version=0.0.4"
+        assert b"# TYPE boneca_event_loop_lag_seconds histogram" in response.body
+
+
+@pytest.fixture
+def monitor(monkeypatch: pytest.MonkeyPatch) -> HealthMonitor:
+    monitor = HealthMonitor()
+    monkeypatch.setattr(healthcheck, "health_monitor", monitor)
+    return monitor
+
+
+def checked(**changes: object) -> DependencyStatus:
+    values: dict = {
+        "checked_at": time.monotonic(),
+        "database_reachable": True,
+        "database_failures": 0,
+        "breaker_open": False,
+        "pool": PoolStatus(2, 15),
+        "migrations": "current",
+        "current_revisions": ("a2d8e4f1c937",),
+        "head_revisions": ("a2d8e4f1c937",),
+    }
+    return DependencyStatus(**{**values, **changes})
+
+
+class TestProbes:
+    """Test cases for the liveness and readiness probes."""
+
+    async def test_live(self, monitor: HealthMonitor) -> None:
+        """Test that liveness does not depend on the dependency checks or draining."""
+        monitor.drain()
+
+        assert await live() == {"status": "alive"}
+
+    async def test_starting(self, monitor: HealthMonitor) -> None:
+        """Test that the worker is not ready before the first dependency check."""
+        response = await ready()
+
+        assert response.status_code == 503
+        assert json.loads(response.body) == {"status": "starting", "reasons": ["dependencies not checked yet"]}
+
+    async def test_ready(self, monitor: HealthMonitor) -> None:
+        """Test that the latest dependency status is reported with 200 when ready."""
+        monitor.status = checked()
+
+        response = await ready()
+        body = json.loads(response.body)
+
+        assert response.status_code == 200
+        assert body["status"] == "ready"
+        assert body["database"] == {"reachable": True, "failures": 0, "breaker": "closed", "error": None}
+        assert body["pool"] == {"checked_out": 2, "capacity": 15, "saturation": 0.133}
+        assert body["migrations"] == {"state": "current", "current": ["a2d8e4f1c937"], "head": ["a2d8e4f1c937"]}
+        assert 0 <= body["checked_seconds_ago"] < 1
+
+    async def test_not_ready(self, monitor: HealthMonitor) -> None:
+        """Test that failed checks answer 503 with the reasons."""
+        monitor.status = checked(database_reachable=False, database_failures=3, breaker_open=True, pool=None)
+
+        response = await ready()
+        body = json.loads(response.body)
+
+        assert response.status_code == 503
+        assert body["reasons"] == ["database unreachable"]
+        assert body["database"]["breaker"] == "open"
+        assert body["pool"] is None
+
+    async def test_draining(self, monitor: HealthMonitor) -> None:
+        """Test that a draining worker answers 503 so load balancers stop routing to it."""
+        monitor.status = checked()
+        monitor.drain()
+
+        response = await ready()
+
+        assert response.status_code == 503
+        assert json.loads(response.body)["status"] == "draining"
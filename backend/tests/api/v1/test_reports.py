@@ -0,0 +1,67 @@
+"""Tests for report endpoints."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from src.api.v1.reports import (
+    ReportWindow,
+    export_attendance,
+    get_attendance_heatmap,
+    get_attendance_repository,
+    get_instructor_utilization,
+    get_report_schedule,
+    get_retention_report,
+)
+from src.core.database import metadata
+from src.domain.attendance.repository import AttendanceRepository
+from src.domain.classes.repository import ClassSeriesRepository
+from src.domain.classes.schedule import ClassSchedule
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def repository() -> AttendanceRepository:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine)
+    return AttendanceRepository(engine)
+
+
+class TestReportEndpoints:
+    """Test cases for report endpoints."""
+
+    async def test_reports(self, repository: AttendanceRepository) -> None:
+        """Test that every report runs over an empty window."""
+        window = ReportWindow(START, START + timedelta(days=31))
+
+        assert (await get_retention_report(window, repository)).months == ["2026-01"]
+        assert len((await get_attendance_heatmap(window, repository)).counts) == 7
+        schedule = ClassSchedule(ClassSeriesRepository(repository.engine))
+        assert await get_instructor_utilization(window, repository, schedule) == []
+
+        response = await export_attendance(window, repository)
+        assert response.media_type == "application/octet-stream"
+        assert 'filename="attendance-20260101-20260201.npz"' in response.headers["content-disposition"]
+
+    @pytest.mark.parametrize(
+        ("start", "end", "tz"),
+        [
+            (START.replace(tzinfo=None), START + timedelta(days=1), "UTC"),
+            (START, START, "UTC"),
+            (START, START + timedelta(days=400), "UTC"),
+            (START, START + timedelta(days=1), "Atlantis/Capital"),
+        ],
+    )
+    def test_invalid_window(self, start: datetime, end: datetime, tz: str) -> None:
+        """Test that invalid windows and time zones are rejected."""
+        with pytest.raises(HTTPException) as error:
+            ReportWindow(start, end, tz)
+        assert error.value.status_code == 422
+
+    def test_default_repository(self) -> None:
+        """Test that reports read from the attendance table."""
+        assert isinstance(get_attendance_repository(), AttendanceRepository)
+        assert isinstance(get_report_schedule(), ClassSchedule)
@@ -1,5 +1,6 @@
 """Tests for users endpoints."""
 from src.api.v1.users import create_user, get_user, list_users
+from src.core.response_cache import CachedResponse, response_cache
 from src.domain.users.schemas import UserCreate
 
 
@@ -47,3 +48,12 @@ class TestUsersEndpoints:
         assert "message" in response
         assert response["user_id"] == str(user_id)
         assert response["message"] == "User details would be here"
+
+    async def test_create_user_purges_cached_user_lists(self) -> None:
+        """Test creating a user drops cached user lists."""
+        response_cache.set(
+            (None, "/api/v1/users", "", ()), (), CachedResponse(200, [], b"", frozenset({"users"}), 0, 1e12)
+        )
+        await create_user(UserCreate(name="Test User"))
+
+        assert response_cache.get((None, "/api/v1/users", "", ())) is None
@@ -1,9 +1,15 @@
 """Test configuration and shared fixtures."""
 import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
 from typing import Generator
 
 import pytest
 
+from src.core.query_log import QueryLog, query_log
+
+pytest_plugins = ["pytester", "tests.plugins.database", "tests.plugins.loop_blocking", "tests.plugins.smtp_server"]
+
 
 @pytest.fixture(scope="session")
 def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
@@ -11,3 +17,22 @@ def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
     loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
+
+
+@pytest.fixture
+def assert_max_queries() -> Callable[[int], AbstractContextManager[QueryLog]]:
+    """Fail the test if a block issues more SQL statements than allowed.
+
+    Usage:
+        with assert_max_queries(2):
+            await list_users()
+    """
+
+    @contextmanager
+    def check(limit: int) -> Iterator[QueryLog]:
+        with query_log(route="test") as log:
+            yield log
+        statements = "\n".join(f"  {record.sql}" for record in log.records)
+        assert log.count <= limit, f"Expected at most {limit} queries, {log.count} were issued:\n{statements}"
+
+    return check
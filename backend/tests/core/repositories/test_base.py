@@ -1,4 +1,5 @@
 """Tests for the base repository."""
+from collections.abc import Sequence
 from uuid import UUID, uuid4
 
 import pytest
@@ -6,6 +7,8 @@ from pydantic import BaseModel
 
 from src.core.exceptions import EntityNotFoundError
 from src.core.repositories.base import BaseRepository
+from src.core.repositories.counts import Total, TotalMode
+from src.core.repositories.filters import Filters
 
 
 class TestEntity(BaseModel):
@@ -26,14 +29,28 @@ class TestRepository(BaseRepository[TestEntity]):
         """Disconnect from the repository."""
         pass
 
-    async def get(self, id: UUID) -> TestEntity:
+    async def get(self, id: UUID, *, include_deleted: bool = False) -> TestEntity:
         """Get an entity."""
         raise EntityNotFoundError("test", str(id))
 
-    async def list(self, *, filters: dict | None = None, offset: int = 0, limit: int = 100) -> list[TestEntity]:
+    async def list(
+        self,
+        *,
+        filters: Filters | None = None,
+        offset: int = 0,
+        limit: int = 100,
+        include_deleted: bool = False,
+        order_by: Sequence[str] = (),
+    ) -> list[TestEntity]:
         """List entities."""
         return []
 
+    async def count(
+        self, *, filters: Filters | None = None, include_deleted: bool = False, mode: TotalMode = TotalMode.EXACT
+    ) -> Total:
+        """Count entities."""
+        return Total(0, mode)
+
     async def create(self, entity: TestEntity) -> TestEntity:
         """Create an entity."""
         return entity
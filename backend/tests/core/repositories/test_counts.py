@@ -0,0 +1,164 @@
+"""Tests for list total counts."""
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import (
+    Column,
+    Engine,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    insert,
+    select,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.pool import StaticPool
+
+from src.core.repositories.counts import (
+    CountCache,
+    Total,
+    TotalMode,
+    count,
+    planner_estimate,
+)
+from src.core.tenancy import tenant_scope
+
+metadata = MetaData()
+seats = Table("seats", metadata, Column("id", Integer, primary_key=True), Column("row", Integer))
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(seats), [{"id": index, "row": index % 3} for index in range(25)])
+    return engine
+
+
+def postgres_connection() -> MagicMock:
+    connection = MagicMock()
+    connection.dialect = postgresql.dialect()
+    return connection
+
+
+class TestTotal:
+    """Test cases for rendering totals."""
+
+    @pytest.mark.parametrize(
+        ("total", "rendered"),
+        [
+            (Total(12, TotalMode.EXACT), "12"),
+            (Total(10000, TotalMode.CAPPED, capped=True), "10000+"),
+            (Total(12, TotalMode.CAPPED), "12"),
+            (Total(1234, TotalMode.ESTIMATE), "~1234"),
+        ],
+    )
+    def test_str(self, total: Total, rendered: str) -> None:
+        """Test that capped and estimated totals are marked."""
+        assert str(total) == rendered
+
+
+class TestCount:
+    """Test cases for counting statements."""
+
+    def test_exact_and_capped(self, engine: Engine) -> None:
+        """Test exact counts and counts stopping at the cap."""
+        cache = CountCache()
+        statement = select(seats.c.id).where(seats.c.row == 0).order_by(seats.c.id)
+        with engine.connect() as connection:
+            assert count(connection, statement, TotalMode.EXACT, cache=cache) == Total(9, TotalMode.EXACT)
+            assert count(connection, statement, TotalMode.CAPPED, cap=5, cache=cache) == Total(
+                5, TotalMode.CAPPED, capped=True
+            )
+            assert count(connection, statement, TotalMode.CAPPED, cap=9, cache=cache) == Total(9, TotalMode.CAPPED)
+
+    def test_estimate_falls_back_to_capped_count(self, engine: Engine) -> None:
+        """Test that databases without a planner estimate get a capped count."""
+        with engine.connect() as connection:
+            total = count(connection, select(seats.c.id), TotalMode.ESTIMATE, table_name="seats", cache=CountCache())
+        assert total == Total(25, TotalMode.CAPPED)
+
+    def test_cached_per_tenant_until_expiry(self, engine: Engine) -> None:
+        """Test that capped counts are served from the cache until the TTL passes."""
+        clock = FakeClock()
+        cache = CountCache(ttl=30, clock=clock)
+        statement = select(seats.c.id)
+        with engine.connect() as connection:
+            assert not count(connection, statement, TotalMode.CAPPED, cache=cache).cached
+            connection.execute(insert(seats).values(id=100, row=1))
+            assert count(connection, statement, TotalMode.CAPPED, cache=cache) == Total(
+                25, TotalMode.CAPPED, cached=True
+            )
+            with tenant_scope("salsa"):
+                assert count(connection, statement, TotalMode.CAPPED, cache=cache).value == 26
+            clock.now = 31
+            assert count(connection, statement, TotalMode.CAPPED, cache=cache) == Total(26, TotalMode.CAPPED)
+            assert count(connection, statement, TotalMode.EXACT, cache=cache) == Total(26, TotalMode.EXACT)
+        assert len(cache) == 2
+
+    def test_cache_eviction_and_disabling(self) -> None:
+        """Test LRU eviction and that a zero TTL stores nothing."""
+        cache = CountCache(ttl=30, max_entries=1)
+        first = (None, TotalMode.CAPPED, 10, "a", "[]")
+        cache.set(first, Total(1, TotalMode.CAPPED))
+        cache.set((None, TotalMode.CAPPED, 10, "b", "[]"), Total(2, TotalMode.CAPPED))
+        assert cache.get(first) is None
+        assert len(cache) == 1
+
+        disabled = CountCache(ttl=0)
+        disabled.set(first, Total(1, TotalMode.CAPPED))
+        assert len(disabled) == 0
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestPlannerEstimate:
+    """Test cases for PostgreSQL row estimates."""
+
+    def test_unfiltered_table_reads_reltuples(self) -> None:
+        """Test that unfiltered statements use the table statistics."""
+        connection = postgres_connection()
+        connection.scalar.return_value = 123456.0
+        assert planner_estimate(connection, select(seats.c.id), "seats") == 123456
+        assert connection.scalar.call_args.args[1] == {"name": "seats"}
+
+    def test_never_analyzed_table(self) -> None:
+        """Test that tables without statistics cannot be estimated."""
+        connection = postgres_connection()
+        connection.scalar.return_value = -1.0
+        assert planner_estimate(connection, select(seats.c.id), "seats") is None
+
+    def test_filtered_statement_is_explained(self) -> None:
+        """Test that filtered statements are estimated from their plan with bound parameters."""
+        connection = postgres_connection()
+        connection.exec_driver_sql.return_value.scalar_one.return_value = '[{"Plan": {"Plan Rows": 4242}}]'
+        statement = select(seats.c.id).where(seats.c.row.in_([1, 2]))
+
+        assert planner_estimate(connection, statement, None) == 4242
+        sql, parameters = connection.exec_driver_sql.call_args.args
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT seats.id")
+        assert "POSTCOMPILE" not in sql
+        assert sorted(parameters.values()) == [1, 2]
+
+    def test_estimate_mode_uses_planner(self) -> None:
+        """Test that estimates are returned and cached as such."""
+        connection = postgres_connection()
+        connection.scalar.return_value = 5000.0
+        cache = CountCache()
+        total = count(connection, select(seats.c.id), TotalMode.ESTIMATE, table_name="seats", cache=cache)
+        assert str(total) == "~5000"
+        assert count(connection, select(seats.c.id), TotalMode.ESTIMATE, table_name="seats", cache=cache).cached
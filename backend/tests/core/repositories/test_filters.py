@@ -0,0 +1,248 @@
+"""Tests for repository filter expressions."""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    Uuid,
+)
+from sqlalchemy.dialects import postgresql
+
+from src.core.exceptions import ValidationError
+from src.core.repositories.filters import (
+    MAX_IN_VALUES,
+    MAX_SORT_FIELDS,
+    And,
+    Eq,
+    In,
+    IsNull,
+    Or,
+    Prefix,
+    Range,
+    as_filter,
+    check_fields,
+    compile_filter,
+    equalities,
+    filter_parameters,
+    matches,
+    order_clauses,
+    parse_query,
+    prefix_columns,
+    shape,
+    sort_fields,
+)
+
+lessons = Table(
+    "lessons",
+    MetaData(),
+    Column("id", Uuid, primary_key=True),
+    Column("title", String),
+    Column("seats", Integer),
+    Column("starts_at", DateTime(timezone=True)),
+    Column("location", Text, index=True),
+    Index("ix_lessons_title", "title", postgresql_ops={"title": "text_pattern_ops"}),
+)
+
+FIELDS = ("id", "title", "seats", "starts_at")
+
+
+def compiled(expression: And | Or | Eq | In | Range | Prefix | IsNull) -> str:
+    return str(compile_filter(expression, lessons).compile(dialect=postgresql.dialect()))
+
+
+class TestCompileFilter:
+    """Test cases for compiling expressions to SQL."""
+
+    def test_values_are_bound_parameters(self) -> None:
+        """Test that values never end up in the SQL text."""
+        sql = compiled(And(Eq("title", "'; DROP TABLE lessons; --"), In("seats", (1, 2))))
+        assert "DROP" not in sql
+        assert sql == ("lessons.title = %(title_1)s AND lessons.seats IN (__[POSTCOMPILE_seats_1])")
+
+    def test_range_and_or(self) -> None:
+        """Test that ranges only compile their set bounds and Or combines clauses."""
+        sql = compiled(Or(Range("seats", gte=1, lt=10), IsNull("starts_at")))
+        assert sql == ("lessons.seats >= %(seats_1)s AND lessons.seats < %(seats_2)s OR lessons.starts_at IS NULL")
+
+    def test_prefix_escapes_wildcards(self) -> None:
+        """Test that LIKE wildcards in a prefix match literally."""
+        expression = compile_filter(Prefix("title", "50%_"), lessons)
+        assert expression.compile().params["title_1"] == "50/%/_"
+        assert compiled(IsNull("title", is_null=False)) == "lessons.title IS NOT NULL"
+
+    def test_bound_parameters_depend_on_shape_only(self) -> None:
+        """Test that expressions of one shape compile to the same SQL with named parameters."""
+        first = And(Eq("title", "Salsa"), In("seats", (1, 2)), Range("seats", gte=1, lt=9), Prefix("title", "5%"))
+        second = And(Eq("title", "Tango"), In("seats", (3, 4)), Range("seats", gte=2, lt=8), Prefix("title", "Ta"))
+        parameters: dict[str, object] = {}
+        sql = str(compile_filter(first, lessons, parameters).compile(dialect=postgresql.dialect()))
+
+        assert shape(first) == shape(second)
+        assert sql == str(compile_filter(second, lessons, {}).compile(dialect=postgresql.dialect()))
+        assert sql == (
+            "lessons.title = %(filter_0)s AND lessons.seats IN (%(filter_1)s, %(filter_2)s) "
+            "AND lessons.seats >= %(filter_3)s AND lessons.seats < %(filter_4)s "
+            "AND lessons.title LIKE %(filter_5)s ESCAPE '/'"
+        )
+        assert (
+            parameters
+            == filter_parameters(first)
+            == {
+                "filter_0": "Salsa",
+                "filter_1": 1,
+                "filter_2": 2,
+                "filter_3": 1,
+                "filter_4": 9,
+                "filter_5": "5/%%",
+            }
+        )
+
+    def test_shapes_that_change_the_sql(self) -> None:
+        """Test that null comparisons, list lengths and set bounds are part of the shape."""
+        assert shape(Eq("title", None)) != shape(Eq("title", "Salsa"))
+        assert shape(In("seats", (1,))) != shape(In("seats", (1, 2)))
+        assert shape(In("seats", (1, 2, 3))) == shape(In("seats", (1, 2, 3, 4)))
+        assert filter_parameters(In("seats", (1, 2, 3))) == {"filter_0": 1, "filter_1": 2, "filter_2": 3, "filter_3": 3}
+        assert shape(Range("seats", gte=1)) != shape(Range("seats", lte=1))
+        assert shape(And(Eq("seats", 1))) != shape(Or(Eq("seats", 1)))
+        assert str(compile_filter(Eq("title", None), lessons, {})) == "lessons.title IS NULL"
+        assert str(compile_filter(In("seats", ()), lessons, {})) == "false"
+        assert filter_parameters(And(Eq("title", None), IsNull("seats"))) == {}
+
+
+class TestMatches:
+    """Test cases for evaluating expressions in memory."""
+
+    def test_all_conditions(self) -> None:
+        """Test every condition against an object."""
+        lesson = SimpleNamespace(title="Salsa", seats=5, starts_at=None)
+        assert matches(And(Eq("title", "Salsa"), In("seats", (4, 5)), Prefix("title", "Sal")), lesson)
+        assert matches(Or(Range("seats", gt=5), IsNull("starts_at")), lesson)
+        assert matches(Range("seats", gte=5, lte=5), lesson)
+        assert not matches(Range("seats", lt=5), lesson)
+        assert not matches(Range("starts_at", gte=0), lesson)
+        assert not matches(Or(), lesson)
+        assert matches(And(), lesson)
+
+
+class TestParseQuery:
+    """Test cases for building filters from query parameters."""
+
+    def test_lookups_and_conversion(self) -> None:
+        """Test that every lookup is parsed and values get their column type."""
+        lesson_id = uuid4()
+        expression = parse_query(
+            [
+                ("id", str(lesson_id)),
+                ("seats__in", "1,2"),
+                ("starts_at__gte", "2026-01-05T10:00:00Z"),
+                ("seats__lt", "9"),
+                ("title__prefix", "Kiz"),
+                ("starts_at__isnull", "false"),
+                ("limit", "10"),
+            ],
+            lessons,
+            FIELDS,
+            "lesson",
+        )
+        assert expression == And(
+            Eq("id", lesson_id),
+            In("seats", (1, 2)),
+            Range("starts_at", gte=datetime(2026, 1, 5, 10, tzinfo=timezone.utc)),
+            Range("seats", lt=9),
+            Prefix("title", "Kiz"),
+            IsNull("starts_at", is_null=False),
+        )
+
+    def test_errors_are_collected(self) -> None:
+        """Test that unfilterable fields, unknown lookups and invalid values are all reported."""
+        with pytest.raises(ValidationError) as error:
+            parse_query(
+                [("location", "Porto"), ("seats__like", "1"), ("seats", "many")],
+                lessons,
+                FIELDS,
+                "lesson",
+            )
+        assert set(error.value.details["errors"]) == {"location", "seats__like", "seats"}
+        assert error.value.details["errors"]["location"] == "not filterable"
+
+    def test_prefix_needs_an_indexed_text_field(self) -> None:
+        """Test that prefixes on non-text fields or without a pattern index are rejected."""
+        with pytest.raises(ValidationError) as error:
+            parse_query(
+                [("id__prefix", "0f"), ("seats__prefix", "1"), ("location__prefix", "Por")],
+                lessons,
+                (*FIELDS, "location"),
+                "lesson",
+            )
+        assert error.value.details["errors"] == {
+            "id__prefix": "prefix only applies to text fields",
+            "seats__prefix": "prefix only applies to text fields",
+            "location__prefix": "prefix needs a text field with a pattern index",
+        }
+
+    def test_prefix_columns(self) -> None:
+        """Test that only text columns leading a pattern index or with a bytewise collation are prefixable."""
+        table = Table(
+            "studios",
+            MetaData(),
+            Column("id", Uuid, primary_key=True),
+            Column("code", String(8, collation="C"), unique=True),
+            Column("name", String, index=True),
+        )
+        assert prefix_columns(lessons) == {"title"}
+        assert prefix_columns(table) == {"code"}
+
+    def test_in_is_bounded(self) -> None:
+        """Test that overly long IN lists are rejected."""
+        values = ",".join(str(index) for index in range(MAX_IN_VALUES + 1))
+        with pytest.raises(ValidationError):
+            parse_query([("seats__in", values)], lessons, FIELDS, "lesson")
+
+
+class TestHelpers:
+    """Test cases for expression helpers."""
+
+    def test_as_filter_and_equalities(self) -> None:
+        """Test that dictionaries become conjunctions of equalities and back."""
+        expression = as_filter({"title": "Salsa", "seats": 5})
+        assert expression == And(Eq("title", "Salsa"), Eq("seats", 5))
+        assert equalities(expression) == {"title": "Salsa", "seats": 5}
+        assert equalities(And(Eq("title", "Salsa"), Prefix("title", "S"))) is None
+        assert as_filter(None) == And()
+
+    def test_check_fields_walks_nested_clauses(self) -> None:
+        """Test that fields inside Or clauses are checked too."""
+        with pytest.raises(ValidationError) as error:
+            check_fields(Or(Eq("title", "a"), And(Eq("seats", 1))), ("title",), "lesson")
+        assert error.value.details["errors"] == {"seats": "not filterable"}
+
+    def test_order_clauses(self) -> None:
+        """Test that the ID is always the final sort key."""
+        clauses = order_clauses(lessons, ["-starts_at"], FIELDS, "lesson")
+        assert [str(clause) for clause in clauses] == ["lessons.starts_at DESC", "lessons.id ASC"]
+        assert [str(clause) for clause in order_clauses(lessons, ["-id"], FIELDS, "lesson")] == ["lessons.id DESC"]
+        with pytest.raises(ValidationError):
+            order_clauses(lessons, ["location"], FIELDS, "lesson")
+
+    def test_sort_fields(self) -> None:
+        """Test that orders sorting the same are spelled the same and long orders are refused."""
+        assert sort_fields(["-starts_at", "title", "starts_at", "-id"], FIELDS, "lesson") == (
+            "-starts_at",
+            "title",
+            "-id",
+        )
+        assert sort_fields(["-id", "title"], FIELDS, "lesson") == sort_fields(["title", "-id"], FIELDS, "lesson")
+        assert sort_fields([], FIELDS, "lesson") == ("id",)
+        with pytest.raises(ValidationError) as error:
+            sort_fields(["a", "b", "c", "d", "e"], "abcde", "lesson")
+        assert error.value.details["errors"] == {"order_by": f"at most {MAX_SORT_FIELDS} fields"}
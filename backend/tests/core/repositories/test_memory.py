@@ -0,0 +1,211 @@
+"""Tests for the in-memory repository."""
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID, uuid4
+
+import pytest
+from pydantic import BaseModel
+
+from src.core.exceptions import (
+    EntityConflictError,
+    EntityNotFoundError,
+    ValidationError,
+)
+from src.core.repositories.counts import Total, TotalMode
+from src.core.repositories.filters import Eq, In, Or, Prefix
+from src.core.repositories.memory import InMemoryRepository
+
+
+class Student(BaseModel):
+    """Entity used by the in-memory repository tests."""
+
+    id: UUID
+    email: str
+    level: str
+    active: bool = True
+    deleted_at: Optional[datetime] = None
+
+
+class StudentRepository(InMemoryRepository[Student]):
+    """Repository with one indexed and one unique field."""
+
+    model = Student
+    entity_type = "student"
+    indexed_fields = ("level",)
+    unique_fields = ("email",)
+
+
+def student(email: str, level: str = "beginner", active: bool = True) -> Student:
+    return Student(id=uuid4(), email=email, level=level, active=active)
+
+
+@pytest.fixture
+def repo() -> StudentRepository:
+    return StudentRepository(
+        [
+            student("ana@example.com"),
+            student("bia@example.com", level="advanced"),
+            student("caio@example.com", active=False),
+        ]
+    )
+
+
+async def test_create_and_get(repo: StudentRepository) -> None:
+    """Test storing and retrieving an entity."""
+    new = student("dora@example.com")
+    async with repo:
+        await repo.create(new)
+        assert await repo.get(new.id) == new
+    assert len(repo) == 4
+
+
+async def test_get_not_found(repo: StudentRepository) -> None:
+    """Test that a missing entity raises EntityNotFoundError."""
+    with pytest.raises(EntityNotFoundError):
+        await repo.get(uuid4())
+
+
+async def test_returned_entities_are_copies(repo: StudentRepository) -> None:
+    """Test that mutating a returned entity does not corrupt the indexes."""
+    (ana,) = await repo.list(filters={"email": "ana@example.com"})
+    ana.level = "advanced"
+    assert len(await repo.list(filters={"level": "advanced"})) == 1
+
+
+async def test_list_uses_indexes_and_remaining_filters(repo: StudentRepository) -> None:
+    """Test combining indexed and non-indexed filters."""
+    beginners = await repo.list(filters={"level": "beginner"})
+    assert [s.email for s in beginners] == ["ana@example.com", "caio@example.com"]
+
+    active_beginners = await repo.list(filters={"level": "beginner", "active": True})
+    assert [s.email for s in active_beginners] == ["ana@example.com"]
+
+    assert await repo.list(filters={"level": "intermediate"}) == []
+
+
+async def test_list_without_indexed_filter_scans(repo: StudentRepository) -> None:
+    """Test filtering on a non-indexed field and pagination."""
+    assert [s.email for s in await repo.list(filters={"active": False})] == ["caio@example.com"]
+    assert len(await repo.list()) == 3
+    assert [s.email for s in await repo.list(offset=1, limit=1)] == ["bia@example.com"]
+
+
+async def test_list_unknown_filter(repo: StudentRepository) -> None:
+    """Test that filtering on an unknown field is rejected."""
+    with pytest.raises(ValidationError):
+        await repo.list(filters={"colour": "red"})
+
+
+async def test_count(repo: StudentRepository) -> None:
+    """Test that every mode counts exactly in memory."""
+    assert await repo.count(filters={"level": "beginner"}, mode=TotalMode.ESTIMATE) == Total(2, TotalMode.EXACT)
+    with pytest.raises(ValidationError):
+        await repo.count(filters={"colour": "red"})
+
+
+async def test_list_filter_expressions_and_order(repo: StudentRepository) -> None:
+    """Test filter expressions on any field and sorting in memory."""
+    found = await repo.list(filters=Or(Prefix("email", "bi"), Eq("active", False)), order_by=["-email"])
+    assert [s.email for s in found] == ["caio@example.com", "bia@example.com"]
+    ordered = await repo.list(filters=In("level", ("beginner", "advanced")), order_by=["level", "-email"])
+    assert [s.email for s in ordered] == ["bia@example.com", "caio@example.com", "ana@example.com"]
+    with pytest.raises(ValidationError):
+        await repo.list(order_by=["colour"])
+
+
+async def test_unique_constraint_on_create(repo: StudentRepository) -> None:
+    """Test that duplicate unique values raise EntityConflictError."""
+    with pytest.raises(EntityConflictError) as exc_info:
+        await repo.create(student("ana@example.com"))
+    assert exc_info.value.details["field"] == "email"
+
+
+async def test_duplicate_id_on_create(repo: StudentRepository) -> None:
+    """Test that duplicate IDs raise EntityConflictError."""
+    (ana,) = await repo.list(filters={"email": "ana@example.com"})
+    with pytest.raises(EntityConflictError) as exc_info:
+        await repo.create(ana.model_copy(update={"email": "other@example.com"}))
+    assert exc_info.value.details["field"] == "id"
+
+
+async def test_update_reindexes(repo: StudentRepository) -> None:
+    """Test that updates move the entity between index buckets."""
+    (ana,) = await repo.list(filters={"email": "ana@example.com"})
+    updated = await repo.update(ana.id, Student(id=uuid4(), email="ana@example.com", level="advanced"))
+
+    assert updated.id == ana.id
+    assert [s.email for s in await repo.list(filters={"level": "advanced"})] == ["ana@example.com", "bia@example.com"]
+    assert [s.email for s in await repo.list(filters={"level": "beginner"})] == ["caio@example.com"]
+
+
+async def test_update_keeps_insertion_order(repo: StudentRepository) -> None:
+    """Test that filtered listings stay in insertion order after entities move between index buckets."""
+    ana, bia, caio = await repo.list()
+    await repo.update(caio.id, caio.model_copy(update={"level": "advanced"}))
+    await repo.update(ana.id, ana.model_copy(update={"level": "advanced"}))
+
+    everyone = [s.email for s in await repo.list()]
+    advanced = [s.email for s in await repo.list(filters={"level": "advanced"})]
+    assert everyone == ["ana@example.com", "bia@example.com", "caio@example.com"]
+    assert advanced == everyone
+    assert [s.email for s in await repo.list(filters={"level": "advanced"}, offset=1, limit=1)] == ["bia@example.com"]
+
+
+async def test_update_unique_conflict(repo: StudentRepository) -> None:
+    """Test that an update cannot take another entity's unique value."""
+    (ana,) = await repo.list(filters={"email": "ana@example.com"})
+    with pytest.raises(EntityConflictError):
+        await repo.update(ana.id, ana.model_copy(update={"email": "bia@example.com"}))
+    assert (await repo.get(ana.id)).email == "ana@example.com"
+
+
+async def test_update_not_found(repo: StudentRepository) -> None:
+    """Test that updating a missing entity raises EntityNotFoundError."""
+    missing = student("x@example.com")
+    with pytest.raises(EntityNotFoundError):
+        await repo.update(missing.id, missing)
+
+
+async def test_delete_releases_unique_value(repo: StudentRepository) -> None:
+    """Test that deleting an entity frees its unique values."""
+    (ana,) = await repo.list(filters={"email": "ana@example.com"})
+    await repo.delete(ana.id)
+
+    with pytest.raises(EntityNotFoundError):
+        await repo.delete(ana.id)
+    await repo.create(student("ana@example.com"))
+    assert len(repo) == 3
+
+
+async def test_clear(repo: StudentRepository) -> None:
+    """Test removing all entities."""
+    repo.clear()
+    assert len(repo) == 0
+    assert await repo.list(filters={"level": "beginner"}) == []
+
+
+async def test_soft_delete(repo: StudentRepository) -> None:
+    """Test that soft-deleting repositories keep deleted entities out of reads."""
+
+    class SoftStudentRepository(StudentRepository):
+        soft_delete_field = "deleted_at"
+
+    soft = SoftStudentRepository(await repo.list())
+    ana = (await soft.list(filters={"email": "ana@example.com"}))[0]
+    await soft.delete(ana.id)
+
+    assert len(soft) == 3
+    assert ana.id not in {entity.id for entity in await soft.list()}
+    assert len(await soft.list(include_deleted=True)) == 3
+    with pytest.raises(EntityNotFoundError):
+        await soft.get(ana.id)
+    assert (await soft.get(ana.id, include_deleted=True)).deleted_at is not None
+    with pytest.raises(EntityNotFoundError):
+        await soft.delete(ana.id)
+    with pytest.raises(EntityNotFoundError):
+        await soft.update(ana.id, ana)
+    assert (await soft.get(ana.id, include_deleted=True)).deleted_at is not None
+
+    bruno = (await soft.list())[0]
+    await soft.update(bruno.id, bruno.model_copy(update={"deleted_at": datetime.now(timezone.utc)}))
+    assert (await soft.get(bruno.id)).deleted_at is None
@@ -0,0 +1,365 @@
+"""Tests for the SQL base repository."""
+from datetime import datetime, timezone
+from typing import Optional
+from unittest.mock import patch
+from uuid import UUID, uuid4
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Engine,
+    Index,
+    MetaData,
+    String,
+    Table,
+    Uuid,
+    create_engine,
+    insert,
+)
+from sqlalchemy.pool import StaticPool
+
+from src.core.archive import archive_table
+from src.core.deadlines import deadline_scope
+from src.core.exceptions import (
+    ConfigurationError,
+    DeadlineExceededError,
+    EntityConflictError,
+    EntityNotFoundError,
+    RepositoryError,
+    ValidationError,
+)
+from src.core.repositories.counts import Total, TotalMode, count_cache
+from src.core.repositories.filters import In, Or, Prefix
+from src.core.repositories.sql import SQLRepository, indexed_columns
+from src.core.repositories.statements import StaleStatementError, StatementCache
+
+metadata = MetaData()
+things = Table(
+    "things",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("name", String, nullable=False, unique=True),
+    Index("ix_things_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+)
+
+studios = Table(
+    "studios",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("deleted_at", DateTime(timezone=True), nullable=True),
+    Index("ix_studios_name", "name", postgresql_ops={"name": "text_pattern_ops"}),
+)
+studios_archive = archive_table(studios)
+
+
+class Thing(BaseModel):
+    """Entity stored in the things table."""
+
+    id: UUID
+    name: str
+
+
+class ThingRepository(SQLRepository[Thing]):
+    """Repository for things."""
+
+    table = things
+    model = Thing
+    entity_type = "thing"
+    filterable_fields = ("name",)
+    sortable_fields = ("name",)
+
+
+class Studio(BaseModel):
+    """Entity stored in the soft-deleting studios table."""
+
+    id: UUID
+    name: str
+    deleted_at: Optional[datetime] = None
+
+
+class StudioRepository(SQLRepository[Studio]):
+    """Repository with soft deletes and an archive."""
+
+    table = studios
+    model = Studio
+    entity_type = "studio"
+    soft_delete_column = "deleted_at"
+    archive = studios_archive
+    filterable_fields = ("name",)
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine)
+    count_cache.clear()
+    return engine
+
+
+@pytest.fixture
+def repo(engine: Engine) -> ThingRepository:
+    return ThingRepository(engine)
+
+
+async def test_create_and_get(repo: ThingRepository) -> None:
+    """Test inserting and reading back an entity."""
+    thing = Thing(id=uuid4(), name="barre")
+    async with repo:
+        await repo.create(thing)
+        assert await repo.get(thing.id) == thing
+
+
+async def test_get_not_found(repo: ThingRepository) -> None:
+    """Test that a missing entity raises EntityNotFoundError."""
+    with pytest.raises(EntityNotFoundError):
+        await repo.get(uuid4())
+
+
+async def test_create_conflict(repo: ThingRepository) -> None:
+    """Test that unique violations raise EntityConflictError."""
+    await repo.create(Thing(id=uuid4(), name="barre"))
+    with pytest.raises(EntityConflictError):
+        await repo.create(Thing(id=uuid4(), name="barre"))
+
+
+async def test_list_filters_and_paginates(repo: ThingRepository) -> None:
+    """Test equality filters and pagination."""
+    for name in ["a", "b", "c"]:
+        await repo.create(Thing(id=uuid4(), name=name))
+
+    assert [thing.name for thing in await repo.list(filters={"name": "b"})] == ["b"]
+    assert len(await repo.list(limit=2)) == 2
+    assert len(await repo.list(offset=2)) == 1
+
+
+async def test_statements_are_cached_by_query_shape(engine: Engine) -> None:
+    """Test that queries of one shape reuse a statement and bind their values."""
+    statements = StatementCache()
+    repo = ThingRepository(engine, statements)
+    things = [Thing(id=uuid4(), name=name) for name in ["a", "b", "c"]]
+    for thing in things:
+        await repo.create(thing)
+
+    assert [await repo.get(thing.id) for thing in things] == things
+    assert [thing.name for thing in await repo.list(filters={"name": "a"})] == ["a"]
+    assert [thing.name for thing in await repo.list(filters={"name": "c"}, limit=1)] == ["c"]
+    assert [thing.name for thing in await repo.list(filters=Prefix("name", "b"))] == ["b"]
+    assert (statements.misses, statements.hits) == (3, 3)
+
+    ids = tuple(thing.id for thing in things)
+    assert {thing.name for thing in await repo.list(filters=In("id", ids))} == {"a", "b", "c"}
+    assert [thing.name for thing in await repo.list(filters=In("id", ids[1:]), order_by=["-name", "name"])] == [
+        "c",
+        "b",
+    ]
+    assert [thing.name for thing in await repo.list(filters=In("id", ids[:2]), order_by=["-name"])] == ["b", "a"]
+    assert (statements.misses, statements.hits) == (5, 4)
+
+
+async def test_stale_prepared_statement_retries_transaction(repo: ThingRepository) -> None:
+    """Test that a transaction rejected for a stale prepared statement runs once more."""
+    calls = []
+
+    def operation(connection: object) -> str:
+        calls.append(connection)
+        if len(calls) == 1:
+            raise StaleStatementError("repo_0")
+        return "done"
+
+    assert await repo.run(operation) == "done"
+    assert len(calls) == 2
+
+
+async def test_list_unknown_filter(repo: ThingRepository) -> None:
+    """Test that filtering on an unknown column is rejected."""
+    with pytest.raises(ValidationError):
+        await repo.list(filters={"colour": "red"})
+
+
+async def test_list_filter_expressions_and_order(repo: ThingRepository) -> None:
+    """Test typed filter expressions and sorting by a sortable field."""
+    for name in ["salsa", "samba", "tango", "100%"]:
+        await repo.create(Thing(id=uuid4(), name=name))
+
+    found = await repo.list(filters=Or(Prefix("name", "sa"), In("name", ("tango",))), order_by=["-name"])
+    assert [thing.name for thing in found] == ["tango", "samba", "salsa"]
+    assert [thing.name for thing in await repo.list(filters=Prefix("name", "1%"))] == []
+    with pytest.raises(ValidationError):
+        await repo.list(order_by=["colour"])
+
+
+async def test_count(engine: Engine) -> None:
+    """Test that counts apply the filters and skip soft-deleted rows."""
+    repo = StudioRepository(engine)
+    studios = [Studio(id=uuid4(), name=name) for name in ["Graça", "Alfama", "Belém"]]
+    for studio in studios:
+        await repo.create(studio)
+    await repo.delete(studios[0].id)
+
+    assert await repo.count() == Total(2, TotalMode.EXACT)
+    assert await repo.count(include_deleted=True) == Total(3, TotalMode.EXACT)
+    assert (await repo.count(filters=Prefix("name", "A"), mode=TotalMode.CAPPED)).value == 1
+    assert (await ThingRepository(engine).count(mode=TotalMode.ESTIMATE)).value == 0
+
+
+async def test_unfiltered_estimate_reads_table_statistics(engine: Engine) -> None:
+    """Test that only estimates leaving no row out use the table statistics."""
+    repo = StudioRepository(engine)
+    with patch("src.core.repositories.sql.count_rows", return_value=Total(0, TotalMode.ESTIMATE)) as counter:
+        await repo.count(mode=TotalMode.ESTIMATE, include_deleted=True)
+        await repo.count(mode=TotalMode.ESTIMATE)
+        await repo.count(filters=Prefix("name", "A"), mode=TotalMode.ESTIMATE, include_deleted=True)
+
+    everything, live, filtered = counter.call_args_list
+    assert everything.kwargs["table_name"] == "studios"
+    assert live.kwargs["table_name"] is None
+    assert live.kwargs["statement"].whereclause is not None
+    assert filtered.kwargs["table_name"] is None
+
+
+async def test_list_rejects_unindexed_filter(engine: Engine) -> None:
+    """Test that existing but unindexed columns cannot be filtered on."""
+    with pytest.raises(ValidationError) as error:
+        await StudioRepository(engine).list(filters={"deleted_at": None})
+    assert error.value.details["errors"] == {"deleted_at": "not filterable"}
+
+
+async def test_prefix_needs_a_pattern_index(engine: Engine) -> None:
+    """Test that prefixes are refused on columns whose index cannot serve LIKE 'value%'."""
+
+    class ClassRepository(SQLRepository[Thing]):
+        """Repository whose text column has a plain index."""
+
+        table = Table("classes", MetaData(), Column("id", Uuid, primary_key=True), Column("name", String, index=True))
+        model = Thing
+        entity_type = "class"
+        filterable_fields = ("name",)
+
+    with pytest.raises(ValidationError) as error:
+        await ClassRepository(engine).list(filters=Prefix("name", "b"))
+    assert error.value.details["errors"] == {"name": "prefix needs a text field with a pattern index"}
+    with pytest.raises(ValidationError):
+        await ThingRepository(engine).count(filters=Prefix("id", "0"))
+
+
+def test_unindexed_declarations_are_rejected() -> None:
+    """Test that declaring an unindexed filterable field fails at class definition."""
+    assert indexed_columns(studios) == {"id", "name"}
+    with pytest.raises(ConfigurationError):
+
+        class BadRepository(SQLRepository[Studio]):
+            """Repository filtering on an unindexed column."""
+
+            table = studios
+            model = Studio
+            sortable_fields = ("deleted_at",)
+
+
+async def test_update_and_delete(repo: ThingRepository) -> None:
+    """Test updating and deleting an entity."""
+    thing = Thing(id=uuid4(), name="barre")
+    await repo.create(thing)
+
+    await repo.update(thing.id, Thing(id=thing.id, name="pointe"))
+    assert (await repo.get(thing.id)).name == "pointe"
+
+    await repo.delete(thing.id)
+    with pytest.raises(EntityNotFoundError):
+        await repo.get(thing.id)
+
+
+async def test_update_and_delete_not_found(repo: ThingRepository) -> None:
+    """Test that updating or deleting a missing entity raises EntityNotFoundError."""
+    missing = uuid4()
+    with pytest.raises(EntityNotFoundError):
+        await repo.update(missing, Thing(id=missing, name="x"))
+    with pytest.raises(EntityNotFoundError):
+        await repo.delete(missing)
+
+
+async def test_expired_deadline_skips_query(repo: ThingRepository) -> None:
+    """Test that no statement is run once the request deadline has passed."""
+    with deadline_scope(0), pytest.raises(DeadlineExceededError):
+        await repo.list()
+
+
+async def test_batches_use_keyset_pagination(repo: ThingRepository) -> None:
+    """Test iterating over all rows in batches ordered by ID."""
+    things = [Thing(id=uuid4(), name=f"style {index}") for index in range(5)]
+    for thing in things:
+        await repo.create(thing)
+
+    batches = [batch async for batch in repo.batches(batch_size=2)]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [thing.id for batch in batches for thing in batch] == sorted(thing.id for thing in things)
+    assert [batch async for batch in repo.batches(filters={"name": "tango"})] == []
+
+
+async def test_update_many(repo: ThingRepository) -> None:
+    """Test updating many rows with one statement."""
+    things = [Thing(id=uuid4(), name=f"style {index}") for index in range(3)]
+    for thing in things:
+        await repo.create(thing)
+
+    await repo.update_many([{"id": thing.id, "name": f"renamed {thing.name}"} for thing in things[:2]])
+    await repo.update_many([])
+    assert [(await repo.get(thing.id)).name for thing in things] == ["renamed style 0", "renamed style 1", "style 2"]
+
+
+async def test_soft_delete_hides_entity(engine: Engine) -> None:
+    """Test that soft-deleted entities are kept but excluded from reads by default."""
+    repo = StudioRepository(engine)
+    kept, deleted = Studio(id=uuid4(), name="Alfama"), Studio(id=uuid4(), name="Baixa")
+    await repo.create(kept)
+    await repo.create(deleted)
+    await repo.delete(deleted.id)
+
+    assert await repo.list() == [kept]
+    assert len(await repo.list(include_deleted=True)) == 2
+    assert [entity for batch in [b async for b in repo.batches()] for entity in batch] == [kept]
+    with pytest.raises(EntityNotFoundError):
+        await repo.get(deleted.id)
+    stamped = await repo.get(deleted.id, include_deleted=True)
+    assert stamped.deleted_at is not None
+    with pytest.raises(EntityNotFoundError):
+        await repo.delete(deleted.id)
+    with pytest.raises(EntityNotFoundError):
+        await repo.update(deleted.id, deleted.model_copy(update={"name": "Baixa Chiado"}))
+    assert await repo.get(deleted.id, include_deleted=True) == stamped
+
+    await repo.update(kept.id, kept.model_copy(update={"deleted_at": datetime.now(timezone.utc)}))
+    assert await repo.get(kept.id) == kept
+
+    await repo.restore(deleted.id)
+    assert await repo.get(deleted.id) == deleted
+    with pytest.raises(EntityNotFoundError):
+        await repo.restore(deleted.id)
+
+
+async def test_archived_entities_are_read_explicitly(engine: Engine) -> None:
+    """Test reading rows moved to the archive table."""
+    repo = StudioRepository(engine)
+    studio = Studio(id=uuid4(), name="Graça", deleted_at=datetime(2020, 1, 1, tzinfo=timezone.utc))
+    with engine.begin() as connection:
+        connection.execute(
+            insert(studios_archive).values(**studio.model_dump(), archived_at=datetime.now(timezone.utc))
+        )
+
+    archived = await repo.get_archived(studio.id)
+    assert (archived.id, archived.name) == (studio.id, studio.name)
+    assert [entity.id for entity in await repo.list_archived(filters={"name": "Graça"})] == [studio.id]
+    with pytest.raises(EntityNotFoundError):
+        await repo.get_archived(uuid4())
+    with pytest.raises(EntityNotFoundError):
+        await repo.get(studio.id, include_deleted=True)
+
+
+async def test_archive_and_restore_need_support(repo: ThingRepository) -> None:
+    """Test that repositories without archive or soft deletes reject those operations."""
+    with pytest.raises(RepositoryError):
+        await repo.list_archived()
+    with pytest.raises(RepositoryError):
+        await repo.restore(uuid4())
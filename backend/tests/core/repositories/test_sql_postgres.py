@@ -0,0 +1,80 @@
+"""Tests for SQL repositories on PostgreSQL.
+
+They run on the migrated test database (see ``tests.plugins.database``) and are
+skipped when no PostgreSQL server is available.
+"""
+from datetime import datetime, timezone
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import Engine, text
+
+from src.core.exceptions import EntityConflictError
+from src.core.repositories.statements import PREPARED_KEY, StatementCache
+from src.domain.classes.repository import ClassSeriesRepository
+from src.domain.classes.schemas import ClassSeries
+
+
+def series(**changes: Any) -> ClassSeries:
+    values: dict[str, Any] = {
+        "id": uuid4(),
+        "title": "Salsa",
+        "studio_id": uuid4(),
+        "instructor_id": uuid4(),
+        "starts_at": datetime(2026, 11, 2, 19, tzinfo=timezone.utc),
+        "duration_minutes": 60,
+        "recurrence": "RRULE:FREQ=WEEKLY;BYDAY=MO",
+        "updated_at": datetime(2026, 10, 19, tzinfo=timezone.utc),
+    }
+    return ClassSeries(**{**values, **changes})
+
+
+@pytest.fixture
+def repo(db_engine: Engine) -> ClassSeriesRepository:
+    return ClassSeriesRepository(db_engine, StatementCache())
+
+
+class TestTransactionIsolation:
+    """Test cases for the per-test transaction of the database plugin."""
+
+    @pytest.mark.parametrize("run", [1, 2])
+    async def test_changes_do_not_outlive_the_test(self, repo: ClassSeriesRepository, run: int) -> None:
+        """Test that every run starts from the migrated, empty schema."""
+        assert await repo.list() == []
+        created = await repo.create(series(title=f"Salsa {run}"))
+        assert await repo.get(created.id) == created
+
+    async def test_failed_transaction_keeps_earlier_commits(self, repo: ClassSeriesRepository) -> None:
+        """Test that a failing transaction only rolls back to its own savepoint."""
+        created = await repo.create(series())
+        with pytest.raises(EntityConflictError):
+            await repo.create(created)
+
+        assert await repo.list() == [created]
+
+
+class TestPreparedStatements:
+    """Test cases for prepared repository statements on PostgreSQL."""
+
+    async def test_statements_are_prepared_once(self, db_engine: Engine, repo: ClassSeriesRepository) -> None:
+        """Test that repeated queries of one shape reuse the prepared statement."""
+        first, second = series(), series()
+        await repo.create(first)
+        await repo.create(second)
+
+        assert await repo.get(first.id) == first
+        assert await repo.get(second.id) == second
+        assert await repo.list(filters={"studio_id": second.studio_id}) == [second]
+        with db_engine.connect() as connection:
+            assert len(connection.info[PREPARED_KEY]) == 2
+
+    async def test_schema_change_reprepares(self, db_engine: Engine, repo: ClassSeriesRepository) -> None:
+        """Test that a statement whose result type changed is prepared again transparently."""
+        created = await repo.create(series(location="Studio 1"))
+        assert await repo.get(created.id) == created
+
+        with db_engine.begin() as connection:
+            connection.execute(text("ALTER TABLE class_series ALTER COLUMN location TYPE text"))
+
+        assert await repo.get(created.id) == created
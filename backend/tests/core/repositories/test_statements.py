@@ -0,0 +1,188 @@
+"""Tests for cached and prepared repository statements."""
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Select,
+    String,
+    Table,
+    bindparam,
+    create_engine,
+    insert,
+    select,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import StaticPool
+
+from src.core.repositories.statements import (
+    DEALLOCATE_KEY,
+    PREPARED_KEY,
+    CachedStatement,
+    StaleStatementError,
+    StatementCache,
+)
+
+metadata = MetaData()
+rooms = Table("rooms", metadata, Column("id", Integer, primary_key=True), Column("name", String))
+
+
+def by_name() -> Select[Any]:
+    return select(rooms).where(rooms.c.name == bindparam("name")).limit(bindparam("limit", type_=Integer))
+
+
+def postgres_connection() -> MagicMock:
+    connection = MagicMock()
+    connection.dialect = postgresql.dialect()
+    connection.info = {}
+    return connection
+
+
+class ServerError(Exception):
+    """Driver error carrying a SQLSTATE."""
+
+    def __init__(self, pgcode: str, message: str) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.pgcode = pgcode
+
+
+def server_error(pgcode: str, message: str = "") -> DBAPIError:
+    return DBAPIError("EXECUTE", {}, ServerError(pgcode, message))
+
+
+class TestCachedStatement:
+    """Test cases for compiling and executing cached statements."""
+
+    def test_prepared_form(self) -> None:
+        """Test that the statement is compiled with positional parameters and executed by name."""
+        statement = CachedStatement(by_name())
+
+        assert statement.sql == "SELECT rooms.id, rooms.name \nFROM rooms \nWHERE rooms.name = $1 \n LIMIT $2"
+        assert statement.name == CachedStatement(by_name()).name
+        assert statement.name.startswith("repo_")
+        assert str(statement.execute_statement) == f"EXECUTE {statement.name}(:name, :limit)"
+
+    def test_runs_the_statement_outside_postgresql(self) -> None:
+        """Test that other databases execute the cached statement itself."""
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        metadata.create_all(engine)
+        statement = CachedStatement(by_name())
+        with engine.begin() as connection:
+            connection.execute(insert(rooms), [{"id": 1, "name": "studio"}, {"id": 2, "name": "hall"}])
+            rows = statement.execute(connection, {"name": "hall", "limit": 5}).mappings().all()
+
+        assert [dict(row) for row in rows] == [{"id": 2, "name": "hall"}]
+
+    def test_prepares_once_per_connection(self) -> None:
+        """Test that each connection prepares a statement on first use only."""
+        statement = CachedStatement(by_name())
+        connection = postgres_connection()
+
+        statement.execute(connection, {"name": "hall", "limit": 5})
+        statement.execute(connection, {"name": "studio", "limit": 5})
+
+        connection.exec_driver_sql.assert_called_once_with(f"PREPARE {statement.name} AS {statement.sql}")
+        assert connection.execute.call_count == 2
+        assert connection.execute.call_args.args == (statement.execute_statement, {"name": "studio", "limit": 5})
+        assert list(connection.info[PREPARED_KEY]) == [statement.name]
+
+        # A recycled connection comes with an empty info dictionary
+        connection.info.clear()
+        statement.execute(connection, {"name": "hall", "limit": 5})
+        assert connection.exec_driver_sql.call_count == 2
+
+    def test_least_recently_used_are_deallocated(self) -> None:
+        """Test that a connection keeps at most max_prepared statements, dropping the least recently used."""
+        first, second, third = (
+            CachedStatement(select(*columns), max_prepared=2) for columns in ([rooms.c.id], [rooms.c.name], [rooms])
+        )
+        connection = postgres_connection()
+
+        for statement in (first, second, first, third):
+            statement.execute(connection, {"name": "hall", "limit": 5})
+
+        assert connection.exec_driver_sql.call_args_list[-2].args == (f"DEALLOCATE {second.name}",)
+        assert list(connection.info[PREPARED_KEY]) == [first.name, third.name]
+
+    def test_without_preparing(self) -> None:
+        """Test that prepared statements can be turned off."""
+        statement = CachedStatement(by_name(), prepare=False)
+        connection = postgres_connection()
+
+        statement.execute(connection, {"name": "hall", "limit": 5})
+
+        connection.exec_driver_sql.assert_not_called()
+        assert connection.execute.call_args.args == (statement.statement, {"name": "hall", "limit": 5})
+
+    @pytest.mark.parametrize(
+        ("pgcode", "message"),
+        [
+            ("0A000", "cached plan must not change result type"),
+            ("26000", 'prepared statement "repo_0" does not exist'),
+        ],
+    )
+    def test_stale_statement(self, pgcode: str, message: str) -> None:
+        """Test that a rejected prepared statement is reported and all of them are dropped before the next query."""
+        statement = CachedStatement(by_name())
+        connection = postgres_connection()
+        connection.execute.side_effect = server_error(pgcode, message)
+
+        with pytest.raises(StaleStatementError):
+            statement.execute(connection, {"name": "hall", "limit": 5})
+        assert connection.info == {PREPARED_KEY: {}, DEALLOCATE_KEY: True}
+
+        connection.execute.side_effect = None
+        connection.exec_driver_sql.reset_mock()
+        statement.execute(connection, {"name": "hall", "limit": 5})
+        assert [call.args[0] for call in connection.exec_driver_sql.call_args_list] == [
+            "DEALLOCATE ALL",
+            f"PREPARE {statement.name} AS {statement.sql}",
+        ]
+
+    @pytest.mark.parametrize(
+        ("pgcode", "message"),
+        [("57014", "canceling statement due to statement timeout"), ("0A000", "cannot use LIMIT with FOR UPDATE")],
+    )
+    def test_other_errors_propagate(self, pgcode: str, message: str) -> None:
+        """Test that unrelated server errors, also other unsupported features, are raised unchanged."""
+        statement = CachedStatement(by_name())
+        connection = postgres_connection()
+        connection.execute.side_effect = server_error(pgcode, message)
+
+        with pytest.raises(DBAPIError):
+            statement.execute(connection, {"name": "hall", "limit": 5})
+        assert list(connection.info[PREPARED_KEY]) == [statement.name]
+
+
+class TestStatementCache:
+    """Test cases for the statement cache."""
+
+    def test_builds_each_shape_once(self) -> None:
+        """Test that a shape is built on first use and served from the cache afterwards."""
+        cache = StatementCache(max_entries=10)
+        build = MagicMock(side_effect=by_name)
+
+        first = cache.get(("rooms", "by_name"), build)
+        assert cache.get(("rooms", "by_name"), build) is first
+        assert build.call_count == 1
+        assert (cache.misses, cache.hits, len(cache)) == (1, 1, 1)
+
+    def test_least_recently_used_are_evicted(self) -> None:
+        """Test that the cache keeps at most max_entries statements."""
+        cache = StatementCache(max_entries=2, prepare=False)
+        cache.get("a", by_name)
+        cache.get("b", by_name)
+        cache.get("a", by_name)
+        cache.get("c", by_name)
+
+        assert len(cache) == 2
+        assert not cache.get("c", by_name).prepare
+        cache.get("b", by_name)
+        assert cache.misses == 4
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,88 @@
+"""Tests for hot/cold data tiering."""
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Engine,
+    Integer,
+    MetaData,
+    Table,
+    Uuid,
+    create_engine,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.pool import StaticPool
+
+from src.core.archive import ArchivePolicy, Archiver, archive_table
+
+NOW = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+metadata = MetaData()
+visits = Table(
+    "visits",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("seats", Integer, nullable=False, default=1),
+    Column("happened_at", DateTime(timezone=True), nullable=False, index=True),
+)
+visits_archive = archive_table(visits)
+policy = ArchivePolicy(visits, visits_archive, lambda now: visits.c.happened_at < now - timedelta(days=30))
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(visits),
+            [{"id": uuid4(), "seats": day, "happened_at": NOW - timedelta(days=day)} for day in range(60)],
+        )
+    return engine
+
+
+def count(engine: Engine, table: Table) -> int:
+    with engine.connect() as connection:
+        return connection.scalar(select(func.count()).select_from(table)) or 0
+
+
+class TestArchiveTable:
+    """Test cases for archive table definitions."""
+
+    def test_copies_columns_without_indexes(self) -> None:
+        """Test that the archive mirrors the columns and adds archived_at."""
+        assert visits_archive.name == "visits_archive"
+        assert [column.name for column in visits_archive.columns] == ["id", "seats", "happened_at", "archived_at"]
+        assert visits_archive.c.id.primary_key
+        assert not visits_archive.indexes
+        assert visits_archive.c.seats.default is None
+
+
+class TestArchiver:
+    """Test cases for the batched archival job."""
+
+    def test_moves_matching_rows_in_batches(self, engine: Engine) -> None:
+        """Test that old rows move to the archive and recent rows stay hot."""
+        assert Archiver(engine, batch_size=7).run(policy, now=NOW) == 29
+
+        assert count(engine, visits) == 31
+        assert count(engine, visits_archive) == 29
+        with engine.connect() as connection:
+            archived = connection.execute(select(visits_archive).order_by(visits_archive.c.seats)).first()
+        assert archived is not None
+        assert archived.seats == 31
+        assert archived.archived_at.replace(tzinfo=timezone.utc) == NOW
+
+    def test_max_batches(self, engine: Engine) -> None:
+        """Test that a run can be limited to a number of batches."""
+        assert Archiver(engine, batch_size=5, pause=0.001).run(policy, now=NOW, max_batches=2) == 10
+        assert count(engine, visits_archive) == 10
+
+    def test_nothing_to_archive(self, engine: Engine) -> None:
+        """Test that a run without matching rows moves nothing."""
+        assert Archiver(engine).run(policy, now=NOW - timedelta(days=365)) == 0
@@ -0,0 +1,139 @@
+"""Tests for the broadcaster and the PostgreSQL notifier."""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core import broadcast
+from src.core.broadcast import Broadcaster, Message, PostgresNotifier
+
+TOPIC = ("salsa", "session:1")
+OTHER = ("salsa", "session:2")
+
+
+def message(topic: tuple = TOPIC, seats: int = 1, event: str = "availability") -> Message:
+    return Message(topic, event, {"seats": seats})
+
+
+class TestBroadcaster:
+    """Test fan-out to subscriptions."""
+
+    async def test_fan_out(self) -> None:
+        """Test that messages reach every subscription of their topic only."""
+        hub = Broadcaster()
+        with hub.subscribe([TOPIC]) as first, hub.subscribe([TOPIC, OTHER]) as second:
+            assert hub.subscriber_count(TOPIC) == 2
+            assert hub.publish(message()) == 2
+            assert hub.publish(message(OTHER)) == 1
+            assert await first.get(timeout=0) == message()
+            assert await first.get(timeout=0) is None
+            assert [await second.get(), await second.get()] == [message(), message(OTHER)]
+        assert hub.subscriber_count(TOPIC) == 0
+
+    async def test_slow_consumer_keeps_latest(self) -> None:
+        """Test that unread messages are coalesced instead of queued."""
+        hub = Broadcaster()
+        with hub.subscribe([TOPIC]) as subscription:
+            for seats in range(1000):
+                hub.publish(message(seats=seats))
+            hub.publish(message(event="waitlist"))
+            assert subscription.superseded == 999
+            assert await subscription.get() == message(seats=999)
+            assert await subscription.get() == message(event="waitlist")
+
+    async def test_replays_latest(self) -> None:
+        """Test that new subscribers start with the retained state."""
+        hub = Broadcaster(retain=1)
+        hub.publish(message(OTHER))
+        hub.publish(message(seats=5))
+        with hub.subscribe([TOPIC, OTHER]) as subscription:
+            assert await subscription.get(timeout=0) == message(seats=5)
+            assert await subscription.get(timeout=0) is None
+
+    async def test_get_waits_for_publish(self) -> None:
+        """Test that a waiting consumer wakes up on publish."""
+        hub = Broadcaster()
+        with hub.subscribe([TOPIC]) as subscription:
+            waiter = asyncio.create_task(subscription.get(timeout=1))
+            await asyncio.sleep(0)
+            hub.publish(message())
+            assert await waiter == message()
+
+    def test_to_sse(self) -> None:
+        """Test the Server-Sent Events frame."""
+        assert message().to_sse() == 'event: availability\ndata: {"seats":1}\n\n'
+
+
+class TestPostgresNotifier:
+    """Test syncing workers with LISTEN/NOTIFY."""
+
+    def test_invalid_channel(self) -> None:
+        """Test that channel names are never interpolated unchecked."""
+        with pytest.raises(ValueError):
+            PostgresNotifier(Broadcaster(), 'events"; DROP')
+
+    async def test_publish_notifies(self) -> None:
+        """Test that publishing sends pg_notify with the encoded message."""
+        engine = MagicMock()
+        notifier = PostgresNotifier(Broadcaster(), "events", engine)
+        await notifier.publish(message())
+
+        parameters = engine.begin().__enter__().execute.call_args.args[1]
+        assert parameters["channel"] == "events"
+        assert json.loads(parameters["payload"]) == {
+            "topic": list(TOPIC),
+            "event": "availability",
+            "data": {"seats": 1},
+        }
+
+    async def test_drain_dispatches_on_loop(self) -> None:
+        """Test that received notifications reach the local broadcaster."""
+        hub = Broadcaster()
+        notifier = PostgresNotifier(hub, "events", MagicMock())
+        notifier._loop = asyncio.get_running_loop()
+        payload = json.dumps({"topic": list(TOPIC), "event": "availability", "data": {"seats": 3}})
+        connection = SimpleNamespace(
+            poll=lambda: None,
+            notifies=[SimpleNamespace(payload=payload), SimpleNamespace(payload="not json")],
+        )
+
+        with hub.subscribe([TOPIC]) as subscription:
+            notifier.drain(connection)
+            assert await subscription.get(timeout=1) == message(seats=3)
+        assert connection.notifies == []
+
+    async def test_listener_reconnects_and_stops(self) -> None:
+        """Test that the listener retries lost connections until stopped."""
+        engine = MagicMock()
+        engine.raw_connection.side_effect = OSError("connection refused")
+        notifier = PostgresNotifier(Broadcaster(), "events", engine, poll_interval=0.01)
+        notifier.start()
+        await asyncio.sleep(0.05)
+        assert notifier.running
+        notifier.stop()
+        assert notifier._thread is None
+        assert engine.raw_connection.call_count >= 2
+
+
+class TestModulePublish:
+    """Test the module-level publish helpers."""
+
+    async def test_local_without_channel(self) -> None:
+        """Test that messages stay in-process without BROADCAST_CHANNEL."""
+        assert broadcast.start_notifier() is None
+        with broadcast.broadcaster.subscribe([TOPIC]) as subscription:
+            await broadcast.publish(message())
+            assert await subscription.get(timeout=0) == message()
+
+    async def test_notifier_lifecycle(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test starting and stopping the notifier from settings."""
+        monkeypatch.setattr(broadcast.settings, "BROADCAST_CHANNEL", "events")
+        start = MagicMock()
+        monkeypatch.setattr(PostgresNotifier, "start", start)
+        notifier = broadcast.start_notifier()
+        assert notifier is not None
+        start.assert_called_once()
+        broadcast.stop_notifier()
+        assert broadcast._notifier is None
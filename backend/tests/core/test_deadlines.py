@@ -0,0 +1,172 @@
+"""Tests for request deadline propagation."""
+import time
+from typing import Any, Optional
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from src.core.config import settings
+from src.core.deadlines import (
+    Deadline,
+    DeadlineMiddleware,
+    Receive,
+    Scope,
+    Send,
+    deadline_scope,
+    get_current_deadline,
+    parse_timeout_header,
+    route_deadline,
+)
+from src.core.exceptions import DeadlineExceededError
+
+
+class TestDeadline:
+    """Test cases for the Deadline value object."""
+
+    def test_remaining_counts_down(self) -> None:
+        """Test that a fresh deadline has roughly its full budget left."""
+        deadline = Deadline.after(2.0)
+        assert 1.9 < deadline.remaining() <= 2.0
+        assert 1900 < deadline.remaining_ms() <= 2000
+        assert not deadline.expired
+
+    def test_expired_deadline(self) -> None:
+        """Test that a past deadline reports zero remaining time and fails checks."""
+        deadline = Deadline(time.monotonic() - 1)
+        assert deadline.remaining() == 0.0
+        assert deadline.expired
+        with pytest.raises(DeadlineExceededError) as exc_info:
+            deadline.check("query")
+        assert exc_info.value.details["operation"] == "query"
+
+
+class TestDeadlineScope:
+    """Test cases for deadline scopes."""
+
+    def test_scope_sets_and_resets_deadline(self) -> None:
+        """Test that the deadline is only visible inside the scope."""
+        assert get_current_deadline() is None
+        with deadline_scope(1.0) as deadline:
+            assert get_current_deadline() is deadline
+        assert get_current_deadline() is None
+
+    def test_nested_scope_cannot_extend_deadline(self) -> None:
+        """Test that an inner scope keeps the tighter outer deadline."""
+        with deadline_scope(1.0) as outer, deadline_scope(10.0) as inner:
+            assert inner is outer
+
+    def test_nested_scope_can_replace_deadline(self) -> None:
+        """Test that a replacing inner scope may extend the deadline until it ends."""
+        with deadline_scope(1.0) as outer:
+            with deadline_scope(10.0, replace=True) as inner:
+                assert inner.expires_at > outer.expires_at
+            assert get_current_deadline() is outer
+
+    def test_nested_scope_can_tighten_deadline(self) -> None:
+        """Test that an inner scope can shorten the deadline."""
+        with deadline_scope(10.0) as outer, deadline_scope(1.0) as inner:
+            assert inner.expires_at < outer.expires_at
+
+
+class TestParseTimeoutHeader:
+    """Test cases for timeout header parsing."""
+
+    @pytest.mark.parametrize("value", [None, "", "abc", "0", "-3", "nan"])
+    def test_invalid_values_are_ignored(self, value: str | None) -> None:
+        """Test that missing or invalid headers yield no timeout."""
+        assert parse_timeout_header(value) is None
+
+    def test_valid_value(self) -> None:
+        """Test parsing a valid timeout."""
+        assert parse_timeout_header("2.5") == 2.5
+
+    def test_value_is_capped(self) -> None:
+        """Test that client timeouts cannot exceed the configured maximum."""
+        assert parse_timeout_header("100000") == settings.REQUEST_MAX_TIMEOUT
+
+
+class TestDeadlineMiddleware:
+    """Test cases for the deadline ASGI middleware."""
+
+    async def _call(self, headers: list[tuple[bytes, bytes]], scope_type: str = "http") -> Deadline | None:
+        seen: list[Deadline | None] = []
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            seen.append(get_current_deadline())
+
+        await DeadlineMiddleware(app)({"type": scope_type, "headers": headers}, MagicMock(), MagicMock())
+        return seen[0]
+
+    async def test_header_sets_deadline(self) -> None:
+        """Test that the timeout header determines the deadline."""
+        deadline = await self._call([(b"x-request-timeout", b"2")])
+        assert deadline is not None
+        assert 1.9 < deadline.remaining() <= 2.0
+
+    async def test_default_deadline(self) -> None:
+        """Test that requests without header get the default deadline."""
+        deadline = await self._call([])
+        assert deadline is not None
+        assert deadline.remaining() > settings.REQUEST_DEFAULT_TIMEOUT - 1
+
+    async def test_non_http_scope_is_passed_through(self) -> None:
+        """Test that lifespan and websocket scopes get no deadline."""
+        assert await self._call([], scope_type="lifespan") is None
+
+
+class TestRouteDeadline:
+    """Test cases for the per-route deadline dependency, through the application."""
+
+    @staticmethod
+    async def _remaining(headers: dict[str, str], route_seconds: float = 0.5) -> dict[str, Any]:
+        app = FastAPI()
+        app.add_middleware(DeadlineMiddleware)
+
+        @app.get("/work", dependencies=[Depends(route_deadline(route_seconds))])
+        async def work() -> dict[str, Optional[float]]:
+            deadline = get_current_deadline()
+            return {"remaining": deadline.remaining() if deadline is not None else None}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/work", headers=headers)
+        result: dict[str, Any] = response.json()
+        return result
+
+    async def test_route_default_applies_without_header(self) -> None:
+        """Test that the route default is used when the client sends no timeout."""
+        remaining = (await self._remaining({}))["remaining"]
+        assert 0 < remaining <= 0.5
+
+    async def test_header_overrides_route_default(self) -> None:
+        """Test that a client timeout takes precedence over the route default."""
+        remaining = (await self._remaining({settings.REQUEST_TIMEOUT_HEADER: "3"}))["remaining"]
+        assert 2.5 < remaining <= 3
+
+    async def test_route_default_replaces_the_global_default(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a route default longer than REQUEST_DEFAULT_TIMEOUT is not cut to it."""
+        monkeypatch.setattr(settings, "REQUEST_DEFAULT_TIMEOUT", 1.0)
+
+        remaining = (await self._remaining({}, route_seconds=30))["remaining"]
+        assert 29 < remaining <= 30
+
+    async def test_client_timeout_is_not_extended_by_route_default(self) -> None:
+        """Test that a client timeout shorter than the route default is kept."""
+        remaining = (await self._remaining({settings.REQUEST_TIMEOUT_HEADER: "1"}, route_seconds=30))["remaining"]
+        assert 0 < remaining <= 1
+
+    async def test_route_deadline_is_reset(self) -> None:
+        """Test that the route deadline does not outlive the dependency."""
+        request = MagicMock()
+        request.headers = {}
+        with deadline_scope(60):
+            dependency = route_deadline(0.5)(request)
+            deadline = await anext(dependency)
+            assert get_current_deadline() is deadline
+            with pytest.raises(StopAsyncIteration):
+                await anext(dependency)
+            outer = get_current_deadline()
+        assert outer is not None
+        assert outer.remaining() > 59
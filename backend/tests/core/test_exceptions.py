@@ -2,11 +2,14 @@
 import pytest
 
 from src.core.exceptions import (
+    AuthenticationError,
     BonecaError,
     ConfigurationError,
     ConnectionError,
+    DeadlineExceededError,
     EntityConflictError,
     EntityNotFoundError,
+    OverloadedError,
     RepositoryError,
     ValidationError,
 )
@@ -66,3 +69,26 @@ def test_configuration_error() -> None:
     assert "DATABASE_URL" in str(error)
     assert isinstance(error, BonecaError)
     assert error.details["config_key"] == "DATABASE_URL"
+
+
+def test_deadline_exceeded_error() -> None:
+    """Test DeadlineExceededError."""
+    error = DeadlineExceededError("query", 250)
+    assert "query" in str(error)
+    assert isinstance(error, RepositoryError)
+    assert error.details == {"operation": "query", "timeout_ms": 250}
+
+
+def test_authentication_error() -> None:
+    """Test AuthenticationError."""
+    error = AuthenticationError("expired token")
+    assert str(error) == "Authentication failed: expired token"
+    assert error.details == {"reason": "expired token"}
+
+
+def test_overloaded_error() -> None:
+    """Test OverloadedError."""
+    error = OverloadedError("password hashing", 34, retry_after=2)
+    assert str(error) == "Password hashing is overloaded"
+    assert error.retry_after == 2
+    assert isinstance(error, BonecaError)
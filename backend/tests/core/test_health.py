@@ -0,0 +1,235 @@
+"""Tests for dependency checks, readiness and draining."""
+import asyncio
+import os
+import signal
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from src.core.health import (
+    ALEMBIC_CONFIG,
+    MIGRATIONS_AHEAD,
+    MIGRATIONS_CURRENT,
+    MIGRATIONS_PENDING,
+    MIGRATIONS_UNKNOWN,
+    HealthMonitor,
+    PoolStatus,
+    install_drain_handler,
+    pool_status,
+)
+
+SCRIPT = ScriptDirectory.from_config(Config(str(ALEMBIC_CONFIG)))
+HEAD = SCRIPT.get_current_head() or ""
+FIRST = [revision.revision for revision in SCRIPT.walk_revisions()][-1]
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Iterator[Engine]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'health.db'}", poolclass=QueuePool, pool_size=1, max_overflow=1)
+    yield engine
+    engine.dispose()
+
+
+def stamp(engine: Engine, revision: str) -> None:
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32))"))
+        connection.execute(text("DELETE FROM alembic_version"))
+        connection.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+
+
+def unreachable() -> Engine:
+    return create_engine("sqlite:////nonexistent/directory/health.db", poolclass=StaticPool)
+
+
+class TestDependencyChecks:
+    """Test cases for the background dependency checks."""
+
+    def test_pool_status(self, engine: Engine) -> None:
+        """Test that pool usage is read from the pool, with overflow counted in the capacity."""
+        assert pool_status(engine) == PoolStatus(0, 2)
+        with engine.connect():
+            assert pool_status(engine) == PoolStatus(1, 2)
+        assert pool_status(create_engine("sqlite://", poolclass=StaticPool)) is None
+        assert PoolStatus(3, None).saturation == 0.0
+        assert PoolStatus(3, 4).saturation == 0.75
+
+    @pytest.mark.parametrize(
+        ("revision", "migrations"),
+        [(HEAD, MIGRATIONS_CURRENT), (FIRST, MIGRATIONS_PENDING), ("f00dfeedbeef", MIGRATIONS_AHEAD)],
+    )
+    def test_migrations(self, engine: Engine, revision: str, migrations: str) -> None:
+        """Test that the revision of the database is compared with the heads of the migration scripts."""
+        stamp(engine, revision)
+
+        status = HealthMonitor(engine=engine).check()
+
+        assert status.database_reachable
+        assert not status.breaker_open
+        assert status.migrations == migrations
+        assert status.current_revisions == (revision,)
+        assert status.head_revisions == (HEAD,)
+
+    def test_unmigrated_database(self, engine: Engine) -> None:
+        """Test that a reachable database without the revision table has all migrations pending."""
+        status = HealthMonitor(engine=engine).check()
+
+        assert status.database_reachable
+        assert status.migrations == MIGRATIONS_PENDING
+        assert status.current_revisions == ()
+
+    def test_missing_migration_scripts(self, engine: Engine, tmp_path: Path) -> None:
+        """Test that migrations are not judged when the scripts are not shipped."""
+        stamp(engine, HEAD)
+
+        status = HealthMonitor(engine=engine, alembic_config=tmp_path / "alembic.ini").check()
+
+        assert status.migrations == MIGRATIONS_UNKNOWN
+        assert status.head_revisions == ()
+
+    def test_breaker(self, engine: Engine) -> None:
+        """Test that the database counts as down until reached and after too many failed probes in a row."""
+        monitor = HealthMonitor(failure_threshold=2, engine=unreachable())
+        status = monitor.check()
+        assert (status.database_reachable, status.breaker_open, status.migrations) == (False, True, MIGRATIONS_UNKNOWN)
+        assert status.error
+
+        monitor._engine = engine
+        assert not monitor.check().breaker_open
+
+        monitor._engine = unreachable()
+        status = monitor.check()
+        assert (status.database_reachable, status.database_failures, status.breaker_open) == (False, 1, False)
+        assert monitor.check().breaker_open
+
+        monitor._engine = engine
+        status = monitor.check()
+        assert (status.database_failures, status.breaker_open) == (0, False)
+
+    def test_saturated_pool_is_not_probed(self, engine: Engine) -> None:
+        """Test that no connection is requested from a fully used pool and the last probe result is kept."""
+        stamp(engine, HEAD)
+        monitor = HealthMonitor(engine=engine)
+        monitor.check()
+
+        with engine.connect(), engine.connect():
+            with patch.object(HealthMonitor, "_probe") as probe:
+                status = monitor.check()
+            probe.assert_not_called()
+
+        assert status.pool == PoolStatus(2, 2)
+        assert status.database_reachable
+        assert status.current_revisions == (HEAD,)
+
+
+class TestReadiness:
+    """Test cases for deriving readiness from the dependency status."""
+
+    def test_ready(self, engine: Engine) -> None:
+        """Test that a worker with a reachable, migrated database and free connections is ready."""
+        stamp(engine, HEAD)
+        monitor = HealthMonitor(engine=engine)
+        assert monitor.readiness().state == "starting"
+
+        monitor.check()
+        readiness = monitor.readiness()
+
+        assert readiness.ready
+        assert readiness.reasons == []
+
+    def test_not_ready(self, engine: Engine) -> None:
+        """Test that each failed check is reported as a reason."""
+        stamp(engine, FIRST)
+        monitor = HealthMonitor(interval=1, max_pool_saturation=0.5, engine=engine)
+        status = monitor.check()
+
+        with engine.connect():
+            monitor.check()
+            readiness = monitor.readiness()
+        assert readiness.state == "not_ready"
+        assert readiness.reasons == ["database migrations pending", "connection pool saturated"]
+
+        monitor._engine = unreachable()
+        monitor.check()
+        assert "database unreachable" not in monitor.readiness().reasons
+        monitor.check()
+        monitor.check()
+        assert "database unreachable" in monitor.readiness().reasons
+        assert "dependency status is stale" in monitor.readiness(now=status.checked_at + 10).reasons
+
+    def test_draining(self, engine: Engine) -> None:
+        """Test that a draining worker is not ready whatever its dependencies."""
+        stamp(engine, HEAD)
+        monitor = HealthMonitor(engine=engine)
+        monitor.check()
+
+        monitor.drain()
+
+        assert monitor.readiness().state == "draining"
+        assert not monitor.readiness().ready
+
+    async def test_refreshes_in_the_background(self, engine: Engine) -> None:
+        """Test that the status is refreshed on a background task until stopped."""
+        stamp(engine, HEAD)
+        monitor = HealthMonitor(interval=0.01, engine=engine)
+
+        monitor.start()
+        for _ in range(100):
+            if monitor.status is not None:
+                break
+            await asyncio.sleep(0.01)
+        first = monitor.status
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert first is not None
+        assert monitor.status is not None and monitor.status.checked_at > first.checked_at
+        assert not monitor.running
+
+
+class TestDrainHandler:
+    """Test cases for draining on SIGTERM."""
+
+    async def test_drains_then_shuts_down(self) -> None:
+        """Test that SIGTERM starts draining and hands the shutdown to the server after the delay."""
+        loop = asyncio.get_running_loop()
+        monitor = HealthMonitor()
+        with patch("src.core.health.signal.raise_signal") as raise_signal:
+            assert install_drain_handler(monitor, 0.05)
+            try:
+                os.kill(os.getpid(), signal.SIGTERM)
+                await asyncio.sleep(0.01)
+                assert monitor.draining
+                raise_signal.assert_not_called()
+
+                await asyncio.sleep(0.1)
+                raise_signal.assert_called_once_with(signal.SIGINT)
+
+                # Another SIGTERM while draining shuts down right away
+                os.kill(os.getpid(), signal.SIGTERM)
+                await asyncio.sleep(0.01)
+                assert raise_signal.call_count == 2
+            finally:
+                loop.remove_signal_handler(signal.SIGTERM)
+
+    def test_outside_the_main_thread(self) -> None:
+        """Test that no handler is installed where the loop cannot handle signals."""
+
+        async def install() -> bool:
+            return install_drain_handler(HealthMonitor(), 1)
+
+        result: list[bool] = []
+
+        def run() -> None:
+            result.append(asyncio.run(install()))
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        assert result == [False]
@@ -0,0 +1,72 @@
+"""Tests for list endpoint parameters."""
+from typing import cast
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+from sqlalchemy import Column, Integer, MetaData, Table, Uuid
+
+from src.core.listing import ListQuery, list_query
+from src.core.repositories.filters import MAX_SORT_FIELDS, And, Eq, In
+from src.core.repositories.sql import SQLRepository
+from src.domain.attendance.repository import AttendanceRepository
+
+
+def request(query: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": query.encode(), "headers": []})
+
+
+class TestListQuery:
+    """Test cases for the list parameters dependency."""
+
+    async def test_parses_filters_and_order(self) -> None:
+        """Test that filters and sort fields declared by the repository are accepted."""
+        student_ids = [uuid4(), uuid4()]
+        parse = list_query(AttendanceRepository)
+        query = f"student_id__in={student_ids[0]},{student_ids[1]}&id={student_ids[0]}&order_by=-starts_at,id&limit=5"
+
+        parsed = await parse(request(query), offset=0, limit=5, order_by="-starts_at, id")
+        assert parsed == ListQuery(
+            filters=And(In("student_id", tuple(student_ids)), Eq("id", student_ids[0])),
+            order_by=("-starts_at", "id"),
+            offset=0,
+            limit=5,
+        )
+
+    @pytest.mark.parametrize(
+        ("query", "order_by", "field"),
+        [("studio_id=" + str(uuid4()), "", "studio_id"), ("", "-studio_id", "studio_id")],
+    )
+    async def test_rejects_unindexed_fields(self, query: str, order_by: str, field: str) -> None:
+        """Test that filtering or sorting on unindexed columns is a client error."""
+        with pytest.raises(HTTPException) as error:
+            await list_query(AttendanceRepository)(request(query), order_by=order_by)
+        assert error.value.status_code == 422
+        assert field in cast(dict, error.value.detail)["errors"]
+
+    async def test_rejects_too_many_sort_fields(self) -> None:
+        """Test that sorting on more fields than repositories accept is a client error."""
+        columns = [f"rank_{index}" for index in range(MAX_SORT_FIELDS + 1)]
+
+        class RankingRepository(SQLRepository[BaseModel]):
+            """Repository with more sortable fields than may be combined."""
+
+            table = Table(
+                "rankings",
+                MetaData(),
+                Column("id", Uuid, primary_key=True),
+                *(Column(name, Integer, index=True) for name in columns),
+            )
+            model = BaseModel
+            entity_type = "ranking"
+            sortable_fields = tuple(columns)
+
+        parse = list_query(RankingRepository)
+        parsed = await parse(request(""), order_by=",".join([*columns[:2], f"-{columns[0]}"]))
+        assert parsed.order_by == (*columns[:2], "id")
+
+        with pytest.raises(HTTPException) as error:
+            await parse(request(""), order_by=",".join(columns))
+        assert error.value.status_code == 422
+        assert cast(dict, error.value.detail)["errors"] == {"order_by": f"at most {MAX_SORT_FIELDS} fields"}
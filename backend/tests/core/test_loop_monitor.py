@@ -0,0 +1,176 @@
+"""Tests for event loop monitoring."""
+import asyncio
+import logging
+import time
+
+import pytest
+
+from src.core import loop_monitor as loop_monitor_module
+from src.core.config import settings
+from src.core.loop_monitor import (
+    BlockingDetector,
+    BlockingReport,
+    LagHistogram,
+    LoopLagMonitor,
+    callback_stack,
+    render_metrics,
+    start_loop_monitor,
+    stop_loop_monitor,
+)
+
+
+def block(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+class TestLagHistogram:
+    """Test cases for the lag histogram."""
+
+    def test_observe_and_render(self) -> None:
+        """Test that samples land in every bucket at or above them."""
+        histogram = LagHistogram(buckets=(0.01, 0.1))
+        histogram.observe(0.005)
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+
+        assert histogram.render("lag") == [
+            "# TYPE lag histogram",
+            'lag_bucket{le="0.01"} 1',
+            'lag_bucket{le="0.1"} 2',
+            'lag_bucket{le="+Inf"} 3',
+            "lag_sum 0.555",
+            "lag_count 3",
+        ]
+        assert (histogram.last, histogram.maximum) == (0.5, 0.5)
+
+
+class TestLoopLagMonitor:
+    """Test cases for lag sampling."""
+
+    @pytest.mark.allow_blocking
+    async def test_measures_lag(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that a blocked loop shows up as lag and is logged."""
+        monitor = LoopLagMonitor(interval=0.01, warn_after=0.05)
+        monitor.start()
+        monitor.start()
+        await asyncio.sleep(0.02)
+        with caplog.at_level(logging.WARNING):
+            block(0.1)
+            await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        assert not monitor.running
+        assert monitor.histogram.maximum >= 0.05
+        assert "Event loop lagged" in caplog.text
+        await monitor.stop()
+
+
+class TestBlockingDetector:
+    """Test cases for blocking callback detection."""
+
+    @pytest.mark.allow_blocking
+    async def test_reports_blocking_call(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that the stack of the blocking call is captured once per stall."""
+        detector = BlockingDetector(threshold=0.05)
+        detector.start()
+        await asyncio.sleep(0.05)
+        with caplog.at_level(logging.WARNING):
+            block(0.3)
+            await asyncio.sleep(0.05)
+        detector.stop()
+
+        assert not detector.running
+        assert detector.blocked == 1
+        report = detector.reports[0]
+        assert report.blocked_for >= 0.05
+        assert "block(0.3)" in report.stack
+        assert "asyncio" not in report.stack.splitlines()[0]
+        assert "Event loop blocked for at least" in caplog.text
+
+    async def test_awaiting_is_not_blocking(self) -> None:
+        """Test that a loop waiting on I/O or timers is not reported."""
+        reports: list[BlockingReport] = []
+        detector = BlockingDetector(threshold=0.02, on_block=reports.append)
+        detector.start()
+        await asyncio.sleep(0.15)
+        detector.stop()
+        assert reports == []
+
+    def test_stopped_loop_is_not_blocking(self) -> None:
+        """Test that a loop that is not running is not reported."""
+        loop = asyncio.new_event_loop()
+        detector = BlockingDetector(threshold=0.02)
+        detector.start(loop)
+        time.sleep(0.1)
+        detector.stop()
+        loop.close()
+        assert detector.blocked == 0
+
+    def test_callback_stack_without_frame(self) -> None:
+        """Test that a missing loop thread yields an empty stack."""
+        assert callback_stack(None) == ""
+
+
+class TestLifecycle:
+    """Test cases for starting, stopping and exporting the monitor."""
+
+    async def test_start_stop_and_metrics(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that detection follows LOOP_BLOCK_DETECTION and shows up in the metrics."""
+        monkeypatch.setattr(settings, "LOOP_BLOCK_DETECTION", True)
+        start_loop_monitor()
+        try:
+            assert loop_monitor_module.loop_monitor.running
+            metrics = render_metrics()
+        finally:
+            await stop_loop_monitor()
+
+        assert "boneca_event_loop_lag_seconds_count" in metrics
+        assert "boneca_event_loop_blocked_total 0" in metrics
+        assert "boneca_event_loop_blocked_total" not in render_metrics()
+
+
+class TestPytestPlugin:
+    """Test cases for the pytest plugin failing blocking tests.
+
+    The plugin runs in a subprocess, so the inner session cannot close the event loop of this one.
+    """
+
+    @pytest.fixture(autouse=True)
+    def importable(self, monkeypatch: pytest.MonkeyPatch, request: pytest.FixtureRequest) -> None:
+        monkeypatch.setenv("PYTHONPATH", str(request.config.rootpath))
+
+    def test_fails_blocking_tests(self, pytester: pytest.Pytester) -> None:
+        """Test that blocking async tests fail unless marked, and sync tests are ignored."""
+        pytester.makeini("[pytest]\nasyncio_mode = auto\nloop_block_threshold_ms = 50\n")
+        pytester.makepyfile(
+            """
+            import time
+
+            import pytest
+
+
+            async def test_blocks():
+                time.sleep(0.2)
+
+
+            @pytest.mark.allow_blocking
+            async def test_allowed():
+                time.sleep(0.2)
+
+
+            def test_sync():
+                time.sleep(0.2)
+            """
+        )
+        result = pytester.runpytest_subprocess("-p", "tests.plugins.loop_blocking", "-p", "no:cacheprovider")
+        result.assert_outcomes(passed=2, failed=1)
+        result.stdout.fnmatch_lines(["*Test blocked the event loop for at least*", "*time.sleep(0.2)*"])
+
+    def test_threshold_option(self, pytester: pytest.Pytester) -> None:
+        """Test that a zero threshold disables the check."""
+        pytester.makeini("[pytest]\nasyncio_mode = auto\n")
+        pytester.makepyfile("import time\n\nasync def test_blocks():\n    time.sleep(0.1)\n")
+        result = pytester.runpytest_subprocess(
+            "-p", "tests.plugins.loop_blocking", "-p", "no:cacheprovider", "--loop-block-threshold-ms=0"
+        )
+        result.assert_outcomes(passed=1)
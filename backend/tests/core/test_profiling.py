@@ -0,0 +1,154 @@
+"""Tests for the sampling profiler and allocation snapshots."""
+import asyncio
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+
+import pytest
+
+from src.core.profiling import (
+    AllocationTracker,
+    Profile,
+    ProfilerBusyError,
+    SamplingProfiler,
+)
+
+
+def spin(stopping: threading.Event) -> None:
+    while not stopping.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def busy_thread() -> Iterator[threading.Thread]:
+    stopping = threading.Event()
+    thread = threading.Thread(target=spin, args=(stopping,), name="busy", daemon=True)
+    thread.start()
+    yield thread
+    stopping.set()
+    thread.join()
+
+
+@pytest.fixture
+def tracker() -> Iterator[AllocationTracker]:
+    tracker = AllocationTracker(keep=2)
+    yield tracker
+    tracker.stop()
+
+
+class TestSamplingProfiler:
+    """Test cases for the sampling profiler."""
+
+    def test_collapsed_format(self) -> None:
+        """Test that stacks are rendered one per line with their count, most frequent first."""
+        profile = Profile(
+            Counter({("thread:a", "f (m.py:1)"): 1, ("thread:a", "g (m.py:2)", "h (m.py:3)"): 3}), 4, 0.04
+        )
+
+        assert profile.collapsed() == "thread:a;g (m.py:2);h (m.py:3) 3\nthread:a;f (m.py:1) 1\n"
+
+    def test_samples_other_threads(self, busy_thread: threading.Thread) -> None:
+        """Test that each sample counts the stack of every other thread, from the thread name down."""
+        profile = SamplingProfiler(interval=0.001).collect(0.05)
+
+        busy = [stack for stack in profile.stacks if stack[0] == "thread:busy"]
+        assert busy
+        assert all(any(frame.startswith("spin (") for frame in stack) for stack in busy)
+        assert all(any("test_profiling.py:" in frame for frame in stack) for stack in busy)
+        assert profile.samples > 1
+        assert sum(profile.stacks[stack] for stack in busy) == profile.samples
+        assert not any(stack[0] == f"thread:{threading.current_thread().name}" for stack in profile.stacks)
+
+    def test_stops_early(self) -> None:
+        """Test that a run ends as soon as it is asked to stop."""
+        stopping = threading.Event()
+        stopping.set()
+
+        started = time.monotonic()
+        profile = SamplingProfiler().collect(10, stopping)
+
+        assert time.monotonic() - started < 1
+        assert profile.samples == 0
+
+    async def test_profile_from_the_event_loop(self, busy_thread: threading.Thread) -> None:
+        """Test that a run samples from its own thread, capped at the maximum length."""
+        profiler = SamplingProfiler(interval=0.001, max_seconds=0.05)
+
+        profile = await profiler.profile(30)
+
+        assert profile.seconds < 1
+        assert any(stack[0] == "thread:busy" for stack in profile.stacks)
+        # The event loop thread itself is sampled too
+        assert any(stack[0] == f"thread:{threading.current_thread().name}" for stack in profile.stacks)
+        assert not profiler.running
+
+    async def test_one_run_at_a_time(self) -> None:
+        """Test that a second run is refused while one is in progress."""
+        profiler = SamplingProfiler(interval=0.01)
+        first = asyncio.create_task(profiler.profile(0.2))
+        await asyncio.sleep(0.02)
+
+        assert profiler.running
+        with pytest.raises(ProfilerBusyError):
+            await profiler.profile(0.1)
+        await first
+
+    async def test_cancelled_run_stops_sampling(self) -> None:
+        """Test that cancelling the awaiting request ends the run."""
+        profiler = SamplingProfiler(interval=0.01)
+        run = asyncio.create_task(profiler.profile(10))
+        await asyncio.sleep(0.02)
+
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        for _ in range(100):
+            if not profiler.running:
+                break
+            await asyncio.sleep(0.01)
+        assert not profiler.running
+
+
+class TestAllocationTracker:
+    """Test cases for allocation snapshots."""
+
+    def test_first_snapshot_starts_tracing(self, tracker: AllocationTracker) -> None:
+        """Test that the first snapshot starts tracing and stopping drops the snapshots."""
+        report = tracker.snapshot(limit=5)
+
+        assert tracemalloc.is_tracing()
+        assert report.snapshot == 1
+        assert report.compared_to is None
+        assert len(report.top) <= 5
+
+        tracker.stop()
+        assert not tracker.tracing
+        with pytest.raises(KeyError):
+            tracker.snapshot(compare_to=1)
+
+    def test_compares_snapshots(self, tracker: AllocationTracker) -> None:
+        """Test that a snapshot reports the growth since an earlier one."""
+        baseline = tracker.snapshot()
+        retained = [bytearray(1000) for _ in range(1000)]
+
+        report = tracker.snapshot(limit=3, compare_to=baseline.snapshot)
+
+        assert report.compared_to == baseline.snapshot
+        largest = report.top[0]
+        assert "test_profiling.py:" in largest.location
+        assert "bytearray(1000)" in largest.line
+        assert largest.size_diff >= 1_000_000
+        assert largest.count_diff >= 1000
+        assert report.traced >= 1_000_000
+        del retained
+
+    def test_keeps_latest_snapshots(self, tracker: AllocationTracker) -> None:
+        """Test that only the latest snapshots can be compared with."""
+        for _ in range(3):
+            tracker.snapshot()
+
+        with pytest.raises(KeyError):
+            tracker.snapshot(compare_to=1)
+        assert tracker.snapshot(compare_to=3).snapshot == 4
@@ -0,0 +1,206 @@
+"""Tests for SQL query instrumentation."""
+import logging
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Engine, create_engine, text
+
+from src.core.deadlines import Receive, Scope, Send
+from src.core.query_log import (
+    QueryLog,
+    QueryLogMiddleware,
+    _explain,
+    get_current_query_log,
+    instrument_engine,
+    normalize_sql,
+    query_log,
+)
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    return engine
+
+
+class TestNormalizeSql:
+    """Test cases for SQL normalization."""
+
+    def test_literals_and_whitespace(self) -> None:
+        """Test that literals become placeholders and whitespace collapses."""
+        sql = "SELECT *\n  FROM users WHERE name = 'O''Hara' AND age > 30"
+        assert normalize_sql(sql) == "SELECT * FROM users WHERE name = ? AND age > ?"
+
+    def test_bind_placeholders(self) -> None:
+        """Test that driver placeholders are normalized."""
+        assert normalize_sql("SELECT 1 WHERE a = %(a_1)s AND b = %s AND c = :c") == (
+            "SELECT ? WHERE a = ? AND b = ? AND c = ?"
+        )
+
+    def test_in_lists_collapse(self) -> None:
+        """Test that IN lists of any length normalize to the same shape."""
+        assert normalize_sql("SELECT * FROM t1 WHERE id IN (%(id_1_1)s, %(id_1_2)s)") == (
+            normalize_sql("SELECT * FROM t1 WHERE id IN (7)")
+        )
+
+
+class TestInstrumentation:
+    """Test cases for engine instrumentation."""
+
+    def test_records_statements(self, engine: Engine) -> None:
+        """Test that statements are recorded in the active query log."""
+        with query_log(route="GET list_users") as log, engine.connect() as connection:
+            connection.execute(text("SELECT 1 WHERE 2 > 1"))
+
+        assert log.count == 1
+        record = log.records[0]
+        assert record.sql == "SELECT ? WHERE ? > ?"
+        assert record.route == "GET list_users"
+        assert record.duration_ms >= 0
+        assert log.total_ms == record.duration_ms
+
+    def test_no_active_log(self, engine: Engine) -> None:
+        """Test that statements outside a query log are still executed."""
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+        assert get_current_query_log() is None
+
+    def test_instrument_twice_is_noop(self, engine: Engine) -> None:
+        """Test that repeated instrumentation does not record statements twice."""
+        instrument_engine(engine)
+        with query_log() as log, engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        assert log.count == 1
+
+    def test_slow_queries_are_logged(self, engine: Engine, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that statements over the threshold are logged as slow."""
+        with (
+            patch("src.core.query_log.settings.SLOW_QUERY_THRESHOLD_MS", 0),
+            caplog.at_level(logging.WARNING, logger="src.core.query_log"),
+            engine.connect() as connection,
+        ):
+            connection.execute(text("SELECT 42"))
+        assert "Slow query" in caplog.text
+        assert "SELECT ?" in caplog.text
+
+
+class TestExplain:
+    """Test cases for slow query plan capture."""
+
+    def test_plan_is_captured_in_savepoint(self) -> None:
+        """Test that the plan is read and the savepoint released."""
+        cursor = MagicMock()
+        explain_cursor = cursor.connection.cursor.return_value
+        explain_cursor.fetchall.return_value = [("Seq Scan on users",), ("Buffers: shared hit=1",)]
+
+        plan = _explain(cursor, "SELECT * FROM users", {})
+
+        assert plan == "Seq Scan on users\nBuffers: shared hit=1"
+        executed = [call.args[0] for call in explain_cursor.execute.call_args_list]
+        assert executed == [
+            "SAVEPOINT query_log_explain",
+            "EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM users",
+            "RELEASE SAVEPOINT query_log_explain",
+        ]
+
+    def test_failed_capture_rolls_back(self) -> None:
+        """Test that a failing EXPLAIN rolls back to the savepoint."""
+        cursor = MagicMock()
+        explain_cursor = cursor.connection.cursor.return_value
+        explain_cursor.execute.side_effect = [None, RuntimeError("boom"), None]
+
+        assert _explain(cursor, "SELECT 1", {}) is None
+        assert explain_cursor.execute.call_args.args[0] == "ROLLBACK TO SAVEPOINT query_log_explain"
+
+
+class TestQueryLogMiddleware:
+    """Test cases for the query log middleware."""
+
+    async def test_route_from_scope(self) -> None:
+        """Test that the route label is taken from the routed endpoint."""
+        seen: list[QueryLog | None] = []
+
+        async def list_users() -> None:
+            pass
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            scope["endpoint"] = list_users
+            seen.append(get_current_query_log())
+
+        await QueryLogMiddleware(app)({"type": "http", "method": "GET", "path": "/users"}, MagicMock(), MagicMock())
+
+        log = seen[0]
+        assert log is not None
+        assert log.route == "GET list_users"
+        assert get_current_query_log() is None
+
+    async def test_non_http_scope_is_passed_through(self) -> None:
+        """Test that non-HTTP scopes get no query log."""
+        seen: list[QueryLog | None] = []
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            seen.append(get_current_query_log())
+
+        await QueryLogMiddleware(app)({"type": "lifespan"}, MagicMock(), MagicMock())
+        assert seen == [None]
+
+
+class TestNestedLogs:
+    """Test cases for nested query logs."""
+
+    def test_enclosing_log_receives_records(self, engine: Engine) -> None:
+        """Test that statements recorded in an inner log are also recorded in the enclosing one."""
+        with query_log(route="outer") as outer, engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            with query_log(route="inner") as inner:
+                connection.execute(text("SELECT 2"))
+
+        assert inner.count == 1
+        assert inner.records[0].route == "inner"
+        assert outer.count == 2
+        assert outer.records[1] is inner.records[0]
+
+
+def test_assert_max_queries_fixture(
+    engine: Engine, assert_max_queries: Callable[[int], AbstractContextManager[QueryLog]]
+) -> None:
+    """Test that the query budget fixture fails when the budget is exceeded."""
+    with assert_max_queries(1), engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    with (
+        pytest.raises(AssertionError, match="at most 1 queries, 2 were issued"),
+        assert_max_queries(1),
+        engine.connect() as connection,
+    ):
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 2"))
+
+
+async def test_assert_max_queries_through_the_app(
+    engine: Engine, assert_max_queries: Callable[[int], AbstractContextManager[QueryLog]]
+) -> None:
+    """Test that the query budget counts the statements of requests sent through the application."""
+    app = FastAPI()
+    app.add_middleware(QueryLogMiddleware)
+
+    @app.get("/rooms")
+    async def list_rooms() -> dict[str, int]:
+        with engine.connect() as connection:
+            for number in range(5):
+                connection.execute(text(f"SELECT {number}"))
+        return {"queries": 5}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        with assert_max_queries(5) as log:
+            await client.get("/rooms")
+        assert log.count == 5
+        assert {record.route for record in log.records} == {"GET list_rooms"}
+
+        with pytest.raises(AssertionError, match="at most 4 queries, 5 were issued"), assert_max_queries(4):
+            await client.get("/rooms")
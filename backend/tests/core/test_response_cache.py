@@ -0,0 +1,322 @@
+"""Tests for the response cache."""
+import time
+from typing import Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.config import settings
+from src.core.deadlines import Message, Receive, Scope, Send
+from src.core.response_cache import (
+    SCOPE_KEY,
+    CachedResponse,
+    CachePolicy,
+    InMemoryResponseCache,
+    ResponseCacheMiddleware,
+    cache_response,
+    normalize_query,
+    purge,
+    response_cache,
+)
+from src.core.tenancy import tenant_scope
+
+USERS_POLICY = CachePolicy(60, frozenset({"users"}))
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+def entry(tags: frozenset[str] = frozenset(), ttl: float = 60, now: Optional[float] = None) -> CachedResponse:
+    """Build a stored response."""
+    now = time.monotonic() if now is None else now
+    return CachedResponse(200, [], b"{}", tags, now, now + ttl)
+
+
+class TestNormalizeQuery:
+    """Test cases for query string normalization."""
+
+    def test_parameter_order_is_ignored(self) -> None:
+        """Test that equivalent query strings normalize to the same key."""
+        assert normalize_query(b"b=2&a=1") == normalize_query(b"a=1&b=2")
+
+    def test_blank_values_are_kept(self) -> None:
+        """Test that blank parameters still distinguish requests."""
+        assert normalize_query(b"a=") == "a="
+        assert normalize_query(b"") == ""
+
+
+class TestInMemoryResponseCache:
+    """Test cases for the in-process cache backend."""
+
+    def test_entries_expire(self) -> None:
+        """Test that entries are not served past their TTL."""
+        clock = FakeClock()
+        cache = InMemoryResponseCache(clock=clock)
+        cache.set((None, "/a", "", ()), (), entry(ttl=10, now=0.0))
+        assert cache.get((None, "/a", "", ())) is not None
+        clock.now = 10
+        assert cache.get((None, "/a", "", ())) is None
+        assert len(cache) == 0
+        assert cache.vary((None, "/a", "")) is None
+
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        """Test that the cache stays within max_entries, keeping recently read entries."""
+        cache = InMemoryResponseCache(max_entries=2)
+        cache.set((None, "/a", "", ()), (), entry())
+        cache.set((None, "/b", "", ()), (), entry())
+        cache.get((None, "/a", "", ()))
+        cache.set((None, "/c", "", ()), (), entry())
+        assert len(cache) == 2
+        assert cache.get((None, "/b", "", ())) is None
+        assert cache.get((None, "/a", "", ())) is not None
+
+    def test_purge_drops_only_tagged_entries_of_the_tenant(self) -> None:
+        """Test that purging a surrogate key leaves other tags and tenants alone."""
+        cache = InMemoryResponseCache()
+        cache.set(("a", "/users/1", "", ()), (), entry(frozenset({"user:1"})))
+        cache.set(("a", "/users/2", "", ()), (), entry(frozenset({"user:2"})))
+        cache.set(("b", "/users/1", "", ()), (), entry(frozenset({"user:1"})))
+        assert cache.purge("a", ["user:1"]) == 1
+        assert cache.get(("a", "/users/1", "", ())) is None
+        assert cache.get(("a", "/users/2", "", ())) is not None
+        assert cache.get(("b", "/users/1", "", ())) is not None
+
+    def test_vary_is_kept_while_a_variant_is_cached(self) -> None:
+        """Test that the varying headers are remembered until the last variant is gone."""
+        cache = InMemoryResponseCache()
+        cache.set((None, "/a", "", ("de",)), ("accept-language",), entry(frozenset({"de"})))
+        cache.set((None, "/a", "", ("en",)), ("accept-language",), entry(frozenset({"en"})))
+        cache.purge(None, ["de"])
+        assert cache.vary((None, "/a", "")) == ("accept-language",)
+        cache.purge(None, ["en"])
+        assert cache.vary((None, "/a", "")) is None
+
+    def test_clear(self) -> None:
+        """Test that clearing drops every entry."""
+        cache = InMemoryResponseCache()
+        cache.set((None, "/a", "", ()), (), entry(frozenset({"a"})))
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.purge(None, ["a"]) == 0
+
+
+class TestCacheResponse:
+    """Test cases for the opt-in dependency."""
+
+    async def test_policy_tags_are_formatted_from_path_parameters(self) -> None:
+        """Test that tag placeholders are filled from the route's path parameters."""
+        request = MagicMock()
+        request.scope = {}
+        request.path_params = {"user_id": 7}
+        await cache_response(30, ["users", "user:{user_id}"], vary=["Accept-Language"])(request)
+        assert request.scope[SCOPE_KEY] == CachePolicy(30, frozenset({"users", "user:7"}), ("accept-language",))
+
+
+class TestResponseCacheMiddleware:
+    """Test cases for the response cache ASGI middleware."""
+
+    @pytest.fixture
+    def cache(self) -> InMemoryResponseCache:
+        """Provide an empty cache."""
+        return InMemoryResponseCache()
+
+    def _app(
+        self,
+        calls: list[Scope],
+        policy: Optional[CachePolicy] = USERS_POLICY,
+        status: int = 200,
+        headers: Optional[list[tuple[bytes, bytes]]] = None,
+    ) -> MagicMock:
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            calls.append(scope)
+            if policy is not None:
+                scope[SCOPE_KEY] = policy
+            body = f"response {len(calls)}".encode()
+            await send({"type": "http.response.start", "status": status, "headers": headers or []})
+            await send({"type": "http.response.body", "body": body})
+
+        return app  # type: ignore[return-value]
+
+    async def _get(
+        self,
+        middleware: ResponseCacheMiddleware,
+        path: str = "/users",
+        query: bytes = b"",
+        headers: Optional[list[tuple[bytes, bytes]]] = None,
+        method: str = "GET",
+    ) -> list[Message]:
+        sent: list[Message] = []
+
+        async def send(message: Message) -> None:
+            sent.append(message)
+
+        scope = {"type": "http", "method": method, "path": path, "query_string": query, "headers": headers or []}
+        await middleware(scope, MagicMock(), send)
+        return sent
+
+    async def test_hit_is_served_without_calling_the_endpoint(self, cache: InMemoryResponseCache) -> None:
+        """Test that a repeated request is replayed from the cache."""
+        calls: list[Scope] = []
+        middleware = ResponseCacheMiddleware(self._app(calls), cache)
+        miss = await self._get(middleware, query=b"b=2&a=1")
+        hit = await self._get(middleware, query=b"a=1&b=2")
+
+        assert len(calls) == 1
+        assert (b"x-cache", b"MISS") in miss[0]["headers"]
+        assert (b"surrogate-key", b"users") in miss[0]["headers"]
+        assert (b"x-cache", b"HIT") in hit[0]["headers"]
+        assert (b"age", b"0") in hit[0]["headers"]
+        assert hit[1]["body"] == b"response 1"
+
+    async def test_purge_invalidates_entry(self, cache: InMemoryResponseCache) -> None:
+        """Test that purging the surrogate key makes the next request reach the endpoint."""
+        calls: list[Scope] = []
+        middleware = ResponseCacheMiddleware(self._app(calls), cache)
+        with tenant_scope("salsa"):
+            await self._get(middleware)
+            cache.purge("salsa", ["users"])
+            sent = await self._get(middleware)
+        assert len(calls) == 2
+        assert sent[1]["body"] == b"response 2"
+
+    async def test_entries_are_scoped_by_tenant(self, cache: InMemoryResponseCache) -> None:
+        """Test that tenants never share cached responses."""
+        calls: list[Scope] = []
+        middleware = ResponseCacheMiddleware(self._app(calls), cache)
+        for tenant in ("salsa", "tango"):
+            with tenant_scope(tenant):
+                await self._get(middleware)
+        assert len(calls) == 2
+
+    async def test_vary_headers_select_the_variant(self, cache: InMemoryResponseCache) -> None:
+        """Test that responses are cached per value of the varying headers."""
+        calls: list[Scope] = []
+        policy = CachePolicy(60, frozenset(), ("accept-language",))
+        middleware = ResponseCacheMiddleware(self._app(calls, policy), cache)
+        await self._get(middleware, headers=[(b"accept-language", b"de")])
+        await self._get(middleware, headers=[(b"accept-language", b"en")])
+        sent = await self._get(middleware, headers=[(b"accept-language", b"de")])
+        assert len(calls) == 2
+        assert sent[1]["body"] == b"response 1"
+
+    async def test_routes_without_policy_are_not_cached(self, cache: InMemoryResponseCache) -> None:
+        """Test that only opted-in routes are cached."""
+        calls: list[Scope] = []
+        middleware = ResponseCacheMiddleware(self._app(calls, policy=None), cache)
+        await self._get(middleware)
+        sent = await self._get(middleware)
+        assert len(calls) == 2
+        assert sent[0]["headers"] == []
+
+    @pytest.mark.parametrize(
+        "status, headers",
+        [
+            (404, []),
+            (200, [(b"set-cookie", b"session=1")]),
+            (200, [(b"cache-control", b"private")]),
+            (200, [(b"cache-control", b"no-store")]),
+        ],
+    )
+    async def test_uncacheable_responses_are_not_stored(
+        self, cache: InMemoryResponseCache, status: int, headers: list[tuple[bytes, bytes]]
+    ) -> None:
+        """Test that errors, cookies and private responses are never stored."""
+        calls: list[Scope] = []
+        middleware = ResponseCacheMiddleware(self._app(calls, status=status, headers=headers), cache)
+        await self._get(middleware)
+        await self._get(middleware)
+        assert len(calls) == 2
+
+    async def test_large_bodies_are_not_stored(
+        self, cache: InMemoryResponseCache, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that bodies above RESPONSE_CACHE_MAX_BODY are passed through uncached."""
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_MAX_BODY", 4)
+        calls: list[Scope] = []
+        middleware = ResponseCacheMiddleware(self._app(calls), cache)
+        await self._get(middleware)
+        await self._get(middleware)
+        assert len(calls) == 2
+
+    async def test_streamed_bodies_stop_buffering_at_the_limit(
+        self, cache: InMemoryResponseCache, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a streamed body is passed through whole but not kept once it exceeds the limit."""
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_MAX_BODY", 4)
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            scope[SCOPE_KEY] = USERS_POLICY
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            for chunk in (b"abc", b"defgh", b""):
+                await send({"type": "http.response.body", "body": chunk, "more_body": bool(chunk)})
+
+        sent = await self._get(ResponseCacheMiddleware(app, cache))
+
+        assert b"".join(message.get("body", b"") for message in sent) == b"abcdefgh"
+        assert len(cache) == 0
+
+    @pytest.mark.parametrize(("tag", "stored"), [("users", False), ("classes", True)])
+    async def test_purge_during_request(self, cache: InMemoryResponseCache, tag: str, stored: bool) -> None:
+        """Test that a response is not stored if one of its tags was purged while it was produced."""
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            scope[SCOPE_KEY] = USERS_POLICY
+            cache.purge(None, [tag])
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"stale"})
+
+        await self._get(ResponseCacheMiddleware(app, cache))
+
+        assert (len(cache) == 1) is stored
+
+    @pytest.mark.parametrize(
+        "method, headers",
+        [("POST", []), ("GET", [(b"authorization", b"Bearer token")])],
+    )
+    async def test_bypass(self, cache: InMemoryResponseCache, method: str, headers: list[tuple[bytes, bytes]]) -> None:
+        """Test that non-GET and authorized requests bypass the cache."""
+        calls: list[Scope] = []
+        middleware = ResponseCacheMiddleware(self._app(calls), cache)
+        await self._get(middleware, method=method, headers=headers)
+        await self._get(middleware, method=method, headers=headers)
+        assert len(calls) == 2
+        assert len(cache) == 0
+
+    async def test_disabled(self, cache: InMemoryResponseCache, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that RESPONSE_CACHE_ENABLED turns the cache off."""
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+        calls: list[Scope] = []
+        middleware = ResponseCacheMiddleware(self._app(calls), cache)
+        await self._get(middleware)
+        await self._get(middleware)
+        assert len(calls) == 2
+
+    async def test_non_http_scope_is_passed_through(self) -> None:
+        """Test that lifespan scopes reach the application untouched."""
+        app = MagicMock(side_effect=self._noop)
+        await ResponseCacheMiddleware(app)({"type": "lifespan"}, MagicMock(), MagicMock())
+        app.assert_called_once()
+
+    @staticmethod
+    async def _noop(scope: Scope, receive: Receive, send: Send) -> None:
+        return None
+
+
+class TestPurge:
+    """Test cases for the purge helper."""
+
+    def test_purges_current_tenant(self) -> None:
+        """Test that the helper purges the shared cache for the current tenant."""
+        response_cache.set(("salsa", "/users", "", ()), (), entry(frozenset({"users"})))
+        with tenant_scope("salsa"):
+            assert purge("users") == 1
+        assert len(response_cache) == 0
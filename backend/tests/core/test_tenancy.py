@@ -0,0 +1,101 @@
+"""Tests for tenant resolution."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core.deadlines import Receive, Scope, Send
+from src.core.exceptions import ValidationError
+from src.core.tenancy import (
+    TenantMiddleware,
+    get_current_tenant,
+    resolve_tenant,
+    tenant_schema,
+    tenant_scope,
+    validate_tenant,
+)
+
+
+class TestTenantIdentifiers:
+    """Test cases for tenant identifiers and schemas."""
+
+    @pytest.mark.parametrize("tenant", ["salsa", "salsa-porto", "a", "ballet42"])
+    def test_valid_tenants(self, tenant: str) -> None:
+        """Test that slugs are accepted."""
+        assert validate_tenant(tenant) == tenant
+
+    @pytest.mark.parametrize("tenant", ["", "-salsa", "salsa-", "Salsa", "sal sa", "x;drop", "a" * 41])
+    def test_invalid_tenants(self, tenant: str) -> None:
+        """Test that anything that is not a slug is rejected."""
+        with pytest.raises(ValidationError):
+            validate_tenant(tenant)
+
+    def test_tenant_schema(self) -> None:
+        """Test the schema name of a tenant."""
+        assert tenant_schema("salsa-porto") == "school_salsa_porto"
+
+
+class TestResolveTenant:
+    """Test cases for resolving the tenant of a request."""
+
+    def test_header_takes_precedence(self) -> None:
+        """Test that the tenant header wins over the host."""
+        with patch("src.core.tenancy.settings.TENANT_DOMAIN", "boneca.app"):
+            assert resolve_tenant({"x-tenant": " Salsa "}, "ballet.boneca.app") == "salsa"
+
+    def test_subdomain(self) -> None:
+        """Test resolving the tenant from the host."""
+        with patch("src.core.tenancy.settings.TENANT_DOMAIN", "boneca.app"):
+            assert resolve_tenant({}, "ballet.boneca.app:8000") == "ballet"
+            assert resolve_tenant({}, "boneca.app") is None
+            assert resolve_tenant({}, "a.b.boneca.app") is None
+            assert resolve_tenant({}, "ballet.example.com") is None
+
+    def test_no_tenant_domain(self) -> None:
+        """Test that hosts are ignored when no tenant domain is configured."""
+        assert resolve_tenant({}, "ballet.boneca.app") is None
+
+
+class TestTenantScope:
+    """Test cases for tenant scopes."""
+
+    def test_scope_sets_and_resets_tenant(self) -> None:
+        """Test that the tenant is only visible inside the scope."""
+        with tenant_scope("salsa"):
+            assert get_current_tenant() == "salsa"
+        assert get_current_tenant() is None
+
+    def test_scope_validates_tenant(self) -> None:
+        """Test that invalid tenants cannot be entered."""
+        with pytest.raises(ValidationError), tenant_scope("../etc"):
+            pass
+
+
+class TestTenantMiddleware:
+    """Test cases for the tenant middleware."""
+
+    async def test_sets_tenant_from_header(self) -> None:
+        """Test that the tenant header is applied for the request."""
+        seen: list[str | None] = []
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            seen.append(get_current_tenant())
+
+        await TenantMiddleware(app)({"type": "http", "headers": [(b"x-tenant", b"salsa")]}, MagicMock(), MagicMock())
+        assert seen == ["salsa"]
+
+    async def test_invalid_tenant_is_rejected(self) -> None:
+        """Test that an invalid tenant yields 400 without calling the app."""
+        app = AsyncMock()
+        send = AsyncMock()
+        scope = {"type": "http", "headers": [(b"x-tenant", b"not a tenant")]}
+
+        await TenantMiddleware(app)(scope, AsyncMock(), send)
+
+        app.assert_not_called()
+        assert send.call_args_list[0].args[0]["status"] == 400
+
+    async def test_non_http_scope_is_passed_through(self) -> None:
+        """Test that non-HTTP scopes are passed through unchanged."""
+        app = AsyncMock()
+        await TenantMiddleware(app)({"type": "lifespan"}, MagicMock(), MagicMock())
+        app.assert_awaited_once()
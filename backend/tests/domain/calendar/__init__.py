@@ -0,0 +1 @@
+"""Calendar domain tests package."""
@@ -0,0 +1,307 @@
+"""Tests for calendar feed tokens and caching."""
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from src.core.exceptions import EntityNotFoundError
+from src.core.tenancy import tenant_scope
+from src.domain.calendar.feeds import (
+    FeedCache,
+    InMemorySchedule,
+    feed_token,
+    feed_window,
+    parse_feed_token,
+)
+from src.domain.calendar.schemas import ClassSession, FeedKind, FeedOwner
+
+TODAY = date(2026, 3, 1)
+START = datetime(2026, 3, 3, 19, 0, tzinfo=timezone.utc)
+
+
+def make_session(**overrides: object) -> ClassSession:
+    values: dict = {
+        "id": uuid4(),
+        "title": "Salsa",
+        "starts_at": START,
+        "ends_at": START + timedelta(hours=1),
+        "studio_id": uuid4(),
+        "instructor_id": uuid4(),
+        "updated_at": START - timedelta(days=1),
+    }
+    values.update(overrides)
+    return ClassSession(**values)
+
+
+class CountingSchedule(InMemorySchedule):
+    """Schedule counting how often feeds load sessions."""
+
+    def __init__(self) -> None:
+        """Initialize the schedule."""
+        super().__init__()
+        self.loads = 0
+
+    async def sessions_for(self, owner: FeedOwner, start: datetime, end: datetime) -> list[ClassSession]:
+        self.loads += 1
+        await asyncio.sleep(0)
+        return await super().sessions_for(owner, start, end)
+
+
+class GatedSchedule(CountingSchedule):
+    """Schedule whose loads return only once their gate is opened."""
+
+    def __init__(self) -> None:
+        """Initialize the schedule."""
+        super().__init__()
+        self.gates: list[asyncio.Event] = []
+
+    async def sessions_for(self, owner: FeedOwner, start: datetime, end: datetime) -> list[ClassSession]:
+        sessions = await super().sessions_for(owner, start, end)
+        gate = asyncio.Event()
+        self.gates.append(gate)
+        await gate.wait()
+        return sessions
+
+    async def loading(self, loads: int) -> None:
+        """Wait until a number of loads started."""
+        while len(self.gates) < loads:
+            await asyncio.sleep(0)
+
+
+@pytest.fixture
+def cache() -> FeedCache:
+    return FeedCache(max_size=10)
+
+
+@pytest.fixture
+def schedule(cache: FeedCache) -> CountingSchedule:
+    schedule = CountingSchedule()
+    schedule.subscribe(cache.invalidate_session)
+    return schedule
+
+
+class TestFeedTokens:
+    """Test cases for feed tokens."""
+
+    def test_round_trip(self) -> None:
+        """Test that a token resolves to its owner."""
+        owner = FeedOwner(FeedKind.STUDENT, uuid4())
+        assert parse_feed_token(feed_token(owner)) == owner
+
+    @pytest.mark.parametrize("token", ["garbage", "teacher-abc-def", f"student-{uuid4().hex}-{'0' * 32}"])
+    def test_invalid_tokens(self, token: str) -> None:
+        """Test that malformed or forged tokens are rejected."""
+        with pytest.raises(EntityNotFoundError):
+            parse_feed_token(token)
+
+    def test_tokens_are_bound_to_tenant(self) -> None:
+        """Test that a token of one school is not valid for another."""
+        owner = FeedOwner(FeedKind.STUDIO, uuid4())
+        with tenant_scope("salsa"):
+            token = feed_token(owner)
+        with tenant_scope("tango"), pytest.raises(EntityNotFoundError):
+            parse_feed_token(token)
+
+
+def test_feed_window() -> None:
+    """Test the time window covered by feeds."""
+    start, end = feed_window(TODAY)
+    assert start == datetime(2026, 1, 30, tzinfo=timezone.utc)
+    assert end == datetime(2026, 8, 28, tzinfo=timezone.utc)
+
+
+class TestInMemorySchedule:
+    """Test cases for the in-memory schedule."""
+
+    async def test_sessions_by_owner_and_window(self, schedule: CountingSchedule) -> None:
+        """Test that sessions are selected by owner and time window."""
+        session = make_session()
+        schedule.upsert(session)
+        owner = FeedOwner(FeedKind.INSTRUCTOR, session.instructor_id)
+
+        assert await schedule.sessions_for(owner, START - timedelta(days=1), START + timedelta(days=1)) == [session]
+        assert await schedule.sessions_for(owner, START + timedelta(hours=2), START + timedelta(days=1)) == []
+
+    async def test_update_moves_session_between_owners(self, schedule: CountingSchedule) -> None:
+        """Test that changing the instructor re-indexes the session."""
+        session = make_session()
+        schedule.upsert(session)
+        new_instructor = uuid4()
+        schedule.upsert(session.model_copy(update={"instructor_id": new_instructor}))
+        start, end = feed_window(TODAY)
+
+        assert await schedule.sessions_for(FeedOwner(FeedKind.INSTRUCTOR, session.instructor_id), start, end) == []
+        assert len(await schedule.sessions_for(FeedOwner(FeedKind.INSTRUCTOR, new_instructor), start, end)) == 1
+
+        schedule.remove(session.id)
+        schedule.remove(session.id)
+        assert await schedule.sessions_for(FeedOwner(FeedKind.INSTRUCTOR, new_instructor), start, end) == []
+
+
+class TestFeedCache:
+    """Test cases for the rendered feed cache."""
+
+    async def test_feed_is_rendered_once(self, cache: FeedCache, schedule: CountingSchedule) -> None:
+        """Test that repeated polls are served from the cache."""
+        session = make_session()
+        schedule.upsert(session)
+        owner = FeedOwner(FeedKind.STUDIO, session.studio_id)
+
+        first = await cache.get(owner, schedule, TODAY)
+        second = await cache.get(owner, schedule, TODAY)
+
+        assert first is second
+        assert schedule.loads == 1
+        assert b"SUMMARY:Salsa" in first.body
+        assert first.etag.startswith('"')
+
+    async def test_concurrent_misses_render_once(self, cache: FeedCache, schedule: CountingSchedule) -> None:
+        """Test that simultaneous polls of a stale feed share one render."""
+        owner = FeedOwner(FeedKind.STUDIO, uuid4())
+        feeds = await asyncio.gather(*(cache.get(owner, schedule, TODAY) for _ in range(20)))
+        assert schedule.loads == 1
+        assert len({feed.etag for feed in feeds}) == 1
+
+    async def test_change_during_render_is_not_cached_over(self, cache: FeedCache) -> None:
+        """Test that a render overtaken by an invalidation is served but not cached."""
+        schedule = GatedSchedule()
+        schedule.subscribe(cache.invalidate_session)
+        session = make_session()
+        owner = FeedOwner(FeedKind.STUDIO, session.studio_id)
+
+        stale = asyncio.create_task(cache.get(owner, schedule, TODAY))
+        await schedule.loading(1)
+        schedule.upsert(session)
+        schedule.gates[0].set()
+
+        assert b"VEVENT" not in (await stale).body
+        assert len(cache) == 0
+        fresh = asyncio.create_task(cache.get(owner, schedule, TODAY))
+        await schedule.loading(2)
+        schedule.gates[1].set()
+        assert b"SUMMARY:Salsa" in (await fresh).body
+
+    async def test_newcomers_wait_for_the_running_render(self, cache: FeedCache) -> None:
+        """Test that requests arriving while a queued request renders share its render."""
+        schedule = GatedSchedule()
+        schedule.subscribe(cache.invalidate_session)
+        session = make_session()
+        owner = FeedOwner(FeedKind.STUDIO, session.studio_id)
+
+        first = asyncio.create_task(cache.get(owner, schedule, TODAY))
+        queued = asyncio.create_task(cache.get(owner, schedule, TODAY))
+        await schedule.loading(1)
+        schedule.upsert(session)
+        schedule.gates[0].set()
+        await schedule.loading(2)
+
+        newcomer = asyncio.create_task(cache.get(owner, schedule, TODAY))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert len(schedule.gates) == 2
+        schedule.gates[1].set()
+        await asyncio.gather(first, queued, newcomer)
+
+        assert newcomer.result() is queued.result()
+
+    async def test_change_invalidates_only_affected_feeds(self, cache: FeedCache, schedule: CountingSchedule) -> None:
+        """Test that a session change drops only the feeds containing it."""
+        student = uuid4()
+        salsa = make_session(student_ids=frozenset({student}))
+        tango = make_session(title="Tango")
+        schedule.upsert(salsa)
+        schedule.upsert(tango)
+        student_owner = FeedOwner(FeedKind.STUDENT, student)
+        tango_owner = FeedOwner(FeedKind.STUDIO, tango.studio_id)
+        before = await cache.get(student_owner, schedule, TODAY)
+        await cache.get(tango_owner, schedule, TODAY)
+        renders = cache.renders
+
+        schedule.upsert(salsa.model_copy(update={"title": "Salsa advanced", "sequence": 1}))
+
+        after = await cache.get(student_owner, schedule, TODAY)
+        await cache.get(tango_owner, schedule, TODAY)
+        assert cache.renders == renders + 1
+        assert after.etag != before.etag
+        assert b"SUMMARY:Salsa advanced" in after.body
+
+    async def test_invalidate_owners(self, cache: FeedCache, schedule: CountingSchedule) -> None:
+        """Test that the feeds of given owners are dropped, e.g. after a class series changed."""
+        studio, other = FeedOwner(FeedKind.STUDIO, uuid4()), FeedOwner(FeedKind.STUDIO, uuid4())
+        await cache.get(studio, schedule, TODAY)
+        await cache.get(other, schedule, TODAY)
+
+        assert cache.invalidate_owners([studio, FeedOwner(FeedKind.INSTRUCTOR, uuid4())]) == 1
+        await cache.get(studio, schedule, TODAY)
+        await cache.get(other, schedule, TODAY)
+        assert schedule.loads == 3
+
+    async def test_new_enrollment_invalidates_student_feed(self, cache: FeedCache, schedule: CountingSchedule) -> None:
+        """Test that a student's feed is refreshed when they enroll in a session."""
+        student = uuid4()
+        owner = FeedOwner(FeedKind.STUDENT, student)
+        empty = await cache.get(owner, schedule, TODAY)
+        assert empty.session_ids == frozenset()
+
+        session = make_session(student_ids=frozenset({student}))
+        schedule.upsert(session)
+        assert (await cache.get(owner, schedule, TODAY)).session_ids == {session.id}
+
+    async def test_deleted_session_disappears(self, cache: FeedCache, schedule: CountingSchedule) -> None:
+        """Test that deleting a session refreshes the feeds that contained it."""
+        session = make_session()
+        schedule.upsert(session)
+        owner = FeedOwner(FeedKind.STUDIO, session.studio_id)
+        await cache.get(owner, schedule, TODAY)
+
+        schedule.remove(session.id)
+        assert b"VEVENT" not in (await cache.get(owner, schedule, TODAY)).body
+
+    async def test_window_change_rerenders(self, cache: FeedCache, schedule: CountingSchedule) -> None:
+        """Test that feeds are rendered again when the day changes."""
+        owner = FeedOwner(FeedKind.STUDIO, uuid4())
+        await cache.get(owner, schedule, TODAY)
+        await cache.get(owner, schedule, TODAY + timedelta(days=1))
+        assert schedule.loads == 2
+
+    async def test_feeds_expire(self, schedule: CountingSchedule) -> None:
+        """Test that feeds are rendered again after the TTL, picking up changes made in other workers."""
+        now = [0.0]
+        cache = FeedCache(ttl=300, clock=lambda: now[0])
+        session = make_session()
+        owner = FeedOwner(FeedKind.STUDIO, session.studio_id)
+        await cache.get(owner, schedule, TODAY)
+
+        # Written by another worker: no invalidation reaches this cache
+        other_worker = make_session(studio_id=session.studio_id)
+        schedule._sessions[other_worker.id] = other_worker
+        schedule._by_owner[owner] = {other_worker.id}
+        now[0] = 299
+        assert b"VEVENT" not in (await cache.get(owner, schedule, TODAY)).body
+        now[0] = 300
+        assert b"VEVENT" in (await cache.get(owner, schedule, TODAY)).body
+        assert schedule.loads == 2
+
+    async def test_lru_eviction(self, schedule: CountingSchedule) -> None:
+        """Test that the least recently used feeds are evicted."""
+        cache = FeedCache(max_size=2)
+        session = make_session()
+        schedule.upsert(session)
+        owners = [FeedOwner(FeedKind.STUDIO, session.studio_id), FeedOwner(FeedKind.STUDIO, uuid4())]
+        for owner in owners:
+            await cache.get(owner, schedule, TODAY)
+        await cache.get(FeedOwner(FeedKind.STUDIO, uuid4()), schedule, TODAY)
+
+        assert len(cache) == 2
+        await cache.get(owners[0], schedule, TODAY)
+        assert schedule.loads == 4
+
+    async def test_tenants_are_cached_separately(self, cache: FeedCache, schedule: CountingSchedule) -> None:
+        """Test that feeds of different schools never share cache entries."""
+        owner = FeedOwner(FeedKind.STUDIO, uuid4())
+        with tenant_scope("salsa"):
+            await cache.get(owner, schedule, TODAY)
+        with tenant_scope("tango"):
+            await cache.get(owner, schedule, TODAY)
+        assert schedule.loads == 2
@@ -0,0 +1,74 @@
+"""Tests for iCalendar rendering."""
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from src.domain.calendar.ics import (
+    escape_text,
+    fold_line,
+    format_datetime,
+    render_calendar,
+    render_event,
+)
+from src.domain.calendar.schemas import ClassSession
+
+START = datetime(2026, 3, 3, 19, 0, tzinfo=timezone.utc)
+
+
+def make_session(**overrides: object) -> ClassSession:
+    values: dict = {
+        "id": uuid4(),
+        "title": "Salsa, level 1; Tuesdays",
+        "starts_at": START,
+        "ends_at": START + timedelta(hours=1),
+        "studio_id": uuid4(),
+        "instructor_id": uuid4(),
+        "updated_at": START - timedelta(days=1),
+    }
+    values.update(overrides)
+    return ClassSession(**values)
+
+
+class TestIcs:
+    """Test cases for iCalendar rendering."""
+
+    def test_escape_text(self) -> None:
+        """Test escaping of TEXT values."""
+        assert escape_text("a,b;c\\d\ne") == "a\\,b\\;c\\\\d\\ne"
+
+    def test_format_datetime_converts_to_utc(self) -> None:
+        """Test that datetimes are rendered in UTC."""
+        lisbon_summer = timezone(timedelta(hours=1))
+        assert format_datetime(datetime(2026, 6, 1, 20, 0, tzinfo=lisbon_summer)) == "20260601T190000Z"
+
+    def test_short_lines_are_not_folded(self) -> None:
+        """Test that short lines are only terminated."""
+        assert fold_line("SUMMARY:Tango") == b"SUMMARY:Tango\r\n"
+
+    def test_long_lines_are_folded_at_75_octets(self) -> None:
+        """Test folding of long lines without splitting characters."""
+        line = "SUMMARY:" + "ç" * 100
+        folded = fold_line(line)
+        physical = folded.split(b"\r\n")[:-1]
+        assert all(len(part) <= 75 for part in physical)
+        assert all(part.startswith(b" ") for part in physical[1:])
+        assert b"".join(part.removeprefix(b" ") for part in physical).decode("utf-8") == line
+
+    def test_render_event(self) -> None:
+        """Test rendering a session as VEVENT."""
+        session = make_session(location="Studio A", sequence=2)
+        event = render_event(session).decode()
+
+        assert event.startswith("BEGIN:VEVENT\r\n")
+        assert f"UID:{session.id}@boneca\r\n" in event
+        assert "DTSTART:20260303T190000Z\r\n" in event
+        assert "DTEND:20260303T200000Z\r\n" in event
+        assert "SUMMARY:Salsa\\, level 1\\; Tuesdays\r\n" in event
+        assert "LOCATION:Studio A\r\n" in event
+        assert "SEQUENCE:2\r\n" in event
+
+    def test_render_calendar(self) -> None:
+        """Test wrapping events in a calendar."""
+        calendar = render_calendar("My classes", [render_event(make_session())]).decode()
+        assert calendar.startswith("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+        assert "X-WR-CALNAME:My classes\r\n" in calendar
+        assert calendar.endswith("END:VEVENT\r\nEND:VCALENDAR\r\n")
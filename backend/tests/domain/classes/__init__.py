@@ -0,0 +1 @@
+"""Classes domain tests package."""
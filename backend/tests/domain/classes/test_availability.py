@@ -0,0 +1,39 @@
+"""Tests for live seat availability."""
+from uuid import uuid4
+
+from src.core.broadcast import broadcaster
+from src.core.tenancy import tenant_scope
+from src.domain.classes.availability import (
+    AVAILABILITY_EVENT,
+    SeatAvailability,
+    availability_topic,
+    publish_availability,
+)
+
+
+def test_seats_available() -> None:
+    """Test that free seats never go negative."""
+    assert SeatAvailability(session_id=uuid4(), capacity=10, seats_taken=4).seats_available == 6
+    assert SeatAvailability(session_id=uuid4(), capacity=10, seats_taken=12).seats_available == 0
+
+
+async def test_publish_is_tenant_scoped() -> None:
+    """Test that availability is published to the session topic of the tenant."""
+    session_id = uuid4()
+    with tenant_scope("salsa"):
+        topic = availability_topic(session_id)
+    assert topic == ("salsa", f"session:{session_id}")
+
+    with broadcaster.subscribe([topic]) as subscription, tenant_scope("salsa"):
+        await publish_availability(SeatAvailability(session_id=session_id, capacity=12, seats_taken=12, waitlist=3))
+        message = await subscription.get(timeout=0)
+
+    assert message is not None
+    assert message.event == AVAILABILITY_EVENT
+    assert message.data == {
+        "session_id": str(session_id),
+        "capacity": 12,
+        "seats_taken": 12,
+        "waitlist": 3,
+        "seats_available": 0,
+    }
@@ -0,0 +1,129 @@
+"""Tests for recurrence rules."""
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.domain.classes.recurrence import Frequency, Recurrence
+
+LISBON = ZoneInfo("Europe/Lisbon")
+# Tuesday, 19:00 local time
+FIRST = datetime(2026, 1, 6, 19, 0, tzinfo=LISBON)
+
+
+def window(start: date, days: int) -> tuple[datetime, datetime]:
+    begin = datetime(start.year, start.month, start.day, tzinfo=timezone.utc)
+    return begin, begin + timedelta(days=days)
+
+
+def expand(rule: str, start: date, days: int, first: datetime = FIRST) -> list[datetime]:
+    return list(Recurrence.parse(rule).occurrences(first, LISBON, *window(start, days), timedelta(hours=1)))
+
+
+class TestParse:
+    """Test parsing and formatting recurrences."""
+
+    def test_round_trip(self) -> None:
+        """Test that formatting a parsed recurrence gives the same text."""
+        text = "RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,TH;UNTIL=20261231T230000Z\nEXDATE:20260414,20261208"
+        rule = Recurrence.parse(text)
+        assert rule.frequency is Frequency.WEEKLY
+        assert rule.weekdays == (1, 3)
+        assert rule.exception_dates == {date(2026, 4, 14), date(2026, 12, 8)}
+        assert rule.format() == text
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "EXDATE:20260101",
+            "RRULE:FREQ=MONTHLY",
+            "RRULE:FREQ=WEEKLY;BYMONTH=1",
+            "RRULE:FREQ=WEEKLY;WKST=SU",
+            "RRULE:FREQ=DAILY;BYDAY=MO",
+            "RRULE:FREQ=DAILY;INTERVAL=0",
+            "RRULE:FREQ=DAILY;COUNT=0",
+            "RRULE:FREQ=DAILY;COUNT=3;UNTIL=20260101T000000Z",
+            "DTSTART:20260101",
+        ],
+    )
+    def test_invalid(self, text: str) -> None:
+        """Test that unsupported recurrences are rejected."""
+        with pytest.raises(ValueError):
+            Recurrence.parse(text)
+
+    def test_naive_until(self) -> None:
+        """Test that UNTIL must be timezone-aware."""
+        with pytest.raises(ValueError):
+            Recurrence(Frequency.DAILY, until=datetime(2026, 1, 1))
+
+
+class TestOccurrences:
+    """Test expanding recurrences within a window."""
+
+    def test_weekly_by_day(self) -> None:
+        """Test a twice-weekly class."""
+        starts = expand("RRULE:FREQ=WEEKLY;BYDAY=TU,TH", date(2026, 1, 5), 7)
+        assert [start.date() for start in starts] == [date(2026, 1, 6), date(2026, 1, 8)]
+        assert all(start.hour == 19 for start in starts)
+
+    def test_starts_mid_week(self) -> None:
+        """Test that weekdays before the first occurrence are skipped."""
+        first = datetime(2026, 1, 8, 19, 0, tzinfo=LISBON)  # Thursday
+        starts = expand("RRULE:FREQ=WEEKLY;BYDAY=TU,TH;COUNT=3", date(2026, 1, 1), 30, first)
+        assert [start.date() for start in starts] == [date(2026, 1, 8), date(2026, 1, 13), date(2026, 1, 15)]
+
+    def test_daily_interval(self) -> None:
+        """Test a class every other day."""
+        starts = expand("RRULE:FREQ=DAILY;INTERVAL=2", date(2026, 1, 6), 6)
+        assert [start.day for start in starts] == [6, 8, 10]
+
+    def test_count_after_window_jump(self) -> None:
+        """Test that COUNT is honored when expansion starts past the first period."""
+        first = datetime(2026, 1, 8, 19, 0, tzinfo=LISBON)  # Thursday
+        rule = "RRULE:FREQ=WEEKLY;BYDAY=TU,TH;COUNT=4"
+        # Occurrences: Jan 8, 13, 15, 20
+        assert [start.day for start in expand(rule, date(2026, 1, 19), 14, first)] == [20]
+        assert expand(rule, date(2026, 1, 21), 14, first) == []
+
+    def test_until(self) -> None:
+        """Test that no occurrence starts after UNTIL."""
+        starts = expand("RRULE:FREQ=WEEKLY;UNTIL=20260120T190000Z", date(2026, 1, 1), 60)
+        assert [start.day for start in starts] == [6, 13, 20]
+
+    @pytest.mark.parametrize(
+        ("rule", "last_start"),
+        [
+            ("RRULE:FREQ=WEEKLY", None),
+            ("RRULE:FREQ=WEEKLY;UNTIL=20260120T190000Z", datetime(2026, 1, 20, 19, tzinfo=timezone.utc)),
+            ("RRULE:FREQ=WEEKLY;BYDAY=TU,TH;COUNT=4", datetime(2026, 1, 15, 19, tzinfo=LISBON)),
+            ("RRULE:FREQ=DAILY;INTERVAL=2;COUNT=3\nEXDATE:20260110", datetime(2026, 1, 10, 19, tzinfo=LISBON)),
+        ],
+    )
+    def test_last_start(self, rule: str, last_start: datetime | None) -> None:
+        """Test that the end bound comes from UNTIL or the last occurrence counted by COUNT."""
+        assert Recurrence.parse(rule).last_start(FIRST, LISBON) == last_start
+
+    def test_exception_dates(self) -> None:
+        """Test that excluded dates are skipped."""
+        starts = expand("RRULE:FREQ=WEEKLY\nEXDATE:20260113", date(2026, 1, 1), 21)
+        assert [start.day for start in starts] == [6, 20]
+
+    def test_overlapping_start_is_included(self) -> None:
+        """Test that an occurrence running at the start of the window is included."""
+        start = datetime(2026, 1, 6, 19, 30, tzinfo=LISBON)
+        rule = Recurrence.parse("RRULE:FREQ=DAILY")
+        starts = list(rule.occurrences(FIRST, LISBON, start, start + timedelta(hours=1), timedelta(hours=1)))
+        assert starts == [FIRST]
+
+    def test_keeps_wall_clock_across_dst(self) -> None:
+        """Test that occurrences stay at 19:00 local time when DST starts."""
+        starts = expand("RRULE:FREQ=WEEKLY", date(2026, 3, 23), 14)
+        assert [start.astimezone(timezone.utc).hour for start in starts] == [19, 18]
+        assert all(start.astimezone(LISBON).hour == 19 for start in starts)
+
+    def test_far_future_window_is_lazy(self) -> None:
+        """Test that a window decades away yields without iterating from the start."""
+        starts = Recurrence.parse("RRULE:FREQ=DAILY").occurrences(
+            FIRST, LISBON, *window(date(2226, 1, 1), 2), timedelta(hours=1)
+        )
+        assert next(starts).date() == date(2226, 1, 1)
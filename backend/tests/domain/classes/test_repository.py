@@ -0,0 +1,65 @@
+"""Tests for the class series repository."""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pytest
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import metadata
+from src.domain.classes.repository import ClassSeriesRepository
+from src.domain.classes.schedule import ClassSchedule
+from src.domain.classes.schemas import ClassSeries
+from tests.domain.classes.test_schedule import WEEK, series
+
+Change = tuple[Optional[ClassSeries], Optional[ClassSeries]]
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def changes(monkeypatch: pytest.MonkeyPatch) -> list[Change]:
+    changes: list[Change] = []
+    monkeypatch.setattr(ClassSeriesRepository, "listeners", [lambda before, after: changes.append((before, after))])
+    return changes
+
+
+class TestClassSeriesRepository:
+    """Test cases for the class series repository."""
+
+    async def test_listeners_see_every_change(self, engine: Engine, changes: list[Change]) -> None:
+        """Test that creating, updating, deleting and restoring a series notifies the listeners."""
+        repository = ClassSeriesRepository(engine)
+        item = series("RRULE:FREQ=WEEKLY")
+        moved = item.model_copy(update={"studio_id": item.instructor_id, "sequence": 1})
+
+        await repository.create(item)
+        await repository.update(item.id, moved)
+        await repository.delete(item.id)
+        await repository.restore(item.id)
+
+        assert [(before and before.studio_id, after and after.studio_id) for before, after in changes] == [
+            (None, item.studio_id),
+            (item.studio_id, moved.studio_id),
+            (moved.studio_id, None),
+            (None, moved.studio_id),
+        ]
+
+    async def test_window_is_filtered_in_sql(self, engine: Engine, changes: list[Change]) -> None:
+        """Test that the stored end limits the series a schedule loads."""
+        repository = ClassSeriesRepository(engine)
+        running = series("RRULE:FREQ=WEEKLY")
+        ended = series("RRULE:FREQ=WEEKLY;COUNT=2", starts_at=WEEK[0] - timedelta(weeks=3))
+        later = series("RRULE:FREQ=WEEKLY", starts_at=WEEK[1] + timedelta(days=1))
+        for item in (running, ended, later):
+            await repository.create(item)
+
+        loaded = await ClassSchedule(repository).series(None, *WEEK)
+
+        assert [item.id for item in loaded] == [running.id]
+        assert (await repository.get(ended.id)).ends_at == datetime(2025, 12, 22, 1, tzinfo=timezone.utc)
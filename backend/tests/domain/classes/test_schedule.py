@@ -0,0 +1,155 @@
+"""Tests for the class schedule."""
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID, uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from src.core.repositories.memory import InMemoryRepository
+from src.domain.calendar.schemas import FeedKind, FeedOwner
+from src.domain.classes.schedule import ClassSchedule, Occurrence, expand, expand_all
+from src.domain.classes.schemas import ClassSeries
+from src.domain.waitlist.schemas import SessionSeats
+
+STUDIO = uuid4()
+WEEK = (datetime(2026, 1, 5, tzinfo=timezone.utc), datetime(2026, 1, 12, tzinfo=timezone.utc))
+
+
+class ClassSeriesMemoryRepository(InMemoryRepository[ClassSeries]):
+    """In-memory class series repository."""
+
+    model = ClassSeries
+    entity_type = "class series"
+    indexed_fields = ("studio_id", "instructor_id")
+
+
+class FakeReservations:
+    """Reservation source answering from a mapping of students to their seats."""
+
+    def __init__(self, seats: dict[UUID, list[SessionSeats]]) -> None:
+        """Initialize the source."""
+        self.seats = seats
+        self.queries: list[tuple[UUID, datetime, datetime]] = []
+
+    async def reserved_sessions(self, student_id: UUID, start: datetime, end: datetime) -> list[SessionSeats]:
+        self.queries.append((student_id, start, end))
+        return self.seats.get(student_id, [])
+
+
+def seats(occurrence: Occurrence) -> SessionSeats:
+    return SessionSeats(
+        session_id=occurrence.id, starts_at=occurrence.starts_at, ends_at=occurrence.ends_at, capacity=10
+    )
+
+
+def series(recurrence: str, hour: int = 19, instructor_id: UUID | None = None, **fields: Any) -> ClassSeries:
+    values: dict[str, Any] = {
+        "id": uuid4(),
+        "title": "Salsa",
+        "studio_id": STUDIO,
+        "instructor_id": instructor_id or uuid4(),
+        "starts_at": datetime(2026, 1, 6, hour, tzinfo=timezone.utc),
+        "duration_minutes": 60,
+        "timezone": "UTC",
+        "recurrence": recurrence,
+        "updated_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+    }
+    return ClassSeries(**(values | fields))
+
+
+class TestClassSeries:
+    """Test the class series model."""
+
+    def test_validation(self) -> None:
+        """Test that unknown time zones and recurrences are rejected."""
+        with pytest.raises(ValidationError):
+            series("RRULE:FREQ=WEEKLY", timezone="Mars/Olympus")
+        with pytest.raises(ValidationError):
+            series("RRULE:FREQ=HOURLY")
+
+    def test_naive_datetimes_are_utc(self) -> None:
+        """Test that naive datetimes are read as UTC."""
+        item = series("RRULE:FREQ=WEEKLY").model_copy(update={"starts_at": datetime(2026, 1, 6)})
+        assert ClassSeries.model_validate(item.model_dump()).starts_at.tzinfo is timezone.utc
+
+    def test_ends_at(self) -> None:
+        """Test that the end of the last occurrence is derived from the recurrence."""
+        assert series("RRULE:FREQ=WEEKLY").ends_at is None
+        assert series("RRULE:FREQ=WEEKLY;COUNT=2").ends_at == datetime(2026, 1, 13, 20, tzinfo=timezone.utc)
+        assert "ends_at" in series("RRULE:FREQ=DAILY;COUNT=1").model_dump()
+
+
+class TestExpand:
+    """Test expanding series into occurrences."""
+
+    def test_stable_ids(self) -> None:
+        """Test that occurrence IDs are stable between expansions."""
+        item = series("RRULE:FREQ=DAILY")
+        first = [occurrence.id for occurrence in expand(item, *WEEK)]
+        assert first == [occurrence.id for occurrence in expand(item, *WEEK)]
+        assert len(set(first)) == 6
+
+    def test_merge_is_chronological(self) -> None:
+        """Test that occurrences of many series are merged by start time."""
+        evening = series("RRULE:FREQ=WEEKLY;BYDAY=TU,TH", hour=19)
+        morning = series("RRULE:FREQ=DAILY", hour=9)
+        starts = [occurrence.starts_at for occurrence in expand_all([evening, morning], *WEEK)]
+        assert len(starts) == 8
+        assert starts == sorted(starts)
+
+    def test_to_session(self) -> None:
+        """Test converting an occurrence to a calendar session."""
+        occurrence = next(expand(series("RRULE:FREQ=WEEKLY"), *WEEK))
+        session = occurrence.to_session()
+        assert session.id == occurrence.id
+        assert session.ends_at - session.starts_at == timedelta(hours=1)
+
+
+class TestClassSchedule:
+    """Test the repository-backed schedule."""
+
+    async def test_pages_and_filters(self) -> None:
+        """Test loading series page by page with filters."""
+        instructor = uuid4()
+        items = [series("RRULE:FREQ=WEEKLY", instructor_id=instructor) for _ in range(5)]
+        repo = ClassSeriesMemoryRepository([*items, series("RRULE:FREQ=WEEKLY")])
+        schedule = ClassSchedule(repo, page_size=2)
+
+        assert len(await schedule.series({"instructor_id": instructor})) == 5
+        assert len(await schedule.occurrences(*WEEK)) == 6
+
+    async def test_sessions_for_feed_owners(self) -> None:
+        """Test serving calendar feeds from the schedule."""
+        item = series("RRULE:FREQ=WEEKLY;BYDAY=TU,TH")
+        schedule = ClassSchedule(ClassSeriesMemoryRepository([item]))
+
+        assert len(await schedule.sessions_for(FeedOwner(FeedKind.STUDIO, STUDIO), *WEEK)) == 2
+        assert len(await schedule.sessions_for(FeedOwner(FeedKind.INSTRUCTOR, item.instructor_id), *WEEK)) == 2
+        assert await schedule.sessions_for(FeedOwner(FeedKind.STUDENT, uuid4()), *WEEK) == []
+
+    async def test_student_feeds_show_reserved_sessions(self) -> None:
+        """Test that student feeds contain the sessions the student holds a seat in."""
+        item = series("RRULE:FREQ=WEEKLY;BYDAY=TU,TH")
+        student = uuid4()
+        tuesday, thursday = list(expand(item, *WEEK))
+        reservations = FakeReservations({student: [seats(thursday)]})
+        schedule = ClassSchedule(ClassSeriesMemoryRepository([item, series("RRULE:FREQ=DAILY")]), reservations)
+
+        [session] = await schedule.sessions_for(FeedOwner(FeedKind.STUDENT, student), *WEEK)
+
+        assert session.id == thursday.id
+        assert session.student_ids == {student}
+        assert await schedule.sessions_for(FeedOwner(FeedKind.STUDENT, uuid4()), *WEEK) == []
+        assert reservations.queries[0] == (student, *WEEK)
+
+    async def test_only_series_overlapping_the_window_are_loaded(self) -> None:
+        """Test that series ended before or starting after the window are not loaded."""
+        running = series("RRULE:FREQ=WEEKLY")
+        ending = series("RRULE:FREQ=WEEKLY;UNTIL=20260106T190000Z")
+        ended = series("RRULE:FREQ=DAILY;COUNT=1", starts_at=datetime(2026, 1, 4, 18, tzinfo=timezone.utc))
+        later = series("RRULE:FREQ=WEEKLY", starts_at=WEEK[1])
+        schedule = ClassSchedule(ClassSeriesMemoryRepository([running, ending, ended, later]))
+
+        assert {item.id for item in await schedule.series(None, *WEEK)} == {running.id, ending.id}
+        assert len(await schedule.series()) == 4
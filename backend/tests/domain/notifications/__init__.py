@@ -0,0 +1 @@
+"""Notifications domain tests package."""
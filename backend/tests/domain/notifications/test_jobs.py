@@ -0,0 +1,25 @@
+"""Tests for the notification job outbox."""
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import metadata
+from src.domain.notifications.jobs import enqueue, notification_jobs
+
+
+def test_enqueue_inserts_pending_jobs() -> None:
+    """Test that jobs are queued unsent within the caller's transaction."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    metadata.create_all(engine, tables=[notification_jobs])
+    now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+    with engine.begin() as connection:
+        enqueue(connection, "waitlist.promoted", [{"student_id": "a"}, {"student_id": "b"}], now)
+        enqueue(connection, "waitlist.promoted", [])
+
+    with engine.connect() as connection:
+        rows = connection.execute(select(notification_jobs).order_by(notification_jobs.c.payload)).mappings().all()
+    assert [row["payload"] for row in rows] == [{"student_id": "a"}, {"student_id": "b"}]
+    assert {row["kind"] for row in rows} == {"waitlist.promoted"}
+    assert all(row["sent_at"] is None and row["attempts"] == 0 for row in rows)
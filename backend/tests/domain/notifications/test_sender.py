@@ -0,0 +1,134 @@
+"""Tests for the notification sender."""
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import metadata
+from src.domain.notifications.jobs import enqueue, notification_jobs
+from src.domain.notifications.sender import NotificationSender
+from src.domain.notifications.smtp import SMTPPool, SMTPServer
+from src.domain.notifications.templates import NotificationTemplate, TemplateRenderer
+from tests.plugins.smtp_server import SMTPStandIn
+
+NOW = datetime(2026, 10, 19, 9, tzinfo=timezone.utc)
+REMINDER = NotificationTemplate("reminder", 1, "$title tomorrow", "Class starts at $time.")
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine, tables=[notification_jobs])
+    return engine
+
+
+@pytest.fixture
+def pool() -> SMTPPool:
+    return SMTPPool(max_connections_per_host=3, reconnect_backoff=0.01)
+
+
+def make_sender(engine: Engine, pool: SMTPPool, smtp_server: SMTPStandIn, **kwargs: Any) -> NotificationSender:
+    return NotificationSender(
+        engine,
+        pool,
+        TemplateRenderer({"reminder": REMINDER}),
+        SMTPServer(host="127.0.0.1", port=smtp_server.port),
+        sender="school@example.com",
+        **kwargs,
+    )
+
+
+def queue(engine: Engine, recipients: list[str]) -> None:
+    with engine.begin() as connection:
+        enqueue(
+            connection,
+            "reminder",
+            [{"email": recipient, "title": "Salsa", "time": "19:00"} for recipient in recipients],
+            NOW,
+        )
+
+
+def jobs(engine: Engine) -> dict[str, dict[str, Any]]:
+    with engine.connect() as connection:
+        rows = connection.execute(select(notification_jobs)).mappings().all()
+    return {row["payload"].get("email", ""): dict(row) for row in rows}
+
+
+class TestNotificationSender:
+    """Test cases for sending queued jobs."""
+
+    async def test_sends_batches_over_pooled_connections(
+        self, engine: Engine, pool: SMTPPool, smtp_server: SMTPStandIn
+    ) -> None:
+        """Test that all due jobs are sent in batches, spread over a few reused connections."""
+        queue(engine, [f"student{index}@example.com" for index in range(25)])
+        sender = make_sender(engine, pool, smtp_server, batch_size=10)
+
+        report = await sender.send_pending(now=NOW)
+        pool.close()
+
+        assert (report.batches, report.sent, report.retried, report.failed) == (3, 25, 0, 0)
+        assert len(smtp_server.messages) == 25
+        assert smtp_server.connections <= 3
+        assert sender.templates.compiled == 1
+        assert len(sender.templates) == 1
+        received = smtp_server.messages[0].message
+        assert received["From"] == "school@example.com"
+        assert received["Subject"] == "Salsa tomorrow"
+        assert all(job["sent_at"] is not None and job["attempts"] == 1 for job in jobs(engine).values())
+        assert (await sender.send_pending(now=NOW)).batches == 0
+
+    async def test_retries_with_backoff_then_gives_up(
+        self, engine: Engine, pool: SMTPPool, smtp_server: SMTPStandIn
+    ) -> None:
+        """Test that temporary rejections are retried with growing delays up to the attempt limit."""
+        queue(engine, ["busy@example.com", "ok@example.com"])
+        smtp_server.reject = {"busy@example.com": 451}
+        sender = make_sender(engine, pool, smtp_server, max_attempts=3, retry_backoff=60)
+
+        first = await sender.send_pending(now=NOW)
+        busy = jobs(engine)["busy@example.com"]
+        assert (first.sent, first.retried) == (1, 1)
+        assert busy["attempts"] == 1
+        assert busy["available_at"].replace(tzinfo=timezone.utc) == NOW + timedelta(seconds=60)
+        assert busy["last_error"].startswith("451")
+
+        assert (await sender.send_pending(now=NOW + timedelta(seconds=30))).batches == 0
+        await sender.send_pending(now=NOW + timedelta(seconds=60))
+        busy = jobs(engine)["busy@example.com"]
+        assert busy["available_at"].replace(tzinfo=timezone.utc) == NOW + timedelta(seconds=180)
+
+        last = await sender.send_pending(now=NOW + timedelta(seconds=180))
+        assert last.failed == 1
+        assert jobs(engine)["busy@example.com"]["failed_at"] is not None
+        assert len(smtp_server.messages) == 1
+
+    async def test_permanent_failures_are_given_up_at_once(
+        self, engine: Engine, pool: SMTPPool, smtp_server: SMTPStandIn
+    ) -> None:
+        """Test that rejected recipients and unrenderable jobs are not retried."""
+        queue(engine, ["gone@example.com"])
+        with engine.begin() as connection:
+            enqueue(connection, "reminder", [{"title": "No address"}], NOW)
+            enqueue(connection, "unknown", [{"email": "x@example.com"}], NOW)
+        smtp_server.reject = {"gone@example.com": 550}
+
+        report = await make_sender(engine, pool, smtp_server).send_pending(now=NOW)
+
+        assert (report.sent, report.retried, report.failed) == (0, 0, 3)
+        errors = {email: job["last_error"] for email, job in jobs(engine).items()}
+        assert errors["gone@example.com"].startswith("550")
+        assert "No 'email'" in errors[""]
+        assert "No template" in errors["x@example.com"]
+
+    async def test_claimed_jobs_are_leased(self, engine: Engine, pool: SMTPPool, smtp_server: SMTPStandIn) -> None:
+        """Test that jobs claimed by a sender that never finished come back after the lease."""
+        queue(engine, ["a@example.com"])
+        sender = make_sender(engine, pool, smtp_server, lease=300)
+        assert len(sender._claim(NOW)) == 1
+
+        assert (await sender.send_pending(now=NOW + timedelta(seconds=10))).batches == 0
+        report = await sender.send_pending(now=NOW + timedelta(seconds=300), max_batches=1)
+        assert report.sent == 1
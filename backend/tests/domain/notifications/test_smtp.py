@@ -0,0 +1,146 @@
+"""Tests for pooled SMTP delivery."""
+import asyncio
+import socket
+from email.message import EmailMessage
+
+import pytest
+
+from src.domain.notifications import smtp
+from src.domain.notifications.smtp import DeliveryStatus, SMTPPool, SMTPServer
+from tests.plugins.smtp_server import SMTPStandIn
+
+
+def message(recipient: str) -> EmailMessage:
+    mail = EmailMessage()
+    mail["From"] = "school@example.com"
+    mail["To"] = recipient
+    mail["Subject"] = "Hello"
+    mail.set_content("Olá!")
+    return mail
+
+
+def server_of(standin: SMTPStandIn, username: str = "", password: str = "") -> SMTPServer:
+    return SMTPServer(host="127.0.0.1", port=standin.port, username=username, password=password)
+
+
+class TestSMTPPool:
+    """Test cases for the SMTP connection pool."""
+
+    async def test_batches_reuse_connections(self, smtp_server: SMTPStandIn) -> None:
+        """Test that consecutive batches are sent over the same logged-in connection."""
+        pool = SMTPPool(max_connections_per_host=2)
+        server = server_of(smtp_server, username="school", password="secret")
+
+        first = await pool.send([message(f"a{index}@example.com") for index in range(3)], server)
+        second = await pool.send([message("b@example.com")], server)
+        pool.close()
+
+        assert [delivery.status for delivery in first + second] == [DeliveryStatus.SENT] * 4
+        assert smtp_server.connections == 1
+        assert smtp_server.logins == ["school"]
+        assert [received.recipients for received in smtp_server.messages][-1] == ["b@example.com"]
+        assert smtp_server.messages[0].message["Subject"] == "Hello"
+
+    async def test_replaces_connections_after_message_limit(self, smtp_server: SMTPStandIn) -> None:
+        """Test that a connection is quit after ``messages_per_connection`` messages."""
+        pool = SMTPPool(messages_per_connection=2)
+        deliveries = await pool.send([message(f"{index}@example.com") for index in range(5)], server_of(smtp_server))
+        await pool.send([message("x@example.com")], server_of(smtp_server))
+
+        assert len(deliveries) == 5
+        assert smtp_server.connections == 3
+        assert [received.connection for received in smtp_server.messages] == [1, 1, 2, 2, 3, 3]
+
+    async def test_limits_connections_per_host(self, smtp_server: SMTPStandIn) -> None:
+        """Test that concurrent batches never open more connections than allowed."""
+        pool = SMTPPool(max_connections_per_host=2)
+        server = server_of(smtp_server)
+        batches = [[message(f"{batch}-{index}@example.com") for index in range(5)] for batch in range(6)]
+
+        results = await asyncio.gather(*(pool.send(batch, server) for batch in batches))
+        pool.close()
+
+        assert sum(len(deliveries) for deliveries in results) == 30
+        assert len(smtp_server.messages) == 30
+        assert smtp_server.connections <= 2
+        assert smtp_server.max_active <= 2
+
+    async def test_rejections_are_reported_per_message(self, smtp_server: SMTPStandIn) -> None:
+        """Test that 4xx replies are retried later, 5xx replies given up, and the batch goes on."""
+        smtp_server.reject = {"full@example.com": 452, "gone@example.com": 550}
+        pool = SMTPPool()
+
+        deliveries = await pool.send(
+            [message("full@example.com"), message("gone@example.com"), message("ok@example.com")],
+            server_of(smtp_server),
+        )
+
+        assert [delivery.status for delivery in deliveries] == [
+            DeliveryStatus.RETRY,
+            DeliveryStatus.FAILED,
+            DeliveryStatus.SENT,
+        ]
+        assert deliveries[1].error is not None and deliveries[1].error.startswith("550")
+        assert smtp_server.connections == 1
+
+    async def test_reconnects_after_dropped_connection(self, smtp_server: SMTPStandIn) -> None:
+        """Test that the rest of the batch is resent over a new connection."""
+        pool = SMTPPool(reconnect_backoff=0.01)
+        server = server_of(smtp_server)
+        await pool.send([message("first@example.com")], server)
+        smtp_server.drop_next()
+
+        deliveries = await pool.send([message(f"{index}@example.com") for index in range(3)], server)
+
+        assert [delivery.status for delivery in deliveries] == [DeliveryStatus.SENT] * 3
+        assert smtp_server.connections == 2
+        assert len(smtp_server.messages) == 4
+
+    async def test_gives_up_after_reconnect_attempts(self, smtp_server: SMTPStandIn) -> None:
+        """Test that an unreachable server leaves the messages for a later retry."""
+        pool = SMTPPool(reconnect_attempts=2, reconnect_backoff=0.01)
+        smtp_server.drop_next(3)
+
+        deliveries = await pool.send([message("a@example.com"), message("b@example.com")], server_of(smtp_server))
+
+        assert [delivery.status for delivery in deliveries] == [DeliveryStatus.RETRY] * 2
+        assert smtp_server.messages == []
+
+    async def test_refused_connection(self) -> None:
+        """Test that a server that cannot be reached leaves the messages for a later retry."""
+        pool = SMTPPool(reconnect_attempts=0)
+        with SMTPStandIn() as closed:
+            port = closed.port
+        deliveries = await pool.send([message("a@example.com")], SMTPServer(host="127.0.0.1", port=port))
+        assert deliveries[0].status is DeliveryStatus.RETRY
+        assert pool.connects == 0
+
+    async def test_rejected_login(self, smtp_server: SMTPStandIn) -> None:
+        """Test that a failed login leaves the messages for a later retry."""
+        smtp_server.password = "secret"
+        pool = SMTPPool(reconnect_attempts=0)
+
+        deliveries = await pool.send([message("a@example.com")], server_of(smtp_server, "school", "wrong"))
+
+        assert deliveries[0].status is DeliveryStatus.RETRY
+        assert deliveries[0].error is not None and "535" in deliveries[0].error
+        assert smtp_server.logins == []
+
+    async def test_idle_connections_are_probed(self, smtp_server: SMTPStandIn, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that idle connections are checked with NOOP and replaced when they are gone."""
+        monkeypatch.setattr(smtp, "IDLE_CHECK_AFTER", 0.0)
+        pool = SMTPPool(reconnect_attempts=0)
+        server = server_of(smtp_server)
+        await pool.send([message("a@example.com")], server)
+        await pool.send([message("b@example.com")], server)
+        assert smtp_server.connections == 1
+
+        # The server closed the idle session
+        for idle in pool._idle[server]:
+            assert idle.client.sock is not None
+            idle.client.sock.shutdown(socket.SHUT_RDWR)
+        deliveries = await pool.send([message("c@example.com")], server)
+        pool.close()
+
+        assert deliveries[0].status is DeliveryStatus.SENT
+        assert smtp_server.connections == 2
@@ -0,0 +1,72 @@
+"""Tests for notification templates."""
+import pytest
+
+from src.domain.notifications.templates import (
+    TEMPLATES,
+    NotificationTemplate,
+    TemplateRenderer,
+)
+
+REMINDER = NotificationTemplate(kind="reminder", version=1, subject="$title tomorrow", body="See you at $time.")
+
+
+class TestTemplateRenderer:
+    """Test cases for the render cache."""
+
+    def test_renders_placeholders(self) -> None:
+        """Test that subject and body are filled from the context."""
+        renderer = TemplateRenderer({"reminder": REMINDER})
+        message = renderer.render("reminder", {"title": "Salsa", "time": "19:00"})
+        assert (message.subject, message.body) == ("Salsa tomorrow", "See you at 19:00.")
+
+    def test_same_context_is_rendered_once(self) -> None:
+        """Test that repeated renders of a template version are served from the cache."""
+        renderer = TemplateRenderer({"reminder": REMINDER})
+        first = renderer.render("reminder", {"title": "Salsa", "time": "19:00"})
+        again = renderer.render("reminder", {"time": "19:00", "title": "Salsa"})
+        renderer.render("reminder", {"title": "Tango", "time": "20:00"})
+
+        assert again is first
+        assert renderer.compiled == 1
+        assert len(renderer) == 2
+
+    def test_new_version_bypasses_the_cache(self) -> None:
+        """Test that bumping the version renders the new text."""
+        templates = {"reminder": REMINDER}
+        renderer = TemplateRenderer(templates)
+        renderer.render("reminder", {"title": "Salsa", "time": "19:00"})
+
+        templates["reminder"] = NotificationTemplate("reminder", 2, "Reminder: $title", "At $time.")
+        message = renderer.render("reminder", {"title": "Salsa", "time": "19:00"})
+
+        assert message.subject == "Reminder: Salsa"
+        assert renderer.compiled == 2
+
+    def test_cache_is_bounded(self) -> None:
+        """Test that the least recently used renderings are evicted."""
+        renderer = TemplateRenderer({"reminder": REMINDER}, max_entries=2)
+        for title in ("Salsa", "Tango", "Zouk"):
+            renderer.render("reminder", {"title": title, "time": "19:00"})
+        assert len(renderer) == 2
+
+    def test_errors(self) -> None:
+        """Test that unknown kinds, missing values and invalid templates are rejected."""
+        broken = NotificationTemplate("broken", 1, "Hi $", "Body")
+        renderer = TemplateRenderer({"reminder": REMINDER, "broken": broken})
+
+        with pytest.raises(ValueError, match="No template"):
+            renderer.render("unknown", {})
+        with pytest.raises(ValueError, match="'time'"):
+            renderer.render("reminder", {"title": "Salsa"})
+        with pytest.raises(ValueError, match="Invalid placeholder"):
+            renderer.render("broken", {})
+
+    def test_builtin_templates_render(self) -> None:
+        """Test that the shipped templates render with the payload of their jobs."""
+        renderer = TemplateRenderer()
+        message = renderer.render(
+            "waitlist.promoted",
+            {"session_id": "s", "student_id": "u", "reservation_id": "r", "promoted_at": "now"},
+        )
+        assert "Reservation: r" in message.body
+        assert set(TEMPLATES) == {"waitlist.promoted"}
@@ -0,0 +1 @@
+"""Payments domain tests package."""
@@ -0,0 +1,98 @@
+"""Tests for payment reconciliation."""
+from datetime import date, datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import metadata
+from src.domain.payments.reconcile import Reconciler
+from src.domain.payments.repository import ExpectedPaymentRepository
+from src.domain.payments.schemas import ExpectedPayment, PaymentStatus
+
+NOW = datetime(2026, 10, 3, 8, 0, tzinfo=timezone.utc)
+DUE = date(2026, 10, 1)
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def repo(engine: Engine) -> ExpectedPaymentRepository:
+    return ExpectedPaymentRepository(engine)
+
+
+def payment(reference: str, amount_cents: int, due_on: date = DUE, **fields: object) -> ExpectedPayment:
+    return ExpectedPayment.model_validate(
+        {"id": uuid4(), "reference": reference, "amount_cents": amount_cents, "due_on": due_on, **fields}
+    )
+
+
+class TestReconciler:
+    """Test reconciling statements against pending payments."""
+
+    async def test_reconcile(self, repo: ExpectedPaymentRepository, tmp_path: Path) -> None:
+        """Test matching, write-back and unmatched reports on both sides."""
+        september = payment("RF 01", 4500, date(2026, 9, 1))
+        october = payment("RF 01", 4500, date(2026, 10, 1))
+        other = payment("RF02", 3000)
+        settled = payment("RF03", 1000, status=PaymentStatus.MATCHED)
+        unpaid = payment("RF04", 2000)
+        for item in (september, october, other, settled, unpaid):
+            await repo.create(item)
+
+        statement = tmp_path / "statement.csv"
+        statement.write_text(
+            "booking_date,amount,reference\n"
+            "2026-10-02,45.00,rf01\n"
+            "2026-10-02,30.00,RF02\n"
+            "2026-10-02,30.00,RF02\n"
+            "2026-10-02,10.00,RF03\n"
+            "2026-10-02,20.01,RF04\n"
+        )
+        reconciler = Reconciler(repo, read_batch_size=2, write_batch_size=1, chunk_size=32)
+        report = await reconciler.reconcile(statement, now=NOW)
+
+        assert (report.lines, report.matched) == (5, 2)
+        assert [line.line_number for line in report.unmatched_lines] == [4, 5, 6]
+        assert [item.id for item in report.unmatched_payments] == [october.id, unpaid.id]
+
+        matched = await repo.get(september.id)
+        assert matched.status == PaymentStatus.MATCHED
+        assert matched.statement_line == 2
+        assert matched.matched_at is not None
+        assert (await repo.get(other.id)).statement_line == 3
+        assert (await repo.get(october.id)).status == PaymentStatus.PENDING
+
+    async def test_malformed_lines_are_reported(self, repo: ExpectedPaymentRepository, tmp_path: Path) -> None:
+        """Test that lines which cannot be parsed are reported without stopping the run."""
+        first, second = payment("RF01", 4500), payment("RF02", 3000)
+        for item in (first, second):
+            await repo.create(item)
+
+        statement = tmp_path / "statement.csv"
+        statement.write_text(
+            "booking_date,amount,reference\n2026-10-02,45.00,RF01\n2026-10-02,-1.50,\n2026-10-02,3O.00,RF02\n"
+            "2026-10-03,30.00,RF02\n"
+        )
+        report = await Reconciler(repo, chunk_size=16).reconcile(statement, now=NOW)
+
+        assert (report.lines, report.matched) == (2, 2)
+        assert [line.line_number for line in report.rejected_lines] == [4]
+        assert (await repo.get(second.id)).statement_line == 5
+
+    async def test_load_pending_orders_by_due_date(self, repo: ExpectedPaymentRepository) -> None:
+        """Test that the hash table pops the earliest due payment first."""
+        later = payment("RF01", 100, date(2026, 11, 1))
+        earlier = payment("RF01", 100, date(2026, 10, 1))
+        for item in (later, earlier):
+            await repo.create(item)
+
+        table = await Reconciler(repo).load_pending()
+        assert table[("RF01", 100)].pop().id == earlier.id
@@ -0,0 +1,115 @@
+"""Tests for bank statement parsing."""
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src.core.exceptions import ValidationError
+from src.domain.payments.schemas import RejectedLine, StatementLine
+from src.domain.payments.statement import (
+    normalize_reference,
+    parse_amount,
+    read_statement,
+)
+
+
+def write(tmp_path: Path, text: str) -> Path:
+    path = tmp_path / "statement.csv"
+    path.write_bytes(text.encode())
+    return path
+
+
+def test_parse_amount() -> None:
+    """Test parsing decimal amounts into cents."""
+    assert parse_amount("12.5") == 1250
+    assert parse_amount(" -3.00 ") == -300
+    with pytest.raises(ValueError):
+        parse_amount("1.234")
+    with pytest.raises(ValueError):
+        parse_amount("twelve")
+
+
+@pytest.mark.parametrize("text", ["Infinity", "-Infinity", "inf", "NaN", "sNaN"])
+def test_parse_amount_rejects_non_finite(text: str) -> None:
+    """Test that infinities and NaNs are rejected like any other invalid amount."""
+    with pytest.raises(ValueError, match="invalid amount"):
+        parse_amount(text)
+
+
+def test_normalize_reference() -> None:
+    """Test that references match regardless of spacing and case."""
+    assert normalize_reference(" rf18 5390 0754 ") == "RF1853900754"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 16, 1 << 20])
+def test_read_statement_in_chunks(tmp_path: Path, chunk_size: int) -> None:
+    """Test that chunking never splits or loses lines."""
+    path = write(
+        tmp_path,
+        "booking_date,description,amount,reference\r\n"
+        '2026-10-01,"Fee, October",45.00,RF01\r\n'
+        "\r\n"
+        "2026-10-01,Card fee,-1.50,\r\n"
+        "2026-10-02,Fee,30,RF02",
+    )
+    lines = [line for batch in read_statement(path, chunk_size) for line in batch]
+    assert lines == [
+        StatementLine(2, date(2026, 10, 1), 4500, "RF01"),
+        StatementLine(5, date(2026, 10, 2), 3000, "RF02"),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 24, 40, 1 << 20])
+def test_quoted_fields_span_lines(tmp_path: Path, chunk_size: int) -> None:
+    """Test that records with line breaks in quoted fields are never cut at a chunk boundary."""
+    path = write(
+        tmp_path,
+        "booking_date,description,amount,reference\n"
+        '2026-10-01,"Fee\nOctober ""A""\nclass",45.00,RF01\n'
+        "2026-10-02,Fee,30,RF02\n",
+    )
+    lines = [line for batch in read_statement(path, chunk_size) for line in batch]
+    assert lines == [
+        StatementLine(2, date(2026, 10, 1), 4500, "RF01"),
+        StatementLine(5, date(2026, 10, 2), 3000, "RF02"),
+    ]
+
+
+def test_byte_order_mark(tmp_path: Path) -> None:
+    """Test that a byte order mark before the header is ignored."""
+    path = write(tmp_path, "\ufeffbooking_date,amount,reference\n2026-10-01,1.00,A\n")
+    assert list(read_statement(path)) == [[StatementLine(2, date(2026, 10, 1), 100, "A")]]
+
+
+def test_empty_statement(tmp_path: Path) -> None:
+    """Test that an empty file has no lines."""
+    assert list(read_statement(write(tmp_path, ""))) == []
+
+
+def test_missing_columns(tmp_path: Path) -> None:
+    """Test that a header without the required columns is rejected."""
+    with pytest.raises(ValidationError) as error:
+        list(read_statement(write(tmp_path, "date,amount\n2026-10-01,1.00\n")))
+    assert error.value.details["errors"] == {"header": "missing columns booking_date, reference"}
+
+
+def test_malformed_line(tmp_path: Path) -> None:
+    """Test that malformed lines are reported with their line number."""
+    with pytest.raises(ValidationError) as error:
+        list(read_statement(write(tmp_path, "booking_date,amount,reference\n2026-10-01,1.00,A\nyesterday,1.00,B\n")))
+    assert "line 3" in error.value.details["errors"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1 << 20])
+def test_rejected_lines(tmp_path: Path, chunk_size: int) -> None:
+    """Test that malformed lines are collected and skipped when asked to."""
+    path = write(
+        tmp_path,
+        "booking_date,amount,reference\n2026-10-01,one,A\n2026-10-01\n2026-10-02,1.00,B\nyesterday,1.00,C\n",
+    )
+    rejected: list[RejectedLine] = []
+    lines = [line for batch in read_statement(path, chunk_size, rejected=rejected) for line in batch]
+
+    assert lines == [StatementLine(4, date(2026, 10, 2), 100, "B")]
+    assert [line.line_number for line in rejected] == [2, 3, 5]
+    assert "invalid amount" in rejected[0].reason
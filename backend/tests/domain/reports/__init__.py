@@ -0,0 +1 @@
+"""Reports domain tests package."""
@@ -0,0 +1,132 @@
+"""Tests for vectorized report aggregates."""
+from datetime import datetime, timezone
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from src.domain.reports.analytics import (
+    attendance_heatmap,
+    instructor_utilization,
+    local_seconds,
+    retention_cohorts,
+)
+from src.domain.reports.columns import COLUMNS, AttendanceColumns, OfferedSessions
+
+LISBON = ZoneInfo("Europe/Lisbon")
+UTC = ZoneInfo("UTC")
+
+
+def epoch(year: int, month: int, day: int, hour: int) -> int:
+    return int(datetime(year, month, day, hour, tzinfo=timezone.utc).timestamp())
+
+
+def columns(rows: list[tuple[int, int, int, int, int, int]], instructors: int = 1) -> AttendanceColumns:
+    """Build columns from (student, instructor, session, starts_at, first_at, capacity) rows."""
+    arrays = np.array(rows, dtype=np.int64).reshape(len(rows), 6).T
+    return AttendanceColumns(**dict(zip(COLUMNS, arrays)), instructor_ids=[uuid4() for _ in range(instructors)])
+
+
+class TestLocalSeconds:
+    """Test converting UTC epoch seconds to local time."""
+
+    def test_dst(self) -> None:
+        """Test that offsets follow DST changes."""
+        winter, summer = epoch(2026, 1, 15, 19), epoch(2026, 7, 15, 18)
+        local = local_seconds(np.array([winter, summer]), LISBON)
+        assert (local % 86400 // 3600).tolist() == [19, 19]
+
+    def test_empty(self) -> None:
+        """Test that empty input stays empty."""
+        assert local_seconds(np.array([], dtype=np.int64), LISBON).size == 0
+
+
+class TestRetentionCohorts:
+    """Test monthly retention cohorts."""
+
+    def test_cohorts(self) -> None:
+        """Test cohort sizes and returning students."""
+        jan, feb, mar = epoch(2026, 1, 10, 19), epoch(2026, 2, 10, 19), epoch(2026, 3, 10, 19)
+        old = epoch(2025, 6, 1, 19)
+        report = retention_cohorts(
+            columns(
+                [
+                    (0, 0, 0, jan, jan, 10),
+                    (0, 0, 1, jan + 86400, jan, 10),  # same month again counts once
+                    (0, 0, 2, mar, jan, 10),
+                    (1, 0, 0, jan, jan, 10),
+                    (1, 0, 3, feb, jan, 10),
+                    (2, 0, 3, feb, feb, 10),
+                    (3, 0, 3, feb, old, 10),  # joined before the window
+                ]
+            ),
+            datetime(2026, 1, 1, tzinfo=timezone.utc),
+            datetime(2026, 4, 1, tzinfo=timezone.utc),
+            UTC,
+        )
+        assert report.months == ["2026-01", "2026-02", "2026-03"]
+        assert report.cohort_sizes == [2, 1, 0]
+        assert report.retained == [[2, 1, 1], [1, 0], [0]]
+
+    def test_empty(self) -> None:
+        """Test a window without check-ins."""
+        report = retention_cohorts(
+            columns([]),
+            datetime(2026, 1, 1, tzinfo=timezone.utc),
+            datetime(2026, 2, 1, tzinfo=timezone.utc),
+            UTC,
+        )
+        assert report.cohort_sizes == [0]
+
+
+class TestHeatmap:
+    """Test the weekday and hour heatmap."""
+
+    def test_counts(self) -> None:
+        """Test bucketing by local weekday and hour."""
+        tuesday = epoch(2026, 7, 7, 18)  # 19:00 in Lisbon
+        heatmap = attendance_heatmap(columns([(0, 0, 0, tuesday, tuesday, 10)] * 3), LISBON)
+        assert heatmap.timezone == "Europe/Lisbon"
+        assert heatmap.counts[1][19] == 3
+        assert sum(map(sum, heatmap.counts)) == 3
+
+
+class TestInstructorUtilization:
+    """Test instructor utilization."""
+
+    def test_utilization(self) -> None:
+        """Test seats taken per instructor out of the seats scheduled, highest first."""
+        start = epoch(2026, 1, 6, 19)
+        data = columns(
+            [
+                (0, 0, 0, start, start, 4),
+                (1, 0, 0, start, start, 4),
+                (0, 1, 1, start, start, 10),
+                (0, 1, 2, start, start, 10),
+                (1, 1, 2, start, start, 10),
+                (2, 1, 2, start, start, 10),
+            ],
+            instructors=2,
+        )
+        idle = uuid4()
+        offered = OfferedSessions(
+            instructor=np.array([0, 0, 1, 1, 2]),
+            capacity=np.array([4, 4, 10, 10, 6]),
+            instructor_ids=[*data.instructor_ids, idle],
+        )
+
+        first, second, third = instructor_utilization(data, offered)
+        assert first.instructor_id == data.instructor_ids[0]
+        assert (first.sessions, first.attendances, first.seats, first.utilization) == (2, 2, 8, 0.25)
+        assert (second.sessions, second.attendances, second.seats, second.utilization) == (2, 4, 20, 0.2)
+        assert third.instructor_id == idle
+        assert (third.sessions, third.attendances, third.seats, third.utilization) == (1, 0, 6, 0.0)
+
+    def test_check_ins_outside_the_schedule(self) -> None:
+        """Test that check-ins of sessions no longer scheduled offer no seats."""
+        start = epoch(2026, 1, 6, 19)
+        data = columns([(0, 0, 0, start, start, 0)])
+        empty = OfferedSessions(np.array([], dtype=np.int64), np.array([], dtype=np.int64), [])
+
+        (result,) = instructor_utilization(data, empty)
+        assert (result.sessions, result.attendances, result.seats, result.utilization) == (0, 1, 0, 0.0)
@@ -0,0 +1,129 @@
+"""Tests for loading attendance columns."""
+import io
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import Engine, create_engine, insert
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import metadata
+from src.domain.attendance.repository import AttendanceRepository, attendance
+from src.domain.classes.repository import ClassSeriesRepository, class_series
+from src.domain.classes.schedule import ClassSchedule
+from src.domain.reports.columns import load_attendance_columns, load_offered_sessions
+
+START = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine)
+    return engine
+
+
+def seed(engine: Engine, studio_id: UUID) -> tuple[UUID, UUID]:
+    series_id, instructor_id, student_id = uuid4(), uuid4(), uuid4()
+    with engine.begin() as connection:
+        connection.execute(
+            insert(class_series).values(
+                id=series_id,
+                title="Bachata",
+                studio_id=studio_id,
+                instructor_id=instructor_id,
+                starts_at=START,
+                duration_minutes=60,
+                timezone="UTC",
+                recurrence="RRULE:FREQ=WEEKLY",
+                capacity=12,
+                updated_at=START,
+            )
+        )
+        connection.execute(
+            insert(attendance),
+            [
+                {
+                    "id": uuid4(),
+                    "series_id": series_id,
+                    "session_id": uuid4(),
+                    "student_id": student_id,
+                    "instructor_id": instructor_id,
+                    "studio_id": studio_id,
+                    "starts_at": START + timedelta(weeks=week),
+                }
+                for week in range(-1, 3)
+            ],
+        )
+    return instructor_id, student_id
+
+
+async def test_load_columns(engine: Engine) -> None:
+    """Test loading a window of check-ins as integer columns."""
+    studio_id = uuid4()
+    instructor_id, _ = seed(engine, studio_id)
+    seed(engine, uuid4())
+    repository = AttendanceRepository(engine)
+
+    columns = await load_attendance_columns(repository, START, START + timedelta(weeks=2), studio_id)
+    assert len(columns) == 2
+    assert columns.instructor_ids == [instructor_id]
+    assert columns.student.tolist() == [0, 0]
+    assert columns.capacity.tolist() == [12, 12]
+    assert sorted(columns.starts_at.tolist()) == [int(START.timestamp()), int((START + timedelta(weeks=1)).timestamp())]
+    assert columns.first_at.tolist() == [int((START - timedelta(weeks=1)).timestamp())] * 2
+
+    everything = await load_attendance_columns(repository, START, START + timedelta(weeks=3))
+    assert len(everything) == 6
+    assert len(everything.instructor_ids) == 2
+
+    archive = np.load(io.BytesIO(columns.to_npz()))
+    assert archive["capacity"].tolist() == [12, 12]
+    assert archive["instructor_ids"].tolist() == [str(instructor_id)]
+
+
+async def test_check_ins_without_series(engine: Engine) -> None:
+    """Test that check-ins of a series gone from the table keep codes and IDs aligned."""
+    studio_id = uuid4()
+    instructor_id, _ = seed(engine, studio_id)
+    orphan_instructor = UUID(int=0)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(attendance).values(
+                id=uuid4(),
+                series_id=uuid4(),
+                session_id=uuid4(),
+                student_id=uuid4(),
+                instructor_id=orphan_instructor,
+                studio_id=studio_id,
+                starts_at=START,
+            )
+        )
+
+    columns = await load_attendance_columns(AttendanceRepository(engine), START, START + timedelta(weeks=2), studio_id)
+
+    assert len(columns) == 3
+    assert columns.instructor_ids == [orphan_instructor, instructor_id]
+    by_instructor = dict(zip(columns.instructor.tolist(), columns.capacity.tolist()))
+    assert by_instructor == {0: 0, 1: 12}
+
+
+async def test_load_offered_sessions(engine: Engine) -> None:
+    """Test loading the sessions starting in a window, attended or not."""
+    studio_id = uuid4()
+    instructor_id, _ = seed(engine, studio_id)
+    seed(engine, uuid4())
+    schedule = ClassSchedule(ClassSeriesRepository(engine))
+
+    offered = await load_offered_sessions(schedule, START, START + timedelta(weeks=4), studio_id)
+    assert len(offered) == 4
+    assert offered.instructor_ids == [instructor_id]
+    assert offered.instructor.tolist() == [0] * 4
+    assert offered.capacity.tolist() == [12] * 4
+
+    running = await load_offered_sessions(
+        schedule, START + timedelta(minutes=30), START + timedelta(weeks=1), studio_id
+    )
+    assert len(running) == 0
+    assert len(await load_offered_sessions(schedule, START, START + timedelta(weeks=1))) == 2
@@ -0,0 +1,77 @@
+"""Tests for password hashing."""
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from src.core.exceptions import OverloadedError
+from src.domain.users.passwords import (
+    PasswordHasher,
+    ScryptParameters,
+    hash_password,
+    needs_rehash,
+    parse_hash,
+    verify_password,
+)
+
+# Cheap parameters keep the tests fast; production uses AUTH_HASH_COST
+FAST = ScryptParameters(cost=4)
+
+
+@pytest.fixture
+async def hasher() -> AsyncIterator[PasswordHasher]:
+    hasher = PasswordHasher(workers=1, queue_limit=1, parameters=FAST)
+    yield hasher
+    hasher.shutdown()
+
+
+class TestHashing:
+    """Test cases for hashing and verifying passwords."""
+
+    def test_hash_and_verify(self) -> None:
+        """Test that only the original password verifies and salts differ."""
+        encoded = hash_password("pa$$word", FAST)
+
+        assert encoded.startswith("scrypt$4$8$1$")
+        assert verify_password("pa$$word", encoded)
+        assert not verify_password("password", encoded)
+        assert hash_password("pa$$word", FAST) != encoded
+
+    def test_malformed_hashes(self) -> None:
+        """Test that malformed or foreign hashes never verify and need a rehash."""
+        assert not verify_password("secret", "bcrypt$12$abc")
+        with pytest.raises(ValueError):
+            parse_hash("md5$1$1$1$salt$key")
+        assert needs_rehash("md5$1$1$1$salt$key")
+
+    def test_needs_rehash_after_cost_change(self) -> None:
+        """Test that hashes made with an old cost are flagged."""
+        encoded = hash_password("secret", FAST)
+        assert not needs_rehash(encoded, FAST)
+        assert needs_rehash(encoded)
+
+
+class TestPasswordHasher:
+    """Test cases for the process pool hasher."""
+
+    async def test_hash_and_verify_off_the_loop(self, hasher: PasswordHasher) -> None:
+        """Test hashing and verifying on the pool."""
+        encoded = await hasher.hash("secret")
+
+        assert await hasher.verify("secret", encoded)
+        assert not await hasher.verify("guess", encoded)
+        assert hasher.pending == 0
+
+    async def test_full_queue_is_rejected(self, hasher: PasswordHasher) -> None:
+        """Test that operations beyond workers plus queue limit fail fast."""
+        encoded = await hasher.hash("secret")
+        results = await asyncio.gather(
+            *(hasher.verify("secret", encoded) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert results[:2] == [True, True]
+        assert isinstance(results[2], OverloadedError)
+        assert results[2].details == {"resource": "password hashing", "limit": 2, "retry_after": 1}
+        hasher.shutdown()
+        hasher.shutdown()
@@ -0,0 +1,112 @@
+"""Tests for access tokens."""
+import base64
+import hashlib
+import hmac
+
+import pytest
+
+from src.core.config import settings
+from src.core.exceptions import AuthenticationError
+from src.core.tenancy import tenant_scope
+from src.domain.users.tokens import (
+    TokenClaims,
+    VerifiedTokenCache,
+    decode_token,
+    issue_token,
+    verify_token,
+)
+
+NOW = 1_800_000_000.0
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self, now: float) -> None:
+        """Start the clock at a given time."""
+        self.now = now
+
+    def __call__(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+class TestTokens:
+    """Test cases for issuing and decoding tokens."""
+
+    def test_round_trip(self) -> None:
+        """Test that an issued token decodes to its claims."""
+        with tenant_scope("salsa"):
+            token = issue_token("user-1", ttl=60, now=NOW)
+        assert decode_token(token, now=NOW + 59) == TokenClaims("user-1", "salsa", NOW + 60)
+
+    @pytest.mark.parametrize(
+        "token",
+        ["", "garbage", "e30.signature", "not-base64!.x", "e30.sïgnature"],
+    )
+    def test_malformed_tokens(self, token: str) -> None:
+        """Test that malformed tokens are rejected."""
+        with pytest.raises(AuthenticationError):
+            decode_token(token)
+
+    def test_forged_and_expired_tokens(self) -> None:
+        """Test that tokens signed with another secret or past expiry are rejected."""
+        forged = issue_token("user-1", secret="other", now=NOW)
+        with pytest.raises(AuthenticationError, match="invalid token"):
+            decode_token(forged, now=NOW)
+        with pytest.raises(AuthenticationError, match="expired token"):
+            decode_token(issue_token("user-1", ttl=60, now=NOW), now=NOW + 60)
+
+    def test_signed_payload_without_claims(self) -> None:
+        """Test that a correctly signed payload missing claims is rejected."""
+        payload = "e30"  # {}
+        digest = hmac.new(settings.AUTH_SECRET.encode(), payload.encode(), hashlib.sha256).digest()
+        signature = base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+        with pytest.raises(AuthenticationError, match="invalid token"):
+            decode_token(f"{payload}.{signature}")
+
+
+class TestVerifiedTokenCache:
+    """Test cases for the verified-token cache."""
+
+    def test_cached_until_token_expiry(self) -> None:
+        """Test that repeated tokens are served from the cache, never past their expiry."""
+        clock = FakeClock(NOW)
+        cache = VerifiedTokenCache(clock=clock)
+        token = issue_token("user-1", ttl=60, now=NOW)
+
+        claims = verify_token(token, cache)
+        assert cache.get(token) == claims
+        clock.now = NOW + 60
+        assert cache.get(token) is None
+        with pytest.raises(AuthenticationError, match="expired token"):
+            verify_token(token, cache)
+        assert len(cache) == 0
+
+    def test_lru_eviction_and_discard(self) -> None:
+        """Test that the least recently used tokens are evicted and logout forgets a token."""
+        cache = VerifiedTokenCache(max_entries=2, clock=FakeClock(NOW))
+        tokens = [issue_token(f"user-{index}", now=NOW) for index in range(3)]
+        for token in tokens[:2]:
+            verify_token(token, cache)
+        verify_token(tokens[0], cache)
+        verify_token(tokens[2], cache)
+
+        assert cache.get(tokens[1]) is None
+        cache.discard(tokens[0])
+        assert len(cache) == 1
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_tenant_must_match(self) -> None:
+        """Test that a cached token cannot be used in another tenant."""
+        cache = VerifiedTokenCache(clock=FakeClock(NOW))
+        with tenant_scope("salsa"):
+            token = issue_token("user-1", now=NOW)
+            verify_token(token, cache)
+        with tenant_scope("tango"), pytest.raises(AuthenticationError, match="another tenant"):
+            verify_token(token, cache)
+
+    def test_default_cache(self) -> None:
+        """Test verifying with the process-wide cache."""
+        assert verify_token(issue_token("user-1")).subject == "user-1"
@@ -0,0 +1 @@
+"""Waitlist domain tests package."""
@@ -0,0 +1,104 @@
+"""Tests for the waitlist priority queue."""
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from src.domain.waitlist.queue import WaitlistQueue, WaitlistQueues
+from src.domain.waitlist.schemas import MembershipTier, WaitlistEntry
+
+SESSION = uuid4()
+NOW = datetime(2026, 10, 19, 18, tzinfo=timezone.utc)
+
+
+def entry(minutes: int, tier: MembershipTier = MembershipTier.MEMBER) -> WaitlistEntry:
+    return WaitlistEntry(
+        id=uuid4(),
+        session_id=SESSION,
+        student_id=uuid4(),
+        email="student@example.com",
+        tier=tier,
+        signed_up_at=NOW + timedelta(minutes=minutes),
+    )
+
+
+def drain(queue: WaitlistQueue) -> list[UUID]:
+    ids = []
+    while (next_entry := queue.pop()) is not None:
+        ids.append(next_entry.id)
+    return ids
+
+
+class TestWaitlistQueue:
+    """Test cases for the waitlist heap."""
+
+    def test_orders_by_tier_then_signup_time(self) -> None:
+        """Test that higher tiers come first and earlier signups break ties."""
+        late_unlimited = entry(30, MembershipTier.UNLIMITED)
+        early_drop_in = entry(0, MembershipTier.DROP_IN)
+        early_member = entry(5)
+        late_member = entry(10)
+        queue = WaitlistQueue([early_drop_in, late_member, late_unlimited, early_member])
+
+        assert len(queue) == 4
+        assert queue.peek() == late_unlimited
+        assert drain(queue) == [late_unlimited.id, early_member.id, late_member.id, early_drop_in.id]
+        assert queue.peek() is None
+        assert queue.pop() is None
+
+    def test_push_keeps_heap_order(self) -> None:
+        """Test that pushed entries are popped in priority order."""
+        entries = [entry(minutes) for minutes in (7, 3, 9, 1)]
+        queue = WaitlistQueue()
+        for waiting in entries:
+            queue.push(waiting)
+        queue.push(entries[0])
+
+        assert len(queue) == 4
+        assert drain(queue) == [entries[3].id, entries[1].id, entries[0].id, entries[2].id]
+
+    def test_remove_is_lazy(self) -> None:
+        """Test that removed entries are skipped and can be pushed again."""
+        first, second, third = entry(1), entry(2), entry(3)
+        queue = WaitlistQueue([first, second, third])
+
+        queue.remove(first.id)
+        queue.remove(uuid4())
+        assert len(queue) == 2
+        assert first.id not in queue
+        assert queue.peek() == second
+
+        queue.push(first)
+        assert first.id in queue
+        assert drain(queue) == [first.id, second.id, third.id]
+
+
+class TestWaitlistQueues:
+    """Test cases for the queue cache."""
+
+    def test_only_current_versions_are_returned(self) -> None:
+        """Test that a queue whose version differs from the stored one is stale."""
+        queues = WaitlistQueues(max_entries=10)
+        queue = WaitlistQueue([entry(1)], version=3)
+        queues.put((None, SESSION), queue)
+
+        assert queues.get((None, SESSION), 3) is queue
+        assert queues.get((None, SESSION), 4) is None
+        assert queues.get(("salsa", SESSION), 3) is None
+
+        queues.discard((None, SESSION))
+        assert queues.get((None, SESSION), 3) is None
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test that the cache is bounded."""
+        queues = WaitlistQueues(max_entries=2)
+        keys = [(None, uuid4()) for _ in range(3)]
+        queues.put(keys[0], WaitlistQueue())
+        queues.put(keys[1], WaitlistQueue())
+        queues.get(keys[0], 0)
+        queues.put(keys[2], WaitlistQueue())
+
+        assert len(queues) == 2
+        assert queues.get(keys[1], 0) is None
+        assert queues.get(keys[0], 0) is not None
+
+        queues.clear()
+        assert len(queues) == 0
@@ -0,0 +1,289 @@
+"""Tests for the waitlist repository."""
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import Engine, create_engine, func, select, update
+from sqlalchemy.pool import StaticPool
+
+from src.core.broadcast import broadcaster
+from src.core.database import metadata
+from src.core.exceptions import EntityConflictError, EntityNotFoundError
+from src.domain.classes.availability import availability_topic
+from src.domain.notifications.jobs import notification_jobs
+from src.domain.notifications.sender import NotificationSender
+from src.domain.notifications.smtp import SMTPPool, SMTPServer
+from src.domain.notifications.templates import TemplateRenderer
+from src.domain.waitlist.queue import WaitlistQueues
+from src.domain.waitlist.repository import (
+    PROMOTED_JOB,
+    WaitlistRepository,
+    seat_reservations,
+    session_seats,
+    waitlist_entries,
+)
+from src.domain.waitlist.schemas import MembershipTier, SessionSeats
+from tests.plugins.smtp_server import SMTPStandIn
+
+STARTS_AT = datetime(2026, 10, 20, 18, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def repository(engine: Engine) -> WaitlistRepository:
+    return WaitlistRepository(engine, WaitlistQueues())
+
+
+async def open_session(repository: WaitlistRepository, capacity: int, starts_at: datetime = STARTS_AT) -> UUID:
+    seats = SessionSeats(
+        session_id=uuid4(),
+        starts_at=starts_at,
+        ends_at=starts_at + timedelta(hours=1),
+        capacity=capacity,
+    )
+    await repository.open_session(seats)
+    return seats.session_id
+
+
+def email(student_id: UUID) -> str:
+    return f"{student_id}@example.com"
+
+
+def reserved(engine: Engine, session_id: UUID) -> set[UUID]:
+    statement = select(seat_reservations.c.student_id).where(seat_reservations.c.session_id == session_id)
+    with engine.connect() as connection:
+        return set(connection.execute(statement).scalars())
+
+
+class TestSeats:
+    """Test cases for tracking and booking seats."""
+
+    async def test_open_session_twice_conflicts(self, repository: WaitlistRepository) -> None:
+        """Test that a session's seats are tracked once."""
+        session_id = await open_session(repository, 2)
+        seats = await repository.get_seats(session_id)
+        with pytest.raises(EntityConflictError):
+            await repository.open_session(seats)
+        with pytest.raises(EntityNotFoundError):
+            await repository.get_seats(uuid4())
+
+    async def test_reserve_until_full(self, engine: Engine, repository: WaitlistRepository) -> None:
+        """Test that seats are booked up to the capacity."""
+        session_id = await open_session(repository, 1)
+        student = uuid4()
+        await repository.reserve(session_id, student)
+
+        with pytest.raises(EntityConflictError, match="capacity"):
+            await repository.reserve(session_id, uuid4())
+        with pytest.raises(EntityNotFoundError):
+            await repository.reserve(uuid4(), student)
+        assert (await repository.get_seats(session_id)).seats_taken == 1
+        assert reserved(engine, session_id) == {student}
+
+    async def test_reserve_rejects_schedule_conflicts(self, repository: WaitlistRepository) -> None:
+        """Test that a student cannot hold seats in overlapping sessions."""
+        student = uuid4()
+        first = await open_session(repository, 5)
+        overlapping = await open_session(repository, 5, STARTS_AT + timedelta(minutes=30))
+        later = await open_session(repository, 5, STARTS_AT + timedelta(hours=1))
+
+        await repository.reserve(first, student)
+        with pytest.raises(EntityConflictError, match="schedule"):
+            await repository.reserve(overlapping, student)
+        await repository.reserve(later, student)
+
+    async def test_reserved_sessions(self, repository: WaitlistRepository) -> None:
+        """Test that the sessions of a student overlapping a window are listed in order."""
+        student = uuid4()
+        later = await open_session(repository, 5, STARTS_AT + timedelta(days=1))
+        first = await open_session(repository, 5)
+        outside = await open_session(repository, 5, STARTS_AT + timedelta(days=7))
+        for session_id in (later, first, outside):
+            await repository.reserve(session_id, student)
+        await repository.reserve(first, uuid4())
+
+        sessions = await repository.reserved_sessions(student, STARTS_AT, STARTS_AT + timedelta(days=2))
+
+        assert [seats.session_id for seats in sessions] == [first, later]
+
+
+class TestWaitlist:
+    """Test cases for joining, leaving and promotion."""
+
+    async def test_cancel_promotes_best_student(self, engine: Engine, repository: WaitlistRepository) -> None:
+        """Test that a freed seat goes to the highest tier, then the earliest signup."""
+        session_id = await open_session(repository, 1)
+        holder = uuid4()
+        await repository.reserve(session_id, holder)
+        drop_in, member, unlimited = uuid4(), uuid4(), uuid4()
+        await repository.join(session_id, drop_in, email(drop_in), MembershipTier.DROP_IN)
+        await repository.join(session_id, member, email(member))
+        await repository.join(session_id, unlimited, email(unlimited), MembershipTier.UNLIMITED)
+
+        promotions = await repository.cancel(session_id, holder)
+
+        assert [promotion.student_id for promotion in promotions] == [unlimited]
+        assert reserved(engine, session_id) == {unlimited}
+        waiting = await repository.list(filters={"session_id": session_id})
+        assert {entry.student_id for entry in waiting} == {drop_in, member}
+        seats = await repository.get_seats(session_id)
+        assert seats.seats_taken == 1
+
+        await repository.cancel(session_id, unlimited)
+        assert reserved(engine, session_id) == {member}
+
+    async def test_promotion_queues_notification(self, engine: Engine, repository: WaitlistRepository) -> None:
+        """Test that each promotion queues a notification job in the same transaction."""
+        session_id = await open_session(repository, 1)
+        holder, waiting = uuid4(), uuid4()
+        await repository.reserve(session_id, holder)
+        await repository.join(session_id, waiting, email(waiting))
+
+        [promotion] = await repository.cancel(session_id, holder)
+
+        with engine.connect() as connection:
+            jobs = connection.execute(select(notification_jobs)).mappings().all()
+        assert [(job["kind"], job["payload"]) for job in jobs] == [(PROMOTED_JOB, promotion.model_dump(mode="json"))]
+
+    async def test_join_with_free_seats_promotes_immediately(
+        self, engine: Engine, repository: WaitlistRepository
+    ) -> None:
+        """Test that joining a session with free seats books one right away."""
+        session_id = await open_session(repository, 1)
+        student = uuid4()
+        await repository.join(session_id, student, email(student))
+
+        assert reserved(engine, session_id) == {student}
+        assert await repository.list(filters={"session_id": session_id}) == []
+        with pytest.raises(EntityConflictError):
+            await repository.join(session_id, student, email(student))
+
+    async def test_join_twice_conflicts(self, repository: WaitlistRepository) -> None:
+        """Test that a student waits for a session only once."""
+        session_id = await open_session(repository, 0)
+        student = uuid4()
+        await repository.join(session_id, student, email(student))
+        with pytest.raises(EntityConflictError):
+            await repository.join(session_id, student, email(student))
+        assert len(await repository.list(filters={"session_id": session_id})) == 1
+
+    async def test_conflicting_students_keep_their_place(self, engine: Engine, repository: WaitlistRepository) -> None:
+        """Test that students with an overlapping seat are skipped but stay on the waitlist."""
+        session_id = await open_session(repository, 0)
+        other = await open_session(repository, 5, STARTS_AT + timedelta(minutes=15))
+        busy, free = uuid4(), uuid4()
+        await repository.join(session_id, busy, email(busy), MembershipTier.UNLIMITED)
+        await repository.join(session_id, free, email(free))
+        await repository.reserve(other, busy)
+
+        promotions = await repository.resize(session_id, 1)
+        assert [promotion.student_id for promotion in promotions] == [free]
+
+        await repository.cancel(other, busy)
+        await repository.resize(session_id, 2)
+        assert reserved(engine, session_id) == {busy, free}
+
+    async def test_resize_promotes_in_bulk(self, engine: Engine, repository: WaitlistRepository) -> None:
+        """Test that added capacity is filled in priority order in one transaction."""
+        session_id = await open_session(repository, 0)
+        students = [uuid4() for _ in range(5)]
+        for student in students:
+            await repository.join(session_id, student, email(student))
+
+        promotions = await repository.resize(session_id, 3)
+
+        assert [promotion.student_id for promotion in promotions] == students[:3]
+        assert await repository.promote(session_id) == []
+        seats = await repository.get_seats(session_id)
+        assert (seats.capacity, seats.seats_taken) == (3, 3)
+        assert await repository.resize(session_id, 1) == []
+        assert reserved(engine, session_id) == set(students[:3])
+
+    async def test_leave(self, repository: WaitlistRepository) -> None:
+        """Test that students who left are never promoted."""
+        session_id = await open_session(repository, 0)
+        first, second = uuid4(), uuid4()
+        await repository.join(session_id, first, email(first))
+        await repository.join(session_id, second, email(second))
+
+        await repository.leave(session_id, first)
+        with pytest.raises(EntityNotFoundError):
+            await repository.leave(session_id, first)
+
+        promotions = await repository.resize(session_id, 2)
+        assert [promotion.student_id for promotion in promotions] == [second]
+
+    async def test_cancel_without_seat(self, repository: WaitlistRepository) -> None:
+        """Test that cancelling a seat the student does not hold fails."""
+        session_id = await open_session(repository, 1)
+        with pytest.raises(EntityNotFoundError):
+            await repository.cancel(session_id, uuid4())
+
+    async def test_stale_queue_is_reloaded(self, engine: Engine, repository: WaitlistRepository) -> None:
+        """Test that changes made by another worker are picked up through the version."""
+        session_id = await open_session(repository, 0)
+        await repository.join(session_id, uuid4(), "drop-in@example.com", MembershipTier.DROP_IN)
+        other_worker = WaitlistRepository(engine, WaitlistQueues())
+        vip = uuid4()
+        await other_worker.join(session_id, vip, email(vip), MembershipTier.UNLIMITED)
+
+        promotions = await repository.resize(session_id, 1)
+        assert [promotion.student_id for promotion in promotions] == [vip]
+
+    async def test_failed_operation_discards_cached_queue(self, engine: Engine, repository: WaitlistRepository) -> None:
+        """Test that a rolled back change cannot leave a wrong queue behind."""
+        session_id = await open_session(repository, 0)
+        student = uuid4()
+        await repository.join(session_id, student, email(student))
+        assert len(repository.queues) == 1
+
+        with pytest.raises(EntityNotFoundError):
+            await repository.leave(session_id, uuid4())
+        assert len(repository.queues) == 0
+        with engine.begin() as connection:
+            count = connection.scalar(select(func.count()).select_from(waitlist_entries))
+            connection.execute(update(session_seats).values(capacity=1))
+        assert count == 1
+        assert [promotion.student_id for promotion in await repository.promote(session_id)] == [student]
+
+    async def test_changes_publish_availability(self, repository: WaitlistRepository) -> None:
+        """Test that seat counts and the waitlist length are announced."""
+        session_id = await open_session(repository, 1)
+        with broadcaster.subscribe([availability_topic(session_id)]) as subscription:
+            await repository.reserve(session_id, uuid4())
+            await repository.join(session_id, uuid4(), "late@example.com")
+            # Updates are coalesced per topic, so only the latest is read
+            message = await subscription.get(timeout=0)
+
+        assert message is not None
+        assert message.data["seats_taken"] == 1
+        assert message.data["waitlist"] == 1
+
+    async def test_promoted_student_is_emailed(
+        self, engine: Engine, repository: WaitlistRepository, smtp_server: SMTPStandIn
+    ) -> None:
+        """Test that the promotion job is delivered to the address the student joined with."""
+        session_id = await open_session(repository, 1)
+        holder, waiting = uuid4(), uuid4()
+        await repository.reserve(session_id, holder)
+        await repository.join(session_id, waiting, "ana@example.com")
+        [promotion] = await repository.cancel(session_id, holder)
+
+        pool = SMTPPool(reconnect_backoff=0.01)
+        sender = NotificationSender(
+            engine, pool, TemplateRenderer(), SMTPServer(host="127.0.0.1", port=smtp_server.port)
+        )
+        report = await sender.send_pending()
+        pool.close()
+
+        assert (report.sent, report.failed) == (1, 0)
+        [received] = smtp_server.messages
+        assert received.recipients == ["ana@example.com"]
+        assert received.message["To"] == "ana@example.com"
+        assert f"Reservation: {promotion.reservation_id}" in received.message.get_payload()
@@ -0,0 +1 @@
+"""Pytest plugins used by the test suite."""
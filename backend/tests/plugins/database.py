@@ -0,0 +1,186 @@
+"""Pytest plugin providing PostgreSQL fixtures with per-test rollback.
+
+Migrating a schema takes seconds, so it happens at most once per session: the
+first worker to need the database creates ``boneca_test_template`` and migrates
+it with Alembic. The template records the migration head it was built for (as
+its comment) and is reused by later sessions until a new migration appears.
+Every worker (the main process, or each ``pytest -n`` worker of pytest-xdist)
+then clones the template into a database of its own with
+``CREATE DATABASE ... TEMPLATE``, a file copy that takes milliseconds, and drops
+it at the end of the session. An advisory lock keeps concurrent workers from
+building the template twice.
+
+Each test gets a single connection with an open transaction that is rolled back
+at teardown. The connection turns the commits and rollbacks of the code under
+test into savepoints (``SavepointConnection``): repositories run their usual
+transactions, a failing transaction only rolls back to its savepoint, and
+nothing outlives the test. ``db_engine`` is that connection's engine, installed
+as the application engine for the test.
+
+``TEST_DATABASE_URL`` names the maintenance database of a server and a role
+allowed to create databases; it defaults to the configured server and
+credentials. Tests using the fixtures are skipped when the server cannot be
+reached.
+"""
+import os
+import subprocess
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import psycopg2  # type: ignore[import-untyped]
+import psycopg2.extensions  # type: ignore[import-untyped]
+import pytest
+from sqlalchemy import URL, Engine, create_engine, make_url, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool, StaticPool
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from src.core import database
+from src.core.config import settings
+from src.core.query_log import instrument_engine
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+TEMPLATE_DATABASE = "boneca_test_template"
+# Advisory lock serializing template builds across workers and concurrent runs
+TEMPLATE_LOCK = 7_310_045
+SAVEPOINT = "test_transaction"
+
+
+class SavepointConnection(psycopg2.extensions.connection):
+    """psycopg2 connection whose commits and rollbacks stay inside the test transaction.
+
+    The first statement opens the test transaction and a savepoint. ``commit``
+    releases the savepoint and starts the next one, ``rollback`` returns to it,
+    and ``rollback_test`` ends the test transaction for real.
+    """
+
+    def _savepoint(self, statement: str) -> None:
+        with self.cursor() as cursor:
+            cursor.execute(statement)
+
+    def begin_test(self) -> None:
+        """Open the test transaction and its first savepoint."""
+        self._savepoint(f"SAVEPOINT {SAVEPOINT}")
+
+    def commit(self) -> None:
+        """Keep the changes of the finished transaction and open the next savepoint."""
+        self._savepoint(f"RELEASE SAVEPOINT {SAVEPOINT}; SAVEPOINT {SAVEPOINT}")
+
+    def rollback(self) -> None:
+        """Undo the changes since the last commit."""
+        self._savepoint(f"ROLLBACK TO SAVEPOINT {SAVEPOINT}")
+
+    def rollback_test(self) -> None:
+        """Roll back everything the test did."""
+        super().rollback()
+
+
+def admin_url() -> URL:
+    """Get the URL of the maintenance database used to create the test databases."""
+    url = os.environ.get("TEST_DATABASE_URL")
+    return make_url(url) if url else make_url(settings.DATABASE_URL).set(database="postgres")
+
+
+def worker_database(worker: str) -> str:
+    """Get the name of the database of an xdist worker (``gw0``, ...) or of the main process."""
+    return f"boneca_test_{worker}"
+
+
+def migration_head() -> str:
+    """Get the head revision of the Alembic migrations."""
+    script = ScriptDirectory.from_config(Config(str(BACKEND_ROOT / "alembic.ini")))
+    return script.get_current_head() or ""
+
+
+def migrate(url: URL) -> None:
+    """Create the application schema in a database and migrate it to the head revision."""
+    engine = create_engine(url, poolclass=NullPool)
+    with engine.begin() as connection:
+        connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{settings.DATABASE_SCHEMA}"'))
+    engine.dispose()
+    environment = {
+        **os.environ,
+        "DATABASE_HOST": url.host or "localhost",
+        "DATABASE_PORT": str(url.port or 5432),
+        "DATABASE_USER": url.username or "",
+        "DATABASE_PASSWORD": url.password or "",
+        "DATABASE_NAME": url.database or "",
+    }
+    completed = subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_ROOT,
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Migrating {url.database} failed:\n{completed.stdout}{completed.stderr}")
+
+
+def build_template(admin: Engine) -> None:
+    """Create and migrate the template database unless it is already at the migration head."""
+    head = migration_head()
+    with admin.connect() as connection:
+        built_for = connection.scalar(
+            text("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = :name"),
+            {"name": TEMPLATE_DATABASE},
+        )
+        if built_for == head:
+            return
+        connection.execute(text(f"DROP DATABASE IF EXISTS {TEMPLATE_DATABASE}"))
+        connection.execute(text(f"CREATE DATABASE {TEMPLATE_DATABASE}"))
+    migrate(admin.url.set(database=TEMPLATE_DATABASE))
+    with admin.connect() as connection:
+        # Recorded last, so a half-built template is rebuilt by the next session
+        connection.execute(text(f"COMMENT ON DATABASE {TEMPLATE_DATABASE} IS '{head}'"))
+
+
+@pytest.fixture(scope="session")
+def database_url() -> Iterator[URL]:
+    admin = create_engine(
+        admin_url(), isolation_level="AUTOCOMMIT", poolclass=NullPool, connect_args={"connect_timeout": 3}
+    )
+    name = worker_database(os.environ.get("PYTEST_XDIST_WORKER", "main"))
+    try:
+        with admin.connect() as lock:
+            lock.execute(text("SELECT pg_advisory_lock(:key)"), {"key": TEMPLATE_LOCK})
+            build_template(admin)
+            with admin.connect() as connection:
+                connection.execute(text(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)"))
+                connection.execute(text(f"CREATE DATABASE {name} TEMPLATE {TEMPLATE_DATABASE}"))
+            lock.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": TEMPLATE_LOCK})
+    except DBAPIError as error:
+        pytest.skip(f"PostgreSQL test database unavailable: {error.orig}")
+
+    yield admin.url.set(database=name)
+
+    with admin.connect() as connection:
+        connection.execute(text(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)"))
+    admin.dispose()
+
+
+@pytest.fixture
+def db_engine(database_url: URL, monkeypatch: pytest.MonkeyPatch) -> Iterator[Engine]:
+    url = database_url
+    connection: Any = psycopg2.connect(
+        host=url.host,
+        port=url.port,
+        user=url.username,
+        password=url.password,
+        dbname=url.database,
+        options=f"-csearch_path={settings.DATABASE_SCHEMA}",
+        connection_factory=SavepointConnection,
+    )
+    connection.begin_test()
+    engine = create_engine("postgresql+psycopg2://", creator=lambda: connection, poolclass=StaticPool)
+    instrument_engine(engine)
+    monkeypatch.setattr(database, "_engine", engine)
+
+    yield engine
+
+    connection.rollback_test()
+    connection.close()
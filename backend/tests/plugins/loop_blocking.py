@@ -0,0 +1,71 @@
+"""Pytest plugin failing async tests that block the event loop.
+
+A ``BlockingDetector`` watches the event loop of every coroutine test. If the
+test, or the code under test, keeps the loop busy in a single callback for
+longer than the threshold (``loop_block_threshold_ms`` in ``pytest.ini`` or
+``--loop-block-threshold-ms``), the test fails with the stack of the blocking
+call. Tests that block on purpose opt out with ``@pytest.mark.allow_blocking``.
+"""
+import asyncio
+import inspect
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+
+from src.core.loop_monitor import BlockingDetector
+
+DEFAULT_THRESHOLD_MS = "500"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the blocking threshold option."""
+    parser.addini("loop_block_threshold_ms", "Milliseconds an async test may block the event loop", default=None)
+    parser.addoption(
+        "--loop-block-threshold-ms",
+        type=float,
+        default=None,
+        help="Milliseconds an async test may block the event loop (0 disables the check)",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the opt-out marker."""
+    config.addinivalue_line("markers", "allow_blocking: the test may block the event loop")
+
+
+def threshold(config: pytest.Config) -> float:
+    """Get the blocking threshold in seconds."""
+    option = config.getoption("--loop-block-threshold-ms")
+    if option is None:
+        option = float(config.getini("loop_block_threshold_ms") or DEFAULT_THRESHOLD_MS)
+    return float(option) / 1000
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item: pytest.Item) -> Generator[None, Any, Any]:
+    """Run coroutine tests under a blocking detector and fail them if they blocked the loop."""
+    limit = threshold(item.config)
+    function = getattr(item, "obj", None)
+    loop = getattr(item, "funcargs", {}).get("event_loop")
+    if (
+        limit <= 0
+        or not inspect.iscoroutinefunction(function)
+        or not isinstance(loop, asyncio.AbstractEventLoop)
+        or item.get_closest_marker("allow_blocking")
+    ):
+        return (yield)
+
+    detector = BlockingDetector(threshold=limit, on_block=lambda report: None)
+    detector.start(loop)
+    try:
+        result = yield
+    finally:
+        detector.stop()
+    if detector.reports:
+        report = detector.reports[0]
+        pytest.fail(
+            f"Test blocked the event loop for at least {report.blocked_for * 1000:.0f} ms in:\n{report.stack}",
+            pytrace=False,
+        )
+    return result
@@ -0,0 +1,187 @@
+"""Pytest plugin providing a local stand-in SMTP server.
+
+``SMTPStandIn`` speaks enough SMTP for ``smtplib`` (EHLO, AUTH PLAIN, MAIL,
+RCPT, DATA, RSET, NOOP, QUIT), records every accepted message and every
+connection, and can inject failures: per-recipient reply codes and dropped
+connections. The ``smtp_server`` fixture runs one on a free local port.
+"""
+import base64
+import socketserver
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from email import message_from_bytes
+from email.message import Message
+from typing import Any, Optional
+
+import pytest
+
+
+@dataclass
+class ReceivedMessage:
+    """A message accepted by the stand-in.
+
+    Attributes:
+        sender: Envelope sender.
+        recipients: Envelope recipients.
+        data: Raw message.
+        connection: Number of the connection the message arrived on.
+    """
+
+    sender: str
+    recipients: list[str]
+    data: bytes
+    connection: int
+
+    @property
+    def message(self) -> Message:
+        """Get the parsed message."""
+        return message_from_bytes(self.data)
+
+
+@dataclass
+class _Envelope:
+    sender: Optional[str] = None
+    recipients: list[str] = field(default_factory=list)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "SMTPStandIn"
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        number = self.server.connected()
+        envelope = _Envelope()
+        self.reply("220 standin ESMTP")
+        while line := self.rfile.readline():
+            command, _, argument = line.decode().rstrip("\r\n").partition(" ")
+            verb = command.upper()
+            if verb == "EHLO":
+                self.reply("250-standin")
+                self.reply("250-AUTH PLAIN")
+                self.reply("250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 standin")
+            elif verb == "AUTH":
+                _, username, password = base64.b64decode(argument.split(" ")[1]).decode().split("\0")
+                if self.server.password is not None and password != self.server.password:
+                    self.reply("535 Authentication credentials invalid")
+                    continue
+                self.server.logins.append(username)
+                self.reply("235 Authentication successful")
+            elif verb == "MAIL":
+                if self.server.should_drop():
+                    return
+                envelope = _Envelope(sender=argument.split(":", 1)[1].strip("<>").split(">")[0])
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipient = argument.split(":", 1)[1].strip().strip("<>")
+                code = self.server.reject.get(recipient)
+                if code is not None:
+                    self.reply(f"{code} Recipient rejected")
+                else:
+                    envelope.recipients.append(recipient)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = bytearray()
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data += chunk[1:] if chunk.startswith(b"..") else chunk
+                self.server.accept(ReceivedMessage(envelope.sender or "", envelope.recipients, bytes(data), number))
+                envelope = _Envelope()
+                self.reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                envelope = _Envelope() if verb == "RSET" else envelope
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Threaded stand-in SMTP server recording what it receives."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Bind the server; ``port`` 0 picks a free port."""
+        super().__init__((host, port), _Handler)
+        self.messages: list[ReceivedMessage] = []
+        self.logins: list[str] = []
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        # Reply codes for recipients, e.g. {"full@example.com": 452}
+        self.reject: dict[str, int] = {}
+        # Password logins must use; None accepts any
+        self.password: Optional[str] = None
+        self._drops = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Get the port the server listens on."""
+        return int(self.server_address[1])
+
+    def drop_next(self, count: int = 1) -> None:
+        """Close the next ``count`` connections that start a message, without a reply."""
+        with self._lock:
+            self._drops += count
+
+    def should_drop(self) -> bool:
+        """Consume one pending drop, if any."""
+        with self._lock:
+            if self._drops:
+                self._drops -= 1
+                return True
+            return False
+
+    def connected(self) -> int:
+        """Count a new connection and return its number."""
+        with self._lock:
+            self.connections += 1
+            return self.connections
+
+    def accept(self, message: ReceivedMessage) -> None:
+        """Record an accepted message."""
+        with self._lock:
+            self.messages.append(message)
+
+    def process_request_thread(self, request: Any, client_address: Any) -> None:
+        """Track the number of concurrently open connections."""
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def start(self) -> None:
+        """Serve on a background thread."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, name="smtp-stand-in", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+@pytest.fixture
+def smtp_server() -> Iterator[SMTPStandIn]:
+    server = SMTPStandIn()
+    server.start()
+    yield server
+    server.stop()
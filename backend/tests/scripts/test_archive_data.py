@@ -0,0 +1,54 @@
+"""Tests for the archival script."""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import Engine, create_engine, func, insert, select
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import metadata
+from src.domain.classes.repository import class_series, class_series_archive
+from src.scripts.archive_data import main
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine)
+    return engine
+
+
+def test_main_archives_long_deleted_series(engine: Engine, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that only series deleted before the retention period are archived."""
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(class_series),
+            [
+                {
+                    "id": uuid4(),
+                    "title": "Salsa",
+                    "studio_id": uuid4(),
+                    "instructor_id": uuid4(),
+                    "starts_at": now,
+                    "duration_minutes": 60,
+                    "timezone": "UTC",
+                    "recurrence": "RRULE:FREQ=WEEKLY",
+                    "updated_at": now,
+                    "deleted_at": deleted_at,
+                }
+                for deleted_at in (None, now - timedelta(days=1), now - timedelta(days=365))
+            ],
+        )
+
+    with patch("src.core.archive.get_engine", return_value=engine):
+        assert main(["--tenant", "salsa", "--table", "class_series", "--batch-size", "10"]) == 0
+        assert main([]) == 0
+
+    with engine.connect() as connection:
+        assert connection.scalar(select(func.count()).select_from(class_series)) == 2
+        assert connection.scalar(select(func.count()).select_from(class_series_archive)) == 1
+    output = capsys.readouterr().out
+    assert "class_series: archived 1 rows" in output
+    assert "attendance: archived 0 rows" in output
@@ -0,0 +1,24 @@
+"""Tests for the repository statement benchmark."""
+import pytest
+
+from src.scripts.benchmark_statements import MODES, main, run_benchmark
+
+
+async def test_run_benchmark_times_every_query_and_mode() -> None:
+    """Test that both queries are timed in every mode."""
+    results = await run_benchmark("sqlite://", queries=5, rows=120)
+
+    assert [(result.query, result.mode) for result in results] == [
+        (query, mode) for mode in MODES for query in ("get", "list")
+    ]
+    assert all(result.queries == 5 and result.microseconds > 0 for result in results)
+
+
+def test_main_prints_savings(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the command line reports the time per query and the savings."""
+    assert main(["--queries", "3", "--rows", "60"]) == 0
+
+    output = capsys.readouterr().out
+    assert "get rebuilt: 3 queries" in output
+    assert "list prepared: 3 queries" in output
+    assert "us/query" in output and "us saved" in output
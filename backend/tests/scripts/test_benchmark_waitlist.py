@@ -0,0 +1,34 @@
+"""Tests for the waitlist benchmark."""
+import pytest
+from sqlalchemy import func, select
+
+from src.domain.notifications.jobs import notification_jobs
+from src.domain.waitlist.repository import seat_reservations
+from src.scripts.benchmark_waitlist import create_engine_for, main, run_benchmark
+
+
+async def test_run_benchmark_promotes_every_freed_seat() -> None:
+    """Test that each cancellation promotes one student and resizes fill the new seats."""
+    engine = create_engine_for("sqlite://")
+    results = await run_benchmark(engine, sessions=3, capacity=4, waitlist=20, cancellations=2, growth=5, cached=False)
+
+    assert [(result.phase, result.operations, result.promotions) for result in results] == [
+        ("cancellations", 6, 6),
+        ("bulk", 3, 15),
+    ]
+    assert all(result.rate > 0 for result in results)
+    with engine.connect() as connection:
+        assert connection.scalar(select(func.count()).select_from(seat_reservations)) == 3 * (4 + 5)
+        assert connection.scalar(select(func.count()).select_from(notification_jobs)) == 21
+
+
+def test_main_prints_promotion_rates(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the command line reports both phases."""
+    assert (
+        main(["--sessions", "2", "--capacity", "3", "--waitlist", "10", "--cancellations", "5", "--growth", "2"]) == 0
+    )
+
+    output = capsys.readouterr().out
+    assert "cancellations: 6 promotions in 6 operations" in output
+    assert "bulk: 4 promotions in 2 operations" in output
+    assert "promotions/s" in output
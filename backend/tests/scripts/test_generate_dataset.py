@@ -0,0 +1,173 @@
+"""Tests for the synthetic dataset generator."""
+import csv
+import io
+import json
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import Engine, create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import metadata
+from src.domain.attendance.repository import AttendanceRepository, attendance
+from src.domain.classes.schedule import expand
+from src.domain.payments.repository import expected_payments
+from src.scripts.generate_dataset import (
+    PRESETS,
+    TABLES,
+    CsvStream,
+    DatasetGenerator,
+    copy_rows,
+    load,
+    main,
+    truncate,
+    zipf_weights,
+)
+
+UNTIL = date(2026, 10, 19)
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture(scope="module")
+def generator() -> DatasetGenerator:
+    return DatasetGenerator(PRESETS["tiny"], seed=7, until=UNTIL)
+
+
+class TestDatasetGenerator:
+    """Test cases for row generation."""
+
+    def test_same_seed_generates_same_rows(self, generator: DatasetGenerator) -> None:
+        """Test that generation is deterministic."""
+        again = DatasetGenerator(PRESETS["tiny"], seed=7, until=UNTIL)
+        for table in TABLES:
+            assert list(again.rows(table)) == list(generator.rows(table))
+
+    def test_other_seed_generates_other_rows(self, generator: DatasetGenerator) -> None:
+        """Test that the seed changes the dataset."""
+        other = DatasetGenerator(PRESETS["tiny"], seed=8, until=UNTIL)
+        assert list(other.rows("attendance")) != list(generator.rows("attendance"))
+
+    def test_attendance_belongs_to_generated_sessions(self, generator: DatasetGenerator) -> None:
+        """Test that check-ins reference real occurrences and never exceed capacity."""
+        series = {series.id: series for series in generator.series}
+        sessions = {
+            occurrence.id: occurrence.starts_at
+            for item in generator.series
+            for occurrence in expand(item, generator.start, generator.end)
+        }
+        per_session: Counter[tuple] = Counter()
+        for _, series_id, session_id, _, instructor_id, _, starts_at in generator.rows("attendance"):
+            assert sessions[session_id] == starts_at
+            assert series[series_id].instructor_id == instructor_id
+            per_session[series_id, session_id] += 1
+        assert per_session
+        assert all(count <= series[series_id].capacity for (series_id, _), count in per_session.items())
+
+    def test_attendance_is_skewed(self) -> None:
+        """Test that the most active tenth of students accounts for a large share of check-ins."""
+        generator = DatasetGenerator(PRESETS["small"], seed=1, until=UNTIL)
+        counts = Counter(row[3] for row in generator.rows("attendance"))
+        top = sum(count for _, count in counts.most_common(len(generator.students) // 10))
+        assert top / sum(counts.values()) > 0.3
+
+    def test_payments_have_unique_references(self, generator: DatasetGenerator) -> None:
+        """Test that payment references are unique and recent fees are pending."""
+        rows = list(generator.rows("expected_payments"))
+        assert len({row[1] for row in rows}) == len(rows)
+        assert all(row[4] == "pending" for row in rows if row[3] >= date(2026, 10, 1))
+
+    def test_zipf_weights(self) -> None:
+        """Test that each entity adds a smaller weight than the one before."""
+        weights = zipf_weights(3, 1.0)
+        assert weights == pytest.approx([1.0, 1.5, 1.5 + 1 / 3])
+
+
+class TestCsvStream:
+    """Test cases for the COPY input stream."""
+
+    def test_small_reads_reassemble_csv(self) -> None:
+        """Test that reading in small pieces yields the complete CSV."""
+        rows = [(index, f"name, {index}", None) for index in range(25)]
+        stream = CsvStream(rows, batch_rows=4)
+        chunks = []
+        while chunk := stream.read(7):
+            chunks.append(chunk)
+
+        assert list(csv.reader(io.StringIO("".join(chunks)))) == [
+            [str(index), f"name, {index}", ""] for index in range(25)
+        ]
+        assert stream.rows == 25
+
+    def test_read_all(self) -> None:
+        """Test that a negative size reads everything."""
+        assert CsvStream([(1, 2)]).read() == "1,2\n"
+
+
+class TestLoad:
+    """Test cases for bulk loading."""
+
+    async def test_load_and_truncate(self, engine: Engine, generator: DatasetGenerator) -> None:
+        """Test that all rows are loaded, readable through repositories, and removed by truncate."""
+        counts = load(engine, generator)
+
+        with engine.connect() as connection:
+            assert connection.scalar(select(func.count()).select_from(attendance)) == counts["attendance"]
+            assert connection.scalar(select(func.count()).select_from(expected_payments)) == counts["expected_payments"]
+        assert counts["class_series"] == PRESETS["tiny"].series
+        checkin = await AttendanceRepository(engine).list(limit=1)
+        assert checkin[0].starts_at.tzinfo is not None
+
+        truncate(engine)
+        with engine.connect() as connection:
+            assert connection.scalar(select(func.count()).select_from(attendance)) == 0
+
+    def test_copy_rows_batches_inserts(self, engine: Engine, generator: DatasetGenerator) -> None:
+        """Test that loading in small batches loads every row."""
+        assert copy_rows(engine, TABLES["class_series"], generator.rows("class_series"), batch_rows=3) == 20
+
+    def test_copy_rows_uses_copy_on_postgres(self) -> None:
+        """Test that PostgreSQL receives all rows through a single COPY."""
+        engine = MagicMock()
+        engine.dialect.name = "postgresql"
+        cursor = engine.raw_connection.return_value.cursor.return_value
+        cursor.copy_expert.side_effect = lambda sql, stream, size: stream.read()
+
+        assert copy_rows(engine, TABLES["expected_payments"], [(1, "BON1", 4500)] * 3) == 3
+        statement = cursor.copy_expert.call_args.args[0]
+        assert statement.startswith("COPY expected_payments (id, reference, amount_cents, due_on")
+        engine.raw_connection.return_value.commit.assert_called_once()
+
+
+class TestMain:
+    """Test cases for the command line interface."""
+
+    def test_writes_fixture_set(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test that --output writes one CSV per table and a manifest."""
+        assert main(["--size", "tiny", "--seed", "3", "--until", "2026-10-19", "--output", str(tmp_path)]) == 0
+
+        manifest = json.loads((tmp_path / "dataset.json").read_text())
+        assert manifest["seed"] == 3
+        assert manifest["size"]["series"] == 20
+        with open(tmp_path / "class_series.csv", newline="") as file:
+            reader = csv.reader(file)
+            assert next(reader) == [column.name for column in TABLES["class_series"].columns]
+            assert sum(1 for _ in reader) == manifest["rows"]["class_series"]
+        assert "class_series: 20 rows" in capsys.readouterr().out
+
+    def test_loads_database(self, engine: Engine) -> None:
+        """Test that the script loads the tables of the current engine."""
+        with patch("src.scripts.generate_dataset.get_engine", return_value=engine):
+            assert main(["--size", "tiny", "--truncate", "--tenant", "salsa"]) == 0
+            assert main(["--size", "tiny", "--truncate"]) == 0
+
+        with engine.connect() as connection:
+            assert connection.scalar(select(func.count()).select_from(TABLES["class_series"])) == 20
@@ -0,0 +1,78 @@
+"""Tests for the tenant migration script."""
+import subprocess
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine
+
+from src.scripts import migrate_tenants
+from src.scripts.migrate_tenants import (
+    MigrationResult,
+    create_schemas,
+    main,
+    migrate_all,
+    migrate_schema,
+)
+
+
+def completed(returncode: int = 0) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(args=[], returncode=returncode, stdout="out", stderr="err")
+
+
+def test_migrate_schema_runs_alembic_for_schema() -> None:
+    """Test that each schema gets its own Alembic process."""
+    with patch("src.scripts.migrate_tenants.subprocess.run", return_value=completed()) as run:
+        result = migrate_schema("school_salsa", "abc123")
+
+    command = run.call_args.args[0]
+    assert command[-5:] == ["alembic", "-x", "schema=school_salsa", "upgrade", "abc123"]
+    assert result == MigrationResult("school_salsa", 0, "outerr")
+    assert result.ok
+
+
+def test_migrate_all_keeps_order() -> None:
+    """Test that results are returned per schema in input order."""
+    with patch("src.scripts.migrate_tenants.subprocess.run", side_effect=[completed(), completed(1)]):
+        results = migrate_all(["school_a", "school_b"], jobs=1)
+    assert [(result.schema, result.ok) for result in results] == [("school_a", True), ("school_b", False)]
+
+
+def test_create_schemas_quotes_names() -> None:
+    """Test that schemas are created with quoted identifiers."""
+    engine = create_engine("sqlite://")
+    with patch.object(engine, "begin") as begin:
+        create_schemas(engine, ["school_salsa"])
+    statement = begin.return_value.__enter__.return_value.execute.call_args.args[0]
+    assert str(statement) == "CREATE SCHEMA IF NOT EXISTS school_salsa"
+
+
+def test_main_with_explicit_tenants() -> None:
+    """Test migrating explicitly named tenants."""
+    with (
+        patch.object(migrate_tenants, "get_engine", return_value=MagicMock()),
+        patch.object(migrate_tenants, "create_schemas") as create,
+        patch.object(migrate_tenants, "migrate_all", return_value=[MigrationResult("school_salsa", 0, "")]) as run,
+    ):
+        assert main(["--tenant", "salsa", "--create", "--jobs", "2"]) == 0
+
+    assert create.call_args.args[1] == ["school_salsa"]
+    run.assert_called_once_with(["school_salsa"], "head", 2)
+
+
+def test_main_discovers_tenants_and_reports_failures() -> None:
+    """Test that failures are reported with a non-zero exit code."""
+    with (
+        patch.object(migrate_tenants, "get_engine", return_value=MagicMock()),
+        patch.object(migrate_tenants, "discover_tenant_schemas", return_value=["school_a"]),
+        patch.object(migrate_tenants, "migrate_all", return_value=[MigrationResult("school_a", 1, "boom")]),
+    ):
+        assert main([]) == 1
+
+
+def test_discover_tenant_schemas_filters_by_prefix() -> None:
+    """Test that schema discovery queries by the tenant prefix."""
+    engine = MagicMock()
+    connection = engine.connect.return_value.__enter__.return_value
+    connection.execute.return_value.scalars.return_value = ["school_a", "school_b"]
+
+    assert migrate_tenants.discover_tenant_schemas(engine) == ["school_a", "school_b"]
+    assert connection.execute.call_args.args[1] == {"prefix": "school_"}
@@ -0,0 +1,32 @@
+"""Tests for the payment reconciliation script."""
+import csv
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.domain.payments.reconcile import ReconciliationReport
+from src.domain.payments.schemas import RejectedLine, StatementLine
+from src.scripts.reconcile_payments import main
+
+
+def test_main_writes_unmatched_lines(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the script prints a summary and exports unmatched lines."""
+    report = ReconciliationReport(
+        lines=2,
+        matched=1,
+        unmatched_lines=[StatementLine(3, date(2026, 10, 2), 1205, "RF09")],
+        rejected_lines=[RejectedLine(4, "invalid amount 'one'")],
+    )
+    output = tmp_path / "unmatched.csv"
+    with patch("src.scripts.reconcile_payments.Reconciler.reconcile", AsyncMock(return_value=report)) as reconcile:
+        assert main(["statement.csv", "--tenant", "salsa", "--unmatched", str(output)]) == 0
+
+    reconcile.assert_awaited_once_with("statement.csv")
+    assert "line 4: invalid amount 'one'" in capsys.readouterr().out
+    with open(output, newline="") as file:
+        assert list(csv.reader(file)) == [
+            ["line_number", "booking_date", "amount", "reference"],
+            ["3", "2026-10-02", "12.05", "RF09"],
+        ]
@@ -0,0 +1,35 @@
+"""Tests for the notification sending script."""
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import metadata
+from src.domain.notifications.jobs import enqueue, notification_jobs
+from src.domain.notifications.smtp import SMTPServer
+from src.scripts.send_notifications import main
+from tests.plugins.smtp_server import SMTPStandIn
+
+
+def test_main_sends_due_jobs(smtp_server: SMTPStandIn, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that due jobs are sent and give-ups are reflected in the exit code."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata.create_all(engine, tables=[notification_jobs])
+    payload = {"session_id": "s", "student_id": "u", "reservation_id": "r", "promoted_at": "now"}
+    with engine.begin() as connection:
+        enqueue(connection, "waitlist.promoted", [{**payload, "email": "ana@example.com"}, payload])
+
+    server = SMTPServer(host="127.0.0.1", port=smtp_server.port)
+    with (
+        patch("src.domain.notifications.sender.get_engine", return_value=engine),
+        patch("src.domain.notifications.sender.SMTPServer", return_value=server),
+    ):
+        assert main(["--tenant", "salsa", "--batch-size", "10"]) == 1
+        assert main([]) == 0
+
+    assert [received.recipients for received in smtp_server.messages] == [["ana@example.com"]]
+    output = capsys.readouterr().out
+    assert "sent 1, retrying 0, failed 1 in 1 batches" in output
+    assert "sent 0, retrying 0, failed 0 in 0 batches" in output